@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: block-length sweep versus one daily-history run per combination.
+
+Writes a synthetic hourly PZU history and evaluates every charge/discharge
+block-length combination (1-4h each) for several power ratings, first by
+calling load_pzu_daily_history once per (power, charge, discharge) and then
+with one sweep_block_lengths call. Before timing it checks that:
+- the scalar and batched evaluators agree for unequal blocks;
+- the sweep totals match the per-combination runs.
+
+Usage:
+    python benchmarks/bench_block_sweep.py [--years 3] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.horizon import (
+    _evaluate_two_by_two_cycle,
+    _evaluate_two_by_two_cycle_batch,
+    load_pzu_daily_history,
+    sweep_block_lengths,
+)
+
+CAPACITY_MWH = 55.0
+ETA = 0.9
+POWERS = (10.0, 15.0, 20.0, 27.5)
+HOURS = (1, 2, 3, 4)
+
+
+def write_prices(folder: Path, years: int, seed: int = 9) -> Path:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2022-01-01", periods=years * 365, freq="D")
+    hours = np.tile(np.arange(24), len(days))
+    shape = 90 + 35 * np.sin((hours - 6) / 24 * 4 * np.pi)
+    prices = pd.DataFrame(
+        {
+            "date": np.repeat(days.strftime("%Y-%m-%d"), 24),
+            "hour": hours,
+            "price": shape + rng.normal(0, 25, len(hours)),
+            "currency": "EUR",
+        }
+    )
+    path = folder / "pzu_history.csv"
+    prices.to_csv(path, index=False)
+    return path
+
+
+def check_scalar_vs_batch(seed: int = 2):
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(90, 40, (20, 24))
+    for charge_hours, discharge_hours in ((1, 3), (3, 1), (4, 2)):
+        batch = _evaluate_two_by_two_cycle_batch(matrix, CAPACITY_MWH, 20.0, ETA, charge_hours, discharge_hours)
+        for day, prices in enumerate(matrix):
+            scalar = _evaluate_two_by_two_cycle(list(prices), CAPACITY_MWH, 20.0, ETA, charge_hours, discharge_hours)
+            assert scalar["buy_start_hour"] == batch["buy_start_hour"][day]
+            assert scalar["sell_start_hour"] == batch["sell_start_hour"][day]
+            assert np.isclose(scalar["profit_eur"], batch["profit_eur"][day])
+
+
+def per_combination(csv):
+    rows = []
+    for power in POWERS:
+        for charge_hours in HOURS:
+            for discharge_hours in HOURS:
+                history = load_pzu_daily_history(
+                    csv,
+                    CAPACITY_MWH,
+                    ETA,
+                    power_mw=power,
+                    charge_hours=charge_hours,
+                    discharge_hours=discharge_hours,
+                )
+                rows.append((power, charge_hours, discharge_hours, float(history["daily_profit_eur"].sum())))
+    return rows
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Block-length sweep vs per-combination runs")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    check_scalar_vs_batch()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = str(write_prices(Path(tmp), args.years))
+        per_combination(csv)  # warm the price cube
+        t_old, old = best_of(lambda: per_combination(csv), args.repeat)
+        t_new, sweep = best_of(
+            lambda: sweep_block_lengths(csv, CAPACITY_MWH, POWERS, ETA, charge_hours=HOURS, discharge_hours=HOURS),
+            args.repeat,
+        )
+
+    indexed = sweep.set_index(["power_mw", "charge_hours", "discharge_hours"])["total_profit_eur"]
+    for power, charge_hours, discharge_hours, total in old:
+        assert np.isclose(indexed.loc[(power, charge_hours, discharge_hours)], total), (power, charge_hours, discharge_hours)
+
+    best = sweep.loc[sweep.groupby("power_mw")["total_profit_eur"].idxmax()]
+    print(f"{len(old)} combinations over {int(sweep['days'].iloc[0]):,} days; sweep matches per-combination runs")
+    print(best[["power_mw", "charge_hours", "discharge_hours", "total_profit_eur"]].to_string(index=False))
+    print(f"one run per combination     {t_old * 1000:9.1f} ms")
+    print(f"sweep_block_lengths         {t_new * 1000:9.1f} ms  ({t_old / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold import time of the headless compute core versus the web modules.
+
+Each import runs in a fresh interpreter so nothing is shared between
+measurements. For the src.core modules the script also checks that Streamlit
+was never loaded, which is what lets batch jobs run where it is not installed.
+
+Usage:
+    python benchmarks/bench_core_import.py [--repeats 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import subprocess
+
+ROOT = Path(__file__).parent.parent
+
+CORE = "src.core.frequency_regulation, src.core.loaders, src.core.pzu, src.core.finance"
+WEB = "src.web.simulation.frequency_regulation, src.web.data.loaders, src.web.analysis"
+
+PROBE = (
+    "import sys, time\n"
+    "t0 = time.perf_counter()\n"
+    "import {modules}\n"
+    "print(time.perf_counter() - t0, 'streamlit' in sys.modules)\n"
+)
+
+
+def cold_import(modules: str):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), out[1] == "True"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold import time of src.core vs src.web")
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    core = [cold_import(CORE) for _ in range(args.repeats)]
+    assert not any(loaded for _, loaded in core), "src.core pulled in streamlit"
+    print("src.core imports without streamlit")
+    core_s = min(t for t, _ in core)
+    print(f"src.core  {core_s * 1000:9.1f} ms")
+
+    try:
+        web_s = min(cold_import(WEB)[0] for _ in range(args.repeats))
+    except subprocess.CalledProcessError:
+        print("src.web   (not importable here: streamlit missing)")
+        return
+    print(f"src.web   {web_s * 1000:9.1f} ms  ({web_s / core_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
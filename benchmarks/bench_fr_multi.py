@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: multi-product FR revenue simulation over several years of 15-minute slots.
+
+Builds a synthetic price frame (string dates, as loaded from CSV) with DAMAS
+activation columns and a PZU hedge curve, plus an FCR availability calendar,
+a system imbalance table and an aFRR activation curve, then times
+src.core.fr_engine.simulate_fr_multi for FCR + aFRR + mFRR with
+SOC tracking: restarting SOC every month, carrying it across months, and
+with all three products sharing one 15 MW / 55 MWh battery. The engine is called directly: the Streamlit wrapper caches
+results, which would turn repeats into cache hits.
+
+Usage:
+    python benchmarks/bench_fr_multi.py [--years 3] [--repeat 5]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.fr_engine import simulate_fr_multi
+
+PRODUCTS = {
+    "FCR": {"enabled": True, "mw": 10, "cap_eur_mw_h": 7.5, "up_thr": 0.0, "down_thr": 0.0},
+    "aFRR": {"enabled": True, "mw": 15, "cap_eur_mw_h": 5.0, "up_thr": 0.0, "down_thr": 0.0},
+    "mFRR": {"enabled": True, "mw": 15, "cap_eur_mw_h": 3.0, "up_thr": 120.0, "down_thr": 30.0},
+}
+
+
+def make_inputs(years, seed=5):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2023-01-01", periods=years * 365, freq="D")
+    dates = np.repeat(days.strftime("%Y-%m-%d"), 96)
+    slots = np.tile(np.arange(96), len(days))
+    n = len(dates)
+    prices = pd.DataFrame({"date": dates, "slot": slots, "price_eur_mwh": rng.normal(80, 120, n)})
+    for col in ("afrr_up_activated_mwh", "afrr_down_activated_mwh"):
+        prices[col] = rng.gamma(1.0, 3.0, n) * (rng.random(n) < 0.4)
+    prices["afrr_up_price_eur"] = rng.normal(150, 50, n)
+    prices["afrr_down_price_eur"] = rng.normal(-20, 60, n)
+    hedge = rng.normal(90, 30, n)
+    hedge[rng.random(n) < 0.05] = np.nan
+    prices["hedge_price_eur_mwh"] = hedge
+
+    keys = prices[["date", "slot"]]
+    calendar = keys.assign(available_mw=rng.uniform(0.0, 12.0, n))
+    imbalance = keys.assign(imbalance_mw=rng.normal(0, 40, n))
+    curve = pd.Series(
+        rng.uniform(0.2, 1.0, n),
+        index=pd.MultiIndex.from_arrays([pd.to_datetime(prices["date"]).to_numpy(), slots]),
+    )
+    extras = {
+        "calendars": {"FCR": calendar},
+        "system_imbalance_df": imbalance,
+        "activation_curve_map": {"aFRR": curve},
+    }
+    return prices, extras
+
+
+def run(prices, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return simulate_fr_multi(
+            prices, PRODUCTS, battery_power_mw=15.0, battery_capacity_mwh=55.0,
+            merit_order_activation_rate=0.5, **kwargs,
+        )
+
+
+def bench(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Multi-product FR engine timing")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    prices, extras = make_inputs(args.years)
+    run(prices.iloc[:960], **extras)  # compile the SOC kernel outside the timings
+    print(f"{len(prices):,} slots x {len(PRODUCTS)} products")
+
+    cases = (
+        ("market data only", {}),
+        ("+ calendar, imbalance, curve", extras),
+        ("+ SOC carried across months", dict(extras, soc_continuous=True)),
+        ("+ shared SOC, priority", dict(extras, soc_continuous=True, shared_soc=True,
+                                        product_priority=["FCR", "aFRR", "mFRR"])),
+        ("+ shared SOC, pro rata", dict(extras, soc_continuous=True, shared_soc=True, soc_allocation="pro_rata")),
+    )
+    for label, kwargs in cases:
+        t, result = bench(lambda: run(prices, **kwargs), args.repeat)
+        totals = result["combined_totals"]
+        monthly = result["combined_monthly"]
+        assert totals["months"] == len(monthly) == args.years * 12
+        assert np.isclose(totals["total_revenue_eur"], sum(r["total_revenue_eur"] for r in monthly))
+        for prod, rows in result["monthly_by_product"].items():
+            assert np.isclose(result["totals_by_product"][prod]["capacity_revenue_eur"],
+                              sum(r["capacity_revenue_eur"] for r in rows))
+        print(f"{label:<30} {t * 1000:8.1f} ms  total={totals['total_revenue_eur']:,.0f} EUR")
+
+
+if __name__ == "__main__":
+    main()
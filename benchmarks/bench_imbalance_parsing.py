@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: imbalance file normalization on a synthetic year of 15-minute data.
+
+Builds 35,040 rows (365 days x 96 slots) in the two layouts handled by
+src/tools/aggregate_imbalance_manual.py -- the export-8 sheet with
+"1. 6. 2024 0:00 - 1. 6. 2024 0:15" interval labels, and a plain
+date/time/price table with "HH:MM" labels -- and reports rows/second for
+_normalize on each.
+
+Usage:
+    python benchmarks/bench_imbalance_parsing.py [--days 365] [--repeat 5]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import contextlib
+import io
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.tools.aggregate_imbalance_manual import _detect_columns, _normalize
+
+
+def build_export8(days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    labels = []
+    start = date(2024, 1, 1)
+    for offset in range(days):
+        d = start + timedelta(days=offset)
+        stamp = f"{d.day}. {d.month}. {d.year}"
+        for slot in range(96):
+            hh, mm = divmod(slot * 15, 60)
+            end_hh, end_mm = divmod(slot * 15 + 15, 60)
+            labels.append(f"{stamp} {hh}:{mm:02d} - {stamp} {end_hh % 24}:{end_mm:02d}")
+    n = len(labels)
+    header = ["Time interval", "Unnamed: 1", "Unnamed: 2", "Unnamed: 3"]
+    body = pd.DataFrame(
+        {
+            header[0]: labels,
+            header[1]: rng.normal(0, 50, n),
+            header[2]: rng.normal(300, 80, n),
+            header[3]: rng.normal(300, 80, n),
+        }
+    )
+    # Four header rows precede the data in real exports.
+    preamble = pd.DataFrame({c: ["header"] * 4 for c in header})
+    return pd.concat([preamble, body], ignore_index=True)
+
+
+def build_plain(days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D").strftime("%Y-%m-%d")
+    times = [f"{s // 4:02d}:{(s % 4) * 15:02d}" for s in range(96)]
+    return pd.DataFrame(
+        {
+            "date": np.repeat(dates, 96),
+            "time": np.tile(times, days),
+            "price": rng.normal(300, 80, days * 96),
+            "frequency": 50 + rng.normal(0, 0.02, days * 96),
+        }
+    )
+
+
+def bench(name: str, df: pd.DataFrame, repeat: int) -> None:
+    columns = _detect_columns(df) if "date" in df.columns else (None, None, "Unnamed: 3", None)
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            out = _normalize(df, *columns)
+            best = min(best, time.perf_counter() - t0)
+        rows = len(out)
+    print(f"{name:<10} {rows:>8} rows  {best * 1000:8.1f} ms  {rows / best:>12,.0f} rows/s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    bench("export-8", build_export8(args.days), args.repeat)
+    bench("date/time", build_plain(args.days), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
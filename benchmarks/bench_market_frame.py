@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FR inputs joined per run versus one pre-joined market frame.
+
+Writes synthetic imbalance, PZU and DAMAS CSVs to a temporary folder, then
+times the FR Simulator's previous per-run path (load imbalance prices, merge
+the PZU hedge curve and the DAMAS file on string (date, slot) keys, then
+simulate) against building the frame with build_market_frame once and
+simulating on it. Both paths must produce the same totals.
+
+Usage:
+    python benchmarks/bench_market_frame.py [--years 3] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.fr_engine import simulate_fr_multi
+from src.core.loaders import build_hedge_price_curve, load_transelectrica_imbalance_from_excel
+from src.core.market_frame import DAMAS_COLUMNS, build_market_frame
+from src.data.market_cache import read_csv_cached
+from src.data.slot_axis import NO_SLOT, slot_index
+
+PRODUCTS = {
+    "FCR": {"enabled": True, "mw": 10, "cap_eur_mw_h": 7.5},
+    "aFRR": {"enabled": True, "mw": 10, "cap_eur_mw_h": 5.0},
+    "mFRR": {"enabled": True, "mw": 10, "cap_eur_mw_h": 3.0},
+}
+
+
+def write_inputs(folder: Path, years: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2023-01-01", periods=years * 365, freq="D")
+    dates = np.repeat(days.strftime("%Y-%m-%d"), 96)
+    slots = np.tile(np.arange(96), len(days))
+    # Real exports have no rows for the hour skipped when clocks go forward
+    real = slot_index(dates, slots) != NO_SLOT
+    dates, slots = dates[real], slots[real]
+    n = len(dates)
+
+    imbalance = pd.DataFrame({"date": dates, "slot": slots, "price_eur_mwh": rng.normal(80, 120, n)})
+    imbalance.to_csv(folder / "imbalance_history.csv", index=False)
+
+    hours = np.tile(np.arange(24), len(days))
+    pzu = pd.DataFrame({"date": np.repeat(days.strftime("%Y-%m-%d"), 24), "hour": hours,
+                        "price": rng.normal(90, 30, len(hours)), "currency": "EUR"})
+    pzu.to_csv(folder / "pzu_history.csv", index=False)
+
+    damas = pd.DataFrame({"date": dates, "slot": slots})
+    for name in DAMAS_COLUMNS:
+        if name.endswith("_mwh"):
+            damas[name] = rng.gamma(1.0, 3.0, n) * (rng.random(n) < 0.4)
+        else:
+            damas[name] = rng.normal(120, 60, n)
+    damas.to_csv(folder / "damas.csv", index=False)
+    return folder / "imbalance_history.csv", folder / "pzu_history.csv", folder / "damas.csv"
+
+
+def per_run_join(imbalance_csv, pzu_csv, damas_csv):
+    imb = load_transelectrica_imbalance_from_excel(str(imbalance_csv))
+    dates = pd.to_datetime(imb["date"], errors="coerce").dropna()
+    hedge = build_hedge_price_curve(str(pzu_csv), start_date=dates.min(), end_date=dates.max())
+    imb = imb.merge(hedge.drop(columns="slot_index"), on=["date", "slot"], how="left")
+    damas = read_csv_cached(str(damas_csv))
+    damas["date"] = pd.to_datetime(damas["date"]).dt.date.astype(str)
+    damas["slot"] = damas["slot"].astype(int)
+    return imb.merge(damas[["date", "slot", *DAMAS_COLUMNS]], on=["date", "slot"], how="left")
+
+
+def simulate(prices):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return simulate_fr_multi(prices, PRODUCTS, battery_power_mw=15.0, battery_capacity_mwh=55.0)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-run joins vs a pre-joined market frame")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        imbalance_csv, pzu_csv, damas_csv = write_inputs(Path(tmp), args.years)
+        simulate(per_run_join(imbalance_csv, pzu_csv, damas_csv))  # warm sidecars and the SOC kernel
+
+        t_old, old = best_of(lambda: simulate(per_run_join(imbalance_csv, pzu_csv, damas_csv)), args.repeat)
+        t_build, frame = best_of(
+            lambda: build_market_frame(str(imbalance_csv), pzu_csv=str(pzu_csv), damas_csv=str(damas_csv)),
+            args.repeat,
+        )
+        t_run, new = best_of(lambda: simulate(frame), args.repeat)
+
+    for key in ("capacity_revenue_eur", "activation_revenue_eur", "total_revenue_eur"):
+        assert np.isclose(old["combined_totals"][key], new["combined_totals"][key]), key
+    print(f"{len(frame):,} slots; totals match")
+    print(f"join + simulate per run   {t_old * 1000:9.1f} ms")
+    print(f"build frame (once)        {t_build * 1000:9.1f} ms")
+    print(f"simulate on frame         {t_run * 1000:9.1f} ms  ({t_old / t_run:.1f}x per run)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark: multi-cycle-per-day PZU scheduler.
+
+Before timing it checks _best_k_cycles_batch in two ways:
+- against brute-force enumeration of every set of non-overlapping 2h/2h
+  cycles on random days, for K = 1, 2 and 3;
+- against load_pzu_daily_history for K = 1, where a loss-making best pair
+  is replaced by an idle day.
+
+It then times compute_multi_cycle_schedule for K = 1..3 on synthetic
+histories of growing length to show the cost is linear in the number of
+days. Brute force is timed on a small sample for comparison.
+
+Usage:
+    python benchmarks/bench_multi_cycle.py [--max-years 8] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.horizon import (
+    _best_k_cycles_batch,
+    _block_sums,
+    compute_multi_cycle_schedule,
+    load_pzu_daily_history,
+)
+
+CAPACITY_MWH = 55.0
+POWER_MW = 20.0
+ETA = 0.9
+BLOCK = 2
+
+
+def write_prices(folder: Path, years: int, seed: int = 4) -> Path:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2020-01-01", periods=years * 365, freq="D")
+    hours = np.tile(np.arange(24), len(days))
+    # Two peaks and a midday solar dip give two-cycle days
+    shape = 90 + 35 * np.sin((hours - 6) / 24 * 4 * np.pi) - 30 * np.exp(-((hours - 13) ** 2) / 5)
+    prices = pd.DataFrame(
+        {
+            "date": np.repeat(days.strftime("%Y-%m-%d"), 24),
+            "hour": hours,
+            "price": shape + rng.normal(0, 25, len(hours)),
+            "currency": "EUR",
+        }
+    )
+    path = folder / f"pzu_{years}y.csv"
+    prices.to_csv(path, index=False)
+    return path
+
+
+def brute_force_day(prices, cycles, charge_power, discharge_power):
+    cost = charge_power * _block_sums(prices[None, :], BLOCK)[0]
+    revenue = discharge_power * _block_sums(prices[None, :], BLOCK)[0]
+    n = len(prices)
+    pairs = [(b, s) for b in range(n - 2 * BLOCK + 1) for s in range(b + BLOCK, n - BLOCK + 1)]
+
+    def search(start, left):
+        best = 0.0
+        if left == 0:
+            return best
+        for b, s in pairs:
+            if b >= start:
+                best = max(best, revenue[s] - cost[b] + search(s + BLOCK, left - 1))
+        return best
+
+    return search(0, cycles)
+
+
+def check_exact(seed: int = 8):
+    rng = np.random.default_rng(seed)
+    charge_energy = min(CAPACITY_MWH, POWER_MW * BLOCK)
+    charge_power, discharge_power = charge_energy / BLOCK, charge_energy * ETA / BLOCK
+    matrix = rng.normal(90, 45, (6, 14))
+    for cycles in (1, 2, 3):
+        batch = _best_k_cycles_batch(matrix, cycles, charge_power, discharge_power, BLOCK, BLOCK)
+        for day, prices in enumerate(matrix):
+            expected = brute_force_day(prices, cycles, charge_power, discharge_power)
+            assert np.isclose(batch["profit_eur"][day], expected), (cycles, day)
+            buys, sells = batch["buy_start_hours"][day], batch["sell_start_hours"][day]
+            used = buys >= 0
+            assert (sells[used] >= buys[used] + BLOCK).all()
+            assert (buys[used][1:] >= sells[used][:-1] + BLOCK).all(), "cycles overlap"
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Multi-cycle PZU scheduler scaling")
+    ap.add_argument("--max-years", type=int, default=8)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    check_exact()
+
+    years_list = [y for y in (1, 2, 4, 8, 16) if y <= args.max_years]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {years: str(write_prices(Path(tmp), years)) for years in years_list}
+
+        single = load_pzu_daily_history(paths[years_list[0]], CAPACITY_MWH, ETA, power_mw=POWER_MW)
+        one = compute_multi_cycle_schedule(paths[years_list[0]], CAPACITY_MWH, POWER_MW, ETA, cycles_per_day=1)
+        np.testing.assert_allclose(
+            one["daily_history"]["daily_profit_eur"], np.maximum(single["daily_profit_eur"], 0.0), atol=1e-6
+        )
+        print("brute-force and single-cycle checks pass")
+
+        print(f"{'days':>7} {'K':>2} {'ms':>9} {'us/day':>8} {'profit EUR':>14} {'2+ cycle days':>14}")
+        for years in years_list:
+            for cycles in (1, 2, 3):
+                compute_multi_cycle_schedule(paths[years], CAPACITY_MWH, POWER_MW, ETA, cycles_per_day=cycles)
+                elapsed, result = best_of(
+                    lambda: compute_multi_cycle_schedule(paths[years], CAPACITY_MWH, POWER_MW, ETA, cycles_per_day=cycles),
+                    args.repeat,
+                )
+                stats = result["stats"]
+                days = stats["total_days"]
+                print(f"{days:7,} {cycles:2d} {elapsed * 1000:9.1f} {elapsed / days * 1e6:8.1f} "
+                      f"{stats['total_profit_eur']:14,.0f} {stats['multi_cycle_days']:14,}")
+
+    rng = np.random.default_rng(0)
+    sample = rng.normal(90, 45, (20, 24))
+    charge_energy = min(CAPACITY_MWH, POWER_MW * BLOCK)
+    for cycles in (1, 2):
+        t0 = time.perf_counter()
+        for prices in sample:
+            brute_force_day(prices, cycles, charge_energy / BLOCK, charge_energy * ETA / BLOCK)
+        per_day = (time.perf_counter() - t0) / len(sample)
+        print(f"brute force, K={cycles}: {per_day * 1e6:,.0f} us/day")
+
+
+if __name__ == "__main__":
+    main()
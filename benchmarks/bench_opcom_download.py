@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OPCOM direct-CSV downloads against a local stand-in server.
+
+Runs entirely offline. Starts src.tools.opcom_standin with per-response
+latency, then:
+  1. downloads N days with 1 worker (the old sequential behaviour) and with
+     the thread pool, reporting days/second;
+  2. checks retries: every day fails once with 503 before succeeding;
+  3. checks resume: a second run over the same range issues no requests,
+     and deleting a few files re-downloads exactly those days.
+
+Usage:
+    python benchmarks/bench_opcom_download.py [--days 120] [--latency 0.05] [--workers 8]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+from src.tools.aggregate_pzu_manual import _read_any
+from src.tools.opcom_downloader import OpcomDownloader, output_name
+from src.tools.opcom_standin import running_standin
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OPCOM downloader throughput and resume check")
+    ap.add_argument("--days", type=int, default=120)
+    ap.add_argument("--latency", type=float, default=0.05, help="Stand-in seconds per response")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(args.days)]
+    missing = {days[3]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for workers in (1, args.workers):
+            with running_standin(latency_s=args.latency, missing=missing) as standin:
+                out_dir = root / f"w{workers}"
+                report = OpcomDownloader(
+                    out_dir, base_url=standin.base_url, workers=workers, rate_per_sec=0
+                ).download(days)
+                print(f"workers={workers:<3} {report.summary()}")
+
+        with running_standin(latency_s=args.latency, fail_first=1) as standin:
+            out_dir = root / "retry"
+            report = OpcomDownloader(
+                out_dir, base_url=standin.base_url, workers=args.workers, rate_per_sec=0, backoff_s=0.01
+            ).download(days)
+            print(f"retry      {report.summary()}; server saw {standin.requests} requests")
+            assert not report.failed and standin.requests == 2 * len(days)
+
+        with running_standin(latency_s=args.latency) as standin:
+            out_dir = root / f"w{args.workers}"
+            downloader = OpcomDownloader(out_dir, base_url=standin.base_url, workers=args.workers, rate_per_sec=0)
+            report = downloader.download(days)
+            print(f"resume     {report.summary()}; server saw {standin.requests} requests")
+            assert standin.requests == 1  # only the day that had no data
+            for d in days[10:13]:
+                (out_dir / output_name(d)).unlink()
+            report = downloader.download(days)
+            print(f"re-fetch   {report.summary()}; server saw {standin.requests} requests total")
+            assert report.downloaded == days[10:13]
+
+        parsed = _read_any(out_dir / output_name(days[0]))
+        assert parsed is not None and len(parsed) == 24
+
+
+if __name__ == "__main__":
+    main()
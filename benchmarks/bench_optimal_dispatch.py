@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: optimal PZU dispatch (SOC-grid dynamic programme).
+
+Writes a synthetic hourly PZU history and times compute_optimal_dispatch
+with SOC carried across days (one multi-year horizon) and with days solved
+independently in one vectorised batch. Before timing it checks that:
+- the DP matches brute-force enumeration on a short random horizon;
+- every day's optimal profit is at least the fixed 2h/2h schedule's, on a
+  grid where that schedule is feasible;
+- carrying SOC never earns less than resetting it each day.
+
+Usage:
+    python benchmarks/bench_optimal_dispatch.py [--years 3] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import itertools
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.horizon import compute_best_fixed_cycle, compute_optimal_dispatch
+from src.strategy.optimal import DispatchGrid, solve_dispatch
+
+CAPACITY_MWH = 55.0
+POWER_MW = 20.0
+ETA = 0.9
+
+
+def write_prices(folder: Path, years: int, seed: int = 3) -> Path:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2022-01-01", periods=years * 365, freq="D")
+    hours = np.tile(np.arange(24), len(days))
+    # Morning and evening peaks with a midday solar dip, plus noise
+    shape = 90 + 35 * np.sin((hours - 6) / 24 * 4 * np.pi) - 25 * np.exp(-((hours - 13) ** 2) / 6)
+    prices = pd.DataFrame(
+        {
+            "date": np.repeat(days.strftime("%Y-%m-%d"), 24),
+            "hour": hours,
+            "price": shape + rng.normal(0, 25, len(hours)),
+            "currency": "EUR",
+        }
+    )
+    path = folder / "pzu_history.csv"
+    prices.to_csv(path, index=False)
+    return path
+
+
+def check_brute_force(seed: int = 1):
+    rng = np.random.default_rng(seed)
+    grid = DispatchGrid.build(4.0, 2.0, ETA, levels=4)
+    prices = rng.normal(80, 40, 7)
+    best = -np.inf
+    for path in itertools.product(range(len(grid.moves)), repeat=len(prices)):
+        state, value = 0, 0.0
+        for price, move in zip(prices, path):
+            if not grid.allowed[state, move]:
+                break
+            value += price * grid.gain[move]
+            state = grid.targets[state, move]
+        else:
+            if state == 0:
+                best = max(best, value)
+    plan = solve_dispatch(prices[None, :], grid, start_state=0, end_state=0)
+    assert np.isclose(plan["value_eur"][0], best), (plan["value_eur"][0], best)
+    assert np.isclose((plan["sold_mwh"][0] - plan["bought_mwh"][0]) @ prices, best)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Optimal PZU dispatch on a SOC grid")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--levels", type=int, default=55, help="SOC steps (55 = 1 MWh grid)")
+    args = ap.parse_args()
+
+    check_brute_force()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = str(write_prices(Path(tmp), args.years))
+        kwargs = dict(capacity_mwh=CAPACITY_MWH, power_mw=POWER_MW, round_trip_efficiency=ETA, soc_levels=args.levels)
+        heuristic = compute_best_fixed_cycle(csv, CAPACITY_MWH, POWER_MW, ETA)
+        t_daily, daily = best_of(lambda: compute_optimal_dispatch(csv, carry_soc=False, **kwargs), args.repeat)
+        t_carry, carry = best_of(lambda: compute_optimal_dispatch(csv, carry_soc=True, **kwargs), args.repeat)
+
+    fixed = heuristic["daily_history"].set_index("date")["daily_profit_eur"]
+    per_day = daily["daily_history"].set_index("date")["daily_profit_eur"]
+    if args.levels % 55 == 0:
+        assert (per_day.loc[fixed.index] >= fixed - 1e-6).all(), "optimal must dominate the fixed schedule"
+    assert carry["stats"]["total_profit_eur"] >= daily["stats"]["total_profit_eur"] - 1e-6
+
+    n_days = len(per_day)
+    print(f"{n_days:,} days, {args.levels} SOC steps; brute-force and dominance checks pass")
+    print(f"fixed 2h/2h profit          {heuristic['stats']['total_profit_eur']:14,.0f} EUR")
+    print(f"optimal, daily reset        {daily['stats']['total_profit_eur']:14,.0f} EUR  "
+          f"({daily['stats']['total_cycles'] / n_days:.2f} cycles/day)")
+    print(f"optimal, SOC carried        {carry['stats']['total_profit_eur']:14,.0f} EUR  "
+          f"({carry['stats']['total_cycles'] / n_days:.2f} cycles/day)")
+    print(f"solve, days batched         {t_daily * 1000:9.1f} ms")
+    print(f"solve, one long horizon     {t_carry * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-horizon rolling sums versus one prefix-sum index.
+
+Builds a synthetic daily PZU history and times the previous summariser (for
+each horizon: filter the frame, run rolling(window).sum(), slice the best and
+worst windows) against summarize_profit_windows on a ProfitWindowIndex. It
+then times a full "window length vs best/worst" curve both ways. Results must
+agree to floating-point tolerance before any timing is printed.
+
+Usage:
+    python benchmarks/bench_profit_windows.py [--years 3] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.horizon import _DEFAULT_PERIODS, _period_cutoff, profit_window_curve, summarize_profit_windows
+
+
+def make_history(years: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-01", periods=years * 365, freq="D")
+    # A few missing days, as in real exports
+    dates = dates[rng.random(len(dates)) > 0.02]
+    cost = rng.gamma(4.0, 900.0, len(dates))
+    revenue = cost + rng.normal(1500, 2500, len(dates))
+    return pd.DataFrame(
+        {
+            "date": dates,
+            "daily_profit_eur": revenue - cost,
+            "daily_revenue_eur": revenue,
+            "daily_cost_eur": cost,
+            "charge_energy_mwh": np.full(len(dates), 40.0),
+            "discharge_energy_mwh": np.full(len(dates), 36.0),
+        }
+    )
+
+
+def legacy_extremes(history: pd.DataFrame, window: int):
+    profits = history["daily_profit_eur"]
+    rolling = profits.rolling(window).sum()
+    valid = rolling.dropna()
+    if valid.empty:
+        return None
+    out = []
+    for idx in (int(valid.idxmax()), int(valid.idxmin())):
+        window_slice = history.iloc[idx - window + 1 : idx + 1]
+        out.append((
+            float(rolling.iloc[idx]),
+            window_slice.iloc[0]["date"],
+            window_slice.iloc[-1]["date"],
+            float((window_slice["daily_profit_eur"] > 0).mean() * 100),
+        ))
+    return out
+
+
+def legacy_summary(daily_history: pd.DataFrame):
+    history = daily_history.sort_values("date").reset_index(drop=True)
+    last_date = history["date"].iloc[-1]
+    results = []
+    for label, offset in _DEFAULT_PERIODS:
+        cutoff = _period_cutoff(last_date, offset)
+        recent = history[history["date"] >= cutoff]
+        profits = recent["daily_profit_eur"]
+        results.append({
+            "period_label": label,
+            "recent_days": len(recent),
+            "recent_total_eur": float(profits.sum()),
+            "recent_avg_eur": float(profits.mean()),
+            "recent_success_rate": float((profits > 0).mean() * 100),
+            "recent_max_day_profit_eur": float(profits.max()),
+            "recent_min_day_profit_eur": float(profits.min()),
+            "recent_loss_eur": abs(float(-profits[profits < 0].sum())),
+            "recent_revenue_eur": float(history["daily_revenue_eur"].iloc[-len(recent):].sum()),
+            "extremes": legacy_extremes(history, len(recent)),
+        })
+    return results
+
+
+def legacy_curve(daily_history: pd.DataFrame, lengths):
+    history = daily_history.sort_values("date").reset_index(drop=True)
+    return [(window, legacy_extremes(history, window)) for window in lengths]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Profit-window summaries: rolling sums vs prefix sums")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    history = make_history(args.years)
+    lengths = range(1, len(history) + 1)
+
+    t_old, old = best_of(lambda: legacy_summary(history), args.repeat)
+    t_new, new = best_of(lambda: summarize_profit_windows(history), args.repeat)
+    for expected, got in zip(old, new):
+        for key, value in expected.items():
+            if key == "extremes":
+                best, worst = value
+                assert np.isclose(best[0], got["best_window_total_eur"]) and best[3] == got["best_window_success_rate"]
+                assert np.isclose(worst[0], got["worst_window_total_eur"]) and worst[3] == got["worst_window_success_rate"]
+            elif isinstance(value, float):
+                assert np.isclose(value, got[key]), (expected["period_label"], key)
+            else:
+                assert value == got[key], (expected["period_label"], key)
+
+    t_curve_old, curve_old = best_of(lambda: legacy_curve(history, lengths), 1)
+    t_curve_new, curve = best_of(lambda: profit_window_curve(history, lengths), args.repeat)
+    assert len(curve) == len(curve_old)
+    np.testing.assert_allclose(curve["best_total_eur"], [e[0][0] for _, e in curve_old], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(curve["worst_total_eur"], [e[1][0] for _, e in curve_old], rtol=1e-9, atol=1e-6)
+
+    print(f"{len(history):,} days, {len(new)} horizons, {len(curve):,} curve lengths; results match")
+    print(f"horizons, rolling per period   {t_old * 1000:9.1f} ms")
+    print(f"horizons, prefix-sum index     {t_new * 1000:9.1f} ms  ({t_old / t_new:.1f}x)")
+    print(f"curve, rolling per length      {t_curve_old * 1000:9.1f} ms")
+    print(f"curve, prefix-sum index        {t_curve_new * 1000:9.1f} ms  ({t_curve_old / t_curve_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PZU strategy engine on hourly versus 15-minute prices.
+
+Writes the same synthetic history twice: hourly (``hour`` 0-23) and at
+15-minute resolution (``slot`` 0-95, each hour split into four noisy
+quarters). Before timing it checks:
+- the linear per-day search (_evaluate_two_by_two_cycle_batch and the scalar
+  _evaluate_two_by_two_cycle) against an O(n^2) scan of every pair on
+  96-slot days, including the pair picked on ties;
+- the fixed-cycle best pair against a dense (days x pairs) reference;
+- that a 15-minute file repeating each hourly price four times gives the
+  hourly profits.
+
+It then times load_pzu_daily_history, compute_best_fixed_cycle,
+sweep_block_lengths, compute_multi_cycle_schedule and
+compute_optimal_dispatch at both resolutions and prints the ratio; the
+searches are linear in the periods per day, so 15-minute data should cost a
+small constant factor, not the 16x/256x of the pairwise scans.
+
+Usage:
+    python benchmarks/bench_pzu_resolution.py [--years 3] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.horizon import (
+    _block_sums,
+    _cached_fixed_cycle_scores,
+    _evaluate_two_by_two_cycle,
+    _evaluate_two_by_two_cycle_batch,
+    build_fixed_cycle_scores,
+    compute_best_fixed_cycle,
+    compute_multi_cycle_schedule,
+    compute_optimal_dispatch,
+    load_pzu_daily_history,
+    sweep_block_lengths,
+)
+
+CAPACITY_MWH = 55.0
+POWER_MW = 20.0
+ETA = 0.9
+
+
+def hourly_shape(days: int, rng) -> np.ndarray:
+    hours = np.tile(np.arange(24), days)
+    shape = 90 + 35 * np.sin((hours - 6) / 24 * 4 * np.pi) - 30 * np.exp(-((hours - 13) ** 2) / 5)
+    return (shape + rng.normal(0, 25, len(hours))).reshape(days, 24)
+
+
+def write_prices(folder: Path, name: str, days: pd.DatetimeIndex, matrix: np.ndarray) -> Path:
+    per_day = matrix.shape[1]
+    column = "hour" if per_day == 24 else "slot"
+    frame = pd.DataFrame(
+        {
+            "date": np.repeat(days.strftime("%Y-%m-%d"), per_day),
+            column: np.tile(np.arange(per_day), len(days)),
+            "price": matrix.ravel(),
+            "currency": "EUR",
+        }
+    )
+    path = folder / f"{name}.csv"
+    frame.to_csv(path, index=False)
+    return path
+
+
+def pairwise_reference(matrix, c, d, charge_power, discharge_power):
+    """Best (profit, buy, sell) per day scanning every pair in (buy, sell) order."""
+    buy = charge_power * _block_sums(matrix, c)
+    sell = discharge_power * _block_sums(matrix, d)
+    n = matrix.shape[1]
+    out = []
+    for row in range(len(matrix)):
+        best = None
+        for b in range(0, n - c - d + 1):
+            for s in range(b + c, n - d + 1):
+                profit = sell[row, s] - buy[row, b]
+                if best is None or profit > best[0]:
+                    best = (profit, b, s)
+        out.append(best)
+    return out
+
+
+def check_linear_search(rng):
+    matrix = np.round(rng.normal(90, 40, (40, 96)), 0)  # rounding forces ties
+    # 4 MW for a quarter hour buys 1 MWh per charge period; eta = 1 sells it all.
+    for c, d in ((8, 8), (4, 12)):
+        hours = (c / 4, d / 4)
+        batch = _evaluate_two_by_two_cycle_batch(matrix, CAPACITY_MWH, 4.0, 1.0, *hours, step_hours=0.25)
+        reference = pairwise_reference(matrix, c, d, 1.0, c / d)
+        for row, (profit, b, s) in enumerate(reference):
+            assert batch["buy_start_hour"][row] == b and batch["sell_start_hour"][row] == s, (row, c, d)
+            assert np.isclose(batch["profit_eur"][row], profit)
+            scalar = _evaluate_two_by_two_cycle(list(matrix[row]), CAPACITY_MWH, 4.0, 1.0, *hours, step_hours=0.25)
+            assert scalar["buy_start_hour"] == b * 0.25 and scalar["sell_start_hour"] == s * 0.25
+    print("linear search matches the pairwise scan on 96-slot days, ties included")
+
+
+def check_fixed_pair(csv):
+    scores = build_fixed_cycle_scores(str(csv), CAPACITY_MWH, POWER_MW, ETA)
+    totals = scores.daily_profit.sum(axis=0)
+    assert np.allclose(scores.pair_totals(slice(None))[0], totals)
+    buy, sell, days = scores.best_pair()
+    idx = int(np.flatnonzero((scores.pairs[:, 0] * 0.25 == buy) & (scores.pairs[:, 1] * 0.25 == sell))[0])
+    # Totals are summed in a different order, so compare profits, not argmax positions
+    assert np.isclose(totals[idx], totals.max()) and days == len(scores.dates)
+    print(f"fixed-cycle best pair matches the dense reference ({len(scores.pairs):,} pairs)")
+
+
+def check_equivalence(hourly_csv, repeated_csv):
+    hourly = load_pzu_daily_history(str(hourly_csv), CAPACITY_MWH, ETA, power_mw=POWER_MW)
+    quarter = load_pzu_daily_history(str(repeated_csv), CAPACITY_MWH, ETA, power_mw=POWER_MW)
+    assert np.allclose(hourly["daily_profit_eur"], quarter["daily_profit_eur"])
+    assert (hourly["hours_count"] == quarter["hours_count"]).all()
+    for args in ({}, {"charge_hours": 1, "discharge_hours": 3}):
+        a = compute_best_fixed_cycle(str(hourly_csv), CAPACITY_MWH, POWER_MW, ETA, **args)
+        b = compute_best_fixed_cycle(str(repeated_csv), CAPACITY_MWH, POWER_MW, ETA, **args)
+        assert np.isclose(a["stats"]["total_profit_eur"], b["stats"]["total_profit_eur"])
+    print("repeated 15-minute prices reproduce the hourly profits")
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PZU strategy engine at hourly and 15-minute resolution")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(25)
+    check_linear_search(rng)
+
+    days = pd.date_range("2022-01-01", periods=args.years * 365, freq="D")
+    hourly = hourly_shape(len(days), rng)
+    quarters = np.repeat(hourly, 4, axis=1) + rng.normal(0, 8, (len(days), 96))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        hourly_csv = write_prices(folder, "pzu_hourly", days, hourly)
+        quarter_csv = write_prices(folder, "pzu_15min", days, quarters)
+        check_fixed_pair(quarter_csv)
+        check_equivalence(hourly_csv, write_prices(folder, "pzu_repeated", days, np.repeat(hourly, 4, axis=1)))
+
+        def fixed_cycle_scores(csv):
+            _cached_fixed_cycle_scores.cache_clear()
+            return build_fixed_cycle_scores(str(csv), CAPACITY_MWH, POWER_MW, ETA)
+
+        runs = {
+            "daily best pair": lambda csv: load_pzu_daily_history(str(csv), CAPACITY_MWH, ETA, power_mw=POWER_MW),
+            "fixed cycle (scores)": fixed_cycle_scores,
+            "fixed cycle (query)": lambda csv: compute_best_fixed_cycle(str(csv), CAPACITY_MWH, POWER_MW, ETA),
+            "block sweep 4x4": lambda csv: sweep_block_lengths(str(csv), CAPACITY_MWH, POWER_MW, ETA),
+            "multi-cycle K=2": lambda csv: compute_multi_cycle_schedule(str(csv), CAPACITY_MWH, POWER_MW, ETA, 2),
+            "optimal dispatch": lambda csv: compute_optimal_dispatch(
+                str(csv), CAPACITY_MWH, POWER_MW, ETA, carry_soc=False, soc_levels=24
+            ),
+        }
+
+        print(f"{len(days):,} days")
+        print(f"{'':22}{'hourly':>12}{'15-minute':>12}{'ratio':>8}")
+        for label, run in runs.items():
+            run(hourly_csv)  # warm the cube sidecars
+            run(quarter_csv)
+            t_hour, _ = best_of(lambda: run(hourly_csv), args.repeat)
+            t_quarter, _ = best_of(lambda: run(quarter_csv), args.repeat)
+            print(f"{label:22}{t_hour * 1000:9.1f} ms{t_quarter * 1000:9.1f} ms{t_quarter / t_hour:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
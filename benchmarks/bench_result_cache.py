@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: result cache in front of the multi-product FR simulation.
+
+Reuses the synthetic inputs of bench_fr_multi.py and times, for the same
+arguments: fingerprinting them, a cold run through cached_result, a hit in the
+memory tier, and a hit in the disk tier from a fresh ResultCache on the same
+directory (what a restarted app sees). Every hit is checked against the cold
+result, a memory hit must be clearly faster than calling the simulation
+without the cache, and changing one parameter or one price must change the
+key. It also times the key of the same frame tagged with a source digest,
+the way build_market_frame returns it.
+
+Usage:
+    python benchmarks/bench_result_cache.py [--years 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+
+from bench_fr_multi import PRODUCTS, make_inputs
+from src.core.frequency_regulation import simulate_frequency_regulation_revenue_multi
+from src.data.result_cache import ResultCache, cached_result, fingerprint, with_source_digest
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Result cache hit/miss timing")
+    ap.add_argument("--years", type=int, default=3)
+    args = ap.parse_args()
+
+    prices, extras = make_inputs(args.years)
+    kwargs = dict(extras, battery_power_mw=15.0)
+    print(f"{len(prices):,} slots x {len(PRODUCTS)} products")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def simulate(cache):
+            fn = cached_result("bench.fr_multi", cache=cache)(simulate_frequency_regulation_revenue_multi)
+            with contextlib.redirect_stdout(io.StringIO()):
+                return fn(prices, PRODUCTS, **kwargs)
+
+        def uncached():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return simulate_frequency_regulation_revenue_multi(prices, PRODUCTS, **kwargs)
+
+        uncached()  # warm the SOC kernel
+        t_plain, _ = timed(uncached)
+        t_key, key = timed(lambda: fingerprint((prices, PRODUCTS, kwargs)))
+        first = ResultCache(tmp)
+        t_cold, cold = timed(lambda: simulate(first))
+        t_mem, mem = timed(lambda: simulate(first))
+        t_disk, disk = timed(lambda: simulate(ResultCache(tmp)))
+
+    for label, got in (("memory", mem), ("disk", disk)):
+        assert np.isclose(got["combined_totals"]["total_revenue_eur"], cold["combined_totals"]["total_revenue_eur"]), label
+    assert fingerprint((prices, PRODUCTS, dict(kwargs, battery_power_mw=5.0))) != key
+    edited = prices.copy()
+    edited.iloc[-1, edited.columns.get_loc("price_eur_mwh")] += 1.0
+    assert fingerprint((edited, PRODUCTS, kwargs)) != key
+    sourced = with_source_digest(prices.copy(), "synthetic", years=args.years)
+    t_sourced, sourced_key = timed(lambda: fingerprint((sourced, PRODUCTS, kwargs)))
+    assert sourced_key != key
+    assert fingerprint((with_source_digest(prices.copy(), "synthetic", years=args.years + 1), PRODUCTS, kwargs)) != sourced_key
+    assert t_mem < 0.5 * t_plain, f"memory hit {t_mem * 1000:.1f} ms vs uncached {t_plain * 1000:.1f} ms"
+    print("hits match the cold run; changed parameters or prices change the key")
+    print(f"uncached run       {t_plain * 1000:9.1f} ms")
+    print(f"fingerprint args   {t_key * 1000:9.1f} ms")
+    print(f"  tagged frame     {t_sourced * 1000:9.1f} ms")
+    print(f"cold run + store   {t_cold * 1000:9.1f} ms")
+    print(f"memory hit         {t_mem * 1000:9.1f} ms  ({t_plain / t_mem:.0f}x vs uncached)")
+    print(f"disk hit (restart) {t_disk * 1000:9.1f} ms  ({t_plain / t_disk:.0f}x vs uncached)")
+
+
+if __name__ == "__main__":
+    main()
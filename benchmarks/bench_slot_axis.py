@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: integer slot-index alignment versus (date, slot) merges.
+
+Times the slot-axis conversion helpers on their own (string dates and
+datetime64 dates to slot_index, and back with slot_labels). It then times
+aligning one 15-minute column onto a price table three ways:
+- a pandas merge on string (date, slot) keys;
+- a merge on Timestamp keys;
+- align_slots on precomputed int64 keys.
+
+Before timing it checks the DST handling on the 2024 transition days, DST
+days numbered sequentially (0..99 and 0..91) running on into the next day,
+the round trip, and that all three alignments return the same values.
+
+Usage:
+    python benchmarks/bench_slot_axis.py [--years 3] [--repeat 5]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.slot_axis import NO_SLOT, align_slots, slot_index, slot_labels, slots_in_day
+
+
+def check_dst():
+    spring, autumn = "2024-03-31", "2024-10-27"
+    keys = slot_index([spring] * 4, [11, 12, 15, 16])
+    assert keys[1] == keys[2] == NO_SLOT, "03:00-04:00 does not exist on the spring day"
+    assert keys[3] == keys[0] + 1, "02:45 and 04:00 are consecutive delivery periods"
+    keys = slot_index([autumn] * 3, [11, 12, 16])
+    assert keys[2] - keys[1] == 8, "the repeated hour sits between 03:00 (first) and 04:00"
+    assert list(slots_in_day([spring, "2024-06-01", autumn])) == [92, 96, 100]
+
+    # Sequentially numbered DST days, as in data/system_imbalance_awards.csv
+    for day, periods, after in (("2024-10-27", 100, "2024-10-28"), ("2025-03-30", 92, "2025-03-31")):
+        dates = [day] * periods + [after] * 4
+        keys = slot_index(dates, list(range(periods)) + [0, 1, 2, 3])
+        assert (keys != NO_SLOT).all() and (np.diff(keys) == 1).all(), f"{day} periods run on into {after}"
+        assert keys[periods] == keys[periods - 1] + 1 == keys[0] + periods
+
+    days = pd.date_range("2023-01-01", "2025-12-31", freq="D")
+    dates = np.repeat(days.to_numpy(), 96)
+    slots = np.tile(np.arange(96), len(days))
+    keys = slot_index(dates, slots)
+    valid = keys != NO_SLOT
+    back_dates, back_slots = slot_labels(keys[valid])
+    assert np.array_equal(back_dates, dates[valid]) and np.array_equal(back_slots, slots[valid])
+    print(f"DST checks pass; round trip exact on {valid.sum():,} slots")
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Slot-index conversions and alignment")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    check_dst()
+
+    rng = np.random.default_rng(7)
+    days = pd.date_range("2023-01-01", periods=args.years * 365, freq="D")
+    str_dates = np.repeat(days.strftime("%Y-%m-%d").to_numpy(), 96)
+    ts_dates = np.repeat(days.to_numpy(), 96)
+    slots = np.tile(np.arange(96), len(days))
+    prices = pd.DataFrame({"date": str_dates, "slot": slots, "price_eur_mwh": rng.normal(80, 100, len(slots))})
+    # The side table is shuffled and has a gap, as real DAMAS/hedge extracts do
+    keep = rng.random(len(slots)) > 0.05
+    order = rng.permutation(np.flatnonzero(keep))
+    side = pd.DataFrame({"date": str_dates[order], "slot": slots[order], "value": rng.normal(0, 1, len(order))})
+
+    t_str, price_keys = best_of(lambda: slot_index(prices["date"], prices["slot"]), args.repeat)
+    t_ts, _ = best_of(lambda: slot_index(ts_dates, slots), args.repeat)
+    t_back, _ = best_of(lambda: slot_labels(price_keys), args.repeat)
+    side_keys = slot_index(side["date"], side["slot"])
+
+    t_merge_str, merged_str = best_of(
+        lambda: prices.merge(side, on=["date", "slot"], how="left")["value"].to_numpy(), args.repeat
+    )
+    prices_ts = prices.assign(date=pd.to_datetime(prices["date"]))
+    side_ts = side.assign(date=pd.to_datetime(side["date"]))
+    t_merge_ts, merged_ts = best_of(
+        lambda: prices_ts.merge(side_ts, on=["date", "slot"], how="left")["value"].to_numpy(), args.repeat
+    )
+
+    def by_index():
+        found = align_slots(side_keys, price_keys)
+        return np.where(found >= 0, side["value"].to_numpy()[np.maximum(found, 0)], np.nan)
+
+    t_align, aligned = best_of(by_index, args.repeat)
+    # Wall-clock slots skipped by the spring DST change have no key and never match
+    real = price_keys != NO_SLOT
+    np.testing.assert_array_equal(merged_str[real], aligned[real])
+    np.testing.assert_array_equal(merged_ts[real], aligned[real])
+    assert np.isnan(aligned[~real]).all()
+
+    print(f"{len(prices):,} slots, side table {len(side):,} rows; all alignments agree")
+    print(f"slot_index from str dates   {t_str * 1000:9.1f} ms")
+    print(f"slot_index from datetime64  {t_ts * 1000:9.1f} ms")
+    print(f"slot_labels (inverse)       {t_back * 1000:9.1f} ms")
+    print(f"merge on str (date, slot)   {t_merge_str * 1000:9.1f} ms")
+    print(f"merge on Timestamp keys     {t_merge_ts * 1000:9.1f} ms")
+    print(f"align_slots on int64 keys   {t_align * 1000:9.1f} ms  ({t_merge_str / t_align:.1f}x vs str merge)")
+
+
+if __name__ == "__main__":
+    main()
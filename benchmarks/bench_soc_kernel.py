@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SOC-constrained FR activation on 3 years of 15-minute slots.
+
+Compares the previous pandas loop in apply_soc_constraints_to_activation
+(kept below as legacy_apply_soc_constraints) with the array kernel in
+src/core/soc_kernel.py, both through numba (when installed) and
+the pure-Python/NumPy fallback. Before timing, every variant is checked to
+return bit-identical energy and SOC arrays across a range of parameter
+sets, activation densities and edge cases (NaN or negative requests, empty
+input, SOC starting outside the window).
+
+Usage:
+    python benchmarks/bench_soc_kernel.py [--years 3] [--repeat 3]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.soc_kernel import jit_available, soc_constrained_activation, soc_efficiencies
+
+
+def legacy_apply_soc_constraints(df, up_mask, down_mask, energy_per_slot_mwh, battery_capacity_mwh,
+                                 initial_soc=0.5, soc_min=0.1, soc_max=0.9, round_trip_efficiency=0.9):
+    """The scalar loop apply_soc_constraints_to_activation used before the kernel."""
+    n = len(df)
+    soc = np.full(n, initial_soc, dtype=float)
+    actual_up_energy = np.zeros(n, dtype=float)
+    actual_down_energy = np.zeros(n, dtype=float)
+    charge_efficiency = np.sqrt(round_trip_efficiency)
+    discharge_efficiency = np.sqrt(round_trip_efficiency)
+    for i in range(n):
+        if i > 0:
+            soc[i] = soc[i - 1]
+        current_soc = soc[i]
+        available_headroom_mwh = (soc_max - current_soc) * battery_capacity_mwh
+        if up_mask.iloc[i]:
+            max_discharge = max(0.0, (current_soc - soc_min) * battery_capacity_mwh)
+            requested_discharge = energy_per_slot_mwh.iloc[i]
+            actual_discharge = min(requested_discharge, max_discharge)
+            actual_up_energy[i] = actual_discharge
+            energy_from_battery = actual_discharge / discharge_efficiency
+            soc[i] = max(soc_min, current_soc - (energy_from_battery / battery_capacity_mwh))
+        elif down_mask.iloc[i]:
+            max_charge = max(0.0, available_headroom_mwh)
+            requested_charge = energy_per_slot_mwh.iloc[i]
+            actual_charge = min(requested_charge, max_charge)
+            actual_down_energy[i] = actual_charge
+            energy_to_battery = actual_charge * charge_efficiency
+            soc[i] = min(soc_max, current_soc + (energy_to_battery / battery_capacity_mwh))
+    return actual_up_energy, actual_down_energy, soc
+
+
+def make_inputs(n, density, seed):
+    rng = np.random.default_rng(seed)
+    draw = rng.random(n)
+    up = draw < density / 2
+    down = (draw >= density / 2) & (draw < density)
+    # Occasional overlap: up wins, as in the original elif
+    down |= up & (rng.random(n) < 0.05)
+    requested = rng.gamma(2.0, 1.5, n) * rng.choice([0.3, 0.5, 1.0], n)
+    return up, down, requested
+
+
+def run_kernel(up, down, requested, params, use_jit):
+    eta_c, eta_d = soc_efficiencies(params["round_trip_efficiency"])
+    return soc_constrained_activation(
+        up, down, requested, params["battery_capacity_mwh"], params["initial_soc"],
+        params["soc_min"], params["soc_max"], eta_c, eta_d, use_jit=use_jit,
+    )
+
+
+def run_legacy(up, down, requested, params):
+    index = pd.RangeIndex(len(up))
+    return legacy_apply_soc_constraints(
+        pd.DataFrame(index=index), pd.Series(up, index=index), pd.Series(down, index=index),
+        pd.Series(requested, index=index), **params,
+    )
+
+
+def bit_identical(a, b):
+    return a.shape == b.shape and np.array_equal(a.view(np.int64), b.view(np.int64))
+
+
+def check_equivalence(variants):
+    cases = []
+    for seed, (cap, soc0, lo, hi, eta, density) in enumerate([
+        (55.0, 0.5, 0.1, 0.9, 0.9, 0.4),
+        (20.0, 0.5, 0.2, 0.8, 0.85, 0.9),
+        (4.0, 0.15, 0.1, 0.9, 0.92, 0.6),
+        (55, 0.95, 0.1, 0.9, 1.0, 0.3),  # starts above soc_max, integer capacity
+        (10.0, 0.05, 0.1, 0.9, 0.81, 0.7),  # starts below soc_min
+        (1.0, 0.5, 0.5, 0.5, 0.9, 0.5),  # zero-width window
+    ]):
+        params = dict(battery_capacity_mwh=cap, initial_soc=soc0, soc_min=lo, soc_max=hi, round_trip_efficiency=eta)
+        up, down, requested = make_inputs(20_000, density, seed)
+        cases.append((params, up, down, requested))
+    up, down, requested = make_inputs(5_000, 0.8, 99)
+    requested[::37] = np.nan
+    requested[::53] = -requested[::53]
+    cases.append((cases[0][0], up, down, requested))
+    cases.append((cases[0][0], up[:0], down[:0], requested[:0]))
+
+    for params, up, down, requested in cases:
+        expected = run_legacy(up, down, requested, params)
+        for name, use_jit in variants:
+            got = run_kernel(up, down, requested, params, use_jit)
+            for label, e, g in zip(("up", "down", "soc"), expected, got):
+                assert bit_identical(e, g), f"{name}: {label} differs for {params}"
+    print(f"bit-identical on {len(cases)} cases: {', '.join(name for name, _ in variants)}")
+
+
+def bench(name, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SOC kernel equivalence and speed")
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--density", type=float, default=0.5, help="Share of slots with an activation")
+    args = ap.parse_args()
+
+    variants = [("numpy", False)]
+    if jit_available():
+        variants.insert(0, ("numba", True))
+        run_kernel(*make_inputs(10, 0.5, 0), dict(battery_capacity_mwh=1.0, initial_soc=0.5, soc_min=0.1,
+                                                  soc_max=0.9, round_trip_efficiency=0.9), True)  # compile
+    else:
+        print("numba not installed: timing the NumPy fallback only")
+    check_equivalence(variants)
+
+    n = args.years * 365 * 96
+    up, down, requested = make_inputs(n, args.density, 7)
+    params = dict(battery_capacity_mwh=55.0, initial_soc=0.5, soc_min=0.1, soc_max=0.9, round_trip_efficiency=0.9)
+    legacy = bench("legacy", lambda: run_legacy(up, down, requested, params), 1)
+    print(f"{n:,} slots, {int((up | down).sum()):,} active")
+    print(f"legacy pandas loop {legacy * 1000:10.1f} ms")
+    for name, use_jit in variants:
+        t = bench(name, lambda: run_kernel(up, down, requested, params, use_jit), args.repeat)
+        print(f"kernel ({name:<5})     {t * 1000:10.1f} ms  {legacy / t:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
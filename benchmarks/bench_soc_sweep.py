@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SOC sensitivity sweep, one call per scenario versus one batched pass.
+
+Builds a scenario grid over capacity, SOC window, round-trip efficiency and
+merit-order rate, then runs apply_soc_constraints_to_activation once per
+scenario (the way sweeps work today) and apply_soc_constraints_to_activation_batch
+once for the whole grid. Every batched row is checked bit for bit against its
+single-scenario run before timings are printed.
+
+Usage:
+    python benchmarks/bench_soc_sweep.py [--years 1] [--density 0.5]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.frequency_regulation import (
+    apply_soc_constraints_to_activation,
+    apply_soc_constraints_to_activation_batch,
+    soc_scenario_grid,
+)
+from src.core.soc_kernel import jit_available
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Batched SOC scenario sweep")
+    ap.add_argument("--years", type=int, default=1)
+    ap.add_argument("--density", type=float, default=0.5, help="Share of slots with an activation")
+    args = ap.parse_args()
+
+    n = args.years * 365 * 96
+    rng = np.random.default_rng(3)
+    draw = rng.random(n)
+    index = pd.RangeIndex(n)
+    df = pd.DataFrame(index=index)
+    up = pd.Series(draw < args.density / 2, index=index)
+    down = pd.Series((draw >= args.density / 2) & (draw < args.density), index=index)
+    energy = pd.Series(rng.gamma(2.0, 1.5, n), index=index)
+
+    grid = soc_scenario_grid(
+        battery_capacity_mwh=[20.0, 40.0, 55.0, 80.0, 110.0],
+        soc_min=[0.05, 0.1],
+        soc_max=[0.9, 0.95],
+        round_trip_efficiency=[0.85, 0.9],
+        merit_order_activation_rate=[0.3, 0.5, 0.7, 1.0, 0.45],
+    )
+    print(f"{len(grid)} scenarios x {n:,} slots ({int((up | down).sum()):,} active), "
+          f"{'numba' if jit_available() else 'NumPy fallback'}")
+
+    # Warm up the compiled kernels so timings exclude JIT compilation
+    apply_soc_constraints_to_activation(df.iloc[:10], up[:10], down[:10], energy[:10], 55.0)
+    apply_soc_constraints_to_activation_batch(df.iloc[:10], up[:10], down[:10], energy[:10], grid.head(2))
+
+    t0 = time.perf_counter()
+    singles = []
+    for row in grid.itertuples(index=False):
+        singles.append(apply_soc_constraints_to_activation(
+            df, up, down, energy * row.merit_order_activation_rate,
+            battery_capacity_mwh=row.battery_capacity_mwh, soc_min=row.soc_min,
+            soc_max=row.soc_max, round_trip_efficiency=row.round_trip_efficiency,
+        ))
+    looped = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    up_energy, down_energy, soc = apply_soc_constraints_to_activation_batch(df, up, down, energy, grid)
+    batched = time.perf_counter() - t0
+
+    for s, (single_up, single_down, single_soc) in enumerate(singles):
+        for label, expected, got in (("up", single_up, up_energy[s]), ("down", single_down, down_energy[s]),
+                                     ("soc", single_soc, soc[s])):
+            assert np.array_equal(expected.to_numpy().view(np.int64), got.view(np.int64)), (s, label)
+    print("batched rows bit-identical to single-scenario runs")
+    print(f"per-scenario calls {looped * 1000:9.1f} ms  ({looped / len(grid) * 1000:.1f} ms/scenario)")
+    print(f"one batched pass   {batched * 1000:9.1f} ms  ({looped / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
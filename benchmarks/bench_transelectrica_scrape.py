@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Transelectrica imbalance scraping against a local static stand-in.
+
+Runs offline but needs Playwright's Chromium (`python -m playwright install
+chromium`). Starts src.tools.transelectrica_standin with per-request
+latency, then:
+  1. scrapes N days with 1 browser context (the old serial behaviour) and
+     with a pool of contexts, reporting days/second;
+  2. checks resume: a second run issues no data requests, and deleting a few
+     day files re-scrapes exactly those days;
+  3. pulls the same range through the page's bulk export and checks the
+     per-day files match the scraped ones.
+
+Usage:
+    python benchmarks/bench_transelectrica_scrape.py [--days 60] [--latency 0.2] [--contexts 8]
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.tools.download_transelectrica_imbalance_playwright import output_name, scrape_days
+from src.tools.transelectrica_standin import running_standin
+
+
+def scrape(days, out_dir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(scrape_days(days, out_dir, **kwargs))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Transelectrica scraper throughput and resume check")
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--latency", type=float, default=0.2, help="Stand-in seconds per data request")
+    ap.add_argument("--contexts", type=int, default=8)
+    args = ap.parse_args()
+
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(args.days)]
+    missing = {days[5]}
+    settle_ms = 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for contexts in (1, args.contexts):
+            with running_standin(latency_s=args.latency, missing=missing) as standin:
+                report = scrape(
+                    days, root / f"c{contexts}", contexts=contexts, url=standin.url, settle_ms=settle_ms
+                )
+                print(f"contexts={contexts:<3} {report.summary()}")
+                assert not report.failed and report.empty == [days[5]]
+
+        out_dir = root / f"c{args.contexts}"
+        with running_standin(latency_s=args.latency) as standin:
+            report = scrape(days, out_dir, contexts=args.contexts, url=standin.url, settle_ms=settle_ms)
+            print(f"resume       {report.summary()}; server saw {standin.state.data_requests} data requests")
+            assert standin.state.data_requests == 0
+            for d in days[10:13]:
+                (out_dir / output_name(d)).unlink()
+            report = scrape(days, out_dir, contexts=args.contexts, url=standin.url, settle_ms=settle_ms)
+            print(f"re-scrape    {report.summary()}")
+            assert report.saved == days[10:13]
+
+        with running_standin(latency_s=args.latency, missing=missing) as standin:
+            bulk_dir = root / "bulk"
+            report = scrape(
+                days, bulk_dir, contexts=args.contexts, url=standin.url, settle_ms=settle_ms,
+                bulk_export=True, chunk_days=31,
+            )
+            print(f"bulk export  {report.summary()}; server saw {standin.state.exports} exports")
+            assert len(report.exported) == len(days) - 1 and report.empty == [days[5]]
+
+        for d in days:
+            if d in missing:
+                continue
+            scraped = pd.read_csv(out_dir / output_name(d))
+            exported = pd.read_csv(bulk_dir / output_name(d))
+            pd.testing.assert_frame_equal(scraped, exported)
+        print("scraped and exported days match")
+
+
+if __name__ == "__main__":
+    main()
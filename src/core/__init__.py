@@ -0,0 +1,10 @@
+"""Streamlit-free compute core.
+
+Pure simulation, analysis and loading functions shared by the web app, the CLI
+(``src/main.py``), the examples and batch jobs. Nothing here imports Streamlit;
+the modules under ``src/web`` wrap these functions in ``st.cache_data`` for the
+dashboard. Submodules are not imported eagerly so that, for example,
+``src.core.soc_kernel`` can be used without loading pandas.
+"""
+
+__all__ = ["finance", "fr_engine", "frequency_regulation", "loaders", "market_frame", "pzu", "soc_kernel"]
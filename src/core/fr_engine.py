@@ -0,0 +1,695 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.slot_axis import align_slots
+from .soc_kernel import shared_soc_activation, soc_constrained_activation, soc_efficiencies
+
+_KEYS = ("date", "slot", "slot_index")
+
+# Product -> (up volume, down volume, up price, down price) DAMAS columns.
+# FCR has a single activation volume and no separate prices.
+_DAMAS_COLUMNS: Dict[str, Tuple[str, Optional[str], Optional[str], Optional[str]]] = {
+    "FCR": ("fcr_activated_mwh", None, None, None),
+    "aFRR": ("afrr_up_activated_mwh", "afrr_down_activated_mwh", "afrr_up_price_eur", "afrr_down_price_eur"),
+    "mFRR": ("mfrr_up_activated_mwh", "mfrr_down_activated_mwh", "mfrr_up_scheduled_price_eur", "mfrr_down_scheduled_price_eur"),
+}
+
+
+def empty_fr_result() -> Dict:
+    return {
+        "monthly_by_product": {},
+        "totals_by_product": {},
+        "combined_monthly": [],
+        "combined_totals": {"capacity_revenue_eur": 0.0, "activation_revenue_eur": 0.0, "total_revenue_eur": 0.0, "months": 0},
+    }
+
+
+def _to_datetime(values: pd.Series) -> np.ndarray:
+    """``pd.to_datetime`` as datetime64[ns], parsing each distinct string once."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]")
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques)).to_numpy(dtype="datetime64[ns]")
+    out = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[ns]")
+    known = codes >= 0
+    out[known] = parsed[codes[known]]
+    return out
+
+
+_DAY_NS = 86_400_000_000_000
+_SLOT_RANGE = 1024
+
+
+def _slot_keys(frame: pd.DataFrame, dates: Optional[np.ndarray] = None) -> pd.Index:
+    """(date, slot) lookup keys: packed int64 day*1024+slot when dates are
+    midnights and slots small non-negative integers, else a MultiIndex."""
+    if dates is None:
+        dates = _to_datetime(frame["date"])
+    slots = frame["slot"].to_numpy()
+    if np.issubdtype(slots.dtype, np.integer) and not np.isnat(dates).any():
+        ns = dates.view(np.int64)
+        if len(slots) == 0 or (
+            (ns % _DAY_NS == 0).all() and slots.min() >= 0 and slots.max() < _SLOT_RANGE
+        ):
+            return pd.Index(ns // _DAY_NS * _SLOT_RANGE + slots.astype(np.int64))
+    return pd.MultiIndex.from_arrays([dates, slots])
+
+
+def _pair_keys(frame: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([_to_datetime(frame["date"]), frame["slot"]])
+
+
+class _Source:
+    """A keyed input table aligned to the price rows by a left (date, slot) lookup."""
+
+    def __init__(self, frame: pd.DataFrame, positions: Optional[np.ndarray]):
+        self.frame = frame
+        self.positions = positions  # None: the price frame itself; -1: no match
+
+    def values(self, name: str, order: np.ndarray) -> np.ndarray:
+        column = pd.to_numeric(self.frame[name], errors="coerce").to_numpy(dtype=float)
+        if self.positions is None:
+            return column[order]
+        positions = self.positions[order]
+        out = np.full(len(order), np.nan)
+        matched = positions >= 0
+        out[matched] = column[positions[matched]]
+        return out
+
+
+@dataclass
+class MonthGrid:
+    """Price rows regrouped by calendar month, keeping row order within a month.
+
+    ``order`` maps grouped positions to rows of the price frame (rows without a
+    date are dropped, as ``groupby`` does), ``starts`` are the first grouped
+    position of each month and ``labels`` the ``YYYY-MM`` month strings.
+    """
+
+    order: np.ndarray
+    starts: np.ndarray
+    labels: List[str]
+    dates: np.ndarray  # datetime64[ns], grouped order
+
+    @classmethod
+    def from_dates(cls, values: np.ndarray) -> "MonthGrid":
+        valid = np.flatnonzero(~np.isnat(values))
+        months = values[valid].astype("datetime64[M]")
+        rank = np.argsort(months.astype(np.int64), kind="stable")
+        order = valid[rank]
+        months = months[rank]
+        if len(order):
+            starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        else:
+            starts = np.zeros(0, dtype=np.int64)
+        labels = [str(label) for label in np.datetime_as_string(months[starts], unit="M")]
+        return cls(order=order, starts=starts, labels=labels, dates=values[order])
+
+    @property
+    def size(self) -> int:
+        return len(self.order)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(np.r_[self.starts, self.size])
+
+    @property
+    def month_index(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.starts)), self.counts)
+
+    def segments(self):
+        bounds = np.r_[self.starts, self.size]
+        return zip(bounds[:-1].tolist(), bounds[1:].tolist())
+
+    def sum(self, values: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-month sum skipping NaN (pandas ``sum`` semantics), optionally over ``mask``."""
+        keep = ~np.isnan(values)
+        if mask is not None:
+            keep &= mask
+        if not len(self.starts):
+            return np.zeros(0)
+        return np.add.reduceat(np.where(keep, values, 0.0), self.starts)
+
+    def count(self, mask: np.ndarray) -> np.ndarray:
+        if not len(self.starts):
+            return np.zeros(0, dtype=np.int64)
+        return np.add.reduceat(mask.astype(np.int64), self.starts)
+
+    def mean(self, values: np.ndarray) -> np.ndarray:
+        """Per-month mean skipping NaN; NaN for months without values."""
+        counts = self.count(~np.isnan(values))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, self.sum(values) / np.maximum(counts, 1), np.nan)
+
+    def activation_events(self, active: np.ndarray) -> np.ndarray:
+        """Inactive -> active transitions per month (the first slot of a month never counts)."""
+        rises = np.zeros(self.size, dtype=bool)
+        rises[1:] = active[1:] & ~active[:-1]
+        rises[self.starts] = False
+        return self.count(rises)
+
+
+class AlignedInputs:
+    """Price frame plus calendar/system-imbalance tables aligned once.
+
+    Column lookups follow what the per-product ``merge`` chain produced: a
+    column present in both sides of a merge is suffixed by pandas and so is
+    no longer visible under its own name.
+    """
+
+    def __init__(self, prices: pd.DataFrame, system_imbalance_df: Optional[pd.DataFrame]):
+        self.prices = prices
+        self.dates = _to_datetime(prices["date"])
+        self.grid = MonthGrid.from_dates(self.dates)
+        self._row_keys: Optional[pd.Index] = None
+        self._sources: Dict[int, _Source] = {}
+        self._cache: Dict[Tuple[int, str], np.ndarray] = {}
+        has_table = system_imbalance_df is not None and not system_imbalance_df.empty
+        self.imbalance = system_imbalance_df if has_table else None
+        # A pre-joined market frame carries imbalance_mw itself
+        self.has_imbalance = has_table or "imbalance_mw" in prices.columns
+
+    def _source(self, table: pd.DataFrame) -> _Source:
+        # Keyed by identity; the source keeps the table alive so ids stay unique
+        source = self._sources.get(id(table))
+        if source is None and "slot_index" in table.columns and "slot_index" in self.prices.columns:
+            # Both sides carry the canonical key: align by array lookup
+            positions = align_slots(table["slot_index"].to_numpy(), self.prices["slot_index"].to_numpy())
+            source = _Source(table, positions)
+            self._sources[id(table)] = source
+        if source is None:
+            if self._row_keys is None:
+                self._row_keys = _slot_keys(self.prices, self.dates)
+            keys = _slot_keys(table)
+            if isinstance(keys, pd.MultiIndex) != isinstance(self._row_keys, pd.MultiIndex):
+                # Mixed key forms (e.g. hourly dates on one side): compare as (date, slot) pairs
+                keys, self._row_keys = _pair_keys(table), _pair_keys(self.prices)
+            first = ~keys.duplicated()
+            found = pd.Index(keys[first]).get_indexer(self._row_keys)
+            positions = np.where(found >= 0, np.flatnonzero(first)[np.maximum(found, 0)], -1)
+            source = _Source(table, positions)
+            self._sources[id(table)] = source
+        return source
+
+    def columns(self, calendar: Optional[pd.DataFrame]) -> Dict[str, _Source]:
+        """Column name -> source, as seen after merging ``calendar`` then system imbalance."""
+        base = self._sources.setdefault(id(self.prices), _Source(self.prices, None))
+        visible = {name: base for name in self.prices.columns}
+        visible.setdefault("month", base)
+        for table in (calendar, self.imbalance):
+            if table is None:
+                continue
+            source = self._source(table)
+            merged = dict(visible)
+            for name in table.columns:
+                if name in _KEYS:
+                    continue
+                if name in visible:
+                    merged.pop(name, None)
+                else:
+                    merged[name] = source
+            visible = merged
+        return visible
+
+    def values(self, columns: Dict[str, _Source], name: str) -> Optional[np.ndarray]:
+        source = columns.get(name)
+        if source is None:
+            return None
+        key = (id(source), name)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = source.values(name, self.grid.order)
+            self._cache[key] = cached
+        return cached
+
+
+def _activation_factor(
+    prod: str,
+    grid: MonthGrid,
+    prices: pd.DataFrame,
+    activation_factor_map: Optional[Dict[str, float]],
+    activation_curve_map: Optional[Dict[str, pd.Series]],
+):
+    default = 1.0
+    if activation_factor_map and prod in activation_factor_map:
+        try:
+            default = max(0.0, float(activation_factor_map.get(prod, 1.0)))
+        except Exception:
+            default = 1.0
+    curve = activation_curve_map.get(prod) if activation_curve_map and prod in activation_curve_map else None
+    if curve is None or curve.empty:
+        return default
+    slots = prices["slot"].to_numpy()[grid.order].astype(int)
+    looked_up = curve.reindex(pd.MultiIndex.from_arrays([grid.dates, slots]))
+    factor = pd.to_numeric(pd.Series(looked_up.to_numpy()), errors="coerce").to_numpy(dtype=float)
+    return np.clip(np.where(np.isnan(factor), default, factor), 0.0, 1.0)
+
+
+def _soc_limited_energy(
+    grid: MonthGrid,
+    up_mask: np.ndarray,
+    down_mask: np.ndarray,
+    planned: np.ndarray,
+    continuous: bool,
+    *battery,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Planned slot energy limited by SOC, plus SOC at the start and end of each month.
+
+    ``battery`` is ``(capacity_mwh, initial_soc, soc_min, soc_max, eta_charge,
+    eta_discharge)``. With ``continuous`` the state runs through the whole
+    history in one kernel call; otherwise it restarts from ``initial_soc``
+    at every month.
+    """
+    initial_soc = float(battery[1])
+    energy = np.zeros(grid.size)
+    if continuous:
+        up_energy, down_energy, soc = soc_constrained_activation(up_mask, down_mask, planned, *battery)
+        energy[up_mask] = up_energy[up_mask]
+        energy[down_mask] = down_energy[down_mask]
+        soc_end = soc[grid.starts + grid.counts - 1]
+        soc_start = np.r_[initial_soc, soc_end[:-1]]
+        return energy, soc_start, soc_end
+
+    soc_start = np.full(len(grid.starts), initial_soc)
+    soc_end = np.empty(len(grid.starts))
+    for m, (start, stop) in enumerate(grid.segments()):
+        up_m, down_m = up_mask[start:stop], down_mask[start:stop]
+        up_energy, down_energy, soc = soc_constrained_activation(up_m, down_m, planned[start:stop], *battery)
+        segment = energy[start:stop]
+        segment[up_m] = up_energy[up_m]
+        segment[down_m] = down_energy[down_m]
+        soc_end[m] = soc[-1]
+    return energy, soc_start, soc_end
+
+
+@dataclass
+class _ProductSlots:
+    """Slot arrays for one product, before SOC limits are applied to ``energy``."""
+
+    prod: str
+    cap_rev: np.ndarray  # per month
+    up_mask: np.ndarray
+    down_mask: np.ndarray
+    energy: np.ndarray
+    up_price: np.ndarray
+    down_price: np.ndarray
+    hedge: Optional[np.ndarray]
+    hedge_avg: np.ndarray  # per month
+    activation_method: str
+
+
+def _shared_soc_energy(
+    grid: MonthGrid,
+    slots: List[_ProductSlots],
+    priority: Sequence[int],
+    pro_rata: bool,
+    slot_limit_mwh: float,
+    continuous: bool,
+    *battery,
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """:func:`_soc_limited_energy` for all products on one shared SOC state."""
+    up = np.stack([s.up_mask for s in slots])
+    down = np.stack([s.down_mask for s in slots])
+    planned = np.stack([s.energy for s in slots])
+    initial_soc = float(battery[1])
+    energy = np.zeros_like(planned)
+    rule = dict(priority=priority, pro_rata=pro_rata, slot_limit_mwh=slot_limit_mwh)
+
+    def apply(segment: slice) -> np.ndarray:
+        up_energy, down_energy, soc = shared_soc_activation(up[:, segment], down[:, segment], planned[:, segment], *battery, **rule)
+        part = energy[:, segment]
+        part[up[:, segment]] = up_energy[up[:, segment]]
+        part[down[:, segment]] = down_energy[down[:, segment]]
+        return soc
+
+    if continuous:
+        soc = apply(slice(None))
+        soc_end = soc[grid.starts + grid.counts - 1]
+        soc_start = np.r_[initial_soc, soc_end[:-1]]
+    else:
+        soc_start = np.full(len(grid.starts), initial_soc)
+        soc_end = np.array([apply(slice(start, stop))[-1] for start, stop in grid.segments()])
+    return list(energy), soc_start, soc_end
+
+
+def _priority_order(names: List[str], product_priority: Optional[Sequence[str]]) -> List[int]:
+    """Row order for the shared SOC: listed products first, then the rest in input order."""
+    listed = [names.index(name) for name in (product_priority or []) if name in names]
+    listed = list(dict.fromkeys(listed))
+    return listed + [i for i in range(len(names)) if i not in listed]
+
+
+def simulate_fr_multi(
+    prices_eur: pd.DataFrame,
+    products: Dict[str, Dict[str, float]],
+    pay_down_as_positive: bool = True,
+    pay_down_positive_map: Optional[Dict[str, bool]] = None,
+    activation_factor_map: Optional[Dict[str, float]] = None,
+    calendars: Optional[Dict[str, pd.DataFrame]] = None,
+    system_imbalance_df: Optional[pd.DataFrame] = None,
+    activation_curve_map: Optional[Dict[str, pd.Series]] = None,
+    activation_price_mode: str = "market",
+    pay_as_bid_map: Optional[Dict[str, Dict[str, float]]] = None,
+    battery_power_mw: Optional[float] = None,
+    battery_capacity_mwh: Optional[float] = None,
+    initial_soc: float = 0.5,
+    soc_min: float = 0.1,
+    soc_max: float = 0.9,
+    round_trip_efficiency: float = 0.9,
+    enable_soc_tracking: bool = True,
+    merit_order_activation_rate: float = 0.5,
+    soc_continuous: bool = False,
+    shared_soc: bool = False,
+    soc_allocation: str = "priority",
+    product_priority: Optional[Sequence[str]] = None,
+    debug: bool = True,
+) -> Dict:
+    """Array engine behind ``simulate_frequency_regulation_revenue_multi``.
+
+    Inputs are aligned once: rows are grouped by month, and calendars and
+    system imbalance are matched to rows by (date, slot) lookups instead of
+    a merge per product. Capacity, activation energy, prices and hedge cost
+    are computed per slot for each product, then reduced to months with
+    ``np.add.reduceat``. Only the SOC recurrence walks time, in the
+    compiled kernel: per month from ``initial_soc``, or with
+    ``soc_continuous`` once over the whole history with the state carried
+    across month boundaries. When SOC is tracked, monthly rows gain
+    ``soc_start``/``soc_end``. The result dict matches the original
+    per-month loop; sums may differ from pandas' in the last bits. Duplicate
+    (date, slot) keys in a calendar or imbalance table match their first row.
+    Tables that carry ``slot_index`` on both sides (every loader emits it,
+    see :mod:`src.data.slot_axis`) are aligned on that key without parsing
+    dates. A price frame that already has an ``imbalance_mw`` column (see
+    :func:`src.core.market_frame.build_market_frame`) needs no
+    ``system_imbalance_df``.
+
+    By default every product is limited by its own copy of the battery.
+    With ``shared_soc`` all products draw on one SOC state instead, stepped
+    once through time: ``soc_allocation="priority"`` serves each slot's
+    requests in ``product_priority`` order (unlisted products follow in
+    input order), ``"pro_rata"`` scales every request in a direction by the
+    same factor when together they exceed what the SOC allows. With
+    ``battery_power_mw`` the combined energy per direction and slot is also
+    capped at ``battery_power_mw * 0.25``. The combined monthly rows then
+    carry the shared ``soc_start``/``soc_end``.
+    """
+    if prices_eur is None or prices_eur.empty:
+        return empty_fr_result()
+    allocation = (soc_allocation or "priority").lower()
+    if allocation not in ("priority", "pro_rata"):
+        raise ValueError(f"soc_allocation must be 'priority' or 'pro_rata', got {soc_allocation!r}")
+
+    inputs = AlignedInputs(prices_eur, system_imbalance_df)
+    grid = inputs.grid
+    n = grid.size
+    labels = grid.labels
+    hours_in_data = grid.counts * 0.25
+    power = float(battery_power_mw) if battery_power_mw is not None else None
+    track_soc = bool(enable_soc_tracking and battery_capacity_mwh and battery_capacity_mwh > 0)
+    if track_soc:
+        battery = (battery_capacity_mwh, initial_soc, soc_min, soc_max, *soc_efficiencies(round_trip_efficiency))
+    mode = (activation_price_mode or "market").lower()
+
+    # Pass 1: slot arrays per product
+    slots: List[_ProductSlots] = []
+    for prod, cfg in products.items():
+        if not cfg.get("enabled"):
+            continue
+        mw = float(cfg.get("mw", 0.0))
+        cap = float(cfg.get("cap_eur_mw_h", 0.0))
+        up_thr = float(cfg.get("up_thr", 0.0))
+        down_thr = float(cfg.get("down_thr", 0.0))
+        if mw <= 0:
+            continue
+
+        calendar = None
+        if calendars and prod in calendars and calendars[prod] is not None and not calendars[prod].empty:
+            calendar = calendars[prod]
+        columns = inputs.columns(calendar)
+
+        def col(name: str) -> Optional[np.ndarray]:
+            return inputs.values(columns, name)
+
+        # Available MW per slot
+        avail = np.full(n, mw)
+        if calendar is not None:
+            if "available_mw" in columns:
+                value = np.maximum(np.nan_to_num(col("available_mw"), nan=0.0), 0.0)
+                avail = np.where(value < mw, value, mw)
+            elif "available" in columns:
+                avail = np.nan_to_num(col("available"), nan=0.0) * mw
+
+        # Capacity revenue: Σ(available_MW × 0.25 h × capacity_price)
+        slot_cap_mw = np.minimum(avail, power) if power is not None else avail
+        cap_rev = grid.sum(slot_cap_mw * 0.25 * cap)
+
+        up_col, down_col, up_price_col, down_price_col = _DAMAS_COLUMNS.get(prod, (None, None, None, None))
+        if prod == "FCR":
+            use_damas = up_col in columns
+        else:
+            use_damas = up_col is not None and up_col in columns and down_col in columns
+        imbalance = col("imbalance_mw") if inputs.has_imbalance and "imbalance_mw" in columns else None
+
+        if use_damas:
+            activation_method = "DAMAS_ACTUAL_TSO_ACTIVATION"
+            market_up = np.nan_to_num(col(up_col), nan=0.0)
+            market_down = np.nan_to_num(col(down_col), nan=0.0) if down_col else np.zeros(n)
+            up_mask = market_up > 0
+            down_mask = market_down > 0
+        else:
+            activation_method = "price_threshold_only"
+            price = col("price_eur_mwh")
+            up_mask = price >= up_thr
+            down_mask = price <= -down_thr
+            if imbalance is not None:
+                up_mask &= imbalance > 0
+                down_mask &= imbalance < 0
+                activation_method = "price_threshold_with_imbalance_direction"
+
+        act_factor = _activation_factor(prod, grid, prices_eur, activation_factor_map, activation_curve_map)
+
+        if use_damas:
+            our_max = avail * act_factor * 0.25
+            if power is not None:
+                our_max = np.minimum(our_max, power * 0.25)
+            energy = np.zeros(n)
+            energy[up_mask] = (np.minimum(our_max, market_up) * merit_order_activation_rate)[up_mask]
+            energy[down_mask] = (np.minimum(our_max, market_down) * merit_order_activation_rate)[down_mask]
+        else:
+            slot_act_mw = avail * act_factor
+            if power is not None:
+                slot_act_mw = np.minimum(slot_act_mw, power)
+            if imbalance is not None:
+                imbalance_cap = np.abs(imbalance)
+                slot_act_mw = np.where(np.isnan(imbalance_cap), slot_act_mw, np.minimum(slot_act_mw, imbalance_cap))
+            energy = slot_act_mw * 0.25 * merit_order_activation_rate
+
+        # Activation prices
+        if use_damas and up_price_col and up_price_col in columns:
+            up_price = np.nan_to_num(col(up_price_col), nan=0.0)
+            down_price = np.nan_to_num(col(down_price_col), nan=0.0) if down_price_col and down_price_col in columns else up_price
+        else:
+            up_price = col("price_eur_mwh")
+            down_price = up_price
+            if mode == "pay_as_bid" and pay_as_bid_map and prod in pay_as_bid_map:
+                pay_prices = pay_as_bid_map.get(prod, {})
+                month_mean = grid.mean(up_price)
+                try:
+                    up_const = np.full(len(labels), float(pay_prices["up_price"])) if "up_price" in pay_prices else month_mean
+                except Exception:
+                    up_const = month_mean
+                try:
+                    down_const = np.full(len(labels), float(pay_prices["down_price"])) if "down_price" in pay_prices else up_const
+                except Exception:
+                    down_const = up_const
+                month_index = grid.month_index
+                up_price = up_const[month_index]
+                down_price = down_const[month_index]
+        prod_down_positive = pay_down_positive_map.get(prod, pay_down_as_positive) if pay_down_positive_map else pay_down_as_positive
+        if prod_down_positive:
+            down_price = np.abs(down_price)
+
+        # Hedge prices: slot-level PZU curve, else a monthly average for the net position
+        hedge = col("hedge_price_eur_mwh") if "hedge_price_eur_mwh" in columns else None
+        if hedge is not None:
+            hedge_avg = grid.mean(hedge)
+        elif "price_eur_mwh" in columns:
+            hedge_avg = grid.mean(np.abs(col("price_eur_mwh")))
+        else:
+            hedge_avg = np.full(len(labels), 50.0)
+
+        slots.append(_ProductSlots(
+            prod=prod, cap_rev=cap_rev, up_mask=up_mask, down_mask=down_mask, energy=energy,
+            up_price=up_price, down_price=down_price, hedge=hedge, hedge_avg=hedge_avg,
+            activation_method=activation_method,
+        ))
+
+    # Pass 2: SOC limits, per product or on one shared state
+    soc_bounds: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    shared_bounds = None
+    if track_soc and slots:
+        if shared_soc:
+            order = _priority_order([s.prod for s in slots], product_priority)
+            slot_limit = power * 0.25 if power is not None else np.inf
+            energies, soc_start, soc_end = _shared_soc_energy(
+                grid, slots, order, allocation == "pro_rata", slot_limit, soc_continuous, *battery
+            )
+            for s, energy in zip(slots, energies):
+                s.energy = energy
+                soc_bounds[s.prod] = (soc_start, soc_end)
+            shared_bounds = (soc_start, soc_end)
+        else:
+            for s in slots:
+                s.energy, soc_start, soc_end = _soc_limited_energy(
+                    grid, s.up_mask, s.down_mask, s.energy, soc_continuous, *battery
+                )
+                soc_bounds[s.prod] = (soc_start, soc_end)
+
+    # Pass 3: monthly reductions
+    monthly_by_product: Dict[str, List[Dict]] = {}
+    totals_by_product: Dict[str, Dict[str, float]] = {}
+    combined_month_map: Dict[str, Dict[str, float]] = {}
+
+    for s in slots:
+        prod, energy, up_mask, down_mask, cap_rev = s.prod, s.energy, s.up_mask, s.down_mask, s.cap_rev
+        up_rev = grid.sum(s.up_price * energy, up_mask)
+        down_rev = grid.sum(s.down_price * energy, down_mask)
+        act_rev = up_rev + down_rev
+        act_energy = grid.sum(energy)
+        up_energy_m = grid.sum(energy, up_mask)
+        down_energy_m = grid.sum(energy, down_mask)
+        net_energy = up_energy_m - down_energy_m  # positive = net discharge, needs hedging
+
+        # Hedge cost: slot-level PZU curve where a month has one, else the net position
+        if s.hedge is not None:
+            has_curve = grid.count(~np.isnan(s.hedge)) > 0
+            filled = np.where(np.isnan(s.hedge), s.hedge_avg[grid.month_index], s.hedge)
+            curve_cost = grid.sum(energy * filled, up_mask) + grid.sum(energy * filled, down_mask)
+        else:
+            has_curve = np.zeros(len(labels), dtype=bool)
+            curve_cost = np.zeros(len(labels))
+        with np.errstate(invalid="ignore"):
+            net_cost = np.where(net_energy > 0, net_energy * s.hedge_avg, 0.0)
+        energy_cost = np.where(has_curve, curve_cost, net_cost)
+
+        up_slots = grid.count(up_mask)
+        down_slots = grid.count(down_mask)
+        if debug:
+            events = grid.activation_events(up_mask | down_mask)
+            for m, month in enumerate(labels):
+                total_rev = cap_rev[m] + act_rev[m]
+                cap_pct = (cap_rev[m] / total_rev * 100) if total_rev > 0 else 0
+                act_pct = (act_rev[m] / total_rev * 100) if total_rev > 0 else 0
+                n_active = int(up_slots[m] + down_slots[m])
+                print(
+                    f"[FR DEBUG] {prod} {month}: CAPACITY={cap_rev[m]:.2f}€ ({cap_pct:.0f}%) + "
+                    f"ACTIVATION={act_rev[m]:.2f}€ ({act_pct:.0f}%) = TOTAL={total_rev:.2f}€"
+                )
+                print(
+                    f"[FR DEBUG] {prod} {month}: energy={act_energy[m]:.2f}MWh hedge_cost={energy_cost[m]:.2f}€ "
+                    f"net_profit={(total_rev - energy_cost[m]):.2f}€ pricing={mode} method={s.activation_method}"
+                )
+                print(
+                    f"[FR DEBUG] {prod} {month}: activation_hours={n_active * 0.25:.1f}h activation_slots={n_active} "
+                    f"activation_events={int(events[m])} up_slots={int(up_slots[m])} down_slots={int(down_slots[m])}"
+                )
+                print(
+                    f"[FR DEBUG] {prod} {month}: up_energy={up_energy_m[m]:.2f}MWh down_energy={down_energy_m[m]:.2f}MWh "
+                    f"net_energy={net_energy[m]:.2f}MWh (positive=discharge)"
+                )
+
+        rows = []
+        cap_total = 0.0
+        act_total = 0.0
+        for m, month in enumerate(labels):
+            cap_m = float(cap_rev[m])
+            act_m = float(act_rev[m])
+            cost_m = float(energy_cost[m])
+            energy_m = float(act_energy[m])
+            row = {
+                "month": month,
+                "hours_in_data": float(hours_in_data[m]),
+                "capacity_revenue_eur": cap_m,
+                "activation_revenue_eur": act_m,
+                "total_revenue_eur": cap_m + act_m,
+                "up_slots": int(up_slots[m]),
+                "down_slots": int(down_slots[m]),
+                "activation_energy_mwh": energy_m,
+                "energy_cost_eur": cost_m,
+            }
+            if prod in soc_bounds:
+                row["soc_start"] = float(soc_bounds[prod][0][m])
+                row["soc_end"] = float(soc_bounds[prod][1][m])
+            rows.append(row)
+            cap_total += cap_m
+            act_total += act_m
+
+            agg = combined_month_map.setdefault(month, {
+                "month": month,
+                "hours_in_data": 0.0,
+                "capacity_revenue_eur": 0.0,
+                "activation_revenue_eur": 0.0,
+                "total_revenue_eur": 0.0,
+                "up_slots": 0,
+                "down_slots": 0,
+                "activation_energy_mwh": 0.0,
+                "energy_cost_eur": 0.0,
+            })
+            agg["hours_in_data"] = max(agg["hours_in_data"], float(hours_in_data[m]))
+            agg["capacity_revenue_eur"] += cap_m
+            agg["activation_revenue_eur"] += act_m
+            agg["total_revenue_eur"] += cap_m + act_m
+            agg["up_slots"] += int(up_slots[m])
+            agg["down_slots"] += int(down_slots[m])
+            agg["activation_energy_mwh"] += energy_m
+            agg["energy_cost_eur"] += cost_m
+            if shared_bounds is not None:
+                agg["soc_start"] = float(shared_bounds[0][m])
+                agg["soc_end"] = float(shared_bounds[1][m])
+
+        monthly_by_product[prod] = rows
+        totals_by_product[prod] = {
+            "capacity_revenue_eur": cap_total,
+            "activation_revenue_eur": act_total,
+            "total_revenue_eur": cap_total + act_total,
+            "energy_cost_eur": float(sum(r["energy_cost_eur"] for r in rows)),
+            "months": len(rows),
+        }
+
+    combined_monthly = sorted(combined_month_map.values(), key=lambda x: x["month"])
+    comb_cap = sum(r["capacity_revenue_eur"] for r in combined_monthly)
+    comb_act = sum(r["activation_revenue_eur"] for r in combined_monthly)
+    comb_cost = sum(r.get("energy_cost_eur", 0.0) for r in combined_monthly)
+    combined_totals = {
+        "capacity_revenue_eur": comb_cap,
+        "activation_revenue_eur": comb_act,
+        "total_revenue_eur": comb_cap + comb_act,
+        "energy_cost_eur": comb_cost,
+        "months": len(combined_monthly),
+    }
+    if debug:
+        comb_energy = sum(r.get("activation_energy_mwh", 0.0) for r in combined_monthly)
+        print(
+            f"[FR DEBUG] Combined totals: cap={comb_cap:.2f}€ act={comb_act:.2f}€ energy={comb_energy:.2f}MWh "
+            f"hedge_cost={comb_cost:.2f}€ months={len(combined_monthly)}",
+        )
+
+    return {
+        "monthly_by_product": monthly_by_product,
+        "totals_by_product": totals_by_product,
+        "combined_monthly": combined_monthly,
+        "combined_totals": combined_totals,
+    }
+
+
+__all__ = [
+    "AlignedInputs",
+    "MonthGrid",
+    "empty_fr_result",
+    "simulate_fr_multi",
+]
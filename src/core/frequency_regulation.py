@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .fr_engine import simulate_fr_multi
+from .soc_kernel import soc_constrained_activation, soc_constrained_activation_batch, soc_efficiencies
+
+
+def simulate_frequency_regulation_revenue(
+    prices_eur: pd.DataFrame,
+    contracted_mw: float,
+    capacity_price_eur_mw_h: float,
+    up_threshold_eur_mwh: float = 0.0,
+    down_threshold_eur_mwh: float = 0.0,
+    pay_down_as_positive: bool = True,
+) -> Dict:
+    """Estimate revenue using estimated imbalance prices as proxy for activation price.
+    - Capacity revenue = contracted_mw * hours_available_in_month * capacity_price_eur_mw_h
+      where hours_available_in_month is computed from the presence of any price entries that month.
+    - Activation revenue: when price >= up_threshold or price <= -down_threshold, assume full contracted MW activated.
+    - Energy per 15-min slot = contracted_mw * 0.25 MWh.
+    - If pay_down_as_positive=True, down-activation uses |price|; else uses signed price.
+    """
+    if prices_eur is None or prices_eur.empty or contracted_mw <= 0:
+        return {
+            'monthly': [],
+            'totals': {
+                'capacity_revenue_eur': 0.0,
+                'activation_revenue_eur': 0.0,
+                'total_revenue_eur': 0.0,
+                'months': 0
+            }
+        }
+
+    df = prices_eur.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df['month'] = df['date'].dt.to_period('M')
+
+    monthly_rows = []
+    cap_total = 0.0
+    act_total = 0.0
+
+    for month, mdf in df.groupby('month'):
+        hours_in_data = len(mdf) * 0.25
+        cap_rev = contracted_mw * hours_in_data * capacity_price_eur_mw_h
+        # Activation flags
+        up_mask = mdf['price_eur_mwh'] >= float(up_threshold_eur_mwh)
+        down_mask = mdf['price_eur_mwh'] <= -float(down_threshold_eur_mwh)
+        # Energy per slot
+        energy_mwh_per_slot = contracted_mw * 0.25
+        # Up activation revenue
+        up_rev = float((mdf.loc[up_mask, 'price_eur_mwh'] * energy_mwh_per_slot).sum())
+        # Down activation revenue (toggle absolute or signed)
+        if pay_down_as_positive:
+            down_rev = float((mdf.loc[down_mask, 'price_eur_mwh'].abs() * energy_mwh_per_slot).sum())
+        else:
+            down_rev = float((mdf.loc[down_mask, 'price_eur_mwh'] * energy_mwh_per_slot).sum())
+        act_rev = up_rev + down_rev
+
+        monthly_rows.append({
+            'month': str(month),
+            'hours_in_data': hours_in_data,
+            'capacity_revenue_eur': cap_rev,
+            'activation_revenue_eur': act_rev,
+            'total_revenue_eur': cap_rev + act_rev,
+            'up_slots': int(up_mask.sum()),
+            'down_slots': int(down_mask.sum()),
+        })
+        cap_total += cap_rev
+        act_total += act_rev
+
+    monthly_rows.sort(key=lambda x: x['month'])
+
+    return {
+        'monthly': monthly_rows,
+        'totals': {
+            'capacity_revenue_eur': cap_total,
+            'activation_revenue_eur': act_total,
+            'total_revenue_eur': cap_total + act_total,
+            'months': len(monthly_rows)
+        }
+    }
+
+
+
+
+def apply_soc_constraints_to_activation(
+    df: pd.DataFrame,
+    up_mask: pd.Series,
+    down_mask: pd.Series,
+    energy_per_slot_mwh: pd.Series,
+    battery_capacity_mwh: float,
+    initial_soc: float = 0.5,
+    soc_min: float = 0.1,
+    soc_max: float = 0.9,
+    round_trip_efficiency: float = 0.9,
+) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """Apply battery SOC constraints to FR activation events.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe with date/slot columns (must be sorted chronologically)
+    up_mask : pd.Series
+        Boolean mask indicating up-regulation activation (discharge)
+    down_mask : pd.Series
+        Boolean mask indicating down-regulation activation (charge)
+    energy_per_slot_mwh : pd.Series
+        Planned energy per 15-min slot before SOC constraints
+    battery_capacity_mwh : float
+        Battery energy capacity (MWh)
+    initial_soc : float, optional
+        Starting SOC fraction (0-1), default 0.5 (50%)
+    soc_min : float, optional
+        Minimum allowed SOC fraction (0-1), default 0.1 (10%)
+    soc_max : float, optional
+        Maximum allowed SOC fraction (0-1), default 0.9 (90%)
+    round_trip_efficiency : float, optional
+        Round-trip efficiency (0-1), default 0.9
+
+    Returns
+    -------
+    constrained_up_energy : pd.Series
+        Actual up-regulation energy after SOC constraints (MWh)
+    constrained_down_energy : pd.Series
+        Actual down-regulation energy after SOC constraints (MWh)
+    soc_series : pd.Series
+        SOC evolution over time (0-1 fraction)
+
+    Notes
+    -----
+    Romania's ANRE regulations require batteries to maintain operational SOC ranges
+    to ensure continued FR availability. This function simulates realistic physical
+    constraints:
+    - Cannot discharge below SOC_min (typically 10-20%)
+    - Cannot charge above SOC_max (typically 80-90%)
+    - Efficiency losses occur during charge/discharge cycles
+    - SOC must be managed to maintain bi-directional capability
+
+    When SOC constraints are violated, activation energy is reduced or blocked,
+    which directly impacts revenue and demonstrates why SOC management is critical
+    for FR participation.
+    """
+    # The recurrence runs on plain arrays (compiled with numba when
+    # installed); see soc_kernel for the bit-exact step rules.
+    charge_efficiency, discharge_efficiency = soc_efficiencies(round_trip_efficiency)  # √η each way
+    actual_up_energy, actual_down_energy, soc = soc_constrained_activation(
+        np.asarray(up_mask, dtype=bool),
+        np.asarray(down_mask, dtype=bool),
+        np.asarray(energy_per_slot_mwh, dtype=float),
+        battery_capacity_mwh,
+        initial_soc,
+        soc_min,
+        soc_max,
+        charge_efficiency,
+        discharge_efficiency,
+    )
+
+    return (
+        pd.Series(actual_up_energy, index=df.index),
+        pd.Series(actual_down_energy, index=df.index),
+        pd.Series(soc, index=df.index),
+    )
+
+
+# Scenario columns understood by apply_soc_constraints_to_activation_batch and
+# their defaults, matching apply_soc_constraints_to_activation.
+SOC_SCENARIO_DEFAULTS: Dict[str, float] = {
+    'battery_capacity_mwh': float('nan'),
+    'initial_soc': 0.5,
+    'soc_min': 0.1,
+    'soc_max': 0.9,
+    'round_trip_efficiency': 0.9,
+    'merit_order_activation_rate': 1.0,
+}
+
+
+def soc_scenario_grid(**axes) -> pd.DataFrame:
+    """Cartesian product of scenario axes, one row per scenario.
+
+    Example: ``soc_scenario_grid(battery_capacity_mwh=[40, 55], soc_min=[0.05, 0.1])``
+    gives four rows. Keys must be columns of :data:`SOC_SCENARIO_DEFAULTS`.
+    """
+    unknown = set(axes) - set(SOC_SCENARIO_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown scenario axes: {sorted(unknown)}")
+    names = list(axes)
+    values = [np.atleast_1d(axes[name]) for name in names]
+    return pd.MultiIndex.from_product(values, names=names).to_frame(index=False)
+
+
+def apply_soc_constraints_to_activation_batch(
+    df: pd.DataFrame,
+    up_mask: pd.Series,
+    down_mask: pd.Series,
+    energy_per_slot_mwh: pd.Series,
+    scenarios: pd.DataFrame,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run :func:`apply_soc_constraints_to_activation` for many battery scenarios at once.
+
+    ``scenarios`` has one row per scenario and any of the columns in
+    :data:`SOC_SCENARIO_DEFAULTS` (``battery_capacity_mwh`` is required).
+    ``merit_order_activation_rate`` scales ``energy_per_slot_mwh`` per
+    scenario, so pass the energy before the merit-order rate is applied.
+
+    Returns ``(up_energy, down_energy, soc)`` as ``(len(scenarios), len(df))``
+    arrays in the row order of ``scenarios``. Every row equals the
+    single-scenario result bit for bit; the rate is applied inside the SOC
+    kernel, so no scaled copy of the energy is built per scenario.
+    """
+    if 'battery_capacity_mwh' not in scenarios.columns:
+        raise ValueError("scenarios must include a 'battery_capacity_mwh' column")
+    columns = {
+        name: (scenarios[name].to_numpy(dtype=float) if name in scenarios.columns
+               else np.full(len(scenarios), default, dtype=float))
+        for name, default in SOC_SCENARIO_DEFAULTS.items()
+    }
+    efficiency = np.sqrt(columns['round_trip_efficiency'])  # √η each way
+    return soc_constrained_activation_batch(
+        np.asarray(up_mask, dtype=bool),
+        np.asarray(down_mask, dtype=bool),
+        np.asarray(energy_per_slot_mwh, dtype=float),
+        columns['battery_capacity_mwh'],
+        columns['initial_soc'],
+        columns['soc_min'],
+        columns['soc_max'],
+        efficiency,
+        efficiency,
+        request_scale=columns['merit_order_activation_rate'],
+    )
+
+
+def simulate_frequency_regulation_revenue_multi(
+    prices_eur: pd.DataFrame,
+    products: Dict[str, Dict[str, float]],
+    pay_down_as_positive: bool = True,
+    pay_down_positive_map: Optional[Dict[str, bool]] = None,
+    activation_factor_map: Optional[Dict[str, float]] = None,
+    calendars: Optional[Dict[str, pd.DataFrame]] = None,
+    system_imbalance_df: Optional[pd.DataFrame] = None,
+    activation_curve_map: Optional[Dict[str, pd.Series]] = None,
+    activation_price_mode: str = "market",
+    pay_as_bid_map: Optional[Dict[str, Dict[str, float]]] = None,
+    battery_power_mw: Optional[float] = None,
+    battery_capacity_mwh: Optional[float] = None,
+    initial_soc: float = 0.5,
+    soc_min: float = 0.1,
+    soc_max: float = 0.9,
+    round_trip_efficiency: float = 0.9,
+    enable_soc_tracking: bool = True,
+    merit_order_activation_rate: float = 0.5,
+    soc_continuous: bool = False,
+    shared_soc: bool = False,
+    soc_allocation: str = "priority",
+    product_priority: Optional[List[str]] = None,
+) -> Dict:
+    """Multi-product simulation for FCR/aFRR/mFRR with SOC tracking and merit-order logic.
+
+    Parameters
+    ----------
+    battery_capacity_mwh : float, optional
+        Battery energy capacity in MWh. Required if enable_soc_tracking=True.
+    initial_soc : float, default 0.5
+        Initial State of Charge as fraction (0-1)
+    soc_min : float, default 0.1
+        Minimum allowed SOC (0-1)
+    soc_max : float, default 0.9
+        Maximum allowed SOC (0-1)
+    round_trip_efficiency : float, default 0.9
+        Battery round-trip efficiency (0-1)
+    enable_soc_tracking : bool, default True
+        Enable realistic SOC constraints on activation energy
+    merit_order_activation_rate : float, default 0.5
+        Conservative activation rate (0-1) to model merit-order dispatch.
+        Represents average probability of activation based on bid position.
+        0.3 = aggressive low bids (30% avg activation)
+        0.5 = mid-stack bids (50% avg activation)
+        0.7 = conservative high bids (70% avg activation)
+    soc_continuous : bool, default False
+        Carry SOC across month boundaries in one pass over the whole history
+        instead of restarting each month from initial_soc. With SOC tracking,
+        monthly rows include soc_start and soc_end either way.
+    shared_soc : bool, default False
+        Run all enabled products against one battery SOC instead of one copy
+        of the battery per product. Combined monthly rows then carry the
+        shared soc_start and soc_end.
+    soc_allocation : {"priority", "pro_rata"}, default "priority"
+        How a shared SOC serves simultaneous requests: in product_priority
+        order, or scaled pro rata when together they exceed the SOC room.
+    product_priority : list of str, optional
+        Product order for the priority rule, e.g. ["FCR", "aFRR", "mFRR"].
+        Unlisted products follow in the order of `products`.
+
+    Products format example:
+    {
+      'FCR': {'enabled': True, 'mw': 10, 'cap_eur_mw_h': 7.5, 'up_thr': 0.0, 'down_thr': 0.0},
+      'aFRR': {'enabled': True, 'mw': 15, 'cap_eur_mw_h': 5.0, 'up_thr': 0.0, 'down_thr': 0.0},
+      'mFRR': {'enabled': False, 'mw': 0,  'cap_eur_mw_h': 0.0, 'up_thr': 0.0, 'down_thr': 0.0},
+    }
+
+    Notes
+    -----
+    Romania Pay-as-Bid Regime (ANRE 2024):
+    - From July 2024 until December 31, 2026, balancing market uses pay-as-bid pricing
+    - Each provider receives their bid price, not the marginal market price
+    - Set activation_price_mode="pay_as_bid" and provide pay_as_bid_map
+    - After 2026, market may revert to marginal pricing (update activation_price_mode accordingly)
+
+    The computation runs in :func:`src.core.fr_engine.simulate_fr_multi`,
+    which aligns the inputs once and reduces slot arrays to months.
+    """
+    return simulate_fr_multi(
+        prices_eur,
+        products,
+        pay_down_as_positive=pay_down_as_positive,
+        pay_down_positive_map=pay_down_positive_map,
+        activation_factor_map=activation_factor_map,
+        calendars=calendars,
+        system_imbalance_df=system_imbalance_df,
+        activation_curve_map=activation_curve_map,
+        activation_price_mode=activation_price_mode,
+        pay_as_bid_map=pay_as_bid_map,
+        battery_power_mw=battery_power_mw,
+        battery_capacity_mwh=battery_capacity_mwh,
+        initial_soc=initial_soc,
+        soc_min=soc_min,
+        soc_max=soc_max,
+        round_trip_efficiency=round_trip_efficiency,
+        enable_soc_tracking=enable_soc_tracking,
+        merit_order_activation_rate=merit_order_activation_rate,
+        soc_continuous=soc_continuous,
+        shared_soc=shared_soc,
+        soc_allocation=soc_allocation,
+        product_priority=product_priority,
+    )
+
+
+__all__ = [
+    "SOC_SCENARIO_DEFAULTS",
+    "apply_soc_constraints_to_activation",
+    "apply_soc_constraints_to_activation_batch",
+    "simulate_frequency_regulation_revenue",
+    "simulate_frequency_regulation_revenue_multi",
+    "soc_scenario_grid",
+]
@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from ..data.columnar import is_columnar_path, read_market_history
+from ..data.market_cache import read_csv_cached
+from ..data.price_cube import load_price_cube
+from ..data.slot_axis import with_slot_index
+from ..tools.aggregate_imbalance_manual import (
+    _detect_columns as _imb_detect_columns,
+    _normalize as _imb_normalize,
+    _read_any as _imb_read_any,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def load_config(path: str) -> dict:
+    """Read a YAML configuration file."""
+    with open(path, "r", encoding="utf-8") as file:
+        return yaml.safe_load(file)
+
+
+def load_balancing_day_series(bm_csv: Optional[str], target_date_iso: str) -> Optional[pd.Series]:
+    """Return balancing market prices for a specific day."""
+    cube = load_price_cube(bm_csv)
+    if cube is None or cube.slot_column != "slot":
+        return None
+
+    prices = cube.day_values(target_date_iso)
+    if prices is None or len(prices) == 0:
+        return None
+
+    return pd.Series(prices.tolist())
+
+
+def _guess_currency_column(df: pd.DataFrame) -> Optional[str]:
+    """Return upper-case currency code detected in raw dataframe, if any."""
+    currency_like = [
+        "currency",
+        "moneda",
+        "cur",
+        "u.m.",
+        "unit",
+        "currency unit",
+        "currency code",
+    ]
+    cols = {str(c).strip().lower(): c for c in df.columns}
+    for key in currency_like:
+        if key in cols:
+            series = df[cols[key]].astype(str).str.strip()
+            non_empty = series[series.str.len() > 0]
+            if non_empty.empty:
+                continue
+            top = non_empty.str.upper().value_counts().idxmax()
+            if isinstance(top, str) and len(top) <= 6:
+                return top
+    return None
+
+
+def load_transelectrica_imbalance_from_excel(
+    path_or_dir: str,
+    fx_ron_per_eur: float = 5.0,
+    declared_currency: Optional[str] = None,
+) -> pd.DataFrame:
+    """Load Transelectrica imbalance data (Excel or CSV). CSV files with DAMAS columns are returned as-is.
+
+    Every non-empty result carries ``slot_index`` (see :mod:`src.data.slot_axis`).
+    """
+    path_obj = Path(path_or_dir)
+    frames: List[pd.DataFrame] = []
+
+    # Handle CSV files (typically contains DAMAS activation data + full columns)
+    if path_obj.is_file() and (path_obj.suffix.lower() == '.csv' or is_columnar_path(path_obj)):
+        try:
+            if is_columnar_path(path_obj):
+                df = read_market_history(path_obj)
+            else:
+                df = read_csv_cached(str(path_obj))
+            # Check if it's already in the correct format with required columns
+            required_cols = {'date', 'slot', 'price_eur_mwh'}
+            if required_cols.issubset(df.columns):
+                # CSV already formatted with full DAMAS columns - return as-is
+                # This preserves afrr_up_activated_mwh, mfrr_down_price_eur, etc.
+                return with_slot_index(df)
+            # If CSV doesn't have required columns, fall through to Excel logic
+        except Exception:
+            pass  # Fall through to try Excel logic
+
+    if path_obj.is_dir():
+        for item in path_obj.rglob("*.xls*"):
+            try:
+                df = _imb_read_any(item)
+                if df is None or df.empty:
+                    continue
+                dcol, tcol, pcol, fcol = _imb_detect_columns(df)
+                norm = _imb_normalize(df, dcol, tcol, pcol, fcol)
+                detected = _guess_currency_column(df)
+                if detected:
+                    norm["source_currency"] = detected.upper()
+                frames.append(norm)
+            except Exception:
+                continue
+    elif path_obj.is_file():
+        try:
+            df = _imb_read_any(path_obj)
+        except Exception:
+            df = None
+        if df is None or df.empty:
+            return pd.DataFrame(columns=["date", "slot", "price_eur_mwh"])
+        dcol, tcol, pcol, fcol = _imb_detect_columns(df)
+        norm = _imb_normalize(df, dcol, tcol, pcol, fcol)
+        detected = _guess_currency_column(df)
+        if detected:
+            norm["source_currency"] = detected.upper()
+        frames.append(norm)
+    else:
+        return pd.DataFrame(columns=["date", "slot", "price_eur_mwh"])
+
+    if not frames:
+        return pd.DataFrame(columns=["date", "slot", "price_eur_mwh"])
+
+    non_empty_frames = [frame for frame in frames if not frame.empty]
+    if not non_empty_frames:
+        return pd.DataFrame(columns=["date", "slot", "price_eur_mwh"])
+
+    out = pd.concat(non_empty_frames, ignore_index=True)
+    out = out.sort_values(["date", "slot"]).drop_duplicates(["date", "slot"], keep="last")
+
+    declared = (declared_currency or "").upper().strip()
+    if declared not in {"RON", "EUR", ""}:
+        declared = ""
+
+    if "source_currency" in out.columns:
+        src_cur = out["source_currency"].fillna("").astype(str).str.upper()
+    else:
+        src_cur = pd.Series([declared or ""] * len(out))
+
+    try:
+        fx = float(fx_ron_per_eur)
+        if fx == 0:
+            fx = 5.0
+    except Exception:
+        fx = 5.0
+
+    price_numeric = pd.to_numeric(out["price"], errors="coerce")
+    ron_aliases = {"RON", "LEI", "RON/MWH", "LEI/MWH"}
+    eur_aliases = {"EUR", "EUR/MWH"}
+
+    is_ron = src_cur.isin(ron_aliases)
+    is_eur = src_cur.isin(eur_aliases)
+
+    if not is_eur.any() and not is_ron.any():
+        if declared == "EUR":
+            is_eur = pd.Series([True] * len(out))
+        elif declared == "RON":
+            is_ron = pd.Series([True] * len(out))
+
+    price_eur = price_numeric.copy()
+    if is_ron.any():
+        # Reset index to ensure alignment
+        is_ron_aligned = is_ron.reindex(price_eur.index, fill_value=False)
+        price_eur.loc[is_ron_aligned] = price_numeric.loc[is_ron_aligned] / fx
+
+    original_currency = src_cur.where(
+        src_cur != "",
+        declared or ("RON" if is_ron.any() and not is_eur.any() else "EUR"),
+    )
+    out["source_currency"] = original_currency
+    out["price_currency"] = "EUR"
+    out["price_eur_mwh"] = price_eur
+    return with_slot_index(out[["date", "slot", "price_eur_mwh", "source_currency", "price_currency"]])
+
+
+def build_hedge_price_curve(
+    pzu_csv: Optional[str],
+    *,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    fx_ron_per_eur: float = 5.0,
+) -> pd.DataFrame:
+    """Return a 15-minute hedge price curve derived from PZU data, keyed by ``slot_index``."""
+    empty = pd.DataFrame(columns=["date", "slot", "hedge_price_eur_mwh"])
+    cube = load_price_cube(pzu_csv)
+    if cube is None:
+        return empty
+
+    try:
+        start_ts = pd.Timestamp(start_date) if start_date is not None else None
+    except Exception:
+        start_ts = None
+    try:
+        end_ts = pd.Timestamp(end_date) if end_date is not None else None
+    except Exception:
+        end_ts = None
+
+    df = cube.to_frame(start_ts, end_ts)
+    if df.empty:
+        return empty
+
+    price_eur = df["price"].copy()
+    if "currency" in df.columns:
+        currency = df["currency"].astype(str).str.strip().str.upper()
+        ron_mask = currency.isin(["RON", "LEI", "RON/MWH", "LEI/MWH"])
+        try:
+            fx = float(fx_ron_per_eur)
+            if fx == 0:
+                fx = 5.0
+        except Exception:
+            fx = 5.0
+        price_eur = price_eur.where(~ron_mask, price_eur / fx)
+    df["hedge_price_eur_mwh"] = price_eur
+
+    if "slot" in df.columns:
+        df["slot"] = pd.to_numeric(df["slot"], errors="coerce")
+        df = df.dropna(subset=["slot"])
+        if df.empty:
+            return empty
+        df["slot"] = df["slot"].astype(int)
+        out = df[["date", "slot", "hedge_price_eur_mwh"]]
+    else:
+        df["hour"] = pd.to_numeric(df["hour"], errors="coerce")
+        df = df.dropna(subset=["hour"])
+        if df.empty:
+            return empty
+        df = df[(df["hour"] >= 0) & (df["hour"] <= 23)]
+        if df.empty:
+            return empty
+        df["hour"] = df["hour"].astype(int)
+        df = df.groupby(["date", "hour"], as_index=False)["hedge_price_eur_mwh"].mean()
+
+        expanded: List[pd.DataFrame] = []
+        for offset in range(4):
+            tmp = df.copy()
+            tmp["slot"] = tmp["hour"] * 4 + offset
+            expanded.append(tmp[["date", "slot", "hedge_price_eur_mwh"]])
+        if not expanded:
+            return empty
+        out = pd.concat(expanded, ignore_index=True)
+
+    out["date"] = pd.to_datetime(out["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    out = out.dropna(subset=["date", "slot"])
+    if out.empty:
+        return empty
+    out["slot"] = out["slot"].astype(int).clip(lower=0, upper=95)
+    out = out.sort_values(["date", "slot"]).drop_duplicates(["date", "slot"], keep="last")
+    return with_slot_index(out)
+
+
+def load_system_imbalance_from_excel(
+    path_or_dir: str,
+    target_dates: Optional[pd.DatetimeIndex] = None,
+) -> pd.DataFrame:
+    """Load Transelectrica system imbalance data and normalise to date/slot/slot_index/mW."""
+    path_obj = Path(path_or_dir)
+    targets: List[Path] = []
+    if path_obj.is_dir():
+        targets = [*path_obj.rglob("*.xls"), *path_obj.rglob("*.xlsx"), *path_obj.rglob("*.csv"), *path_obj.rglob("*.parquet")]
+    elif path_obj.is_file():
+        targets = [path_obj]
+    else:
+        return pd.DataFrame(columns=["date", "slot", "imbalance_mw"])
+
+    frames: List[pd.DataFrame] = []
+
+    for target in targets:
+        if is_columnar_path(target):
+            try:
+                frame = read_market_history(target)
+            except Exception:
+                continue
+            if "imbalance_mw" in frame.columns:
+                frames.append(frame[["date", "slot", "imbalance_mw"]])
+            continue
+
+        if target.suffix.lower() == ".xlsx":
+            try:
+                raw = pd.read_excel(target, skiprows=4)
+                lower_cols = [str(c).lower() for c in raw.columns]
+                if any("estimated system imbalance" in c for c in lower_cols):
+                    tmp = raw.copy()
+                    tmp["Time interval"] = tmp["Time interval"].astype(str)
+                    split = tmp["Time interval"].str.split(" - ", n=1, expand=True)
+                    tmp["start"] = split[0]
+                    tmp["date"] = pd.to_datetime(tmp["start"], dayfirst=True, errors="coerce")
+                    tmp = tmp.dropna(subset=["date", "ISP"])
+                    tmp["slot"] = pd.to_numeric(tmp["ISP"], errors="coerce") - 1
+                    tmp = tmp.dropna(subset=["slot"])
+                    tmp["slot"] = tmp["slot"].astype(int).clip(lower=0, upper=95)
+                    tmp["imbalance_mw"] = pd.to_numeric(
+                        tmp.get("Estimated system imbalance [MWh]"), errors="coerce"
+                    ) / 0.25
+                    frame = tmp[["date", "slot", "imbalance_mw"]].dropna(subset=["imbalance_mw"])
+                    frames.append(frame)
+                    continue
+            except Exception:
+                pass
+
+        try:
+            df = _imb_read_any(target)
+        except Exception:
+            continue
+        if df is None or df.empty:
+            continue
+
+        candidate_col = None
+        for column in df.columns:
+            lowered = str(column).lower()
+            if any(
+                key in lowered
+                for key in [
+                    "imbalance",
+                    "dezechilibru",
+                    "power system imbalance",
+                    "sistem",
+                    "desechilibru",
+                ]
+            ):
+                candidate_col = column
+                break
+        if candidate_col is None:
+            num_cols = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+            if num_cols:
+                candidate_col = num_cols[-1]
+            else:
+                continue
+
+        dcol, tcol, _, _ = _imb_detect_columns(df)
+        norm = _imb_normalize(df, dcol, tcol, candidate_col, None)
+        if "price" in norm.columns:
+            norm = norm.rename(columns={"price": "imbalance_mw"})
+        if "imbalance_mw" not in norm.columns:
+            if candidate_col in norm.columns:
+                norm["imbalance_mw"] = pd.to_numeric(norm[candidate_col], errors="coerce")
+            else:
+                continue
+        frames.append(norm[["date", "slot", "imbalance_mw"]])
+
+    if not frames:
+        return pd.DataFrame(columns=["date", "slot", "imbalance_mw"])
+
+    out = pd.concat(frames, ignore_index=True)
+    out["date"] = pd.to_datetime(out["date"], errors="coerce")
+    out = out.dropna(subset=["date"])
+    out["slot"] = pd.to_numeric(out["slot"], errors="coerce")
+    out = out.dropna(subset=["slot"])
+    out["slot"] = out["slot"].astype(int).clip(lower=0, upper=95)
+    out["imbalance_mw"] = pd.to_numeric(out["imbalance_mw"], errors="coerce")
+    out = out.dropna(subset=["imbalance_mw"])
+    out = out.sort_values(["date", "slot"]).drop_duplicates(["date", "slot"], keep="last")
+
+    if target_dates is not None and len(target_dates) > 0:
+        target_dates = pd.to_datetime(target_dates, errors="coerce").dropna().normalize().unique()
+        if len(target_dates) > 0:
+            base_idx = pd.MultiIndex.from_product([target_dates, range(96)], names=["date", "slot"])
+            base = pd.DataFrame(index=base_idx).reset_index()
+            base = base.merge(out, on=["date", "slot"], how="left")
+            slot_means = base.groupby("slot")["imbalance_mw"].mean()
+            base["imbalance_mw"] = base["imbalance_mw"].fillna(base["slot"].map(slot_means))
+            base["imbalance_mw"] = base["imbalance_mw"].fillna(0.0)
+            out = base
+
+    out["date"] = out["date"].dt.date.astype(str)
+    return with_slot_index(out[["date", "slot", "imbalance_mw"]])
+
+
+def find_in_data_dir(patterns: List[str]) -> Optional[str]:
+    """Return first file path in ./data matching any provided pattern."""
+    data_dir = PROJECT_ROOT / "data"
+    if not data_dir.exists():
+        return None
+    patterns_ci = [pattern.lower() for pattern in patterns]
+    for path in data_dir.rglob("*"):
+        if not path.is_file():
+            continue
+        name = path.name.lower()
+        if any(re.search(pat, name) for pat in patterns_ci):
+            return str(path)
+    return None
+
+
+def list_in_data_dir(patterns: List[str]) -> List[str]:
+    """Return all file paths in known roots matching any provided pattern."""
+    results: List[str] = []
+    roots = [PROJECT_ROOT / "data", PROJECT_ROOT / "downloads", PROJECT_ROOT]
+    patterns_ci = [pattern.lower() for pattern in patterns]
+    for root in roots:
+        if not root.exists():
+            continue
+        for path in root.rglob("*"):
+            if not path.is_file():
+                continue
+            name = path.name.lower()
+            for pattern in patterns_ci:
+                try:
+                    if re.search(pattern, name):
+                        results.append(str(path))
+                        break
+                except Exception:
+                    continue
+    seen = set()
+    uniq = []
+    for item in results:
+        if item not in seen:
+            uniq.append(item)
+            seen.add(item)
+    return uniq
+
+
+def parse_battery_specs_from_document(path: str) -> Dict[str, Optional[float]]:
+    """Parse a document for headline battery specifications."""
+    output: Dict[str, Optional[float]] = {
+        "capacity_mwh": None,
+        "power_mw": None,
+        "round_trip_efficiency": None,
+        "soc_min": None,
+        "soc_max": None,
+    }
+    try:
+        file_path = Path(path)
+        text = ""
+        if file_path.suffix.lower() == ".pdf":
+            try:
+                from pdfminer.high_level import extract_text  # type: ignore
+
+                text = extract_text(path) or ""
+            except Exception:
+                text = ""
+        elif file_path.suffix.lower() in (".txt", ".md"):
+            text = file_path.read_text(encoding="utf-8", errors="ignore")
+        else:
+            try:
+                text = file_path.read_text(encoding="utf-8", errors="ignore")
+            except Exception:
+                text = ""
+        content = text.replace("\n", " ")
+
+        match = re.search(r"(\d{1,3})\s*MW\b", content, re.IGNORECASE)
+        if match:
+            output["power_mw"] = float(match.group(1))
+
+        match = re.search(r"(\d{1,4})\s*MWh\b", content, re.IGNORECASE)
+        if match:
+            output["capacity_mwh"] = float(match.group(1))
+
+        match = re.search(r"(round[-\s]?trip|RTE)[^%]{0,30}?(\d{2,3})\s*%", content, re.IGNORECASE)
+        if match:
+            rte = float(match.group(2)) / 100.0
+            if 0 < rte <= 1.0:
+                output["round_trip_efficiency"] = rte
+
+        match = re.search(r"SOC\s*min[^0-9]{0,10}(\d{1,2})\s*%", content, re.IGNORECASE)
+        if match:
+            output["soc_min"] = float(match.group(1)) / 100.0
+
+        match = re.search(r"SOC\s*max[^0-9]{0,10}(\d{1,3})\s*%", content, re.IGNORECASE)
+        if match:
+            output["soc_max"] = float(match.group(1)) / 100.0
+
+        match = re.search(r"DoD[^0-9]{0,10}(\d{1,3})\s*%", content, re.IGNORECASE)
+        if match and output["soc_min"] is None and output["soc_max"] is None:
+            dod = float(match.group(1)) / 100.0
+            output["soc_min"] = max(0.0, 1.0 - dod)
+            output["soc_max"] = 1.0
+    except Exception:
+        pass
+    return output
+
+
+__all__ = [
+    "PROJECT_ROOT",
+    "load_config",
+    "load_balancing_day_series",
+    "load_transelectrica_imbalance_from_excel",
+    "build_hedge_price_curve",
+    "load_system_imbalance_from_excel",
+    "find_in_data_dir",
+    "list_in_data_dir",
+    "parse_battery_specs_from_document",
+]
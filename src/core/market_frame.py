@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..data.market_cache import read_csv_cached
+from ..data.result_cache import with_source_digest
+from ..data.slot_axis import NO_SLOT, attach_by_slot, slot_index_of
+from .fr_engine import _DAMAS_COLUMNS, _to_datetime
+from .loaders import (
+    build_hedge_price_curve,
+    load_system_imbalance_from_excel,
+    load_transelectrica_imbalance_from_excel,
+)
+
+# Every DAMAS column the FR engine reads, plus the TSO's system imbalance volume.
+DAMAS_COLUMNS: List[str] = [
+    name for columns in _DAMAS_COLUMNS.values() for name in columns if name is not None
+] + ["system_imbalance_mwh"]
+
+
+def _keyed(table: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """``table`` keyed by ``slot_index``, one row per key (last wins), in time order.
+
+    Rows without a valid key (missing date or slot, or a wall-clock time
+    skipped by the spring DST change) are dropped.
+    """
+    if table is None or table.empty or "date" not in table or "slot" not in table:
+        return None
+    keys = table["slot_index"].to_numpy(dtype=np.int64) if "slot_index" in table else slot_index_of(table)
+    valid = keys != NO_SLOT
+    if not valid.any():
+        return None
+    out = table.loc[valid].copy()
+    out["date"] = _to_datetime(out["date"]).astype("datetime64[D]").astype("datetime64[ns]")
+    out["slot"] = pd.to_numeric(out["slot"]).astype(np.int64)
+    out["slot_index"] = keys[valid]
+    out = out.drop_duplicates("slot_index", keep="last")
+    return out.sort_values("slot_index", kind="stable").reset_index(drop=True)
+
+
+def build_market_frame(
+    imbalance_path: str,
+    *,
+    pzu_csv: Optional[str] = None,
+    damas_csv: Optional[str] = None,
+    system_imbalance_path: Optional[str] = None,
+    fx_ron_per_eur: float = 5.0,
+    pzu_fx_ron_per_eur: Optional[float] = None,
+    declared_currency: Optional[str] = None,
+) -> pd.DataFrame:
+    """Join every 15-minute FR input onto the imbalance price rows once.
+
+    Loads imbalance prices (as :func:`load_transelectrica_imbalance_from_excel`)
+    and attaches, by ``slot_index`` (see :mod:`src.data.slot_axis`):
+
+    - ``hedge_price_eur_mwh`` from the PZU curve of ``pzu_csv``, converted
+      at ``pzu_fx_ron_per_eur`` (default ``fx_ron_per_eur``);
+    - the DAMAS activation volumes and prices of ``damas_csv``, unless the
+      imbalance file already carries them;
+    - ``imbalance_mw`` from ``system_imbalance_path``.
+
+    The result has one row per slot index, sorted by time, with ``date`` as
+    datetime64 midnights and integer ``slot``; rows whose wall-clock slot does
+    not exist (spring DST change) are dropped. A column is only added when its
+    source yielded data, so the FR engine can tell "no source" from "no value
+    in this slot". Other columns of the price file are kept as loaded. The
+    frame can be passed to ``simulate_frequency_regulation_revenue_multi``
+    without ``system_imbalance_df``; it carries a digest of its source files
+    and arguments (see :func:`src.data.result_cache.with_source_digest`), so
+    cached simulations key on that instead of hashing the whole frame.
+    """
+    prices = load_transelectrica_imbalance_from_excel(
+        imbalance_path,
+        fx_ron_per_eur=fx_ron_per_eur,
+        declared_currency=declared_currency,
+    )
+    frame = _keyed(prices)
+    if frame is None:
+        return pd.DataFrame(columns=["date", "slot", "slot_index", "price_eur_mwh"])
+
+    start, end = frame["date"].iloc[0], frame["date"].iloc[-1]
+    if pzu_csv:
+        hedge = build_hedge_price_curve(
+            pzu_csv,
+            start_date=start,
+            end_date=end,
+            fx_ron_per_eur=fx_ron_per_eur if pzu_fx_ron_per_eur is None else pzu_fx_ron_per_eur,
+        )
+        if not hedge.empty:
+            frame = attach_by_slot(frame, hedge, ["hedge_price_eur_mwh"])
+
+    if damas_csv and Path(damas_csv).is_file() and not set(DAMAS_COLUMNS).issubset(frame.columns):
+        frame = attach_by_slot(frame, read_csv_cached(str(damas_csv)), DAMAS_COLUMNS)
+
+    if system_imbalance_path:
+        imbalance = load_system_imbalance_from_excel(system_imbalance_path)
+        if not imbalance.empty:
+            frame = attach_by_slot(frame, imbalance, ["imbalance_mw"])
+
+    return with_source_digest(
+        frame,
+        imbalance_path,
+        pzu_csv,
+        damas_csv,
+        system_imbalance_path,
+        fx_ron_per_eur=fx_ron_per_eur,
+        pzu_fx_ron_per_eur=pzu_fx_ron_per_eur,
+        declared_currency=declared_currency,
+    )
+
+
+__all__ = [
+    "DAMAS_COLUMNS",
+    "build_market_frame",
+]
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# numba is optional: when it is installed the SOC recurrence runs as compiled
+# code, otherwise the same loop runs in Python over plain lists. numba is only
+# imported when a kernel is first compiled, so importing this module stays
+# cheap for headless jobs. Set BATTERY_SOC_JIT=0 to force the fallback.
+_JIT_ENABLED = os.environ.get("BATTERY_SOC_JIT", "1").strip().lower() not in ("0", "false", "no")
+
+
+def soc_efficiencies(round_trip_efficiency: float) -> Tuple[float, float]:
+    """Charge and discharge efficiencies, √η each way."""
+    eta = float(np.sqrt(round_trip_efficiency))
+    return eta, eta
+
+
+def _soc_event_loop(is_up, requested, capacity, soc0, soc_min, soc_max, eta_charge, eta_discharge, energy_out, soc_out):
+    # One step per activation slot; SOC is unchanged on idle slots. The
+    # comparisons spell out what builtin min()/max() return (including for
+    # NaN), so compiled and interpreted runs agree bit for bit.
+    current = soc0
+    for k in range(len(is_up)):
+        request = requested[k]
+        if is_up[k]:
+            room = (current - soc_min) * capacity
+            limit = room if room > 0.0 else 0.0
+            actual = limit if limit < request else request
+            level = current - (actual / eta_discharge) / capacity
+            current = level if level > soc_min else soc_min
+        else:
+            room = (soc_max - current) * capacity
+            limit = room if room > 0.0 else 0.0
+            actual = limit if limit < request else request
+            level = current + (actual * eta_charge) / capacity
+            current = level if level < soc_max else soc_max
+        energy_out[k] = actual
+        soc_out[k] = current
+
+
+def _soc_scenario_rows(up, down, requested, scale, capacity, soc0, soc_min, soc_max, eta_charge, eta_discharge,
+                       up_out, down_out, soc_out):
+    # Compiled batch path. Scenarios are independent, so each one walks every
+    # slot and writes its own contiguous (slots,) output rows, including the
+    # SOC carried over idle slots; nothing is scattered or transposed after
+    # the loop. requested has one row shared by all scenarios or one row per
+    # scenario, times scale[s]; up_out/down_out arrive zeroed. The step is
+    # _soc_event_loop's, so every row matches a single-scenario run.
+    shared = requested.shape[0] == 1
+    for s in range(capacity.shape[0]):
+        row = 0 if shared else s
+        current = soc0[s]
+        for t in range(up.shape[0]):
+            if up[t]:
+                request = requested[row, t] * scale[s]
+                room = (current - soc_min[s]) * capacity[s]
+                limit = room if room > 0.0 else 0.0
+                actual = limit if limit < request else request
+                level = current - (actual / eta_discharge[s]) / capacity[s]
+                current = level if level > soc_min[s] else soc_min[s]
+                up_out[s, t] = actual
+            elif down[t]:
+                request = requested[row, t] * scale[s]
+                room = (soc_max[s] - current) * capacity[s]
+                limit = room if room > 0.0 else 0.0
+                actual = limit if limit < request else request
+                level = current + (actual * eta_charge[s]) / capacity[s]
+                current = level if level < soc_max[s] else soc_max[s]
+                down_out[s, t] = actual
+            soc_out[s, t] = current
+
+
+def _soc_event_steps_numpy(is_up, requested, capacity, soc0, soc_min, soc_max, eta_charge, eta_discharge, energy_out, soc_out):
+    # Fallback for _soc_scenario_rows: one vector update across scenarios
+    # per event. np.where reproduces the scalar comparisons exactly.
+    current = soc0.copy()
+    for k, up in enumerate(is_up.tolist()):
+        request = requested[k]
+        if up:
+            room = (current - soc_min) * capacity
+            limit = np.where(room > 0.0, room, 0.0)
+            actual = np.where(limit < request, limit, request)
+            level = current - (actual / eta_discharge) / capacity
+            current = np.where(level > soc_min, level, soc_min)
+        else:
+            room = (soc_max - current) * capacity
+            limit = np.where(room > 0.0, room, 0.0)
+            actual = np.where(limit < request, limit, request)
+            level = current + (actual * eta_charge) / capacity
+            current = np.where(level < soc_max, level, soc_max)
+        energy_out[k] = actual
+        soc_out[k] = current
+
+
+def _shared_soc_loop(kind, requested, order, pro_rata, capacity, soc0, soc_min, soc_max, eta_charge, eta_discharge,
+                     slot_limit, energy_out, soc_out):
+    # One battery, several products. kind/requested/energy_out are
+    # (events, products); kind is 1 for up, -1 for down, 0 when the product
+    # is idle in that slot. Within a slot discharge and charge are not
+    # netted: each request moves the shared SOC, and slot_limit caps the
+    # energy per direction (the inverter rating over one slot).
+    products = len(order)
+    current = soc0
+    for k in range(len(kind)):
+        kinds = kind[k]
+        requests = requested[k]
+        energies = energy_out[k]
+        if pro_rata:
+            # All up requests share the discharge room, then all down
+            # requests share the charge room, pro rata to their size
+            for direction in (1, -1):
+                total = 0.0
+                for p in range(products):
+                    if kinds[p] == direction:
+                        total += requests[p]
+                if not total > 0.0:
+                    continue
+                if direction == 1:
+                    room = (current - soc_min) * capacity
+                else:
+                    room = (soc_max - current) * capacity
+                limit = room if room > 0.0 else 0.0
+                limit = limit if limit < slot_limit else slot_limit
+                share = limit / total if limit < total else 1.0
+                delivered = 0.0
+                for p in range(products):
+                    if kinds[p] == direction:
+                        actual = requests[p] * share
+                        energies[p] = actual
+                        delivered += actual
+                if direction == 1:
+                    level = current - (delivered / eta_discharge) / capacity
+                    current = level if level > soc_min else soc_min
+                else:
+                    level = current + (delivered * eta_charge) / capacity
+                    current = level if level < soc_max else soc_max
+        else:
+            # Products in priority order, each taking what the SOC (and the
+            # power left in its direction) still allows; with one product
+            # this is exactly _soc_event_loop
+            up_left = slot_limit
+            down_left = slot_limit
+            for j in range(products):
+                p = order[j]
+                request = requests[p]
+                if kinds[p] == 1:
+                    room = (current - soc_min) * capacity
+                    limit = room if room > 0.0 else 0.0
+                    limit = limit if limit < up_left else up_left
+                    actual = limit if limit < request else request
+                    up_left -= actual
+                    level = current - (actual / eta_discharge) / capacity
+                    current = level if level > soc_min else soc_min
+                    energies[p] = actual
+                elif kinds[p] == -1:
+                    room = (soc_max - current) * capacity
+                    limit = room if room > 0.0 else 0.0
+                    limit = limit if limit < down_left else down_left
+                    actual = limit if limit < request else request
+                    down_left -= actual
+                    level = current + (actual * eta_charge) / capacity
+                    current = level if level < soc_max else soc_max
+                    energies[p] = actual
+        soc_out[k] = current
+
+
+_soc_event_loop_jit = None
+_soc_scenario_rows_jit = None
+_shared_soc_loop_jit = None
+
+
+@lru_cache(maxsize=None)
+def _numba_installed() -> bool:
+    return importlib.util.find_spec("numba") is not None
+
+
+def jit_available() -> bool:
+    return _JIT_ENABLED and _numba_installed()
+
+
+def _njit(loop):
+    import numba  # deferred: see the note at the top of the module
+
+    return numba.njit(cache=True, nogil=True)(loop)
+
+
+def _compiled_loop():
+    global _soc_event_loop_jit
+    if _soc_event_loop_jit is None:
+        _soc_event_loop_jit = _njit(_soc_event_loop)
+    return _soc_event_loop_jit
+
+
+def _compiled_scenario_rows():
+    global _soc_scenario_rows_jit
+    if _soc_scenario_rows_jit is None:
+        _soc_scenario_rows_jit = _njit(_soc_scenario_rows)
+    return _soc_scenario_rows_jit
+
+
+def _compiled_shared_loop():
+    global _shared_soc_loop_jit
+    if _shared_soc_loop_jit is None:
+        _shared_soc_loop_jit = _njit(_shared_soc_loop)
+    return _shared_soc_loop_jit
+
+
+def _last_active(active: np.ndarray, n: int) -> np.ndarray:
+    # Index into the event arrays of the latest event at or before each slot
+    last = np.full(n, -1, dtype=np.int64)
+    last[active] = np.arange(len(active))
+    np.maximum.accumulate(last, out=last)
+    return last
+
+
+def soc_constrained_activation(
+    up: np.ndarray,
+    down: np.ndarray,
+    requested_mwh: np.ndarray,
+    capacity_mwh: float,
+    initial_soc: float,
+    soc_min: float,
+    soc_max: float,
+    charge_efficiency: float,
+    discharge_efficiency: float,
+    use_jit: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """SOC-limited up/down activation energy on plain arrays.
+
+    ``up``/``down`` are per-slot activation flags (up wins when both are
+    set), ``requested_mwh`` the planned energy per slot. Returns
+    ``(up_energy, down_energy, soc)`` as float64 arrays; ``soc`` is the state
+    after each slot. Only active slots are stepped, and idle slots carry the
+    previous SOC forward. ``use_jit=None`` uses numba when available.
+    """
+    up = np.asarray(up, dtype=bool)
+    down = np.asarray(down, dtype=bool)
+    requested_mwh = np.asarray(requested_mwh, dtype=float)
+    n = len(up)
+    up_energy = np.zeros(n, dtype=float)
+    down_energy = np.zeros(n, dtype=float)
+
+    active = np.flatnonzero(up | down)
+    is_up = up[active]
+    requested = requested_mwh[active]
+    args = (
+        float(capacity_mwh),
+        float(initial_soc),
+        float(soc_min),
+        float(soc_max),
+        float(charge_efficiency),
+        float(discharge_efficiency),
+    )
+    if use_jit is None:
+        use_jit = jit_available()
+    if use_jit and _numba_installed():
+        energy = np.empty(len(active), dtype=float)
+        level = np.empty(len(active), dtype=float)
+        _compiled_loop()(is_up, requested, *args, energy, level)
+    else:
+        energy_list = [0.0] * len(active)
+        level_list = [0.0] * len(active)
+        _soc_event_loop(is_up.tolist(), requested.tolist(), *args, energy_list, level_list)
+        energy = np.array(energy_list, dtype=float)
+        level = np.array(level_list, dtype=float)
+
+    up_energy[active[is_up]] = energy[is_up]
+    down_energy[active[~is_up]] = energy[~is_up]
+
+    # Forward-fill the post-step SOC of the latest active slot
+    last_active = _last_active(active, n)
+    soc = np.full(n, float(initial_soc), dtype=float)
+    stepped = last_active >= 0
+    soc[stepped] = level[last_active[stepped]]
+    return up_energy, down_energy, soc
+
+
+def soc_constrained_activation_batch(
+    up: np.ndarray,
+    down: np.ndarray,
+    requested_mwh: np.ndarray,
+    capacity_mwh,
+    initial_soc,
+    soc_min,
+    soc_max,
+    charge_efficiency,
+    discharge_efficiency,
+    use_jit: Optional[bool] = None,
+    request_scale=None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """:func:`soc_constrained_activation` for many scenarios in one pass.
+
+    The activation flags are shared; ``requested_mwh`` is ``(slots,)`` or
+    ``(scenarios, slots)`` and every battery parameter is a scalar or a
+    ``(scenarios,)`` array, broadcast against each other. ``request_scale``
+    (scalar or ``(scenarios,)``) multiplies the requested energy per
+    scenario without materialising a scaled copy. With numba each scenario
+    is one compiled walk that writes its output rows in place; the NumPy
+    fallback steps all scenarios together through the active slots. Returns
+    ``(up_energy, down_energy, soc)`` as ``(scenarios, slots)`` float64
+    arrays; row ``s`` is bit-identical to a single-scenario run with row
+    ``s``'s inputs.
+    """
+    up = np.asarray(up, dtype=bool)
+    down = np.asarray(down, dtype=bool)
+    n = len(up)
+    requested_mwh = np.asarray(requested_mwh, dtype=float)
+    requested_rows = requested_mwh.reshape(-1, n) if requested_mwh.ndim > 1 else requested_mwh[None, :]
+    params = [
+        np.atleast_1d(np.asarray(value, dtype=float))
+        for value in (capacity_mwh, initial_soc, soc_min, soc_max, charge_efficiency, discharge_efficiency)
+    ]
+    scale = None if request_scale is None else np.atleast_1d(np.asarray(request_scale, dtype=float))
+    shapes = [p.shape for p in params] + [(requested_rows.shape[0],)] + ([scale.shape] if scale is not None else [])
+    scenarios = np.broadcast_shapes(*shapes)[0]
+    params = [np.ascontiguousarray(np.broadcast_to(p, (scenarios,))) for p in params]
+
+    if use_jit is None:
+        use_jit = jit_available()
+    if use_jit and _numba_installed():
+        scale = np.ones(scenarios) if scale is None else np.ascontiguousarray(np.broadcast_to(scale, (scenarios,)))
+        up_energy = np.zeros((scenarios, n), dtype=float)
+        down_energy = np.zeros((scenarios, n), dtype=float)
+        soc = np.empty((scenarios, n), dtype=float)
+        _compiled_scenario_rows()(
+            up, down, np.ascontiguousarray(requested_rows), scale, *params, up_energy, down_energy, soc
+        )
+        return up_energy, down_energy, soc
+
+    if scale is not None:
+        requested_rows = requested_rows * scale[:, None]
+    active = np.flatnonzero(up | down)
+    is_up = up[active]
+    # Time-major (events, scenarios) so each step reads one contiguous row
+    requested = np.ascontiguousarray(np.broadcast_to(requested_rows[:, active].T, (len(active), scenarios)))
+    energy = np.empty((len(active), scenarios), dtype=float)
+    level = np.empty((len(active), scenarios), dtype=float)
+    _soc_event_steps_numpy(is_up, requested, *params, energy, level)
+
+    # Assemble time-major (slots, scenarios) so every scatter moves whole
+    # rows, and hand back transposed views
+    up_energy = np.zeros((n, scenarios), dtype=float)
+    down_energy = np.zeros((n, scenarios), dtype=float)
+    up_energy[active[is_up]] = energy[is_up]
+    down_energy[active[~is_up]] = energy[~is_up]
+    # Row 0 holds the initial SOC for slots before the first event
+    levels = np.concatenate([params[1][None, :], level])
+    soc = levels[_last_active(active, n) + 1]
+    return up_energy.T, down_energy.T, soc.T
+
+
+def shared_soc_activation(
+    up: np.ndarray,
+    down: np.ndarray,
+    requested_mwh: np.ndarray,
+    capacity_mwh: float,
+    initial_soc: float,
+    soc_min: float,
+    soc_max: float,
+    charge_efficiency: float,
+    discharge_efficiency: float,
+    priority: Optional[Sequence[int]] = None,
+    pro_rata: bool = False,
+    slot_limit_mwh: float = np.inf,
+    use_jit: Optional[bool] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """SOC-limited activation for several products sharing one battery.
+
+    ``up``, ``down`` and ``requested_mwh`` are ``(products, slots)``; a
+    product whose up and down flags are both set activates up. One SOC state
+    is stepped through every slot where any product is active. Requests in
+    a slot are served either in ``priority`` order (row indices, default
+    row order) or, with ``pro_rata``, scaled by a common factor per
+    direction when they exceed what the SOC allows. ``slot_limit_mwh`` caps
+    the combined energy per direction in one slot. Returns ``(up_energy,
+    down_energy, soc)`` with energies ``(products, slots)`` and ``soc`` the
+    shared state after each slot. For a single product the priority rule is
+    bit-identical to :func:`soc_constrained_activation`.
+    """
+    up = np.atleast_2d(np.asarray(up, dtype=bool))
+    down = np.atleast_2d(np.asarray(down, dtype=bool))
+    requested_mwh = np.broadcast_to(np.asarray(requested_mwh, dtype=float), up.shape)
+    products, n = up.shape
+    order = np.arange(products, dtype=np.int64) if priority is None else np.asarray(priority, dtype=np.int64)
+    if sorted(order.tolist()) != list(range(products)):
+        raise ValueError(f"priority must be a permutation of 0..{products - 1}, got {list(order)}")
+
+    active = np.flatnonzero((up | down).any(axis=0))
+    kind = np.where(up, 1, np.where(down, -1, 0)).astype(np.int8)
+    # Time-major (events, products) so each slot reads one contiguous row
+    kind = np.ascontiguousarray(kind[:, active].T)
+    requested = np.ascontiguousarray(requested_mwh[:, active].T)
+    args = (
+        bool(pro_rata),
+        float(capacity_mwh),
+        float(initial_soc),
+        float(soc_min),
+        float(soc_max),
+        float(charge_efficiency),
+        float(discharge_efficiency),
+        float(slot_limit_mwh),
+    )
+    if use_jit is None:
+        use_jit = jit_available()
+    if use_jit and _numba_installed():
+        energy = np.zeros((len(active), products), dtype=float)
+        level = np.empty(len(active), dtype=float)
+        _compiled_shared_loop()(kind, requested, order, *args, energy, level)
+    else:
+        energy_rows = [[0.0] * products for _ in range(len(active))]
+        level_list = [0.0] * len(active)
+        _shared_soc_loop(kind.tolist(), requested.tolist(), order.tolist(), *args, energy_rows, level_list)
+        energy = np.array(energy_rows, dtype=float).reshape(len(active), products)
+        level = np.array(level_list, dtype=float)
+
+    up_energy = np.zeros((products, n), dtype=float)
+    down_energy = np.zeros((products, n), dtype=float)
+    is_up = kind.T == 1
+    is_down = kind.T == -1
+    up_energy[:, active] = np.where(is_up, energy.T, 0.0)
+    down_energy[:, active] = np.where(is_down, energy.T, 0.0)
+
+    last_active = _last_active(active, n)
+    soc = np.full(n, float(initial_soc), dtype=float)
+    stepped = last_active >= 0
+    soc[stepped] = level[last_active[stepped]]
+    return up_energy, down_energy, soc
+
+
+__all__ = [
+    "jit_available",
+    "shared_soc_activation",
+    "soc_constrained_activation",
+    "soc_constrained_activation_batch",
+    "soc_efficiencies",
+]
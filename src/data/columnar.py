@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+PARQUET_SUFFIX = ".parquet"
+VIEW_SUFFIX = ".view.json"
+
+# Typed schema for aggregated market history. Columns missing from a frame are
+# simply skipped; anything else is written with pandas' default mapping.
+_INT8_COLUMNS = ("hour", "slot")
+_FLOAT_COLUMNS = ("price", "frequency")
+_CATEGORY_COLUMNS = ("currency",)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise ImportError(
+            "Parquet storage requires the optional 'pyarrow' package (pip install pyarrow)"
+        ) from exc
+    return pa, pq
+
+
+def is_columnar_path(path: Union[str, Path]) -> bool:
+    """Return True for Parquet datasets and ``.view.json`` views over them."""
+    name = str(path).lower()
+    return name.endswith(PARQUET_SUFFIX) or name.endswith(VIEW_SUFFIX)
+
+
+def write_parquet_history(df: pd.DataFrame, output: Path) -> Path:
+    """Write aggregated market history as a typed Parquet file.
+
+    ``date`` is stored as ``date32``, ``hour``/``slot`` as ``int8``, prices as
+    ``float64`` and ``currency`` as a dictionary (categorical) column. Rows are
+    sorted by date and written one calendar month per row group, so date
+    filters only touch the row groups they need.
+    """
+    pa, pq = _require_pyarrow()
+    output = output.with_suffix(PARQUET_SUFFIX)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    typed = df.copy()
+    typed["date"] = pd.to_datetime(typed["date"], errors="coerce")
+    typed = typed.dropna(subset=["date"])
+    slot_column = next((col for col in _INT8_COLUMNS if col in typed.columns), None)
+    typed = typed.sort_values(["date", slot_column] if slot_column else ["date"]).reset_index(drop=True)
+    month = typed["date"].dt.to_period("M")
+    typed["date"] = typed["date"].dt.date
+    for column in _INT8_COLUMNS:
+        if column in typed.columns:
+            typed[column] = typed[column].astype("int8")
+    for column in _FLOAT_COLUMNS:
+        if column in typed.columns:
+            typed[column] = pd.to_numeric(typed[column], errors="coerce").astype("float64")
+    for column in _CATEGORY_COLUMNS:
+        if column in typed.columns:
+            typed[column] = typed[column].astype(str).astype("category")
+
+    table = pa.Table.from_pandas(typed, preserve_index=False)
+    table = table.set_column(
+        table.schema.get_field_index("date"), "date", table.column("date").cast(pa.date32())
+    )
+    with pq.ParquetWriter(output, table.schema) as writer:
+        if len(typed) == 0:
+            writer.write_table(table)
+        for _, positions in typed.groupby(month, sort=True).indices.items():
+            writer.write_table(table.take(pa.array(positions)))
+    return output
+
+
+def write_history_view(
+    view_path: Path,
+    dataset: Path,
+    *,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Path:
+    """Write a ``.view.json`` file selecting a date range of ``dataset``.
+
+    Views replace the 1y/2y/3y CSV copies: they hold no rows, only the
+    dataset path (relative to the view) and the date bounds.
+    """
+    if not str(view_path).lower().endswith(VIEW_SUFFIX):
+        view_path = view_path.with_name(view_path.name + VIEW_SUFFIX)
+    try:
+        location = os.path.relpath(dataset, view_path.parent)
+    except ValueError:  # different drives on Windows
+        location = str(Path(dataset).resolve())
+    record: Dict[str, object] = {"dataset": Path(location).as_posix()}
+    if start_date is not None:
+        record["start_date"] = start_date.isoformat()
+    if end_date is not None:
+        record["end_date"] = end_date.isoformat()
+    view_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    return view_path
+
+
+def resolve_view(path: Union[str, Path]) -> Dict[str, object]:
+    """Return ``{"dataset": Path, "start_date": ..., "end_date": ...}`` for a source."""
+    path = Path(path)
+    if not str(path).lower().endswith(VIEW_SUFFIX):
+        return {"dataset": path, "start_date": None, "end_date": None}
+    record = json.loads(path.read_text(encoding="utf-8"))
+    dataset = Path(str(record["dataset"]))
+    if not dataset.is_absolute():
+        dataset = path.parent / dataset
+    return {
+        "dataset": dataset,
+        "start_date": record.get("start_date"),
+        "end_date": record.get("end_date"),
+    }
+
+
+def source_files(path: Union[str, Path]) -> List[Path]:
+    """Files whose modification invalidates data read from ``path``."""
+    path = Path(path)
+    if str(path).lower().endswith(VIEW_SUFFIX):
+        try:
+            return [path, Path(resolve_view(path)["dataset"])]
+        except (OSError, ValueError, KeyError):
+            return [path]
+    return [path]
+
+
+def read_market_history(
+    path: Union[str, Path],
+    *,
+    start_date: Optional[object] = None,
+    end_date: Optional[object] = None,
+) -> pd.DataFrame:
+    """Read a CSV, Parquet dataset or view into the aggregated CSV layout.
+
+    Parquet reads push the date bounds down to the row-group statistics, so a
+    "last 12 months" query only decodes the matching months. The returned
+    frame matches the CSV layout (``date`` as ``YYYY-MM-DD`` string, plain
+    int/float/str columns) so existing loaders work unchanged.
+    """
+    if not is_columnar_path(path):
+        df = pd.read_csv(path)
+        if start_date is None and end_date is None:
+            return df
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        keep = pd.Series(True, index=df.index)
+        if start_date is not None:
+            keep &= dates >= pd.Timestamp(start_date)
+        if end_date is not None:
+            keep &= dates <= pd.Timestamp(end_date)
+        return df[keep].reset_index(drop=True)
+
+    _, pq = _require_pyarrow()
+    view = resolve_view(path)
+    bounds = [view["start_date"], start_date]
+    lower = max((pd.Timestamp(b) for b in bounds if b is not None), default=None)
+    bounds = [view["end_date"], end_date]
+    upper = min((pd.Timestamp(b) for b in bounds if b is not None), default=None)
+
+    filters = []
+    if lower is not None:
+        filters.append(("date", ">=", lower.date()))
+    if upper is not None:
+        filters.append(("date", "<=", upper.date()))
+    table = pq.read_table(view["dataset"], filters=filters or None)
+
+    df = table.to_pandas()
+    df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    for column in _INT8_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("int64")
+    for column in _CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(str)
+    return df
+
+
+def write_history_outputs(df: pd.DataFrame, output: Path, split_years: bool) -> None:
+    """Parquet counterpart of the aggregation tools' ``write_outputs``.
+
+    Writes one typed dataset and, with ``split_years``, 1y/2y/3y views over it
+    instead of duplicated row copies.
+    """
+    dataset = write_parquet_history(df, output)
+    if split_years:
+        today = datetime.today().date()
+        for years in (1, 2, 3):
+            cutoff = today - timedelta(days=365 * years)
+            view = dataset.with_name(dataset.stem + f"_{years}y" + VIEW_SUFFIX)
+            write_history_view(view, dataset, start_date=cutoff)
+
+
+__all__ = [
+    "PARQUET_SUFFIX",
+    "VIEW_SUFFIX",
+    "is_columnar_path",
+    "read_market_history",
+    "resolve_view",
+    "source_files",
+    "write_history_outputs",
+    "write_history_view",
+    "write_parquet_history",
+]
@@ -1,9 +1,10 @@
 from __future__ import annotations
-from pathlib import Path
 from typing import Dict, Optional
 from datetime import date
 import pandas as pd
 
+from .price_cube import load_price_cube
+
 
 class DataProvider:
     def __init__(self, pzu_csv: Optional[str] = None, bm_csv: Optional[str] = None):
@@ -12,16 +13,16 @@ class DataProvider:
 
     def load_price_forecasts(self, target_date: date) -> Dict[str, pd.Series]:
         out: Dict[str, pd.Series] = {}
-        if self.pzu_csv and Path(self.pzu_csv).exists():
-            df = pd.read_csv(self.pzu_csv)
-            # Expect columns: date, hour(0-23), price
-            sub = df[df["date"] == target_date.isoformat()].sort_values("hour")
-            if not sub.empty:
-                out["pzu"] = pd.Series(sub["price"].to_list())
-        if self.bm_csv and Path(self.bm_csv).exists():
-            df = pd.read_csv(self.bm_csv)
-            # Expect columns: date, slot(0-95), price
-            sub = df[df["date"] == target_date.isoformat()].sort_values("slot")
-            if not sub.empty:
-                out["balancing"] = pd.Series(sub["price"].to_list())
+        # Expect columns: date, hour(0-23), price
+        pzu = load_price_cube(self.pzu_csv)
+        if pzu is not None and pzu.slot_column == "hour":
+            prices = pzu.day_values(target_date.isoformat())
+            if prices is not None and len(prices):
+                out["pzu"] = pd.Series(prices.tolist())
+        # Expect columns: date, slot(0-95), price
+        bm = load_price_cube(self.bm_csv)
+        if bm is not None and bm.slot_column == "slot":
+            prices = bm.day_values(target_date.isoformat())
+            if prices is not None and len(prices):
+                out["balancing"] = pd.Series(prices.tolist())
         return out
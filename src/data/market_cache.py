@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes so stale sidecars are rebuilt.
+CACHE_FORMAT_VERSION = 1
+
+_META_FILE = "meta.json"
+
+
+def cache_root_for(source: Path) -> Path:
+    """Return the sidecar cache directory used for ``source``.
+
+    Defaults to a ``.cache`` folder next to the source file; set
+    ``MARKET_CACHE_DIR`` to relocate every sidecar (e.g. on read-only
+    deployments).
+    """
+    override = os.environ.get("MARKET_CACHE_DIR")
+    if override:
+        return Path(override)
+    return source.parent / ".cache"
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-1 hex digest of ``path``."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_dir(source: Path, key: str) -> Path:
+    name = source.name
+    if os.environ.get("MARKET_CACHE_DIR"):
+        # A shared cache root may see same-named files from different folders.
+        parent = str(source.resolve().parent).encode("utf-8")
+        name = f"{name}-{hashlib.sha1(parent).hexdigest()[:10]}"
+    return cache_root_for(source) / name / key
+
+
+def load_cached_arrays(
+    source: Path,
+    key: str,
+) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, object]]]:
+    """Return memory-mapped arrays and metadata cached for ``source``.
+
+    The entry is used as-is when the source size and mtime match the recorded
+    values. When only the mtime moved (checkout, copy, ``touch``) the content
+    hash decides: identical content refreshes the recorded mtime, anything
+    else invalidates the entry. Returns ``None`` on any miss.
+    """
+    entry = _entry_dir(source, key)
+    try:
+        meta = json.loads((entry / _META_FILE).read_text(encoding="utf-8"))
+        stat = source.stat()
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("version") != CACHE_FORMAT_VERSION or meta.get("source_size") != stat.st_size:
+        return None
+
+    if meta.get("source_mtime_ns") != stat.st_mtime_ns:
+        try:
+            if file_digest(source) != meta.get("source_sha1"):
+                return None
+        except OSError:
+            return None
+        meta["source_mtime_ns"] = stat.st_mtime_ns
+        _write_meta(entry, meta)
+
+    arrays: Dict[str, np.ndarray] = {}
+    try:
+        for name in meta.get("arrays", []):
+            arrays[name] = np.load(entry / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    return arrays, meta
+
+
+def store_cached_arrays(
+    source: Path,
+    key: str,
+    arrays: Dict[str, np.ndarray],
+    meta: Optional[Dict[str, object]] = None,
+) -> bool:
+    """Write ``arrays`` as ``.npy`` sidecars for ``source``.
+
+    The entry is written to a temporary directory and swapped in, so readers
+    in other processes never observe a half-written cache. Returns ``False``
+    when the cache directory is not writable.
+    """
+    entry = _entry_dir(source, key)
+    try:
+        stat = source.stat()
+        sha1 = file_digest(source)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=entry.parent))
+        staging.chmod(0o755)
+    except OSError:
+        return False
+
+    record = dict(meta or {})
+    record.update(
+        {
+            "version": CACHE_FORMAT_VERSION,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_sha1": sha1,
+            "arrays": sorted(arrays),
+        }
+    )
+    try:
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        _write_meta(staging, record)
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        return False
+    return True
+
+
+def read_csv_cached(path: str) -> pd.DataFrame:
+    """``pd.read_csv(path)`` backed by a columnar ``.npy`` sidecar.
+
+    Numeric and boolean columns are stored as-is and memory-mapped on load;
+    text columns are stored as categorical codes with their categories in the
+    metadata. The sidecar is rebuilt whenever the source changes (see
+    :func:`load_cached_arrays`).
+    """
+    source = Path(path)
+    cached = load_cached_arrays(source, "frame")
+    if cached is not None:
+        frame = _frame_from_arrays(*cached)
+        if frame is not None:
+            return frame
+
+    df = pd.read_csv(path)
+    arrays: Dict[str, np.ndarray] = {}
+    columns = []
+    for pos, column in enumerate(df.columns):
+        name = f"c{pos}"
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            arrays[name] = series.to_numpy()
+            columns.append({"name": str(column), "kind": "array", "dtype": str(series.dtype)})
+        else:
+            categorical = pd.Categorical(series)
+            arrays[name] = categorical.codes
+            columns.append(
+                {
+                    "name": str(column),
+                    "kind": "categorical",
+                    "dtype": str(series.dtype),
+                    "categories": [str(c) for c in categorical.categories],
+                }
+            )
+    store_cached_arrays(source, "frame", arrays, {"columns": columns})
+    return df
+
+
+def _frame_from_arrays(arrays: Dict[str, np.ndarray], meta: Dict[str, object]) -> Optional[pd.DataFrame]:
+    data = {}
+    for pos, column in enumerate(meta.get("columns", [])):
+        values = arrays.get(f"c{pos}")
+        if values is None:
+            return None
+        if column["kind"] == "categorical":
+            codes = np.asarray(values)
+            # Code -1 (missing) indexes the trailing NaN.
+            lookup = np.append(np.asarray(column["categories"], dtype=object), np.nan)
+            data[column["name"]] = pd.Series(lookup[codes], dtype=column["dtype"])
+        else:
+            data[column["name"]] = pd.Series(np.asarray(values), dtype=column["dtype"])
+    return pd.DataFrame(data)
+
+
+def _write_meta(entry: Path, meta: Dict[str, object]) -> None:
+    tmp = entry / f".{_META_FILE}.tmp"
+    try:
+        tmp.write_text(json.dumps(meta, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, entry / _META_FILE)
+    except OSError:
+        pass
+
+
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "cache_root_for",
+    "file_digest",
+    "load_cached_arrays",
+    "read_csv_cached",
+    "store_cached_arrays",
+]
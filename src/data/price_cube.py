@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .columnar import is_columnar_path, read_market_history, source_files
+from .market_cache import load_cached_arrays, store_cached_arrays
+
+# Default number of delivery periods per day for each time column.
+_SLOTS_PER_DAY = {"hour": 24, "slot": 96}
+
+
+@dataclass(frozen=True)
+class PriceCube:
+    """Dense (days x slots) view of a ``date,hour|slot,price`` market history.
+
+    ``values`` holds the price of every delivery period (NaN where the file has
+    no row) and ``mask`` flags the cells that were present. Rows follow
+    ``dates`` (sorted, unique calendar days); columns are the hour (hourly PZU,
+    24) or quarter-hour slot (imbalance and 15-minute PZU, 96) index. When the
+    source has duplicate ``(date, slot)`` rows the last one wins, matching the
+    aggregation tools.
+    """
+
+    path: str
+    slot_column: str
+    value_column: str
+    dates: pd.DatetimeIndex
+    values: np.ndarray
+    mask: np.ndarray
+    currency_codes: Optional[np.ndarray] = None  # (days x slots) int8, -1 = none
+    currencies: Tuple[str, ...] = ()
+
+    @property
+    def slots_per_day(self) -> int:
+        return int(self.values.shape[1])
+
+    @property
+    def step_hours(self) -> float:
+        """Length of one delivery period in hours: 1 for ``hour``, 0.25 for ``slot``."""
+        return 24.0 / _SLOTS_PER_DAY[self.slot_column]
+
+    def window_rows(
+        self,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> slice:
+        """Return the row slice covering ``start_date``..``end_date`` inclusive."""
+        lo = 0 if start_date is None else int(self.dates.searchsorted(pd.Timestamp(start_date), side="left"))
+        hi = len(self.dates) if end_date is None else int(self.dates.searchsorted(pd.Timestamp(end_date), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def day_values(self, day: object) -> Optional[np.ndarray]:
+        """Return the present prices of one day in slot order, or ``None``."""
+        try:
+            ts = pd.Timestamp(day).normalize()
+        except (TypeError, ValueError):
+            return None
+        pos = int(self.dates.searchsorted(ts))
+        if pos >= len(self.dates) or self.dates[pos] != ts:
+            return None
+        return self.values[pos][self.mask[pos]]
+
+    def daily_price_lists(
+        self,
+        min_count: int = 0,
+        *,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> List[Tuple[pd.Timestamp, List[float]]]:
+        """Return ``(day, prices)`` for days with at least ``min_count`` prices."""
+        rows = self.window_rows(start_date, end_date)
+        values = self.values[rows]
+        mask = self.mask[rows]
+        dates = self.dates[rows]
+        counts = mask.sum(axis=1)
+        return [
+            (dates[pos], values[pos][mask[pos]].tolist())
+            for pos in np.flatnonzero(counts >= min_count)
+        ]
+
+    def to_frame(
+        self,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """Return the long ``date, slot, price[, currency]`` table (fresh copy).
+
+        ``date`` is already parsed to ``Timestamp`` and rows are sorted by
+        ``(date, slot)``.
+        """
+        rows = self.window_rows(start_date, end_date)
+        day_pos, slot_pos = np.nonzero(self.mask[rows])
+        values = self.values[rows]
+        frame = pd.DataFrame(
+            {
+                "date": self.dates[rows][day_pos],
+                self.slot_column: slot_pos.astype(np.int64),
+                self.value_column: values[day_pos, slot_pos],
+            }
+        )
+        if self.currency_codes is not None:
+            codes = self.currency_codes[rows][day_pos, slot_pos]
+            frame["currency"] = pd.Categorical.from_codes(codes, categories=list(self.currencies))
+            frame["currency"] = frame["currency"].astype(object)
+        return frame
+
+
+def load_price_cube(path: Optional[str], value_column: str = "price") -> Optional[PriceCube]:
+    """Return the shared :class:`PriceCube` for ``path``.
+
+    Cubes are memoised per process on the resolved path, modification time
+    and size, so every engine and view reuses one parse until the file
+    changes. Across processes the parsed arrays are persisted as
+    memory-mapped ``.npy`` sidecars (see :mod:`src.data.market_cache`), so a
+    cold start maps the cached pages instead of re-parsing the CSV. Returns
+    ``None`` when the file is missing, unreadable or lacks ``date``,
+    ``hour``/``slot`` and ``value_column`` columns.
+    """
+    if not path:
+        return None
+    file_path = Path(path)
+    if not file_path.is_file():
+        return None
+    try:
+        # Views over a Parquet dataset are invalidated by either file.
+        stats = [source.stat() for source in source_files(file_path)]
+    except OSError:
+        return None
+    mtime_ns = max(stat.st_mtime_ns for stat in stats)
+    size = sum(stat.st_size for stat in stats)
+    return _cached_price_cube(str(file_path.resolve()), mtime_ns, size, value_column)
+
+
+def load_price_frame(path: str) -> pd.DataFrame:
+    """Return the long price table for ``path`` from the shared cube.
+
+    Files the cube cannot represent are read as-is (CSV, Parquet or view) so
+    callers keep their own column validation and error messages.
+    """
+    cube = load_price_cube(path)
+    if cube is None:
+        return read_market_history(path)
+    return cube.to_frame()
+
+
+def clear_price_cube_cache() -> None:
+    """Drop every memoised cube (e.g. after rewriting files in place)."""
+    _cached_price_cube.cache_clear()
+
+
+@lru_cache(maxsize=16)
+def _cached_price_cube(
+    path: str,
+    _mtime_ns: int,
+    _size: int,
+    value_column: str,
+) -> Optional[PriceCube]:
+    if is_columnar_path(path):
+        # Parquet is already typed and columnar; no sidecar needed.
+        try:
+            df = read_market_history(path)
+        except Exception:
+            return None
+        return build_price_cube(df, path=path, value_column=value_column)
+
+    source = Path(path)
+    key = f"cube-{value_column}"
+    cached = load_cached_arrays(source, key)
+    if cached is not None:
+        return _cube_from_arrays(path, value_column, *cached)
+
+    try:
+        df = pd.read_csv(path)
+    except Exception:
+        return None
+    cube = build_price_cube(df, path=path, value_column=value_column)
+    if cube is None:
+        return None
+
+    # Persist a memory-mapped sidecar so other processes (and the next cold
+    # start) skip the CSV parse and share the same pages.
+    arrays = {"dates": cube.dates.values, "values": cube.values, "mask": cube.mask}
+    if cube.currency_codes is not None:
+        arrays["currency_codes"] = cube.currency_codes
+    meta = {"slot_column": cube.slot_column, "currencies": list(cube.currencies)}
+    if store_cached_arrays(source, key, arrays, meta):
+        cached = load_cached_arrays(source, key)
+        if cached is not None:
+            return _cube_from_arrays(path, value_column, *cached)
+    return cube
+
+
+def _cube_from_arrays(
+    path: str,
+    value_column: str,
+    arrays: Dict[str, np.ndarray],
+    meta: Dict[str, object],
+) -> Optional[PriceCube]:
+    if not {"dates", "values", "mask"}.issubset(arrays):
+        return None
+    return PriceCube(
+        path=path,
+        slot_column=str(meta.get("slot_column", "hour")),
+        value_column=value_column,
+        dates=pd.DatetimeIndex(np.asarray(arrays["dates"])),
+        values=arrays["values"],
+        mask=arrays["mask"],
+        currency_codes=arrays.get("currency_codes"),
+        currencies=tuple(meta.get("currencies") or ()),
+    )
+
+
+def build_price_cube(
+    df: pd.DataFrame,
+    *,
+    path: str = "",
+    value_column: str = "price",
+) -> Optional[PriceCube]:
+    """Build a :class:`PriceCube` from a long ``date, hour|slot, price`` frame."""
+    if "date" not in df.columns or value_column not in df.columns:
+        return None
+    slot_column = next((col for col in ("hour", "slot") if col in df.columns), None)
+    if slot_column is None:
+        return None
+
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    slots = pd.to_numeric(df[slot_column], errors="coerce")
+    values = pd.to_numeric(df[value_column], errors="coerce")
+    keep = (dates.notna() & slots.notna() & values.notna() & (slots >= 0)).to_numpy()
+
+    dates = dates[keep].dt.normalize()
+    slots = slots[keep].to_numpy(dtype=np.int64)
+    values = values[keep].to_numpy(dtype=float)
+
+    day_index = pd.DatetimeIndex(dates.unique()).sort_values()
+    width = _SLOTS_PER_DAY[slot_column]
+    if len(slots):
+        width = max(width, int(slots.max()) + 1)
+
+    rows = day_index.get_indexer(dates)
+    # Keep the last row of any duplicated (date, slot) pair.
+    flat = rows.astype(np.int64) * width + slots
+    _, last_from_end = np.unique(flat[::-1], return_index=True)
+    last = len(flat) - 1 - last_from_end
+
+    matrix = np.full((len(day_index), width), np.nan)
+    mask = np.zeros((len(day_index), width), dtype=bool)
+    matrix[rows[last], slots[last]] = values[last]
+    mask[rows[last], slots[last]] = True
+
+    currency_codes = None
+    currencies: Tuple[str, ...] = ()
+    if "currency" in df.columns:
+        currency = df.loc[keep, "currency"].astype(str).str.strip().str.upper()
+        categorical = pd.Categorical(currency.to_numpy()[last])
+        currencies = tuple(str(c) for c in categorical.categories)
+        currency_codes = np.full((len(day_index), width), -1, dtype=np.int8)
+        currency_codes[rows[last], slots[last]] = categorical.codes
+        currency_codes.setflags(write=False)
+
+    matrix.setflags(write=False)
+    mask.setflags(write=False)
+    return PriceCube(
+        path=path,
+        slot_column=slot_column,
+        value_column=value_column,
+        dates=day_index,
+        values=matrix,
+        mask=mask,
+        currency_codes=currency_codes,
+        currencies=currencies,
+    )
+
+
+__all__ = [
+    "PriceCube",
+    "build_price_cube",
+    "clear_price_cube_cache",
+    "load_price_cube",
+    "load_price_frame",
+]
@@ -0,0 +1,494 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .columnar import source_files
+
+# Bump when the key derivation or the on-disk layout changes.
+CACHE_FORMAT_VERSION = 1
+
+_PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+_PROJECT_ROOT = _PACKAGE_ROOT.parent
+
+_MISS = object()
+
+# DataFrame.attrs key holding a digest of the inputs the frame was built from.
+SOURCE_DIGEST_ATTR = "source_digest"
+
+
+class Unfingerprintable(TypeError):
+    """Raised when an argument cannot be reduced to a stable fingerprint."""
+
+
+def default_cache_dir() -> Path:
+    """Return the disk tier location.
+
+    Defaults to ``.cache/results`` under the project root; set
+    ``RESULT_CACHE_DIR`` to relocate it (e.g. on read-only deployments).
+    """
+    override = os.environ.get("RESULT_CACHE_DIR")
+    if override:
+        return Path(override)
+    return _PROJECT_ROOT / ".cache" / "results"
+
+
+# --------------------------------------------------------------------------- #
+# Fingerprints
+# --------------------------------------------------------------------------- #
+
+_digest_lock = threading.Lock()
+_digests: Dict[str, Tuple[int, int, str]] = {}
+
+
+def _file_sha1(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: os.PathLike | str) -> str:
+    """Return the content digest of ``path``.
+
+    Digests are remembered per process and reused while the file size and
+    mtime are unchanged, so repeated calls cost one ``stat``.
+    """
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    key = str(resolved)
+    with _digest_lock:
+        known = _digests.get(key)
+    if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+        return known[2]
+    digest = _file_sha1(resolved)
+    with _digest_lock:
+        _digests[key] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def source_fingerprint(path: os.PathLike | str) -> str:
+    """Return a digest covering ``path`` and any dataset it refers to.
+
+    Parquet ``.view.json`` files are followed to their dataset (see
+    :func:`src.data.columnar.source_files`).
+    """
+    digest = hashlib.sha1()
+    for source in source_files(path):
+        digest.update(file_fingerprint(source).encode("ascii"))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def code_fingerprint() -> str:
+    """Digest of every module in the ``src`` package.
+
+    Part of every key, so results written by an older checkout are never
+    served after the code changes.
+    """
+    digest = hashlib.sha1()
+    for module in sorted(_PACKAGE_ROOT.rglob("*.py")):
+        digest.update(str(module.relative_to(_PACKAGE_ROOT)).encode("utf-8"))
+        digest.update(file_fingerprint(module).encode("ascii"))
+    return digest.hexdigest()
+
+
+def with_source_digest(frame: pd.DataFrame, *sources: object, **params: object) -> pd.DataFrame:
+    """Tag ``frame`` with a digest of the files and parameters it was built from.
+
+    :func:`fingerprint` keys a tagged frame on that digest, its index and its
+    column names and dtypes instead of hashing every column, so a frame loaded
+    from large files costs about as much to key as the paths themselves.
+    Pandas carries ``attrs`` through copies and most derived frames; code that
+    edits a tagged frame's values in place must drop the tag first. Returns
+    ``frame``.
+    """
+    frame.attrs[SOURCE_DIGEST_ATTR] = fingerprint((sources, params))
+    return frame
+
+
+def _is_source_path(value: object) -> bool:
+    if isinstance(value, Path):
+        return value.is_file()
+    return isinstance(value, str) and 0 < len(value) < 4096 and os.path.isfile(value)
+
+
+def _feed_array(digest, values: np.ndarray) -> None:
+    values = np.asarray(values)
+    digest.update(f"{values.dtype.str}{values.shape}".encode("ascii"))
+    if values.dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(values).view(np.uint8).tobytes())
+        return
+    try:
+        hashed = pd.util.hash_array(values.ravel())
+    except TypeError:
+        digest.update(_pickle_bytes(values.tolist()))
+        return
+    digest.update(hashed.tobytes())
+
+
+def _feed_series(digest, series: pd.Series) -> None:
+    digest.update(f"{series.name!r}|{series.dtype}".encode("utf-8"))
+    if isinstance(series.dtype, np.dtype):
+        _feed_array(digest, series.to_numpy())
+        return
+    try:
+        hashed = pd.util.hash_pandas_object(series, index=False)
+    except TypeError:
+        digest.update(_pickle_bytes(series.tolist()))
+        return
+    digest.update(hashed.to_numpy().tobytes())
+
+
+def _pickle_bytes(value: object) -> bytes:
+    try:
+        return pickle.dumps(value, protocol=4)
+    except Exception as exc:  # pickling raises a variety of types
+        raise Unfingerprintable(f"cannot fingerprint {type(value).__name__}") from exc
+
+
+def _feed(digest, value: object) -> None:
+    if value is None or isinstance(value, (bool, int, float, complex, bytes)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode("utf-8"))
+    elif _is_source_path(value):
+        digest.update(f"file:{source_fingerprint(value)};".encode("ascii"))
+    elif isinstance(value, (str, Path)):
+        digest.update(f"{type(value).__name__}:{value!s};".encode("utf-8"))
+    elif isinstance(value, np.generic):
+        digest.update(f"{value.dtype.str}:{value!r};".encode("utf-8"))
+    elif isinstance(value, (pd.Timestamp, datetime, date, time, timedelta, pd.Timedelta, pd.Period)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode("utf-8"))
+    elif isinstance(value, pd.DataFrame):
+        digest.update(f"frame{value.shape};".encode("ascii"))
+        _feed(digest, value.index)
+        source = value.attrs.get(SOURCE_DIGEST_ATTR)
+        if isinstance(source, str):
+            digest.update(f"source:{source};".encode("ascii"))
+            _feed(digest, [(name, str(dtype)) for name, dtype in value.dtypes.items()])
+            return
+        for _, column in value.items():
+            _feed_series(digest, column)
+    elif isinstance(value, pd.Series):
+        _feed(digest, value.index)
+        _feed_series(digest, value)
+    elif isinstance(value, pd.MultiIndex):
+        # Levels and integer codes hash like any other arrays; going through
+        # tuples would hash an object column row by row.
+        digest.update(f"multiindex{value.nlevels}:".encode("ascii"))
+        _feed(digest, list(value.names))
+        for level in value.levels:
+            _feed(digest, level)
+        for codes in value.codes:
+            _feed_array(digest, codes)
+    elif isinstance(value, pd.Index):
+        digest.update(f"index:{type(value).__name__}:{value.names!r};".encode("utf-8"))
+        if isinstance(value, pd.RangeIndex):
+            digest.update(f"{value.start}:{value.stop}:{value.step};".encode("ascii"))
+        else:
+            _feed_series(digest, value.to_series(index=None))
+    elif isinstance(value, np.ndarray):
+        _feed_array(digest, value)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}{{".encode("ascii"))
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}[".encode("ascii"))
+        for item in value:
+            _feed(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        digest.update(f"set{len(value)}[".encode("ascii"))
+        for item in sorted(fingerprint(item) for item in value):
+            digest.update(item.encode("ascii"))
+        digest.update(b"]")
+    else:
+        digest.update(f"{type(value).__module__}.{type(value).__qualname__}:".encode("utf-8"))
+        digest.update(_pickle_bytes(value))
+
+
+def fingerprint(value: object) -> str:
+    """Return a stable hex digest of ``value``.
+
+    Existing file paths (``str`` or ``Path``) are keyed on their content digest
+    rather than their name. DataFrames tagged by :func:`with_source_digest` are
+    keyed on that digest; other DataFrames, Series and arrays hash their raw
+    column buffers. Containers are walked recursively. Raises
+    :class:`Unfingerprintable` for values that cannot be pickled either.
+    """
+    digest = hashlib.sha1()
+    _feed(digest, value)
+    return digest.hexdigest()
+
+
+# --------------------------------------------------------------------------- #
+# Two-tier store
+# --------------------------------------------------------------------------- #
+
+
+class ResultCache:
+    """In-memory LRU in front of a size-bounded pickle directory.
+
+    Both tiers hold pickled payloads, so every hit returns a fresh copy that
+    callers may mutate freely. The memory tier evicts least recently used
+    entries past ``memory_items`` or ``memory_bytes``; the disk tier drops the
+    least recently read files once ``disk_bytes`` is exceeded. Disk errors are
+    swallowed: an unwritable directory only disables the disk tier.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[os.PathLike | str] = None,
+        *,
+        memory_items: int = 64,
+        memory_bytes: int = 256 << 20,
+        disk_bytes: int = 1 << 30,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.memory_items = int(memory_items)
+        self.memory_bytes = int(memory_bytes)
+        self.disk_bytes = int(disk_bytes)
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str, default: object = None) -> Any:
+        """Return the value stored under ``key`` or ``default``."""
+        payload = self._memory_get(key)
+        if payload is None:
+            payload = self._disk_get(key)
+            if payload is None:
+                return default
+            self._memory_put(key, payload)
+        try:
+            return pickle.loads(payload)
+        except Exception:
+            self.discard(key)
+            return default
+
+    def put(self, key: str, value: object) -> bool:
+        """Store ``value`` under ``key``; ``False`` when it cannot be pickled."""
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        self._memory_put(key, payload)
+        self._disk_put(key, payload)
+        return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            payload = self._memory.pop(key, None)
+            if payload is not None:
+                self._memory_size -= len(payload)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def clear(self, *, disk: bool = True) -> None:
+        """Drop every memory entry and, unless ``disk=False``, every file."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if disk:
+            for path in self._disk_entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    # memory tier ---------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+            return payload
+
+    def _memory_put(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= len(previous)
+            self._memory[key] = payload
+            self._memory_size += len(payload)
+            while self._memory and (
+                len(self._memory) > self.memory_items or self._memory_size > self.memory_bytes
+            ):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    # disk tier -----------------------------------------------------------
+
+    def _disk_entries(self) -> Iterable[Path]:
+        if not self.directory.exists():
+            return []
+        return self.directory.glob("*/*.pkl")
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+            os.utime(path)  # recency for eviction
+        except OSError:
+            return None
+        return payload
+
+    def _disk_put(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.disk_bytes:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=f".{key[:8]}-", dir=path.parent)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        total = 0
+        for path in self._disk_entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_bytes:
+                break
+
+
+_default_lock = threading.Lock()
+_default_cache: Optional[ResultCache] = None
+
+
+def _cache_enabled() -> bool:
+    return os.environ.get("RESULT_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def default_cache() -> Optional[ResultCache]:
+    """Return the process-wide cache, or ``None`` when ``RESULT_CACHE=0``.
+
+    Tier sizes can be tuned with ``RESULT_CACHE_MEMORY_ITEMS`` and
+    ``RESULT_CACHE_DISK_MB``.
+    """
+    global _default_cache
+    if not _cache_enabled():
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache(
+                memory_items=int(os.environ.get("RESULT_CACHE_MEMORY_ITEMS", "64")),
+                disk_bytes=int(float(os.environ.get("RESULT_CACHE_DISK_MB", "1024")) * (1 << 20)),
+            )
+        return _default_cache
+
+
+def clear_result_cache(*, disk: bool = True) -> None:
+    """Empty the process-wide cache (see :meth:`ResultCache.clear`)."""
+    cache = default_cache()
+    if cache is not None:
+        cache.clear(disk=disk)
+
+
+def cached_result(
+    namespace: Optional[str] = None,
+    *,
+    version: int = 1,
+    cache: Optional[ResultCache] = None,
+) -> Callable[[Callable], Callable]:
+    """Memoize a pure function on the fingerprint of its bound arguments.
+
+    The key combines ``namespace`` (the function's qualified name by default),
+    ``version``, :func:`code_fingerprint` and :func:`fingerprint` of the
+    arguments after defaults are applied. Calls whose arguments cannot be
+    fingerprinted, and every call while ``RESULT_CACHE=0``, go straight to the
+    function. The undecorated function is available as ``.uncached``.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        name = namespace or f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache if cache is not None else default_cache()
+            if store is None:
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = fingerprint(
+                    (CACHE_FORMAT_VERSION, name, version, code_fingerprint(), tuple(bound.arguments.items()))
+                )
+            except (TypeError, ValueError, OSError):
+                return func(*args, **kwargs)
+            hit = store.get(key, _MISS)
+            if hit is not _MISS:
+                return hit
+            result = func(*args, **kwargs)
+            store.put(key, result)
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorate
+
+
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "ResultCache",
+    "SOURCE_DIGEST_ATTR",
+    "Unfingerprintable",
+    "cached_result",
+    "clear_result_cache",
+    "code_fingerprint",
+    "default_cache",
+    "default_cache_dir",
+    "file_fingerprint",
+    "fingerprint",
+    "source_fingerprint",
+    "with_source_digest",
+]
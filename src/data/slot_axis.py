@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Romanian market data is labelled in local time: ``date`` is the local
+# delivery day and ``slot`` the wall-clock quarter hour (hour * 4 + minute // 15).
+MARKET_TZ = "Europe/Bucharest"
+
+SLOT_NS = 15 * 60 * 1_000_000_000
+SLOTS_PER_DAY = 96
+_DAY_NS = 86_400_000_000_000
+
+# Key of rows whose date is missing or whose wall-clock time does not exist
+# (the skipped hour when clocks go forward). Never matches another key.
+NO_SLOT = np.iinfo(np.int64).min
+
+
+def _day_ns(dates) -> np.ndarray:
+    """Local midnights as int64 ns, parsing each distinct value once."""
+    values = pd.Series(dates) if not isinstance(dates, pd.Series) else dates
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = pd.to_datetime(values)
+        if getattr(parsed.dt, "tz", None) is not None:
+            parsed = parsed.dt.tz_localize(None)
+        out = parsed.to_numpy(dtype="datetime64[ns]")
+    else:
+        codes, uniques = pd.factorize(values)
+        parsed = pd.to_datetime(pd.Series(uniques), errors="coerce").to_numpy(dtype="datetime64[ns]")
+        out = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[ns]")
+        known = codes >= 0
+        out[known] = parsed[codes[known]]
+    return out.astype("datetime64[D]").astype("datetime64[ns]").view(np.int64)
+
+
+def _sequential_days(days: np.ndarray, slots: np.ndarray, exists: np.ndarray) -> np.ndarray:
+    """Rows whose DST day numbers its 92 or 100 periods 0..N-1 in elapsed order.
+
+    Wall-clock slots never exceed 95 and never fall in the hour skipped when
+    clocks go forward. A DST day is read as sequential when one of its slots
+    reaches 96, or when it uses the skipped hour and its last slot is 91.
+    Only rows on DST days are inspected.
+    """
+    out = np.zeros(len(days), dtype=bool)
+    codes, uniques = pd.factorize(days)
+    periods = slots_in_day(np.asarray(uniques, dtype=np.int64).view("datetime64[ns]"))
+    rows = np.flatnonzero(periods[codes] != SLOTS_PER_DAY)
+    if not len(rows):
+        return out
+    day_codes = codes[rows]
+    top = np.full(len(uniques), -1, dtype=np.int64)
+    np.maximum.at(top, day_codes, slots[rows])
+    skipped = np.zeros(len(uniques), dtype=bool)
+    np.logical_or.at(skipped, day_codes, ~exists[rows])
+    sequential = (top >= SLOTS_PER_DAY) | (skipped & (top == periods - 1))
+    out[rows] = sequential[day_codes]
+    return out
+
+
+def slot_index(dates, slots) -> np.ndarray:
+    """Canonical int64 key of each (local date, slot): UTC quarter hours since 1970.
+
+    ``dates`` may be strings, datetimes or datetime64 values (any time of day
+    is dropped); ``slots`` are wall-clock quarter hours 0..95. The local slot
+    start is placed in Europe/Bucharest, so consecutive delivery periods get
+    consecutive keys across daylight-saving changes. In the repeated hour
+    when clocks go back, wall-clock slots map to the first occurrence.
+    Missing dates, missing slots and wall-clock times skipped when clocks go
+    forward get :data:`NO_SLOT`.
+
+    Some extracts instead number the periods of a DST day sequentially
+    (0..91 in spring, 0..99 in autumn). Such days, detected per day as in
+    :func:`_sequential_days`, are keyed as periods elapsed since local
+    midnight, so slot 99 of an autumn day is followed by slot 0 of the next.
+    """
+    days = _day_ns(dates)
+    slot_values = pd.to_numeric(pd.Series(slots), errors="coerce").to_numpy(dtype=float)
+    valid = (days != np.iinfo(np.int64).min) & ~np.isnan(slot_values)
+    out = np.full(len(days), NO_SLOT, dtype=np.int64)
+    if not valid.any():
+        return out
+    valid_days = days[valid]
+    slot_ints = slot_values[valid].astype(np.int64)
+    local = valid_days + slot_ints * SLOT_NS
+    localized = pd.DatetimeIndex(local.view("datetime64[ns]")).tz_localize(
+        MARKET_TZ,
+        ambiguous=np.ones(len(local), dtype=bool),
+        nonexistent="NaT",
+    )
+    utc = localized.asi8
+    exists = ~localized.isna()
+    keys = np.full(len(local), NO_SLOT, dtype=np.int64)
+    keys[exists] = utc[exists] // SLOT_NS
+    sequential = _sequential_days(valid_days, slot_ints, exists)
+    if sequential.any():
+        midnight = pd.DatetimeIndex(valid_days[sequential].view("datetime64[ns]")).tz_localize(MARKET_TZ).asi8
+        keys[sequential] = midnight // SLOT_NS + slot_ints[sequential]
+    out[valid] = keys
+    return out
+
+
+def slot_index_of(frame: pd.DataFrame, date_column: str = "date", slot_column: str = "slot") -> np.ndarray:
+    """:func:`slot_index` of a frame's date and slot columns."""
+    return slot_index(frame[date_column], frame[slot_column])
+
+
+def with_slot_index(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return ``frame`` with a ``slot_index`` column, adding it when missing.
+
+    Frames without ``date`` and ``slot`` columns are returned unchanged.
+    """
+    if frame is None or "slot_index" in frame.columns or "date" not in frame or "slot" not in frame:
+        return frame
+    frame = frame.copy()
+    frame["slot_index"] = slot_index_of(frame)
+    return frame
+
+
+def slot_labels(index) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of :func:`slot_index`: local dates (datetime64 midnights) and slots.
+
+    Slots are always wall-clock (0..95), also for keys built from sequentially
+    numbered DST days. :data:`NO_SLOT` entries give ``NaT`` and slot ``-1``.
+    """
+    keys = np.asarray(index, dtype=np.int64)
+    valid = keys != NO_SLOT
+    dates = np.full(len(keys), np.datetime64("NaT"), dtype="datetime64[ns]")
+    slots = np.full(len(keys), -1, dtype=np.int64)
+    if valid.any():
+        utc = pd.DatetimeIndex((keys[valid] * SLOT_NS).view("datetime64[ns]"), tz="UTC")
+        local = utc.tz_convert(MARKET_TZ).tz_localize(None).asi8
+        days = local // _DAY_NS * _DAY_NS
+        dates[valid] = days.view("datetime64[ns]")
+        slots[valid] = (local - days) // SLOT_NS
+    return dates, slots
+
+
+def slots_in_day(dates) -> np.ndarray:
+    """Number of delivery periods on each local day: 92, 96 or 100."""
+    days = _day_ns(dates)
+    valid = days != np.iinfo(np.int64).min
+    out = np.zeros(len(days), dtype=np.int64)
+    if valid.any():
+        start = pd.DatetimeIndex(days[valid].view("datetime64[ns]")).tz_localize(MARKET_TZ).asi8
+        end = pd.DatetimeIndex((days[valid] + _DAY_NS).view("datetime64[ns]")).tz_localize(MARKET_TZ).asi8
+        out[valid] = (end - start) // SLOT_NS
+    return out
+
+
+def align_slots(source, target, keep: str = "first") -> np.ndarray:
+    """Row of ``source`` holding each key of ``target``, or -1.
+
+    Both arguments are slot-index arrays. With duplicate keys in ``source``
+    the first (``keep="first"``) or last (``keep="last"``) row wins;
+    :data:`NO_SLOT` never matches. Values are gathered with
+    ``column[positions]`` where ``positions >= 0``.
+    """
+    if keep not in ("first", "last"):
+        raise ValueError(f"keep must be 'first' or 'last', got {keep!r}")
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    rows = np.flatnonzero(source != NO_SLOT)
+    keys = source[rows]
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    rows = rows[order]
+    if not len(keys):
+        return np.full(len(target), -1, dtype=np.int64)
+    if keep == "first":
+        found = np.searchsorted(keys, target, side="left")
+    else:
+        found = np.searchsorted(keys, target, side="right") - 1
+    found = np.clip(found, 0, len(keys) - 1)
+    hit = (keys[found] == target) & (target != NO_SLOT)
+    return np.where(hit, rows[found], -1)
+
+
+def attach_by_slot(
+    frame: pd.DataFrame,
+    table: pd.DataFrame,
+    columns: Sequence[str],
+    keep: str = "last",
+) -> pd.DataFrame:
+    """Left-join ``columns`` of ``table`` onto ``frame`` by slot index.
+
+    Replaces ``frame.merge(table, on=["date", "slot"], how="left")`` with an
+    array lookup (see :func:`align_slots`): ``frame`` keeps its rows and order,
+    unmatched rows get missing values, and columns ``frame`` already has are
+    left alone. ``slot_index`` is computed for either side that lacks it.
+    """
+    wanted = [name for name in columns if name in table.columns and name not in frame.columns]
+    if not wanted:
+        return frame
+    source_keys = table["slot_index"].to_numpy() if "slot_index" in table.columns else slot_index_of(table)
+    target_keys = frame["slot_index"].to_numpy() if "slot_index" in frame.columns else slot_index_of(frame)
+    found = align_slots(source_keys, target_keys, keep=keep)
+    out = frame.copy()
+    for name in wanted:
+        out[name] = table[name].array.take(found, allow_fill=True)
+    return out
+
+
+__all__ = [
+    "MARKET_TZ",
+    "NO_SLOT",
+    "SLOTS_PER_DAY",
+    "SLOT_NS",
+    "align_slots",
+    "attach_by_slot",
+    "slot_index",
+    "slot_index_of",
+    "slot_labels",
+    "slots_in_day",
+    "with_slot_index",
+]
@@ -7,11 +7,14 @@ import yaml
 import matplotlib.pyplot as plt
 import pandas as pd
 
-from .strategy.horizon import (
-    compute_best_fixed_cycle,
-    load_pzu_daily_history,
-    summarize_profit_windows,
-)
+from .data.result_cache import cached_result
+from .strategy import horizon
+from .strategy.horizon import summarize_profit_windows
+
+# Reruns with the same config and data files are served from the result cache
+# (set RESULT_CACHE=0 to recompute).
+load_pzu_daily_history = cached_result("horizon.load_pzu_daily_history")(horizon.load_pzu_daily_history)
+compute_best_fixed_cycle = cached_result("horizon.compute_best_fixed_cycle")(horizon.compute_best_fixed_cycle)
 
 
 def load_config(path: str) -> dict:
@@ -1,16 +1,64 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
-# Constants for two-hour cycle length.
+from ..data.columnar import source_files
+from ..data.price_cube import load_price_cube
+from .optimal import DispatchGrid, solve_dispatch
+
+# Default charge and discharge block length (the historic 2h/2h cycle).
 _BLOCK_HOURS = 2
 _MIN_REQUIRED_HOURS = _BLOCK_HOURS * 2  # need at least 4 hourly prices per day
 
 
+def _cycle_energy(
+    capacity_mwh: float,
+    power_mw: float,
+    eta: float,
+    charge_hours: int,
+    discharge_hours: int,
+) -> Tuple[float, float]:
+    """Energy bought and sold by one charge/discharge block pair.
+
+    The charge block buys at most ``power_mw`` per hour and the capacity;
+    the discharge block sells ``eta`` of it, which must also fit
+    ``discharge_hours`` at ``power_mw``. Equal blocks reduce to
+    ``min(capacity, power * hours)`` bought.
+    """
+    charge_energy = min(capacity_mwh, power_mw * charge_hours)
+    if charge_energy * eta > power_mw * discharge_hours:
+        charge_energy = power_mw * discharge_hours / eta
+    return charge_energy, charge_energy * eta
+
+
+def _block_periods(hours: float, step_hours: float) -> int:
+    """Number of delivery periods in a block of ``hours``."""
+    return max(int(round(float(hours) / step_hours)), 1)
+
+
+def _start_hours(periods: np.ndarray, step_hours: float) -> np.ndarray:
+    """Period indices as clock hours; ``-1`` (no pair) is kept.
+
+    Hourly data returns the integer indices unchanged, 15-minute data gives
+    fractional hours (slot 53 is 13.25).
+    """
+    if step_hours == 1.0:
+        return periods
+    return np.where(periods >= 0, periods * step_hours, -1.0)
+
+
+def _price_step_hours(pzu_csv: Optional[str]) -> float:
+    """Delivery period length of the PZU history (1h, or 0.25h for 15-minute products)."""
+    cube = load_price_cube(pzu_csv)
+    return cube.step_hours if cube is not None else 1.0
+
+
 def load_pzu_daily_history(
     pzu_csv: Optional[str],
     capacity_mwh: float,
@@ -20,13 +68,15 @@ def load_pzu_daily_history(
     power_mw: Optional[float] = None,
     start_date: Optional[pd.Timestamp] = None,
     end_date: Optional[pd.Timestamp] = None,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
 ) -> pd.DataFrame:
     """Compatibility wrapper that supports the historic signature.
 
     Parameters
     ----------
     pzu_csv : optional str
-        Path to CSV with columns date, hour, price.
+        Path to CSV with columns date, hour (or 15-minute slot), price.
     capacity_mwh : float
         Battery energy capacity.
     round_trip_efficiency : float
@@ -36,6 +86,8 @@ def load_pzu_daily_history(
     power_mw : optional float, keyword-only
         Battery power in MW. If omitted, defaults to capacity-based value so
         legacy callers still receive results similar to the previous logic.
+    charge_hours, discharge_hours : int, keyword-only
+        Length of the charge and discharge blocks, 2h each by default.
     """
 
     if power_mw is None:
@@ -51,6 +103,8 @@ def load_pzu_daily_history(
         min_hours_per_day=min_hours_per_day,
         start_date=start_date,
         end_date=end_date,
+        charge_hours=charge_hours,
+        discharge_hours=discharge_hours,
     )
 
 
@@ -62,8 +116,15 @@ def _load_two_hour_history(
     min_hours_per_day: int = 24,
     start_date: Optional[pd.Timestamp] = None,
     end_date: Optional[pd.Timestamp] = None,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
 ) -> pd.DataFrame:
-    """Return per-day profitability for a 2h charge + 2h discharge strategy."""
+    """Return per-day profitability of the best charge block + discharge block.
+
+    Blocks are 2h each unless ``charge_hours``/``discharge_hours`` say
+    otherwise. Hourly and 15-minute histories are both supported; start
+    hours are fractional for the latter.
+    """
     base_columns = [
         "date",
         "hours_count",
@@ -97,34 +158,331 @@ def _load_two_hour_history(
     if power_mw <= 0.0 or capacity_mwh <= 0.0:
         return pd.DataFrame(columns=base_columns)
 
-    daily_rows: List[Dict[str, object]] = []
+    step_hours = _price_step_hours(pzu_csv)
+    days = [pd.Timestamp(day) for day, _ in daily_price_lists]
+    n_days = len(days)
+    hours_count = np.zeros(n_days, dtype=np.int64)
+    min_price = np.zeros(n_days)
+    max_price = np.zeros(n_days)
+    volatility = np.zeros(n_days)
+    best = {
+        "profit_eur": np.zeros(n_days),
+        "revenue_eur": np.zeros(n_days),
+        "cost_eur": np.zeros(n_days),
+        "charge_energy_mwh": np.zeros(n_days),
+        "discharge_energy_mwh": np.zeros(n_days),
+        "buy_start_hour": np.full(n_days, -1, dtype=np.int64),
+        "sell_start_hour": np.full(n_days, -1, dtype=np.int64),
+        "buy_avg_price_eur_mwh": np.full(n_days, np.nan),
+        "sell_avg_price_eur_mwh": np.full(n_days, np.nan),
+    }
+
+    # Days are evaluated in batches of equal length (23/24/25 hours around DST)
+    # so each batch is a dense (days x periods) matrix.
+    for idx, matrix in _group_daily_price_matrices(daily_price_lists):
+        n = matrix.shape[1]
+        hours_count[idx] = int(round(n * step_hours))
+        min_price[idx] = matrix.min(axis=1)
+        max_price[idx] = matrix.max(axis=1)
+        if n > 1:
+            volatility[idx] = matrix.std(axis=1)
+        batch = _evaluate_two_by_two_cycle_batch(
+            matrix,
+            capacity_mwh,
+            power_mw,
+            eta,
+            charge_hours=charge_hours,
+            discharge_hours=discharge_hours,
+            step_hours=step_hours,
+        )
+        for key, values in batch.items():
+            best[key][idx] = values
+
+    found = best["buy_start_hour"] >= 0
+    for key in ("buy_start_hour", "sell_start_hour"):
+        best[key] = _start_hours(best[key], step_hours)
+
+    def _hour_column(values: np.ndarray) -> object:
+        if found.all():
+            return values
+        return pd.Series(values, dtype="float64").where(found)
+
+    def _avg_column(values: np.ndarray) -> object:
+        if found.any():
+            return values
+        return [None] * n_days
+
+    daily_history = pd.DataFrame(
+        {
+            "date": days,
+            "hours_count": hours_count,
+            "min_price_eur_mwh": min_price,
+            "max_price_eur_mwh": max_price,
+            "daily_profit_eur": best["profit_eur"],
+            "daily_revenue_eur": best["revenue_eur"],
+            "daily_cost_eur": best["cost_eur"],
+            "charge_energy_mwh": best["charge_energy_mwh"],
+            "discharge_energy_mwh": best["discharge_energy_mwh"],
+            "buy_start_hour": _hour_column(best["buy_start_hour"]),
+            "sell_start_hour": _hour_column(best["sell_start_hour"]),
+            "buy_avg_price_eur_mwh": _avg_column(best["buy_avg_price_eur_mwh"]),
+            "sell_avg_price_eur_mwh": _avg_column(best["sell_avg_price_eur_mwh"]),
+            "volatility_eur_mwh": volatility,
+        }
+    )
+    return daily_history.sort_values("date").reset_index(drop=True)
+
+
+@dataclass
+class FixedCycleScores:
+    """Block prices of every day for fixed charge/discharge pair queries.
 
-    for day, prices in daily_price_lists:
-        best = _evaluate_two_by_two_cycle(prices, capacity_mwh, power_mw, eta)
-        daily_rows.append(
+    Built once from the price history (hourly or 15-minute), it holds the cost
+    of every charge block and the revenue of every discharge block per day.
+    A pair's total over any date window, calendar year or month is the summed
+    revenue of its sell block minus the summed cost of its buy block over the
+    days it fits, so a query reduces ``(days x periods)`` arrays once and then
+    scores every pair, without re-reading the CSV or materialising a
+    ``(days x pairs)`` matrix (pairs grow with the square of the periods per
+    day: 231 hourly, over 3,000 at 15 minutes).
+    """
+
+    dates: pd.DatetimeIndex
+    pairs: np.ndarray  # (pairs x 2) buy/sell start periods, buy-major order
+    charge_cost: np.ndarray  # (days x buy starts) EUR
+    discharge_revenue: np.ndarray  # (days x sell starts) EUR, NaN past the end of the day
+    lengths: np.ndarray  # (days,) delivery periods per day
+    charge_energy_mwh: float
+    discharge_energy_mwh: float
+    charge_hours: int = _BLOCK_HOURS
+    discharge_hours: int = _BLOCK_HOURS
+    step_hours: float = 1.0
+
+    @property
+    def discharge_periods(self) -> int:
+        return _block_periods(self.discharge_hours, self.step_hours)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """(days x pairs) bool: the pair's discharge block ends within the day."""
+        return self.pairs[None, :, 1] + self.discharge_periods <= self.lengths[:, None]
+
+    @property
+    def daily_cost(self) -> np.ndarray:
+        """(days x pairs) cost, 0 where the pair does not fit the day (built on demand)."""
+        return np.where(self.valid, self.charge_cost[:, self.pairs[:, 0]], 0.0)
+
+    @property
+    def daily_revenue(self) -> np.ndarray:
+        """(days x pairs) revenue, 0 where the pair does not fit the day (built on demand)."""
+        return np.where(self.valid, self.discharge_revenue[:, self.pairs[:, 1]], 0.0)
+
+    @property
+    def daily_profit(self) -> np.ndarray:
+        """(days x pairs) profit, 0 where the pair does not fit the day (built on demand)."""
+        profit = self.discharge_revenue[:, self.pairs[:, 1]] - self.charge_cost[:, self.pairs[:, 0]]
+        return np.where(self.valid, profit, 0.0)
+
+    def window_rows(
+        self,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> slice:
+        """Return the row slice covering ``start_date``..``end_date`` inclusive."""
+        lo = 0 if start_date is None else int(self.dates.searchsorted(pd.Timestamp(start_date), side="left"))
+        hi = len(self.dates) if end_date is None else int(self.dates.searchsorted(pd.Timestamp(end_date), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def _grouped_pair_totals(self, rows: slice, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Total profit and day count of every pair per group of ``rows``.
+
+        ``starts`` are ``np.add.reduceat`` offsets into ``rows``; the result
+        is ``(groups x pairs)``.
+        """
+        lengths = self.lengths[rows]
+        totals = np.zeros((len(starts), len(self.pairs)))
+        counts = np.zeros((len(starts), len(self.pairs)), dtype=np.int64)
+        if not len(lengths):
+            return totals, counts
+
+        cost = self.charge_cost[rows]
+        revenue = self.discharge_revenue[rows]
+        buy, sell = self.pairs[:, 0], self.pairs[:, 1]
+        # Days of one length (23/24/25 hours around DST) fit the same pairs.
+        for length in np.unique(lengths):
+            same = lengths == length
+            fits = sell + self.discharge_periods <= length
+            if not fits.any():
+                continue
+            group_cost = np.add.reduceat(np.where(same[:, None], cost, 0.0), starts, axis=0)
+            group_revenue = np.add.reduceat(np.where(same[:, None], revenue, 0.0), starts, axis=0)
+            days = np.add.reduceat(same.astype(np.int64), starts)
+            totals += np.where(fits, group_revenue[:, sell] - group_cost[:, buy], 0.0)
+            counts += np.where(fits, days[:, None], 0)
+        return totals, counts
+
+    def pair_totals(self, rows: slice) -> Tuple[np.ndarray, np.ndarray]:
+        """Total profit and day count of every pair over ``rows``."""
+        totals, counts = self._grouped_pair_totals(rows, np.zeros(1, dtype=np.int64))
+        return totals[0], counts[0]
+
+    def _best_pair_index(self, rows: slice) -> Optional[Tuple[int, int]]:
+        """Index into ``pairs`` of the most profitable pair over ``rows`` and its day count."""
+        totals, counts = self.pair_totals(rows)
+        if not counts.any():
+            return None
+        idx = int(np.where(counts > 0, totals, -np.inf).argmax())
+        return idx, int(counts[idx])
+
+    def best_pair(
+        self,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> Optional[Tuple[float, float, int]]:
+        """Return ``(buy_start, sell_start, days)`` of the most profitable pair.
+
+        Starts are clock hours: integers for hourly data, fractional at
+        15-minute resolution.
+        """
+        found = self._best_pair_index(self.window_rows(start_date, end_date))
+        if found is None:
+            return None
+        idx, days = found
+        buy_start, sell_start = _start_hours(self.pairs[idx], self.step_hours).tolist()
+        return buy_start, sell_start, days
+
+    def best_pairs_by_period(self, freq: str = "Y") -> pd.DataFrame:
+        """Best pair per calendar period (``"Y"`` or ``"M"``) in one reduction."""
+        columns = ["period", "buy_hour", "sell_hour", "profit_eur", "days"]
+        if len(self.dates) == 0:
+            return pd.DataFrame(columns=columns)
+
+        if freq.upper().startswith("Y"):
+            codes = self.dates.year.to_numpy()
+        elif freq.upper().startswith("M"):
+            codes = self.dates.year.to_numpy() * 12 + self.dates.month.to_numpy() - 1
+        else:
+            raise ValueError(f"Unsupported period frequency: {freq!r}")
+
+        # Dates are sorted, so each period is a contiguous run of rows.
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        totals, counts = self._grouped_pair_totals(slice(None), starts)
+        scored = np.where(counts > 0, totals, -np.inf)
+        best = scored.argmax(axis=1)
+        period_rows = np.arange(len(starts))
+        has_pair = counts[period_rows, best] > 0
+
+        labels = self.dates[starts].to_period("Y" if freq.upper().startswith("Y") else "M").astype(str)
+        result = pd.DataFrame(
             {
-                "date": pd.Timestamp(day),
-                "hours_count": int(len(prices)),
-                "min_price_eur_mwh": float(np.min(prices)),
-                "max_price_eur_mwh": float(np.max(prices)),
-                "daily_profit_eur": float(best["profit_eur"]),
-                "daily_revenue_eur": float(best["revenue_eur"]),
-                "daily_cost_eur": float(best["cost_eur"]),
-                "charge_energy_mwh": float(best["charge_energy_mwh"]),
-                "discharge_energy_mwh": float(best["discharge_energy_mwh"]),
-                "buy_start_hour": best["buy_start_hour"],
-                "sell_start_hour": best["sell_start_hour"],
-                "buy_avg_price_eur_mwh": best["buy_avg_price_eur_mwh"],
-                "sell_avg_price_eur_mwh": best["sell_avg_price_eur_mwh"],
-                "volatility_eur_mwh": float(np.std(prices)) if len(prices) > 1 else 0.0,
+                "period": labels,
+                "buy_hour": _start_hours(self.pairs[best, 0], self.step_hours),
+                "sell_hour": _start_hours(self.pairs[best, 1], self.step_hours),
+                "profit_eur": totals[period_rows, best],
+                "days": counts[period_rows, best],
             }
         )
+        return result[has_pair].reset_index(drop=True)
 
-    if not daily_rows:
-        return pd.DataFrame(columns=base_columns)
 
-    daily_history = pd.DataFrame(daily_rows).sort_values("date").reset_index(drop=True)
-    return daily_history
+def build_fixed_cycle_scores(
+    pzu_csv: Optional[str],
+    capacity_mwh: float,
+    power_mw: float,
+    round_trip_efficiency: float,
+    min_hours_per_day: int = 24,
+    *,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
+) -> Optional[FixedCycleScores]:
+    """Precompute :class:`FixedCycleScores` for the full price history.
+
+    Results are memoised on the file path and modification time, so repeated
+    calls with a different date window reuse the same matrices. Returns
+    ``None`` when no usable history is available.
+    """
+    if not pzu_csv or not Path(pzu_csv).exists():
+        return None
+    try:
+        mtime_ns = max(source.stat().st_mtime_ns for source in source_files(pzu_csv))
+    except OSError:
+        return None
+    return _cached_fixed_cycle_scores(
+        str(pzu_csv),
+        mtime_ns,
+        float(capacity_mwh),
+        float(power_mw),
+        float(round_trip_efficiency),
+        int(min_hours_per_day),
+        max(int(charge_hours), 1),
+        max(int(discharge_hours), 1),
+    )
+
+
+@lru_cache(maxsize=16)
+def _cached_fixed_cycle_scores(
+    pzu_csv: str,
+    _mtime_ns: int,
+    capacity_mwh: float,
+    power_mw: float,
+    round_trip_efficiency: float,
+    min_hours_per_day: int,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
+) -> Optional[FixedCycleScores]:
+    daily_price_lists = _prepare_daily_prices(pzu_csv, min_hours_per_day)
+    if not daily_price_lists:
+        return None
+
+    eta = max(float(round_trip_efficiency), 1e-6)
+    power_mw = max(float(power_mw), 0.0)
+    capacity_mwh = max(float(capacity_mwh), 0.0)
+    if power_mw <= 0.0 or capacity_mwh <= 0.0:
+        return None
+
+    step_hours = _price_step_hours(pzu_csv)
+    charge_periods = _block_periods(charge_hours, step_hours)
+    discharge_periods = _block_periods(discharge_hours, step_hours)
+    charge_energy, discharge_energy = _cycle_energy(capacity_mwh, power_mw, eta, charge_hours, discharge_hours)
+    charge_power = charge_energy / charge_periods
+    discharge_power = discharge_energy / discharge_periods
+
+    # Candidate pairs follow the historic 24-hour grid: sell after the
+    # charge block ends and finish the discharge block by hour 24.
+    grid = int(round(24 / step_hours))
+    n_sell_starts = grid - discharge_periods + 1
+    pairs = np.array(
+        [
+            (buy_start, sell_start)
+            for buy_start in range(0, grid - charge_periods - discharge_periods + 1)
+            for sell_start in range(buy_start + charge_periods, n_sell_starts)
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    n_days = len(daily_price_lists)
+    width = max(grid, max(len(prices) for _, prices in daily_price_lists))
+    matrix = np.full((n_days, width), np.nan)
+    lengths = np.empty(n_days, dtype=np.int64)
+    for pos, (_, prices) in enumerate(daily_price_lists):
+        matrix[pos, : len(prices)] = prices
+        lengths[pos] = len(prices)
+
+    buy_sums = _block_sums(matrix, charge_periods)
+    sell_sums = buy_sums if discharge_periods == charge_periods else _block_sums(matrix, discharge_periods)
+
+    return FixedCycleScores(
+        dates=pd.DatetimeIndex([pd.Timestamp(day) for day, _ in daily_price_lists]),
+        pairs=pairs,
+        charge_cost=charge_power * buy_sums[:, : grid - charge_periods + 1],
+        discharge_revenue=discharge_power * sell_sums[:, :n_sell_starts],
+        lengths=lengths,
+        charge_energy_mwh=float(charge_energy),
+        discharge_energy_mwh=float(discharge_energy),
+        charge_hours=charge_hours,
+        discharge_hours=discharge_hours,
+        step_hours=step_hours,
+    )
 
 
 def compute_best_fixed_cycle(
@@ -135,58 +493,73 @@ def compute_best_fixed_cycle(
     min_hours_per_day: int = 24,
     start_date: Optional[pd.Timestamp] = None,
     end_date: Optional[pd.Timestamp] = None,
+    *,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
 ) -> Dict[str, object]:
-    """Determine the single best 2h charge/2h discharge schedule across history.
+    """Determine the single best charge/discharge schedule across history.
 
-    Returns a dictionary with the chosen schedule and a daily DataFrame under
-    ``daily_history`` that can be fed into :func:`summarize_profit_windows`.
+    Blocks are 2h each unless ``charge_hours``/``discharge_hours`` say
+    otherwise. Returns a dictionary with the chosen schedule and a daily
+    DataFrame under ``daily_history`` that can be fed into
+    :func:`summarize_profit_windows`.
     """
 
-    daily_price_lists = _prepare_daily_prices(
+    empty_result = {
+        "buy_start_hour": None,
+        "sell_start_hour": None,
+        "charge_energy_mwh": 0.0,
+        "discharge_energy_mwh": 0.0,
+        "daily_history": pd.DataFrame(
+            columns=[
+                "date",
+                "daily_profit_eur",
+                "daily_revenue_eur",
+                "daily_cost_eur",
+                "charge_energy_mwh",
+                "discharge_energy_mwh",
+            ]
+        ),
+        "stats": {},
+    }
+
+    if float(power_mw) <= 0.0 or float(capacity_mwh) <= 0.0:
+        if not _prepare_daily_prices(pzu_csv, min_hours_per_day, start_date=start_date, end_date=end_date):
+            return empty_result
+        return {**empty_result, "daily_history": pd.DataFrame()}
+
+    scores = build_fixed_cycle_scores(
         pzu_csv,
-        min_hours_per_day,
-        start_date=start_date,
-        end_date=end_date,
+        capacity_mwh=capacity_mwh,
+        power_mw=power_mw,
+        round_trip_efficiency=round_trip_efficiency,
+        min_hours_per_day=min_hours_per_day,
+        charge_hours=charge_hours,
+        discharge_hours=discharge_hours,
     )
-    if not daily_price_lists:
-        return {
-            "buy_start_hour": None,
-            "sell_start_hour": None,
-            "charge_energy_mwh": 0.0,
-            "discharge_energy_mwh": 0.0,
-            "daily_history": pd.DataFrame(
-                columns=[
-                    "date",
-                    "daily_profit_eur",
-                    "daily_revenue_eur",
-                    "daily_cost_eur",
-                    "charge_energy_mwh",
-                    "discharge_energy_mwh",
-                ]
-            ),
-            "stats": {},
-        }
+    if scores is None:
+        return empty_result
 
-    eta = max(float(round_trip_efficiency), 1e-6)
-    power_mw = max(float(power_mw), 0.0)
-    capacity_mwh = max(float(capacity_mwh), 0.0)
+    rows = scores.window_rows(start_date, end_date)
+    if rows.stop <= rows.start:
+        return empty_result
 
-    if power_mw <= 0.0 or capacity_mwh <= 0.0:
-        return {
-            "buy_start_hour": None,
-            "sell_start_hour": None,
-            "charge_energy_mwh": 0.0,
-            "discharge_energy_mwh": 0.0,
-            "daily_history": pd.DataFrame(),
-            "stats": {},
-        }
+    return _fixed_cycle_result(scores, start_date=start_date, end_date=end_date)
 
-    charge_energy = min(capacity_mwh, power_mw * _BLOCK_HOURS)
-    discharge_energy = charge_energy * eta
-    charge_power = charge_energy / _BLOCK_HOURS
-    discharge_power = discharge_energy / _BLOCK_HOURS
 
-    if discharge_power <= 0.0:
+def _fixed_cycle_result(
+    scores: FixedCycleScores,
+    *,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> Dict[str, object]:
+    """Build the :func:`compute_best_fixed_cycle` result for one date window."""
+    charge_energy = scores.charge_energy_mwh
+    discharge_energy = scores.discharge_energy_mwh
+
+    rows = scores.window_rows(start_date, end_date)
+    best = scores._best_pair_index(rows)
+    if best is None:
         return {
             "buy_start_hour": None,
             "sell_start_hour": None,
@@ -196,69 +569,373 @@ def compute_best_fixed_cycle(
             "stats": {},
         }
 
-    best_pair: Optional[Tuple[int, int]] = None
-    best_total_profit: Optional[float] = None
-    best_days = 0
+    pair_idx, best_days = best
+    buy_period, sell_period = (int(period) for period in scores.pairs[pair_idx])
+    buy_start, sell_start = _start_hours(scores.pairs[pair_idx], scores.step_hours).tolist()
+    day_mask = sell_period + scores.discharge_periods <= scores.lengths[rows]
+    revenue = scores.discharge_revenue[rows, sell_period][day_mask]
+    cost = scores.charge_cost[rows, buy_period][day_mask]
+    profit = revenue - cost
+    positive_days = int((profit > 0).sum())
+    negative_days = int((profit < 0).sum())
+
+    daily_history = pd.DataFrame(
+        {
+            "date": scores.dates[rows][day_mask],
+            "daily_profit_eur": profit,
+            "daily_revenue_eur": revenue,
+            "daily_cost_eur": cost,
+            "charge_energy_mwh": np.full(len(profit), float(charge_energy)),
+            "discharge_energy_mwh": np.full(len(profit), float(discharge_energy)),
+        }
+    )
 
-    for buy_start in range(0, 24 - _BLOCK_HOURS):
-        for sell_start in range(buy_start + _BLOCK_HOURS, 24 - _BLOCK_HOURS + 1):
-            total_profit = 0.0
-            days_count = 0
-            for _, prices in daily_price_lists:
-                if sell_start + _BLOCK_HOURS > len(prices):
-                    continue
-                cost = charge_power * sum(prices[buy_start : buy_start + _BLOCK_HOURS])
-                revenue = discharge_power * sum(prices[sell_start : sell_start + _BLOCK_HOURS])
-                total_profit += revenue - cost
-                days_count += 1
+    stats = _history_stats(
+        daily_history,
+        positive_days=positive_days,
+        negative_days=negative_days,
+        total_days=best_days,
+    )
 
-            if days_count == 0:
-                continue
+    return {
+        "buy_start_hour": buy_start,
+        "sell_start_hour": sell_start,
+        "charge_hours": scores.charge_hours,
+        "discharge_hours": scores.discharge_hours,
+        "charge_energy_mwh": float(charge_energy),
+        "discharge_energy_mwh": float(discharge_energy),
+        "daily_history": daily_history,
+        "stats": stats,
+    }
 
-            if best_total_profit is None or total_profit > best_total_profit:
-                best_total_profit = total_profit
-                best_pair = (buy_start, sell_start)
-                best_days = days_count
 
-    if best_pair is None:
-        return {
-            "buy_start_hour": None,
-            "sell_start_hour": None,
+def compute_optimal_dispatch(
+    pzu_csv: Optional[str],
+    capacity_mwh: float,
+    power_mw: float,
+    round_trip_efficiency: float,
+    min_hours_per_day: int = 24,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    *,
+    carry_soc: bool = True,
+    enforce_soc_end_equal_start: bool = True,
+    initial_soc_fraction: float = 0.0,
+    soc_levels: int = 48,
+) -> Dict[str, object]:
+    """Perfect-foresight PZU arbitrage: the best per-period charge/discharge/idle plan.
+
+    Solves a dynamic programme over ``soc_levels`` SOC steps (see
+    :mod:`src.strategy.optimal`) with the battery's power and capacity
+    limits; as in :func:`compute_best_fixed_cycle`, bought energy is stored
+    and ``round_trip_efficiency`` of it is sold. With ``carry_soc`` the whole
+    window is one horizon and SOC carries over midnight; otherwise every day
+    is solved independently (all days in one vectorised pass) and starts at
+    ``initial_soc_fraction``. ``enforce_soc_end_equal_start`` makes each
+    horizon end where it started. Hourly and 15-minute histories are solved
+    on their own delivery periods, with the power limit scaled to the
+    period length. Days missing from the price history are
+    skipped, not bridged.
+
+    The result mirrors :func:`compute_best_fixed_cycle` (``daily_history``
+    and ``stats``), so the two can be compared directly; profit is the upper
+    bound for any schedule on the same SOC grid.
+    """
+    columns = [
+        "date",
+        "hours_count",
+        "daily_profit_eur",
+        "daily_revenue_eur",
+        "daily_cost_eur",
+        "charge_energy_mwh",
+        "discharge_energy_mwh",
+        "cycles",
+        "soc_end_mwh",
+    ]
+    empty_result = {"daily_history": pd.DataFrame(columns=columns), "stats": {}, "soc_step_mwh": 0.0}
+
+    daily_price_lists = _prepare_daily_prices(
+        pzu_csv,
+        min_hours_per_day,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    eta = max(float(round_trip_efficiency), 1e-6)
+    power_mw = max(float(power_mw), 0.0)
+    capacity_mwh = max(float(capacity_mwh), 0.0)
+    if not daily_price_lists or power_mw <= 0.0 or capacity_mwh <= 0.0:
+        return empty_result
+
+    step_hours = _price_step_hours(pzu_csv)
+    grid = DispatchGrid.build(capacity_mwh, power_mw, eta, soc_levels, step_hours=step_hours)
+    start_state = int(round(min(max(float(initial_soc_fraction), 0.0), 1.0) * grid.levels))
+    end_state = start_state if enforce_soc_end_equal_start else None
+
+    lengths = np.array([len(prices) for _, prices in daily_price_lists], dtype=np.int64)
+    flat_prices = np.concatenate([np.asarray(prices, dtype=float) for _, prices in daily_price_lists])
+    bought = np.zeros(len(flat_prices))
+    sold = np.zeros(len(flat_prices))
+    soc = np.zeros(len(flat_prices))
+    offsets = np.r_[0, np.cumsum(lengths)]
+
+    if carry_soc:
+        plan = solve_dispatch(flat_prices[None, :], grid, start_state, end_state)
+        bought, sold, soc = plan["bought_mwh"][0], plan["sold_mwh"][0], plan["soc_mwh"][0]
+    else:
+        # Equal-length days (23/24/25 hours around DST) are solved together.
+        for idx, matrix in _group_daily_price_matrices(daily_price_lists):
+            plan = solve_dispatch(matrix, grid, start_state, end_state)
+            positions = offsets[idx][:, None] + np.arange(matrix.shape[1])[None, :]
+            bought[positions] = plan["bought_mwh"]
+            sold[positions] = plan["sold_mwh"]
+            soc[positions] = plan["soc_mwh"]
+
+    day_starts = offsets[:-1]
+    cost = np.add.reduceat(bought * flat_prices, day_starts)
+    revenue = np.add.reduceat(sold * flat_prices, day_starts)
+    charge_energy = np.add.reduceat(bought, day_starts)
+    discharge_energy = np.add.reduceat(sold, day_starts)
+    profit = revenue - cost
+
+    daily_history = pd.DataFrame(
+        {
+            "date": [pd.Timestamp(day) for day, _ in daily_price_lists],
+            "hours_count": np.round(lengths * step_hours).astype(np.int64),
+            "daily_profit_eur": profit,
+            "daily_revenue_eur": revenue,
+            "daily_cost_eur": cost,
             "charge_energy_mwh": charge_energy,
             "discharge_energy_mwh": discharge_energy,
-            "daily_history": pd.DataFrame(),
-            "stats": {},
+            "cycles": discharge_energy / eta / capacity_mwh,
+            "soc_end_mwh": soc[offsets[1:] - 1],
         }
+    )
+    stats = _history_stats(
+        daily_history,
+        positive_days=int((profit > 0).sum()),
+        negative_days=int((profit < 0).sum()),
+        total_days=len(daily_history),
+    )
+    stats["total_cycles"] = float(daily_history["cycles"].sum())
+    stats["carry_soc"] = bool(carry_soc)
+    return {"daily_history": daily_history, "stats": stats, "soc_step_mwh": grid.step_mwh}
+
+
+def _running_argmax(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Running maximum along the last axis and the earliest position holding it."""
+    best = np.maximum.accumulate(values, axis=-1)
+    positions = np.broadcast_to(np.arange(values.shape[-1]), values.shape)
+    # A position is a new record when it beats everything before it.
+    record = np.concatenate(
+        [np.ones(values.shape[:-1] + (1,), dtype=bool), values[..., 1:] > best[..., :-1]],
+        axis=-1,
+    )
+    where = np.maximum.accumulate(np.where(record, positions, 0), axis=-1)
+    return best, where
+
+
+def _best_k_cycles_batch(
+    price_matrix: np.ndarray,
+    cycles: int,
+    charge_power: float,
+    discharge_power: float,
+    charge_periods: int,
+    discharge_periods: int,
+) -> Dict[str, np.ndarray]:
+    """Best ``cycles`` non-overlapping charge→discharge block pairs per day.
+
+    Dynamic programme over period boundaries, vectorised across the rows of
+    a (days x periods) matrix; block lengths, powers (EUR per price unit per
+    period) and the returned starts are all in delivery periods.
+    ``done[k][t]`` is the best profit of at most ``k`` complete cycles
+    finished by period ``t``; cycle ``k`` may start charging at
+    ``b`` once ``done[k - 1][b]`` is known, so the battery is empty again
+    before each new cycle and SOC never exceeds one block's energy. Each
+    level is a few running maxima, so the cost is O(cycles x periods) per day.
+    A cycle is only added when it raises profit; ties keep fewer cycles.
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    n_days, n = prices.shape
+    rows = np.arange(n_days)
+    buy_starts = np.full((n_days, cycles), -1, dtype=np.int64)
+    sell_starts = np.full((n_days, cycles), -1, dtype=np.int64)
+    result = {
+        "profit_eur": np.zeros(n_days),
+        "revenue_eur": np.zeros(n_days),
+        "cost_eur": np.zeros(n_days),
+        "cycles": np.zeros(n_days, dtype=np.int64),
+        "buy_start_hours": buy_starts,
+        "sell_start_hours": sell_starts,
+    }
+    if n_days == 0 or cycles <= 0 or n < charge_periods + discharge_periods:
+        return result
+
+    cost = charge_power * _block_sums(prices, charge_periods)  # buy start b = 0..n-c
+    revenue = discharge_power * _block_sums(prices, discharge_periods)  # sell start s = 0..n-d
+    sells = np.arange(charge_periods, n - discharge_periods + 1)
+
+    done = [np.zeros((n_days, n + 1))]
+    sell_choice: List[np.ndarray] = []  # per level: sell start of the last cycle ending by t, or -1
+    buy_choice: List[np.ndarray] = []  # per level: buy start paired with each sell start
+    for _ in range(cycles):
+        previous = done[-1]
+        holding, from_buy = _running_argmax(previous[:, : cost.shape[1]] - cost)
+        # Selling at s pairs with the best charge block starting by s - c.
+        closed = holding[:, sells - charge_periods] + revenue[:, sells]
+        paired = np.full((n_days, revenue.shape[1]), -1, dtype=np.int64)
+        paired[:, sells] = from_buy[:, sells - charge_periods]
+
+        # A cycle sold at s is complete at t = s + d.
+        ending = np.full((n_days, n + 1), -np.inf)
+        ending[:, sells + discharge_periods] = closed
+        ending_best, ending_at = _running_argmax(ending)
+        take = ending_best > previous
+        current = np.where(take, ending_best, previous)
+        done.append(current)
+        sell_choice.append(np.where(take, ending_at - discharge_periods, -1))
+        buy_choice.append(paired)
+
+    # Walk back from the end of the day, one level per step.
+    t = np.full(n_days, n, dtype=np.int64)
+    count = np.zeros(n_days, dtype=np.int64)
+    for level in range(cycles - 1, -1, -1):
+        sell = sell_choice[level][rows, t]
+        took = sell >= 0
+        buy = buy_choice[level][rows, np.maximum(sell, 0)]
+        slot = cycles - 1 - level
+        buy_starts[took, slot] = buy[took]
+        sell_starts[took, slot] = sell[took]
+        result["cost_eur"][took] += cost[rows[took], buy[took]]
+        result["revenue_eur"][took] += revenue[rows[took], sell[took]]
+        count += took
+        t = np.where(took, buy, t)
+
+    # Cycles were collected latest first; list them in time order.
+    order = np.argsort(np.where(buy_starts >= 0, buy_starts, n + 1), axis=1, kind="stable")
+    result["buy_start_hours"] = np.take_along_axis(buy_starts, order, axis=1)
+    result["sell_start_hours"] = np.take_along_axis(sell_starts, order, axis=1)
+    result["profit_eur"] = result["revenue_eur"] - result["cost_eur"]
+    result["cycles"] = count
+    return result
+
+
+def compute_multi_cycle_schedule(
+    pzu_csv: Optional[str],
+    capacity_mwh: float,
+    power_mw: float,
+    round_trip_efficiency: float,
+    cycles_per_day: int = 1,
+    min_hours_per_day: int = 24,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    *,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
+) -> Dict[str, object]:
+    """Best schedule of up to ``cycles_per_day`` charge/discharge cycles each day.
 
-    buy_start, sell_start = best_pair
-    daily_rows: List[Dict[str, object]] = []
-    positive_days = 0
-    negative_days = 0
-    for day, prices in daily_price_lists:
-        if sell_start + _BLOCK_HOURS > len(prices):
-            continue
-        buy_block = prices[buy_start : buy_start + _BLOCK_HOURS]
-        sell_block = prices[sell_start : sell_start + _BLOCK_HOURS]
-        cost = charge_power * sum(buy_block)
-        revenue = discharge_power * sum(sell_block)
-        profit = revenue - cost
-        if profit > 0:
-            positive_days += 1
-        elif profit < 0:
-            negative_days += 1
-        daily_rows.append(
-            {
-                "date": pd.Timestamp(day),
-                "daily_profit_eur": float(profit),
-                "daily_revenue_eur": float(revenue),
-                "daily_cost_eur": float(cost),
-                "charge_energy_mwh": float(charge_energy),
-                "discharge_energy_mwh": float(discharge_energy),
-            }
+    Intended for ``strategy.pzu.daily_cycles_target``. Every cycle is a
+    charge block followed by a discharge block (2h each by default) that
+    moves the same energy as :func:`compute_best_fixed_cycle`'s cycle; cycles
+    do not overlap and each starts with the battery empty. Unlike the
+    single-pair evaluators, a day with no profitable cycle stays idle.
+
+    Returns ``daily_history`` (with ``cycles`` and the chosen
+    ``buy_start_hours``/``sell_start_hours`` per day, fractional at 15-minute
+    resolution) and ``stats`` in the shape of :func:`compute_best_fixed_cycle`.
+    """
+    columns = [
+        "date",
+        "hours_count",
+        "cycles",
+        "daily_profit_eur",
+        "daily_revenue_eur",
+        "daily_cost_eur",
+        "charge_energy_mwh",
+        "discharge_energy_mwh",
+        "buy_start_hours",
+        "sell_start_hours",
+    ]
+    empty_result = {"daily_history": pd.DataFrame(columns=columns), "stats": {}}
+
+    daily_price_lists = _prepare_daily_prices(
+        pzu_csv,
+        min_hours_per_day,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    eta = max(float(round_trip_efficiency), 1e-6)
+    power_mw = max(float(power_mw), 0.0)
+    capacity_mwh = max(float(capacity_mwh), 0.0)
+    cycles_per_day = max(int(cycles_per_day), 0)
+    if not daily_price_lists or power_mw <= 0.0 or capacity_mwh <= 0.0:
+        return empty_result
+
+    charge_energy, discharge_energy = _cycle_energy(capacity_mwh, power_mw, eta, charge_hours, discharge_hours)
+    step_hours = _price_step_hours(pzu_csv)
+    charge_periods = _block_periods(charge_hours, step_hours)
+    discharge_periods = _block_periods(discharge_hours, step_hours)
+    n_days = len(daily_price_lists)
+    lengths = np.array([len(prices) for _, prices in daily_price_lists], dtype=np.int64)
+    profit = np.zeros(n_days)
+    revenue = np.zeros(n_days)
+    cost = np.zeros(n_days)
+    cycles = np.zeros(n_days, dtype=np.int64)
+    buy_hours: List[Tuple[float, ...]] = [()] * n_days
+    sell_hours: List[Tuple[float, ...]] = [()] * n_days
+
+    for idx, matrix in _group_daily_price_matrices(daily_price_lists):
+        batch = _best_k_cycles_batch(
+            matrix,
+            cycles_per_day,
+            charge_energy / charge_periods,
+            discharge_energy / discharge_periods,
+            charge_periods,
+            discharge_periods,
         )
+        profit[idx] = batch["profit_eur"]
+        revenue[idx] = batch["revenue_eur"]
+        cost[idx] = batch["cost_eur"]
+        cycles[idx] = batch["cycles"]
+        buy_starts = _start_hours(batch["buy_start_hours"], step_hours)
+        sell_starts = _start_hours(batch["sell_start_hours"], step_hours)
+        for pos, buys, sells in zip(idx, buy_starts.tolist(), sell_starts.tolist()):
+            buy_hours[pos] = tuple(hour for hour in buys if hour >= 0)
+            sell_hours[pos] = tuple(hour for hour in sells if hour >= 0)
+
+    daily_history = pd.DataFrame(
+        {
+            "date": [pd.Timestamp(day) for day, _ in daily_price_lists],
+            "hours_count": np.round(lengths * step_hours).astype(np.int64),
+            "cycles": cycles,
+            "daily_profit_eur": profit,
+            "daily_revenue_eur": revenue,
+            "daily_cost_eur": cost,
+            "charge_energy_mwh": cycles * charge_energy,
+            "discharge_energy_mwh": cycles * discharge_energy,
+            "buy_start_hours": buy_hours,
+            "sell_start_hours": sell_hours,
+        }
+    )
+    stats = _history_stats(
+        daily_history,
+        positive_days=int((profit > 0).sum()),
+        negative_days=int((profit < 0).sum()),
+        total_days=n_days,
+    )
+    stats["total_cycles"] = int(cycles.sum())
+    stats["multi_cycle_days"] = int((cycles > 1).sum())
+    return {"daily_history": daily_history, "stats": stats}
 
-    daily_history = pd.DataFrame(daily_rows).sort_values("date").reset_index(drop=True)
 
+def _history_stats(
+    daily_history: pd.DataFrame,
+    *,
+    positive_days: int,
+    negative_days: int,
+    total_days: int,
+) -> Dict[str, object]:
+    """Headline totals and average prices of a daily profit history."""
     if daily_history.empty:
         total_profit = 0.0
         average_profit = 0.0
@@ -287,7 +964,7 @@ def compute_best_fixed_cycle(
         avg_sell_price = float(total_revenue / total_discharge_energy) if total_discharge_energy > 0 else None
         spread_price = float(avg_sell_price - avg_buy_price) if avg_sell_price is not None and avg_buy_price is not None else None
 
-    stats = {
+    return {
         "total_profit_eur": total_profit,
         "average_profit_eur": average_profit,
         "total_revenue_eur": total_revenue,
@@ -300,16 +977,7 @@ def compute_best_fixed_cycle(
         "spread_eur_mwh": spread_price,
         "positive_days": int(positive_days),
         "negative_days": int(negative_days),
-        "total_days": int(best_days),
-    }
-
-    return {
-        "buy_start_hour": buy_start,
-        "sell_start_hour": sell_start,
-        "charge_energy_mwh": float(charge_energy),
-        "discharge_energy_mwh": float(discharge_energy),
-        "daily_history": daily_history,
-        "stats": stats,
+        "total_days": int(total_days),
     }
 
 
@@ -326,27 +994,137 @@ def _period_cutoff(last_date: pd.Timestamp, offset: object) -> pd.Timestamp:
     raise TypeError(f"Unsupported offset type: {type(offset).__name__}")
 
 
-def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, object]]:
-    """Summarise profitability across fixed rolling windows (30d → 3y)."""
+_DEFAULT_PERIODS: List[Tuple[str, object]] = [
+    ("1 day", pd.Timedelta(days=1)),
+    ("30 days", pd.Timedelta(days=30)),
+    ("60 days", pd.Timedelta(days=60)),
+    ("90 days", pd.Timedelta(days=90)),
+    ("6 months", pd.DateOffset(months=6)),
+    ("12 months", pd.DateOffset(months=12)),
+    ("2 years", pd.DateOffset(years=2)),
+    ("3 years", pd.DateOffset(years=3)),
+]
+
+
+def _prefix(values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Cumulative sum with a leading zero, NaN counted as 0 (pandas ``skipna``)."""
+    if values is None:
+        return None
+    out = np.zeros(len(values) + 1)
+    np.cumsum(np.nan_to_num(values, nan=0.0), out=out[1:])
+    return out
+
+
+@dataclass
+class ProfitWindowIndex:
+    """Prefix sums over a date-sorted daily history.
+
+    Built in one pass, it answers any trailing-period total as a suffix
+    difference and every rolling window of a given length as one vectorised
+    difference of the profit prefix, so each horizon or window length costs
+    O(n) instead of a fresh filter and ``rolling().sum()``.
+    """
+
+    history: pd.DataFrame  # sorted by date, default index
+    dates: np.ndarray  # datetime64[ns]
+    profit: np.ndarray  # prefix sums, length n + 1
+    counted: np.ndarray  # prefix count of non-NaN profits
+    wins: np.ndarray  # prefix count of profitable days
+    losses: np.ndarray  # prefix sum of negative profits
+    suffix_max: np.ndarray  # max profit from row i to the end
+    suffix_min: np.ndarray
+    revenue: Optional[np.ndarray]
+    cost: Optional[np.ndarray]
+    charge_energy: Optional[np.ndarray]
+    discharge_energy: Optional[np.ndarray]
+
+    @classmethod
+    def from_history(cls, daily_history: pd.DataFrame) -> "ProfitWindowIndex":
+        history = daily_history.sort_values("date").reset_index(drop=True)
+        profits = pd.to_numeric(history["daily_profit_eur"], errors="coerce").to_numpy(dtype=float)
+        missing = np.isnan(profits)
+
+        def _column(name: str) -> Optional[np.ndarray]:
+            if name not in history:
+                return None
+            return pd.to_numeric(history[name], errors="coerce").to_numpy(dtype=float)
+
+        def _running(ufunc: np.ufunc) -> np.ndarray:
+            if not len(profits):
+                return profits.copy()
+            return ufunc.accumulate(profits[::-1])[::-1]
+
+        return cls(
+            history=history,
+            dates=pd.to_datetime(history["date"]).to_numpy(dtype="datetime64[ns]"),
+            profit=_prefix(profits),
+            counted=_prefix((~missing).astype(float)),
+            wins=_prefix((profits > 0).astype(float)),
+            losses=_prefix(np.where(profits < 0, profits, 0.0)),
+            suffix_max=_running(np.fmax),
+            suffix_min=_running(np.fmin),
+            revenue=_prefix(_column("daily_revenue_eur")),
+            cost=_prefix(_column("daily_cost_eur")),
+            charge_energy=_prefix(_column("charge_energy_mwh")),
+            discharge_energy=_prefix(_column("discharge_energy_mwh")),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def suffix_start(self, cutoff: pd.Timestamp) -> int:
+        """First row dated on or after ``cutoff`` (0 for ``NaT``)."""
+        if cutoff is pd.NaT:
+            return 0
+        return int(np.searchsorted(self.dates, pd.Timestamp(cutoff).to_datetime64(), side="left"))
+
+    def extreme_windows(self, window: int) -> Optional[Dict[str, object]]:
+        """Best and worst run of ``window`` consecutive rows.
+
+        Mirrors ``rolling(window).sum()``: windows containing a missing profit
+        are skipped and ties go to the earliest window. Returns ``None`` when
+        no complete window exists.
+        """
+        n = len(self)
+        if window <= 0 or window > n:
+            return None
+        totals = self.profit[window:] - self.profit[:-window]
+        complete = (self.counted[window:] - self.counted[:-window]) == window
+        if not complete.any():
+            return None
+        best = int(np.where(complete, totals, -np.inf).argmax())
+        worst = int(np.where(complete, totals, np.inf).argmin())
+        dates = self.history["date"]
+
+        def _describe(start: int) -> Tuple[float, object, object, float]:
+            won = self.wins[start + window] - self.wins[start]
+            return (
+                float(totals[start]),
+                dates.iloc[start],
+                dates.iloc[start + window - 1],
+                float(won / window * 100),
+            )
+
+        return {"best": _describe(best), "worst": _describe(worst)}
+
+
+def summarize_profit_windows(
+    daily_history: pd.DataFrame,
+    custom_windows: Optional[Sequence[Tuple[str, object]]] = None,
+) -> List[Dict[str, object]]:
+    """Summarise profitability across fixed rolling windows (30d → 3y).
+
+    ``custom_windows`` adds ``(label, offset)`` horizons after the defaults;
+    offsets are ``pd.Timedelta``, ``pd.DateOffset`` or a number of days. All
+    horizons are answered from one :class:`ProfitWindowIndex`.
+    """
     if daily_history.empty:
         return []
 
-    history = daily_history.sort_values("date").reset_index(drop=True)
-    profits = history["daily_profit_eur"]
-    revenue = history.get("daily_revenue_eur")
-    cost = history.get("daily_cost_eur")
-    last_date = history["date"].iloc[-1]
-
-    periods: List[Tuple[str, object]] = [
-        ("1 day", pd.Timedelta(days=1)),
-        ("30 days", pd.Timedelta(days=30)),
-        ("60 days", pd.Timedelta(days=60)),
-        ("90 days", pd.Timedelta(days=90)),
-        ("6 months", pd.DateOffset(months=6)),
-        ("12 months", pd.DateOffset(months=12)),
-        ("2 years", pd.DateOffset(years=2)),
-        ("3 years", pd.DateOffset(years=3)),
-    ]
+    index = ProfitWindowIndex.from_history(daily_history)
+    n = len(index)
+    last_date = index.history["date"].iloc[-1]
+    periods = list(_DEFAULT_PERIODS) + list(custom_windows or [])
 
     results: List[Dict[str, object]] = []
 
@@ -356,12 +1134,8 @@ def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, obje
         except TypeError:
             continue
 
-        if cutoff is pd.NaT:
-            recent = history.copy()
-        else:
-            recent = history[history["date"] >= cutoff]
-
-        recent_len = len(recent)
+        start = index.suffix_start(cutoff)
+        recent_len = n - start
         if recent_len == 0:
             results.append(
                 {
@@ -392,39 +1166,26 @@ def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, obje
         else:
             expected_days = max((last_date - cutoff).days + 1, 1)
 
+        def _recent(prefix: np.ndarray) -> float:
+            return float(prefix[n] - prefix[start])
+
         coverage_ratio = recent_len / expected_days if expected_days else 0.0
-        recent_total = float(recent["daily_profit_eur"].sum())
-        recent_avg = float(recent["daily_profit_eur"].mean())
-        success_rate = float((recent["daily_profit_eur"] > 0).mean() * 100)
-        max_day = float(recent["daily_profit_eur"].max())
-        min_day = float(recent["daily_profit_eur"].min())
-        losing_mask = recent["daily_profit_eur"] < 0
-        recent_loss = float(-recent.loc[losing_mask, "daily_profit_eur"].sum())
-        recent_loss = abs(recent_loss)
+        recent_total = _recent(index.profit)
+        counted = _recent(index.counted)
+        recent_avg = recent_total / counted if counted else float("nan")
+        success_rate = _recent(index.wins) / recent_len * 100
+        max_day = float(index.suffix_max[start])
+        min_day = float(index.suffix_min[start])
+        recent_loss = abs(_recent(index.losses))
 
         window_size = recent_len
         best_total = best_start = best_end = best_success = None
         worst_total = worst_start = worst_end = worst_success = None
 
-        if window_size > 0:
-            rolling = profits.rolling(window_size).sum()
-            valid = rolling.dropna()
-            if not valid.empty:
-                best_idx = int(valid.idxmax())
-                best_total = float(rolling.iloc[best_idx])
-                best_start_idx = max(best_idx - window_size + 1, 0)
-                best_slice = history.iloc[best_start_idx : best_idx + 1]
-                best_start = best_slice.iloc[0]["date"]
-                best_end = best_slice.iloc[-1]["date"]
-                best_success = float((best_slice["daily_profit_eur"] > 0).mean() * 100)
-
-                worst_idx = int(valid.idxmin())
-                worst_total = float(rolling.iloc[worst_idx])
-                worst_start_idx = max(worst_idx - window_size + 1, 0)
-                worst_slice = history.iloc[worst_start_idx : worst_idx + 1]
-                worst_start = worst_slice.iloc[0]["date"]
-                worst_end = worst_slice.iloc[-1]["date"]
-                worst_success = float((worst_slice["daily_profit_eur"] > 0).mean() * 100)
+        extremes = index.extreme_windows(window_size)
+        if extremes is not None:
+            best_total, best_start, best_end, best_success = extremes["best"]
+            worst_total, worst_start, worst_end, worst_success = extremes["worst"]
 
         projection_multiplier = None
         if expected_days and recent_len > 0 and expected_days > recent_len:
@@ -457,14 +1218,13 @@ def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, obje
             summary["projected_avg_eur"] = recent_avg
             summary["projected_loss_eur"] = recent_loss * projection_multiplier
 
-        
-        if revenue is not None:
-            recent_revenue = float(revenue.iloc[-recent_len:].sum()) if recent_len else 0.0
+        if index.revenue is not None:
+            recent_revenue = _recent(index.revenue)
             summary["recent_revenue_eur"] = recent_revenue
         else:
             recent_revenue = None
-        if cost is not None:
-            recent_cost = float(cost.iloc[-recent_len:].sum()) if recent_len else 0.0
+        if index.cost is not None:
+            recent_cost = _recent(index.cost)
             summary["recent_cost_eur"] = recent_cost
         else:
             recent_cost = None
@@ -472,11 +1232,11 @@ def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, obje
         if (
             recent_revenue is not None
             and recent_cost is not None
-            and "charge_energy_mwh" in recent
-            and "discharge_energy_mwh" in recent
+            and index.charge_energy is not None
+            and index.discharge_energy is not None
         ):
-            total_charge = float(recent["charge_energy_mwh"].sum())
-            total_discharge = float(recent["discharge_energy_mwh"].sum())
+            total_charge = _recent(index.charge_energy)
+            total_discharge = _recent(index.discharge_energy)
             avg_buy = float(recent_cost / total_charge) if total_charge > 0 else None
             avg_sell = float(recent_revenue / total_discharge) if total_discharge > 0 else None
             if avg_buy is not None:
@@ -492,9 +1252,9 @@ def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, obje
                     summary["projected_spread_eur_mwh"] = spread
 
         if projection_multiplier and projection_multiplier > 1.0:
-            if revenue is not None:
+            if index.revenue is not None:
                 summary["projected_revenue_eur"] = recent_revenue * projection_multiplier
-            if cost is not None:
+            if index.cost is not None:
                 summary["projected_cost_eur"] = recent_cost * projection_multiplier
 
         results.append(summary)
@@ -502,54 +1262,129 @@ def summarize_profit_windows(daily_history: pd.DataFrame) -> List[Dict[str, obje
     return results
 
 
+def profit_window_curve(
+    daily_history: pd.DataFrame,
+    window_lengths: Optional[Sequence[int]] = None,
+) -> pd.DataFrame:
+    """Best and worst rolling-window profit for each window length.
+
+    ``window_lengths`` defaults to every length from one day to the full
+    history; lengths longer than the history are dropped. One row per
+    length, suitable for a "window length vs best/worst profit" chart.
+    """
+    columns = [
+        "window_days",
+        "best_total_eur",
+        "best_avg_eur",
+        "best_start",
+        "best_end",
+        "best_success_rate",
+        "worst_total_eur",
+        "worst_avg_eur",
+        "worst_start",
+        "worst_end",
+        "worst_success_rate",
+    ]
+    if daily_history is None or daily_history.empty:
+        return pd.DataFrame(columns=columns)
+
+    index = ProfitWindowIndex.from_history(daily_history)
+    if window_lengths is None:
+        window_lengths = range(1, len(index) + 1)
+
+    rows: List[Dict[str, object]] = []
+    for window in sorted({int(length) for length in window_lengths}):
+        extremes = index.extreme_windows(window)
+        if extremes is None:
+            continue
+        best_total, best_start, best_end, best_success = extremes["best"]
+        worst_total, worst_start, worst_end, worst_success = extremes["worst"]
+        rows.append(
+            {
+                "window_days": window,
+                "best_total_eur": best_total,
+                "best_avg_eur": best_total / window,
+                "best_start": best_start,
+                "best_end": best_end,
+                "best_success_rate": best_success,
+                "worst_total_eur": worst_total,
+                "worst_avg_eur": worst_total / window,
+                "worst_start": worst_start,
+                "worst_end": worst_end,
+                "worst_success_rate": worst_success,
+            }
+        )
+    return pd.DataFrame(rows, columns=columns)
+
+
 def _evaluate_two_by_two_cycle(
     prices: List[float],
     capacity_mwh: float,
     power_mw: float,
     eta: float,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
+    step_hours: float = 1.0,
 ) -> Dict[str, object]:
+    charge_periods = _block_periods(charge_hours, step_hours)
+    discharge_periods = _block_periods(discharge_hours, step_hours)
     n = len(prices)
-    if n < _MIN_REQUIRED_HOURS:
+    if n < charge_periods + discharge_periods:
         return _empty_cycle_result()
 
-    charge_energy = min(capacity_mwh, power_mw * _BLOCK_HOURS)
+    charge_energy, discharge_energy = _cycle_energy(capacity_mwh, power_mw, eta, charge_hours, discharge_hours)
     if charge_energy <= 0.0:
         return _empty_cycle_result()
 
-    discharge_energy = charge_energy * eta
-    charge_power = charge_energy / _BLOCK_HOURS
-    discharge_power = discharge_energy / _BLOCK_HOURS
+    # Energy bought/sold in each delivery period of a block.
+    charge_power = charge_energy / charge_periods
+    discharge_power = discharge_energy / discharge_periods
     if discharge_power <= 0.0:
         return _empty_cycle_result(charge_energy_mwh=charge_energy, discharge_energy_mwh=discharge_energy)
 
+    # Revenue of every discharge block and the best one starting at or after
+    # each period, so each charge block is scored once against its best sale.
+    revenues = [
+        discharge_power * sum(prices[start : start + discharge_periods])
+        for start in range(n - discharge_periods + 1)
+    ]
+    best_after = list(revenues)
+    for start in range(len(best_after) - 2, -1, -1):
+        best_after[start] = max(best_after[start], best_after[start + 1])
+
     best_profit = None
-    best: Optional[Dict[str, object]] = None
+    best_buy = 0
+    best_cost = 0.0
+    for buy_start in range(0, n - charge_periods - discharge_periods + 1):
+        cost = charge_power * sum(prices[buy_start : buy_start + charge_periods])
+        profit = best_after[buy_start + charge_periods] - cost
+        if best_profit is None or profit > best_profit:
+            best_profit = profit
+            best_buy = buy_start
+            best_cost = cost
 
-    # Last buy start must leave room for a two-hour discharge afterwards.
-    last_buy_start = n - (_BLOCK_HOURS + _BLOCK_HOURS)
-    for buy_start in range(0, last_buy_start + 1):
-        buy_block = prices[buy_start : buy_start + _BLOCK_HOURS]
-        cost = charge_power * sum(buy_block)
-        buy_avg = float(np.mean(buy_block))
-
-        for sell_start in range(buy_start + _BLOCK_HOURS, n - _BLOCK_HOURS + 1):
-            sell_block = prices[sell_start : sell_start + _BLOCK_HOURS]
-            revenue = discharge_power * sum(sell_block)
-            profit = revenue - cost
-
-            if best_profit is None or profit > best_profit:
-                best_profit = profit
-                best = {
-                    "profit_eur": float(profit),
-                    "revenue_eur": float(revenue),
-                    "cost_eur": float(cost),
-                    "charge_energy_mwh": float(charge_energy),
-                    "discharge_energy_mwh": float(discharge_energy),
-                    "buy_start_hour": int(buy_start),
-                    "sell_start_hour": int(sell_start),
-                    "buy_avg_price_eur_mwh": float(buy_avg),
-                    "sell_avg_price_eur_mwh": float(np.mean(sell_block)),
-                }
+    best: Optional[Dict[str, object]] = None
+    if best_profit is not None:
+        # Earliest sale reaching the best revenue, as scanning every
+        # (buy_start, sell_start) pair in order would pick.
+        target = best_after[best_buy + charge_periods]
+        sell_start = next(
+            start for start in range(best_buy + charge_periods, len(revenues)) if revenues[start] == target
+        )
+        buy_block = prices[best_buy : best_buy + charge_periods]
+        sell_block = prices[sell_start : sell_start + discharge_periods]
+        revenue = revenues[sell_start]
+        best = {
+            "profit_eur": float(revenue - best_cost),
+            "revenue_eur": float(revenue),
+            "cost_eur": float(best_cost),
+            "charge_energy_mwh": float(charge_energy),
+            "discharge_energy_mwh": float(discharge_energy),
+            "buy_start_hour": _start_hours(np.int64(best_buy), step_hours).item(),
+            "sell_start_hour": _start_hours(np.int64(sell_start), step_hours).item(),
+            "buy_avg_price_eur_mwh": float(np.mean(buy_block)),
+            "sell_avg_price_eur_mwh": float(np.mean(sell_block)),
+        }
 
     if best is None:
         return _empty_cycle_result(charge_energy_mwh=charge_energy, discharge_energy_mwh=discharge_energy)
@@ -557,6 +1392,118 @@ def _evaluate_two_by_two_cycle(
     return best
 
 
+def _block_sums(matrix: np.ndarray, block_hours: int) -> np.ndarray:
+    """Return sliding ``block_hours`` sums along the last axis.
+
+    Shifted views are added left to right, matching ``sum(prices[i:i + k])``
+    bit for bit (a prefix-sum difference would drift in the last ulp and
+    could flip ties between equally profitable windows).
+    """
+    width = matrix.shape[-1] - block_hours + 1
+    if width <= 0:
+        return np.zeros(matrix.shape[:-1] + (0,), dtype=float)
+    sums = matrix[..., 0:width].astype(float, copy=True)
+    for offset in range(1, block_hours):
+        sums += matrix[..., offset : offset + width]
+    return sums
+
+
+def _evaluate_two_by_two_cycle_batch(
+    price_matrix: np.ndarray,
+    capacity_mwh: float,
+    power_mw: float,
+    eta: float,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
+    step_hours: float = 1.0,
+) -> Dict[str, np.ndarray]:
+    """Vectorised :func:`_evaluate_two_by_two_cycle` for a (days x periods) matrix.
+
+    Each charge block is scored against the best discharge block starting
+    after it (a suffix maximum), so the search is linear in the number of
+    delivery periods and 15-minute days cost about four times hourly ones.
+    Ties resolve to the first pair in (buy_start, sell_start) order, like
+    scanning every pair. Start indices are delivery periods; days without a
+    valid pair carry ``-1`` starts and NaN averages.
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    n_days, n = prices.shape
+    charge_periods = _block_periods(charge_hours, step_hours)
+    discharge_periods = _block_periods(discharge_hours, step_hours)
+    result: Dict[str, np.ndarray] = {
+        "profit_eur": np.zeros(n_days),
+        "revenue_eur": np.zeros(n_days),
+        "cost_eur": np.zeros(n_days),
+        "charge_energy_mwh": np.zeros(n_days),
+        "discharge_energy_mwh": np.zeros(n_days),
+        "buy_start_hour": np.full(n_days, -1, dtype=np.int64),
+        "sell_start_hour": np.full(n_days, -1, dtype=np.int64),
+        "buy_avg_price_eur_mwh": np.full(n_days, np.nan),
+        "sell_avg_price_eur_mwh": np.full(n_days, np.nan),
+    }
+    if n_days == 0 or n < charge_periods + discharge_periods:
+        return result
+
+    charge_energy, discharge_energy = _cycle_energy(capacity_mwh, power_mw, eta, charge_hours, discharge_hours)
+    if charge_energy <= 0.0:
+        return result
+
+    charge_power = charge_energy / charge_periods
+    discharge_power = discharge_energy / discharge_periods
+    result["charge_energy_mwh"][:] = charge_energy
+    result["discharge_energy_mwh"][:] = discharge_energy
+    if discharge_power <= 0.0:
+        return result
+
+    buy_sums = _block_sums(prices, charge_periods)
+    sell_sums = buy_sums if discharge_periods == charge_periods else _block_sums(prices, discharge_periods)
+    cost = charge_power * buy_sums
+    revenue = discharge_power * sell_sums
+
+    # profit of buying at b = best revenue among sell starts >= b + c - cost[b].
+    best_after = np.maximum.accumulate(revenue[:, ::-1], axis=1)[:, ::-1]
+    buys = np.arange(0, n - charge_periods - discharge_periods + 1)
+    profit = best_after[:, buys + charge_periods] - cost[:, buys]
+    rows = np.arange(n_days)
+    buy_start = profit.argmax(axis=1)
+
+    # Earliest sale reaching that revenue.
+    earliest_sell = buy_start + charge_periods
+    target = best_after[rows, earliest_sell]
+    positions = np.arange(revenue.shape[1])
+    match = (positions[None, :] >= earliest_sell[:, None]) & (revenue == target[:, None])
+    sell_start = match.argmax(axis=1)
+
+    result["cost_eur"] = cost[rows, buy_start]
+    result["revenue_eur"] = revenue[rows, sell_start]
+    result["profit_eur"] = result["revenue_eur"] - result["cost_eur"]
+    result["buy_start_hour"] = buy_start.astype(np.int64)
+    result["sell_start_hour"] = sell_start.astype(np.int64)
+    result["buy_avg_price_eur_mwh"] = buy_sums[rows, buy_start] / charge_periods
+    result["sell_avg_price_eur_mwh"] = sell_sums[rows, sell_start] / discharge_periods
+    return result
+
+
+def _group_daily_price_matrices(
+    daily_price_lists: List[Tuple[pd.Timestamp, List[float]]],
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Group daily price lists by length into dense (days x hours) matrices.
+
+    Returns ``(positions, matrix)`` pairs where ``positions`` indexes back into
+    ``daily_price_lists``.
+    """
+    by_length: Dict[int, List[int]] = {}
+    for pos, (_, prices) in enumerate(daily_price_lists):
+        by_length.setdefault(len(prices), []).append(pos)
+
+    groups: List[Tuple[np.ndarray, np.ndarray]] = []
+    for length in sorted(by_length):
+        positions = by_length[length]
+        matrix = np.array([daily_price_lists[pos][1] for pos in positions], dtype=float)
+        groups.append((np.asarray(positions, dtype=np.int64), matrix.reshape(len(positions), length)))
+    return groups
+
+
 def _empty_cycle_result(
     *,
     charge_energy_mwh: float = 0.0,
@@ -582,54 +1529,37 @@ def _prepare_daily_prices(
     start_date: Optional[pd.Timestamp] = None,
     end_date: Optional[pd.Timestamp] = None,
 ) -> List[Tuple[pd.Timestamp, List[float]]]:
-    if not pzu_csv or not Path(pzu_csv).exists():
-        return []
-
-    try:
-        df = pd.read_csv(pzu_csv)
-    except Exception:
-        return []
-
-    required_cols = {"date", "hour", "price"}
-    if not required_cols.issubset(df.columns):
-        return []
-
-    df = df.dropna(subset=["date", "price"])
-    if df.empty:
-        return []
+    """Daily price lists of an hourly or 15-minute cube, in delivery-period order.
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    if df.empty:
+    ``min_hours_per_day`` is in hours; at 15-minute resolution a day needs
+    four prices per required hour.
+    """
+    cube = load_price_cube(pzu_csv)
+    if cube is None:
         return []
 
-    if start_date is not None:
-        df = df[df["date"] >= pd.Timestamp(start_date)]
-        if df.empty:
-            return []
-
-    if end_date is not None:
-        df = df[df["date"] <= pd.Timestamp(end_date)]
-        if df.empty:
-            return []
-
-    day_lists: List[Tuple[pd.Timestamp, List[float]]] = []
-    for day, day_df in df.groupby("date"):
-        prices = day_df.sort_values("hour")["price"].dropna().to_list()
-        if len(prices) < max(min_hours_per_day, _MIN_REQUIRED_HOURS):
-            continue
-        day_lists.append((pd.Timestamp(day), prices))
-
-    return day_lists
+    periods_per_hour = int(round(1.0 / cube.step_hours))
+    return cube.daily_price_lists(
+        max(min_hours_per_day, _MIN_REQUIRED_HOURS) * periods_per_hour,
+        start_date=start_date,
+        end_date=end_date,
+    )
 
 
 __all__ = [
     "load_pzu_daily_history",
     "load_pzu_price_series",
+    "FixedCycleScores",
+    "build_fixed_cycle_scores",
     "compute_best_fixed_cycle",
+    "compute_optimal_dispatch",
+    "compute_multi_cycle_schedule",
+    "ProfitWindowIndex",
     "summarize_profit_windows",
+    "profit_window_curve",
     "compute_best_hours_by_year",
     "compute_pzu_monthly_costs",
+    "sweep_block_lengths",
 ]
 
 
@@ -641,12 +1571,16 @@ def compute_best_hours_by_year(
     power_mw: float,
     years: Optional[List[int]] = None,
     min_hours_per_day: int = 24,
+    charge_hours: int = _BLOCK_HOURS,
+    discharge_hours: int = _BLOCK_HOURS,
 ) -> pd.DataFrame:
     """Return best charge/discharge hour pairs and profits for each calendar year.
 
-    The function runs the fixed two-hour cycle optimisation for each year separately and
+    The function runs the fixed-cycle optimisation (2h blocks unless
+    ``charge_hours``/``discharge_hours`` are given) for each year separately and
     reports the resulting schedule, annual profit, revenue, cost, and average buy/sell
-    prices. Years without sufficient data are omitted from the result.
+    prices. All years are answered from one :class:`FixedCycleScores` matrix. Years
+    without sufficient data are omitted from the result.
     """
 
     if not pzu_csv or not Path(pzu_csv).exists():
@@ -664,50 +1598,31 @@ def compute_best_hours_by_year(
             ]
         )
 
-    try:
-        df = pd.read_csv(pzu_csv)
-    except Exception:
-        return pd.DataFrame()
-
-    required_cols = {"date", "hour", "price"}
-    if not required_cols.issubset(df.columns):
-        return pd.DataFrame()
-
-    df = df.dropna(subset=["date", "price"])
-    if df.empty:
-        return pd.DataFrame()
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    if df.empty:
+    scores = build_fixed_cycle_scores(
+        pzu_csv,
+        capacity_mwh=capacity_mwh,
+        power_mw=power_mw,
+        round_trip_efficiency=round_trip_efficiency,
+        min_hours_per_day=min_hours_per_day,
+        charge_hours=charge_hours,
+        discharge_hours=discharge_hours,
+    )
+    if scores is None:
         return pd.DataFrame()
 
-    df["year"] = df["date"].dt.year
-
     if years is None:
-        years = sorted(df["year"].unique())
+        years = sorted(scores.dates.year.unique())
     else:
         years = sorted(set(years))
 
     results: List[Dict[str, object]] = []
 
     for year in years:
-        year_df = df[df["year"] == year]
-        if year_df.empty:
-            continue
-
         year_start = pd.Timestamp(year=year, month=1, day=1)
         year_end = pd.Timestamp(year=year, month=12, day=31)
 
-        cycle = compute_best_fixed_cycle(
-            pzu_csv,
-            capacity_mwh=capacity_mwh,
-            power_mw=power_mw,
-            round_trip_efficiency=round_trip_efficiency,
-            min_hours_per_day=min_hours_per_day,
-            start_date=year_start,
-            end_date=year_end,
-        )
+        # One precomputed score matrix serves every year.
+        cycle = _fixed_cycle_result(scores, start_date=year_start, end_date=year_end)
 
         stats = cycle.get("stats", {})
         buy_hour = cycle.get("buy_start_hour")
@@ -718,8 +1633,8 @@ def compute_best_hours_by_year(
         results.append(
             {
                 "year": int(year),
-                "buy_hour": int(buy_hour),
-                "sell_hour": int(sell_hour),
+                "buy_hour": buy_hour,
+                "sell_hour": sell_hour,
                 "profit_eur": float(stats.get("total_profit_eur", 0.0)),
                 "revenue_eur": float(stats.get("total_revenue_eur", 0.0)),
                 "cost_eur": float(stats.get("total_cost_eur", 0.0)),
@@ -735,46 +1650,146 @@ def compute_best_hours_by_year(
     return pd.DataFrame(results).sort_values("year").reset_index(drop=True)
 
 
-
-def load_pzu_price_series(
+def sweep_block_lengths(
     pzu_csv: Optional[str],
+    capacity_mwh: float,
+    power_mw: Union[float, Sequence[float]],
+    round_trip_efficiency: float,
+    charge_hours: Sequence[float] = (1, 2, 3, 4),
+    discharge_hours: Sequence[float] = (1, 2, 3, 4),
+    min_hours_per_day: int = 24,
     start_date: Optional[pd.Timestamp] = None,
     end_date: Optional[pd.Timestamp] = None,
 ) -> pd.DataFrame:
-    """Return a daily average price series for charting."""
-    if not pzu_csv or not Path(pzu_csv).exists():
-        return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
-
-    try:
-        df = pd.read_csv(pzu_csv)
-    except Exception:
-        return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
+    """Daily-best profit of every charge/discharge block-length combination.
+
+    For each ``(power_mw, charge_hours, discharge_hours)`` every day takes its
+    own best pair, as in :func:`load_pzu_daily_history`. Sliding block sums
+    are computed once per length, and the best pair per day comes from a
+    running minimum of the charge-block price (sell block ``s`` pairs with
+    the cheapest charge block ending by ``s``), so each combination is linear
+    in the number of delivery periods (hours or quarter hours). The best pair
+    does not depend on the energy moved, so several ``power_mw`` values share
+    one pass and are only rescaled.
+
+    Block lengths may be fractional hours on 15-minute data; they are rounded
+    to whole delivery periods, lengths that round to the same number of
+    periods are swept once, and the rows report the rounded hours.
+    """
+    columns = [
+        "power_mw",
+        "charge_hours",
+        "discharge_hours",
+        "charge_energy_mwh",
+        "discharge_energy_mwh",
+        "days",
+        "positive_days",
+        "total_profit_eur",
+        "avg_daily_profit_eur",
+        "total_revenue_eur",
+        "total_cost_eur",
+    ]
+    daily_price_lists = _prepare_daily_prices(
+        pzu_csv,
+        min_hours_per_day,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    powers = [float(value) for value in np.atleast_1d(power_mw)]
+    capacity_mwh = max(float(capacity_mwh), 0.0)
+    if not daily_price_lists or capacity_mwh <= 0.0:
+        return pd.DataFrame(columns=columns)
 
-    if "date" not in df.columns or "price" not in df.columns:
-        return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
+    eta = max(float(round_trip_efficiency), 1e-6)
+    step_hours = _price_step_hours(pzu_csv)
+    charge_lengths = sorted({_block_periods(hours, step_hours) for hours in charge_hours})
+    discharge_lengths = sorted({_block_periods(hours, step_hours) for hours in discharge_hours})
+    groups = _group_daily_price_matrices(daily_price_lists)
+    sums: Dict[int, List[np.ndarray]] = {
+        periods: [_block_sums(matrix, periods) for _, matrix in groups]
+        for periods in sorted(set(charge_lengths) | set(discharge_lengths))
+    }
 
-    df = df.dropna(subset=["date", "price"])
-    if df.empty:
-        return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
+    rows: List[Dict[str, object]] = []
+    for buy_periods in charge_lengths:
+        for sell_periods in discharge_lengths:
+            # Per MWh bought: pay the charge-block average, receive eta times
+            # the discharge-block average.
+            days = 0
+            unit_revenue = unit_cost = 0.0
+            unit_daily: List[np.ndarray] = []
+            for pos, (_, matrix) in enumerate(groups):
+                n = matrix.shape[1]
+                if n < buy_periods + sell_periods:
+                    continue
+                buy = sums[buy_periods][pos] / buy_periods
+                sell = eta * sums[sell_periods][pos][:, buy_periods:] / sell_periods
+                cheapest = np.minimum.accumulate(buy, axis=1)[:, : sell.shape[1]]
+                spread = sell - cheapest
+                best = spread.argmax(axis=1)
+                picked = np.arange(len(matrix))
+                unit_daily.append(spread[picked, best])
+                unit_revenue += float(sell[picked, best].sum())
+                unit_cost += float(cheapest[picked, best].sum())
+                days += len(matrix)
+            if not days:
+                continue
+            daily = np.concatenate(unit_daily)
+            unit_profit = float(daily.sum())
+            positive = int((daily > 0).sum())
+            # Whole hours stay integers on hourly data, as in _start_hours
+            buy_hours = buy_periods if step_hours == 1.0 else buy_periods * step_hours
+            sell_hours = sell_periods if step_hours == 1.0 else sell_periods * step_hours
+
+            for power in powers:
+                if power <= 0.0:
+                    continue
+                charge_energy, discharge_energy = _cycle_energy(capacity_mwh, power, eta, buy_hours, sell_hours)
+                total_profit = charge_energy * unit_profit
+                rows.append(
+                    {
+                        "power_mw": power,
+                        "charge_hours": buy_hours,
+                        "discharge_hours": sell_hours,
+                        "charge_energy_mwh": charge_energy,
+                        "discharge_energy_mwh": discharge_energy,
+                        "days": days,
+                        "positive_days": positive,
+                        "total_profit_eur": total_profit,
+                        "avg_daily_profit_eur": total_profit / days,
+                        "total_revenue_eur": charge_energy * unit_revenue,
+                        "total_cost_eur": charge_energy * unit_cost,
+                    }
+                )
+
+    return pd.DataFrame(rows, columns=columns)
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    if df.empty:
-        return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
 
-    if start_date is not None:
-        df = df[df["date"] >= pd.Timestamp(start_date)]
-    if end_date is not None:
-        df = df[df["date"] <= pd.Timestamp(end_date)]
-    if df.empty:
-        return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
 
-    series = (
-        df.groupby(df["date"].dt.to_period("D"))["price"].mean().reset_index()
+def load_pzu_price_series(
+    pzu_csv: Optional[str],
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """Return a daily average price series for charting."""
+    empty = pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
+    cube = load_price_cube(pzu_csv)
+    if cube is None:
+        return empty
+
+    rows = cube.window_rows(start_date, end_date)
+    counts = cube.mask[rows].sum(axis=1)
+    totals = np.where(cube.mask[rows], cube.values[rows], 0.0).sum(axis=1)
+    present = counts > 0
+    if not present.any():
+        return empty
+
+    return pd.DataFrame(
+        {
+            "date": cube.dates[rows][present],
+            "avg_price_eur_mwh": totals[present] / counts[present],
+        }
     )
-    series["date"] = series["date"].dt.to_timestamp()
-    series = series.rename(columns={"price": "avg_price_eur_mwh"})
-    return series.sort_values("date").reset_index(drop=True)
 
 
 def compute_pzu_monthly_costs(
@@ -785,33 +1800,14 @@ def compute_pzu_monthly_costs(
 ) -> pd.DataFrame:
     """Aggregate average OPCOM PZU prices by calendar month."""
 
-    if not pzu_csv or not Path(pzu_csv).exists():
-        return pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
-
-    try:
-        df = pd.read_csv(pzu_csv)
-    except Exception:
-        return pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
-
-    required = {"date", "hour", "price"}
-    if not required.issubset(df.columns):
-        return pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
-
-    df = df.dropna(subset=["date", "price"])
-    if df.empty:
-        return pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    if df.empty:
-        return pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
+    empty = pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
+    cube = load_price_cube(pzu_csv)
+    if cube is None:
+        return empty
 
-    if start_date is not None:
-        df = df[df["date"] >= pd.Timestamp(start_date)]
-    if end_date is not None:
-        df = df[df["date"] <= pd.Timestamp(end_date)]
+    df = cube.to_frame(start_date, end_date)
     if df.empty:
-        return pd.DataFrame(columns=["month", "avg_price_eur_mwh", "min_price_eur_mwh", "max_price_eur_mwh"])
+        return empty
 
     df["month"] = df["date"].dt.to_period("M")
     grouped = (
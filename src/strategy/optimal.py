@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+
+@dataclass
+class DispatchGrid:
+    """Discretised SOC grid and the per-step moves allowed on it.
+
+    SOC is stored energy in units of ``step_mwh``; a move of ``+k`` buys
+    ``k * step_mwh`` from the market, a move of ``-k`` sells
+    ``k * step_mwh * eta``. Moves are ordered idle first, then charges,
+    then discharges, so ties resolve to the least activity.
+    """
+
+    levels: int  # number of SOC steps; states are 0..levels
+    step_mwh: float
+    moves: np.ndarray  # (moves,) int64 change in SOC steps
+    gain: np.ndarray  # (moves,) EUR per EUR/MWh of price: -bought or +sold MWh
+    bought_mwh: np.ndarray  # (moves,)
+    sold_mwh: np.ndarray  # (moves,)
+    targets: np.ndarray  # (states, moves) next state, clipped into range
+    allowed: np.ndarray  # (states, moves) bool
+
+    @classmethod
+    def build(
+        cls,
+        capacity_mwh: float,
+        power_mw: float,
+        eta: float,
+        levels: int,
+        step_hours: float = 1.0,
+    ) -> "DispatchGrid":
+        levels = max(int(levels), 1)
+        step_mwh = float(capacity_mwh) / levels
+        # Charging stores what is bought; discharging sells eta of what is
+        # released, so the power limit caps bought and sold energy per step.
+        energy_per_step = float(power_mw) * float(step_hours)
+        max_charge = min(int(np.floor(energy_per_step / step_mwh + 1e-9)), levels)
+        max_discharge = min(int(np.floor(energy_per_step / (eta * step_mwh) + 1e-9)), levels)
+        moves = np.concatenate(
+            [
+                [0],
+                np.arange(1, max_charge + 1),
+                -np.arange(1, max_discharge + 1),
+            ]
+        ).astype(np.int64)
+        bought = np.where(moves > 0, moves * step_mwh, 0.0)
+        sold = np.where(moves < 0, -moves * step_mwh * eta, 0.0)
+        states = np.arange(levels + 1)
+        raw = states[:, None] + moves[None, :]
+        allowed = (raw >= 0) & (raw <= levels)
+        return cls(
+            levels=levels,
+            step_mwh=step_mwh,
+            moves=moves,
+            gain=sold - bought,
+            bought_mwh=bought,
+            sold_mwh=sold,
+            targets=np.clip(raw, 0, levels),
+            allowed=allowed,
+        )
+
+
+def _terminal_values(grid: DispatchGrid, batch: int, end_state: Optional[int]) -> np.ndarray:
+    values = np.zeros((batch, grid.levels + 1))
+    if end_state is not None:
+        values[:] = -np.inf
+        values[:, end_state] = 0.0
+    return values
+
+
+def solve_dispatch(
+    prices: np.ndarray,
+    grid: DispatchGrid,
+    start_state: int,
+    end_state: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Optimal buy/sell schedule for each row of a (batch x steps) price matrix.
+
+    Backward dynamic programme over the SOC grid: one vectorised step per
+    price column handles every row and every state at once, so a batch of
+    independent days and a single multi-year row use the same code. Each row
+    starts at ``start_state`` and, when ``end_state`` is given, must finish
+    there. The schedule is recovered by a forward pass over the stored
+    policy.
+
+    Returns ``(batch x steps)`` arrays ``bought_mwh``, ``sold_mwh`` and
+    ``soc_mwh`` (after each step) plus ``value_eur`` per row (``-inf`` when
+    ``end_state`` cannot be reached).
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=float))
+    batch, steps = prices.shape
+    states = grid.levels + 1
+    n_moves = len(grid.moves)
+    policy = np.zeros((steps, batch, states), dtype=np.int16 if n_moves < 32767 else np.int64)
+    values = _terminal_values(grid, batch, end_state)
+    blocked = np.where(grid.allowed, 0.0, -np.inf)[None, :, :]
+
+    for t in range(steps - 1, -1, -1):
+        candidates = values[:, grid.targets] + blocked
+        candidates += prices[:, t, None, None] * grid.gain[None, None, :]
+        choice = candidates.argmax(axis=2)
+        policy[t] = choice
+        values = np.take_along_axis(candidates, choice[:, :, None], axis=2)[:, :, 0]
+
+    rows = np.arange(batch)
+    state = np.full(batch, int(start_state), dtype=np.int64)
+    bought = np.zeros((batch, steps))
+    sold = np.zeros((batch, steps))
+    soc = np.zeros((batch, steps))
+    for t in range(steps):
+        move = policy[t, rows, state]
+        bought[:, t] = grid.bought_mwh[move]
+        sold[:, t] = grid.sold_mwh[move]
+        state = grid.targets[state, move]
+        soc[:, t] = state * grid.step_mwh
+
+    return {
+        "bought_mwh": bought,
+        "sold_mwh": sold,
+        "soc_mwh": soc,
+        "value_eur": values[rows, int(start_state)],
+    }
+
+
+__all__ = [
+    "DispatchGrid",
+    "solve_dispatch",
+]
@@ -1,41 +1,38 @@
 from __future__ import annotations
 import argparse
+import re
 from datetime import datetime, timedelta, time
 from pathlib import Path
 from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from ..data.columnar import write_history_outputs
+from .format_sniff import read_csv_sniffed
+from .ingest_manifest import IngestManifest, default_manifest_dir, iter_source_files, parse_files, report_errors
+
 
 def _read_any(path: Path) -> Optional[pd.DataFrame]:
-    try:
-        if path.suffix.lower() in (".xlsx", ".xls"):
-            # For complex Excel files, try reading with different skip rows
-            for skiprows in [0, 1, 2, 3, 4]:
-                try:
-                    df = pd.read_excel(path, skiprows=skiprows)
-                    if not df.empty and len(df.columns) > 3:
-                        print(f"Successfully read {path.name} with skiprows={skiprows}")
-                        return df
-                except Exception:
-                    continue
-            return pd.read_excel(path)
-        
-        # Try multiple encodings and separators for CSV files  
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'windows-1252']
-        separators = [',', ';', '\t']
-        
-        for encoding in encodings:
-            for sep in separators:
-                try:
-                    df = pd.read_csv(path, encoding=encoding, sep=sep)
-                    if not df.empty and len(df.columns) > 1:
-                        print(f"Successfully read {path.name} with encoding={encoding}, sep='{sep}'")
-                        return df
-                except Exception:
-                    continue
-        return None
-    except Exception:
-        return None
+    """Read one export; ``None`` when no separator produces a table.
+
+    Read errors (corrupt workbooks, permissions) propagate so the per-file
+    report shows the real cause.
+    """
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        # For complex Excel files, try reading with different skip rows
+        for skiprows in [0, 1, 2, 3, 4]:
+            try:
+                df = pd.read_excel(path, skiprows=skiprows)
+                if not df.empty and len(df.columns) > 3:
+                    print(f"Successfully read {path.name} with skiprows={skiprows}")
+                    return df
+            except Exception:
+                continue
+        # The plain read raises the workbook's own error when every skip failed
+        return pd.read_excel(path)
+
+    # One sniffed parse; falls back to the encoding x separator search
+    return read_csv_sniffed(path)
 
 
 def _detect_columns(df: pd.DataFrame) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
@@ -109,30 +106,141 @@ def _to_slot_from_time(t: time) -> int:
     return t.hour * 4 + (t.minute // 15)
 
 
+# Time labels accepted by _parse_time_to_slot, tried in order on the stripped
+# text: a valid clock time, a bare slot number, "HH:MM[:SS...]", then the first
+# two digit runs of anything else (e.g. "[00:00-00:15)").
+_CLOCK_FORMATS = ("%H:%M", "%H:%M:%S")
+_SLOT_NUMBER = r"^([+-]?\d+)$"
+_SLOT_HHMM = r"^([+-]?\d+)\s*:\s*([+-]?\d+)\s*(?::.*)?$"
+_SLOT_DIGITS = r"^\D*(\d+)\D+(\d+)"
+
+# export-8 intervals look like "1. 6. 2024 0:00 - 1. 6. 2024 0:15"; only the
+# start ("day. month. year H:MM") is used.
+_EXPORT8_START = r"^(.*?) - "
+_EXPORT8_FIELDS = r"^\s*(\S+)\s+(\S+)\s+(\S+)\s+([+-]?\d+):([+-]?\d+)(?:\s|$)"
+
+
+def _string_mask(series: pd.Series) -> pd.Series:
+    """True where the cell holds a ``str``."""
+    if series.dtype != object:
+        if pd.api.types.is_string_dtype(series):
+            return series.notna()
+        return pd.Series(False, index=series.index)
+    try:
+        return series.str.len().notna()
+    except AttributeError:  # object column without any str cell
+        return pd.Series(False, index=series.index)
+
+
+def _int_groups(groups: pd.DataFrame) -> pd.DataFrame:
+    """Convert ``str.extract`` groups holding integer literals to float.
+
+    ``astype`` goes through ``int()``, so any digit the regex accepts
+    converts exactly as the per-cell parser did.
+    """
+    out = pd.DataFrame(np.nan, index=groups.index, columns=groups.columns)
+    for column in groups.columns:
+        present = groups[column].notna()
+        if present.any():
+            out.loc[present, column] = groups.loc[present, column].astype(np.int64)
+    return out
+
+
+def _text_cells(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Split a column into finite numbers and stripped text labels.
+
+    Returns ``(numbers, text)``: ``numbers`` holds real numbers (NaN
+    elsewhere); ``text`` holds ``str(value).strip()`` for every other present
+    cell (NaN elsewhere), so strings and time-like objects share one path.
+    """
+    is_str = _string_mask(series)
+    if pd.api.types.is_numeric_dtype(series) or series.dtype == object:
+        numbers = pd.to_numeric(series.where(~is_str), errors="coerce").astype(float)
+    else:
+        numbers = pd.Series(np.nan, index=series.index)
+    numbers = numbers.where(np.isfinite(numbers))
+
+    text = pd.Series(np.nan, index=series.index, dtype=object)
+    leftover = series.notna() & numbers.isna()
+    if leftover.any():
+        text[leftover] = series[leftover].astype(str).str.strip()
+    return numbers, text
+
+
 def _parse_time_to_slot(series: pd.Series) -> pd.Series:
-    def parse(v) -> Optional[int]:
-        if pd.isna(v):
-            return None
-        try:
-            # if it's already numeric slot
-            iv = int(v)
-            return iv
-        except Exception:
-            s = str(v).strip()
-            # formats like HH:MM[:SS]
-            try:
-                parts = s.split(":")
-                hh = int(parts[0])
-                mm = int(parts[1]) if len(parts) > 1 else 0
-                return hh * 4 + (mm // 15)
-            except Exception:
-                # interval labels like 00:00-00:15 or [00:00-00:15)
-                digits = [int(x) for x in "".join(ch if ch.isdigit() else " " for ch in s).split()]
-                if len(digits) >= 2:
-                    hh, mm = digits[0], digits[1]
-                    return hh * 4 + (mm // 15)
-                return None
-    return series.map(parse)
+    """Vectorized time label -> 15-minute slot index (NaN when unparseable)."""
+    numbers, text = _text_cells(series)
+    slots = np.trunc(numbers)
+    pending = text.notna()
+    if not pending.any():
+        return slots
+
+    labels = text[pending]
+    parsed = pd.Series(np.nan, index=labels.index)
+    # Plain clock times go through the C strptime parser; everything else
+    # falls back to the regex cascade, each stage only on what is left.
+    for fmt in _CLOCK_FORMATS:
+        rest = parsed.isna()
+        if not rest.any():
+            break
+        clock = pd.to_datetime(labels[rest], format=fmt, errors="coerce")
+        parsed[rest] = clock.dt.hour * 4 + clock.dt.minute // 15
+    for pattern in (_SLOT_NUMBER, _SLOT_HHMM, _SLOT_DIGITS):
+        rest = parsed.isna()
+        if not rest.any():
+            break
+        groups = _int_groups(labels[rest].str.extract(pattern))
+        if pattern == _SLOT_NUMBER:
+            parsed[rest] = groups[0]
+        else:
+            parsed[rest] = groups[0] * 4 + np.floor_divide(groups[1], 15)
+    slots[pending] = parsed
+    return slots
+
+
+def _parse_export8(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Parse the export-8 sheet layout in one pass over whole columns.
+
+    Data starts at row 4; the first column holds the interval label and the
+    fourth the (negative) imbalance price. Rows whose label or price is not
+    usable are skipped; returns ``None`` when no row is usable.
+    """
+    if df.shape[1] <= 3 or len(df) <= 4:
+        return None
+    body = df.iloc[4:]
+    labels = body.iloc[:, 0]
+    is_str = _string_mask(labels)
+    if not is_str.any():
+        return None
+
+    start = labels.where(is_str).str.extract(_EXPORT8_START, flags=re.DOTALL)[0]
+    fields = start.str.extract(_EXPORT8_FIELDS)
+    clock = _int_groups(fields[[3, 4]])
+    hours, minutes = clock[3], clock[4]
+
+    prices = body.iloc[:, 3]
+    if prices.dtype == object:
+        # Only real numbers count; numeric-looking strings are not prices.
+        prices = prices.where(~_string_mask(prices))
+    elif not pd.api.types.is_numeric_dtype(prices):
+        prices = pd.Series(np.nan, index=prices.index)
+    prices = pd.to_numeric(prices, errors="coerce").astype(float)
+
+    keep = (fields[0].notna() & hours.notna() & minutes.notna() & prices.notna()).to_numpy()
+    if not keep.any():
+        return None
+    fields = fields[keep]
+    day = fields[0].str.rstrip(".").str.zfill(2)
+    month = fields[1].str.rstrip(".").str.zfill(2)
+    out = pd.DataFrame(
+        {
+            "date": (fields[2] + "-" + month + "-" + day).to_numpy(dtype=object),
+            "slot": (hours[keep] * 4 + np.floor_divide(minutes[keep], 15)).to_numpy(dtype=np.int64),
+            "price": prices[keep].to_numpy(),
+            "frequency": pd.NA,
+        }
+    )
+    return out[(out["slot"] >= 0) & (out["slot"] <= 95)]
 
 
 def _normalize(df: pd.DataFrame, dcol: Optional[str], tcol: Optional[str], pcol: str, fcol: Optional[str]) -> pd.DataFrame:
@@ -141,48 +249,8 @@ def _normalize(df: pd.DataFrame, dcol: Optional[str], tcol: Optional[str], pcol:
     # Special handling for export-8.xlsx format
     if any("time interval" in str(c).lower() for c in df.columns):
         print("Processing export-8.xlsx format...")
-        # The data starts from row 4 (index 4), first column has time intervals
-        # Skip the header rows and get the actual data
-        data_rows = []
-        
-        for i, row in df.iterrows():
-            if i < 4:  # Skip header rows
-                continue
-            
-            time_val = row.iloc[0]  # First column has time intervals
-            if pd.isna(time_val) or not isinstance(time_val, str):
-                continue
-                
-            # Parse time interval like "1. 6. 2024 0:00 - 1. 6. 2024 0:15"
-            if " - " in str(time_val):
-                try:
-                    start_time = str(time_val).split(" - ")[0].strip()
-                    # Extract date and time: "1. 6. 2024 0:00"
-                    parts = start_time.split()
-                    if len(parts) >= 4:
-                        day, month, year = parts[0].rstrip('.'), parts[1].rstrip('.'), parts[2]
-                        time_part = parts[3]  # "0:00"
-                        
-                        date_str = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                        hh, mm = time_part.split(':')
-                        slot = int(hh) * 4 + (int(mm) // 15)
-                        
-                        # Get price from column 3 (Unnamed: 3) - negative imbalance price
-                        price_val = row.iloc[3] if len(row) > 3 else None
-                        if pd.notna(price_val) and isinstance(price_val, (int, float)):
-                            data_rows.append({
-                                'date': date_str,
-                                'slot': slot,
-                                'price': float(price_val),
-                                'frequency': pd.NA
-                            })
-                except Exception as e:
-                    continue
-        
-        if data_rows:
-            result_df = pd.DataFrame(data_rows)
-            result_df["slot"] = result_df["slot"].astype(int)
-            result_df = result_df[(result_df["slot"] >= 0) & (result_df["slot"] <= 95)]
+        result_df = _parse_export8(df)
+        if result_df is not None:
             print(f"Parsed {len(result_df)} rows from export-8.xlsx")
             return result_df
     
@@ -224,25 +292,45 @@ def _normalize(df: pd.DataFrame, dcol: Optional[str], tcol: Optional[str], pcol:
     return out
 
 
-def aggregate(inputs: List[Path], cutoff: Optional[datetime]) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
-    for folder in inputs:
-        for path in folder.rglob("*"):
-            if not path.is_file():
-                continue
-            if path.suffix.lower() not in (".csv", ".xlsx", ".xls"):
-                continue
-            df = _read_any(path)
-            if df is None or df.empty:
-                continue
-            try:
-                dcol, tcol, pcol, fcol = _detect_columns(df)
-                norm = _normalize(df, dcol, tcol, pcol, fcol)
-                if cutoff is not None:
-                    norm = norm[pd.to_datetime(norm["date"]) >= cutoff.date()]
-                frames.append(norm)
-            except Exception:
-                continue
+_ROW_COLUMNS = ["date", "slot", "price", "frequency"]
+
+
+def _parse_file(path: Path) -> Optional[pd.DataFrame]:
+    """Read, detect and normalize one file; raises when it cannot be parsed."""
+    df = _read_any(path)
+    if df is None:
+        raise ValueError("unreadable file (no encoding/separator produced a table)")
+    if df.empty:
+        return None
+    dcol, tcol, pcol, fcol = _detect_columns(df)
+    return _normalize(df, dcol, tcol, pcol, fcol)
+
+
+def aggregate(
+    inputs: List[Path],
+    cutoff: Optional[datetime],
+    manifest: Optional[Path] = None,
+    rebuild: bool = False,
+    workers: int = 1,
+    error_report: Optional[Path] = None,
+) -> pd.DataFrame:
+    files = iter_source_files(inputs)
+    if manifest is not None:
+        # Only new or changed files are parsed; the rest come from the store.
+        store = IngestManifest(manifest, _ROW_COLUMNS)
+        stats = store.update(files, _parse_file, rebuild=rebuild, workers=workers)
+        print(f"Ingest manifest {manifest}: {stats.summary()}")
+        frames = [store.rows(files)]
+        errors = stats.errors
+    else:
+        results = parse_files(files, _parse_file, workers)
+        frames = [norm for norm, _ in results if norm is not None]
+        errors = {str(path): error for path, (_, error) in zip(files, results) if error is not None}
+    report_errors(errors, error_report)
+    if cutoff is not None:
+        start = pd.Timestamp(cutoff.date())
+        frames = [norm[pd.to_datetime(norm["date"]) >= start] for norm in frames]
+    frames = [norm for norm in frames if not norm.empty]
     if not frames:
         return pd.DataFrame(columns=["date", "slot", "price", "frequency", "currency"])
     all_df = pd.concat(frames, ignore_index=True)
@@ -264,7 +352,11 @@ def maybe_convert_currency(df: pd.DataFrame, currency_in: str, target_currency:
     raise SystemExit(f"Unsupported currency conversion {currency_in}->{target_currency}")
 
 
-def write_outputs(df: pd.DataFrame, output: Path, split_years: bool) -> None:
+def write_outputs(df: pd.DataFrame, output: Path, split_years: bool, fmt: str = "csv") -> None:
+    if fmt == "parquet":
+        # One typed dataset; the 1y/2y/3y splits become views over it.
+        write_history_outputs(df, output, split_years)
+        return
     output.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(output, index=False)
     if split_years:
@@ -286,6 +378,22 @@ def main():
     ap.add_argument("--target-currency", type=str, default="EUR")
     ap.add_argument("--fx-rate", type=float, default=None)
     ap.add_argument("--split-years", action="store_true")
+    ap.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output storage: csv (default) or typed Parquet with 1y/2y/3y views (requires pyarrow)",
+    )
+    ap.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Ingestion manifest directory (default: <output stem>.ingest next to the output)",
+    )
+    ap.add_argument("--no-manifest", action="store_true", help="Parse every file without reading or updating the manifest")
+    ap.add_argument("--rebuild", action="store_true", help="Re-parse every file and rewrite the manifest")
+    ap.add_argument("--workers", type=int, default=1, help="Parse files in N worker processes (default: 1)")
+    ap.add_argument("--error-report", type=str, default=None, help="Also write the per-file parse errors to this CSV")
     args = ap.parse_args()
 
     cutoff: Optional[datetime] = None
@@ -295,10 +403,24 @@ def main():
         cutoff = max(cutoff, datetime.fromisoformat(args.since)) if cutoff else datetime.fromisoformat(args.since)
 
     folders = [Path(p) for p in args.inputs]
-    df = aggregate(folders, cutoff)
+    output = Path(args.output)
+    manifest: Optional[Path] = None
+    if not args.no_manifest:
+        manifest = Path(args.manifest) if args.manifest else default_manifest_dir(output)
+    error_report = Path(args.error_report) if args.error_report else None
+    df = aggregate(
+        folders,
+        cutoff,
+        manifest,
+        rebuild=args.rebuild,
+        workers=max(1, args.workers),
+        error_report=error_report,
+    )
     df = maybe_convert_currency(df, args.currency_in, args.target_currency, args.fx_rate)
-    write_outputs(df, Path(args.output), args.split_years)
-    print(f"Wrote {len(df)} rows to {args.output}")
+    write_outputs(df, output, args.split_years, args.format)
+    if args.format == "parquet":
+        output = output.with_suffix(".parquet")
+    print(f"Wrote {len(df)} rows to {output}")
 
 
 if __name__ == "__main__":
@@ -1,95 +1,69 @@
 from __future__ import annotations
 import argparse
 from datetime import datetime, timedelta
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 import pandas as pd
 
+from ..data.columnar import write_history_outputs
+from .format_sniff import is_opcom_head, read_csv_sniffed, read_head
+from .ingest_manifest import IngestManifest, default_manifest_dir, iter_source_files, parse_files, report_errors
+
 
 def _read_any(path: Path) -> Optional[pd.DataFrame]:
-    try:
-        if path.suffix.lower() in (".xlsx", ".xls"):
-            return pd.read_excel(path)
-        
-        # Special handling for OPCOM Romanian CSV format
-        if path.suffix.lower() == ".csv":
-            # Try to read OPCOM format with special parsing
-            try:
-                df = _parse_opcom_csv(path)
-                if df is not None and not df.empty:
-                    return df
-            except Exception:
-                pass
-        
-        # Try multiple encodings and separators for CSV files
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'windows-1252']
-        separators = [',', ';', '\t']
-        
-        for encoding in encodings:
-            for sep in separators:
-                try:
-                    df = pd.read_csv(path, encoding=encoding, sep=sep)
-                    if not df.empty and len(df.columns) > 1:
-                        print(f"Successfully read {path.name} with encoding={encoding}, sep='{sep}'")
-                        return df
-                except Exception:
-                    continue
-        
-        # Try reading as binary and checking content
-        with open(path, 'rb') as f:
-            content = f.read(1000)  # Read first 1000 bytes
-            print(f"File {path.name} first 100 bytes: {content[:100]}")
-            
-        return None
-    except Exception as e:
-        print(f"Error reading {path}: {e}")
-        return None
+    """Read one export; ``None`` when no separator produces a table.
+
+    Read errors (corrupt workbooks, permissions) propagate so the per-file
+    report shows the real cause.
+    """
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+
+    # Sniff the first few KB once: OPCOM daily reports are recognised by
+    # their banner line, everything else goes through one sniffed parse.
+    if path.suffix.lower() == ".csv" and is_opcom_head(read_head(path)):
+        try:
+            df = _parse_opcom_csv(path)
+            if df is not None and not df.empty:
+                return df
+        except Exception:
+            pass  # not a well-formed daily report; parse it as a plain table
+
+    df = read_csv_sniffed(path)
+    if df is not None:
+        return df
+
+    # Try reading as binary and checking content
+    with open(path, 'rb') as f:
+        content = f.read(1000)  # Read first 1000 bytes
+        print(f"File {path.name} first 100 bytes: {content[:100]}")
+
+    return None
 
 
 def _parse_opcom_csv(path: Path) -> Optional[pd.DataFrame]:
     """Parse OPCOM Romanian CSV format with hourly prices"""
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            first = f.readline()
         
-        # Extract date from first line: "PIP si volum tranzactionat pentru ziua de livrare: 29/9/2023"
-        date_str = None
-        if lines and "ziua de livrare:" in lines[0]:
-            date_part = lines[0].split("ziua de livrare:")[1].strip().strip('"')
-            # Convert from DD/M/YYYY to YYYY-MM-DD
-            try:
-                day, month, year = date_part.split('/')
-                date_str = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            except:
-                pass
-        
-        if not date_str:
-            return None
+            # Extract date from first line: "PIP si volum tranzactionat pentru ziua de livrare: 29/9/2023"
+            date_str = None
+            if first and "ziua de livrare:" in first:
+                date_part = first.split("ziua de livrare:")[1].strip().strip('"')
+                # Convert from DD/M/YYYY to YYYY-MM-DD
+                try:
+                    day, month, year = date_part.split('/')
+                    date_str = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+                except:
+                    pass
         
-        # Find the hourly data section starting with "Zona de tranzactionare"
-        hourly_data = []
-        in_hourly_section = False
+            if not date_str:
+                return None
         
-        for line in lines:
-            line = line.strip().strip('"')
-            if "Zona de tranzactionare" in line:
-                in_hourly_section = True
-                continue
-            
-            if in_hourly_section and line:
-                parts = [p.strip().strip('"') for p in line.split('","')]
-                if len(parts) >= 3 and parts[0] == "Romania":
-                    try:
-                        hour = int(parts[1])  # Interval (1-24)
-                        price = float(parts[2].replace(',', '.'))  # Price in Lei/MWh
-                        if 1 <= hour <= 24:
-                            hourly_data.append({
-                                'date': date_str,
-                                'hour': hour - 1,  # Convert to 0-23
-                                'price': price
-                            })
-                    except (ValueError, IndexError):
-                        continue
+            # Stream the rest of the file; the hourly data section starts with "Zona de tranzactionare"
+            hourly_data = _scan_opcom_lines(chain([first], f), date_str)
         
         if hourly_data:
             df = pd.DataFrame(hourly_data)
@@ -102,6 +76,34 @@ def _parse_opcom_csv(path: Path) -> Optional[pd.DataFrame]:
         return None
 
 
+def _scan_opcom_lines(lines: Iterable[str], date_str: str) -> List[Dict[str, object]]:
+    """Collect the hourly rows of an OPCOM report from an iterable of lines."""
+    hourly_data = []
+    in_hourly_section = False
+    
+    for line in lines:
+        line = line.strip().strip('"')
+        if "Zona de tranzactionare" in line:
+            in_hourly_section = True
+            continue
+        
+        if in_hourly_section and line:
+            parts = [p.strip().strip('"') for p in line.split('","')]
+            if len(parts) >= 3 and parts[0] == "Romania":
+                try:
+                    hour = int(parts[1])  # Interval (1-24)
+                    price = float(parts[2].replace(',', '.'))  # Price in Lei/MWh
+                    if 1 <= hour <= 24:
+                        hourly_data.append({
+                            'date': date_str,
+                            'hour': hour - 1,  # Convert to 0-23
+                            'price': price
+                        })
+                except (ValueError, IndexError):
+                    continue
+    return hourly_data
+
+
 def _detect_columns(df: pd.DataFrame) -> Tuple[str, str, str]:
     cols = {c.lower().strip(): c for c in df.columns}
     # Possible column names in English/Romanian
@@ -194,25 +196,45 @@ def _parse_hour(series: pd.Series) -> pd.Series:
     return series.map(to_hour)
 
 
-def aggregate(inputs: List[Path], cutoff: Optional[datetime]) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
-    for folder in inputs:
-        for path in folder.rglob("*"):
-            if not path.is_file():
-                continue
-            if path.suffix.lower() not in (".csv", ".xlsx", ".xls"):
-                continue
-            df = _read_any(path)
-            if df is None or df.empty:
-                continue
-            try:
-                dcol, hcol, pcol = _detect_columns(df)
-                norm = _normalize(df, dcol, hcol, pcol)
-                if cutoff is not None:
-                    norm = norm[pd.to_datetime(norm["date"]) >= cutoff.date()]
-                frames.append(norm)
-            except Exception:
-                continue
+_ROW_COLUMNS = ["date", "hour", "price"]
+
+
+def _parse_file(path: Path) -> Optional[pd.DataFrame]:
+    """Read, detect and normalize one file; raises when it cannot be parsed."""
+    df = _read_any(path)
+    if df is None:
+        raise ValueError("unreadable file (no encoding/separator produced a table)")
+    if df.empty:
+        return None
+    dcol, hcol, pcol = _detect_columns(df)
+    return _normalize(df, dcol, hcol, pcol)
+
+
+def aggregate(
+    inputs: List[Path],
+    cutoff: Optional[datetime],
+    manifest: Optional[Path] = None,
+    rebuild: bool = False,
+    workers: int = 1,
+    error_report: Optional[Path] = None,
+) -> pd.DataFrame:
+    files = iter_source_files(inputs)
+    if manifest is not None:
+        # Only new or changed files are parsed; the rest come from the store.
+        store = IngestManifest(manifest, _ROW_COLUMNS)
+        stats = store.update(files, _parse_file, rebuild=rebuild, workers=workers)
+        print(f"Ingest manifest {manifest}: {stats.summary()}")
+        frames = [store.rows(files)]
+        errors = stats.errors
+    else:
+        results = parse_files(files, _parse_file, workers)
+        frames = [norm for norm, _ in results if norm is not None]
+        errors = {str(path): error for path, (_, error) in zip(files, results) if error is not None}
+    report_errors(errors, error_report)
+    if cutoff is not None:
+        start = pd.Timestamp(cutoff.date())
+        frames = [norm[pd.to_datetime(norm["date"]) >= start] for norm in frames]
+    frames = [norm for norm in frames if not norm.empty]
     if not frames:
         return pd.DataFrame(columns=["date", "hour", "price", "currency"])
     all_df = pd.concat(frames, ignore_index=True)
@@ -235,7 +257,11 @@ def maybe_convert_currency(df: pd.DataFrame, currency_in: str, target_currency:
     raise SystemExit(f"Unsupported currency conversion {currency_in}->{target_currency}")
 
 
-def write_outputs(df: pd.DataFrame, output: Path, split_years: bool) -> None:
+def write_outputs(df: pd.DataFrame, output: Path, split_years: bool, fmt: str = "csv") -> None:
+    if fmt == "parquet":
+        # One typed dataset; the 1y/2y/3y splits become views over it.
+        write_history_outputs(df, output, split_years)
+        return
     output.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(output, index=False)
     if split_years:
@@ -257,6 +283,22 @@ def main():
     ap.add_argument("--target-currency", type=str, default="EUR", help="Output currency")
     ap.add_argument("--fx-rate", type=float, default=None, help="If converting RON->EUR, provide RON per 1 EUR (e.g., 4.97)")
     ap.add_argument("--split-years", action="store_true", help="Also write *_1y, *_2y, *_3y files")
+    ap.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output storage: csv (default) or typed Parquet with 1y/2y/3y views (requires pyarrow)",
+    )
+    ap.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Ingestion manifest directory (default: <output stem>.ingest next to the output)",
+    )
+    ap.add_argument("--no-manifest", action="store_true", help="Parse every file without reading or updating the manifest")
+    ap.add_argument("--rebuild", action="store_true", help="Re-parse every file and rewrite the manifest")
+    ap.add_argument("--workers", type=int, default=1, help="Parse files in N worker processes (default: 1)")
+    ap.add_argument("--error-report", type=str, default=None, help="Also write the per-file parse errors to this CSV")
     args = ap.parse_args()
 
     cutoff: Optional[datetime] = None
@@ -266,10 +308,24 @@ def main():
         cutoff = max(cutoff, datetime.fromisoformat(args.since)) if cutoff else datetime.fromisoformat(args.since)
 
     folders = [Path(p) for p in args.inputs]
-    df = aggregate(folders, cutoff)
+    output = Path(args.output)
+    manifest: Optional[Path] = None
+    if not args.no_manifest:
+        manifest = Path(args.manifest) if args.manifest else default_manifest_dir(output)
+    error_report = Path(args.error_report) if args.error_report else None
+    df = aggregate(
+        folders,
+        cutoff,
+        manifest,
+        rebuild=args.rebuild,
+        workers=max(1, args.workers),
+        error_report=error_report,
+    )
     df = maybe_convert_currency(df, args.currency_in, args.target_currency, args.fx_rate)
-    write_outputs(df, Path(args.output), args.split_years)
-    print(f"Wrote {len(df)} rows to {args.output}")
+    write_outputs(df, output, args.split_years, args.format)
+    if args.format == "parquet":
+        output = output.with_suffix(".parquet")
+    print(f"Wrote {len(df)} rows to {output}")
 
 
 if __name__ == "__main__":
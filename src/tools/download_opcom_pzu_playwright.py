@@ -8,8 +8,10 @@ import pandas as pd
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
 import requests
 
+from .opcom_downloader import OPCOM_BASE_URL, URL_PATH, OpcomDownloader
+
 # Direct CSV export URL pattern
-URL_PATTERN = "https://www.opcom.ro/rapoarte-pzu-raportPIP-export-csv/{day}/{month}/{year}/ro"
+URL_PATTERN = OPCOM_BASE_URL + URL_PATH
 
 
 def download_csv_direct(d: date, out_dir: Path) -> bool:
@@ -150,27 +152,30 @@ def scrape_day(page, d: date) -> pd.DataFrame:
     return df
 
 
-def run(years: int, out_dir: Path, headless: bool):
+def run(
+    years: int,
+    out_dir: Path,
+    headless: bool,
+    workers: int = 8,
+    rate_per_sec: float = 5.0,
+    base_url: str = OPCOM_BASE_URL,
+):
     out_dir.mkdir(parents=True, exist_ok=True)
     
     start = date.today() - timedelta(days=365 * years)
     end = date.today()
-    d = start
-    
-    # Try direct CSV downloads first
-    successful_downloads = 0
-    failed_dates = []
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
     
-    print(f"Attempting direct CSV downloads for {(end - start).days + 1} dates...")
-    
-    while d <= end:
-        if download_csv_direct(d, out_dir):
-            successful_downloads += 1
-        else:
-            failed_dates.append(d)
-        d += timedelta(days=1)
+    # Direct CSV downloads first: concurrent, rate limited, retried, and
+    # resumable (dates already recorded in the manifest are skipped)
+    print(f"Attempting direct CSV downloads for {len(days)} dates ({workers} workers)...")
+    downloader = OpcomDownloader(out_dir, base_url=base_url, workers=workers, rate_per_sec=rate_per_sec)
+    report = downloader.download(days)
+    for d, error in sorted(report.failed.items()):
+        print(f"Direct download failed for {d}: {error}")
+    failed_dates = report.unavailable
     
-    print(f"Direct downloads: {successful_downloads} successful, {len(failed_dates)} failed")
+    print(f"Direct downloads: {report.summary()}")
     
     # If we have too many failures, fall back to browser automation for failed dates
     if failed_dates and len(failed_dates) < 50:  # Only retry a reasonable number
@@ -201,9 +206,24 @@ def main():
     ap.add_argument("--years", type=int, choices=[1, 2, 3], required=True)
     ap.add_argument("--out-dir", type=str, default="downloads/opcom_pzu/auto")
     ap.add_argument("--headful", action="store_true", help="Run with visible browser for debugging")
+    ap.add_argument("--workers", type=int, default=8, help="Concurrent direct downloads (default: 8)")
+    ap.add_argument("--rate", type=float, default=5.0, help="Max requests per second to OPCOM (default: 5)")
+    ap.add_argument(
+        "--base-url",
+        type=str,
+        default=OPCOM_BASE_URL,
+        help="Export host; point at a local stand-in (python -m src.tools.opcom_standin) to run offline",
+    )
     args = ap.parse_args()
 
-    run(args.years, Path(args.out_dir), headless=not args.headful)
+    run(
+        args.years,
+        Path(args.out_dir),
+        headless=not args.headful,
+        workers=args.workers,
+        rate_per_sec=args.rate,
+        base_url=args.base_url,
+    )
 
 
 if __name__ == "__main__":
@@ -1,14 +1,23 @@
 from __future__ import annotations
 import argparse
+import asyncio
+import json
+import os
 import re
+import time
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 import pandas as pd
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PWTimeout
+
+from .aggregate_imbalance_manual import _parse_file
 
 URL = "https://newmarkets.transelectrica.ro/uu-webkit-maing02/00121011300000000000000000000100/estimatedImbalancePrices"
 
+CHECKPOINT_DIR = ".checkpoints"
+
 
 def parse_rows(texts: List[str]) -> pd.DataFrame:
     # Attempt to parse rows containing time or slot, price, and frequency
@@ -69,117 +78,419 @@ def parse_rows(texts: List[str]) -> pd.DataFrame:
     return df
 
 
-def scrape_day(page, d: date) -> pd.DataFrame:
+def output_name(d: date) -> str:
+    return f"imbalance_{d.isoformat()}.csv"
+
+
+class DayCheckpoints:
+    """Per-day checkpoint files under ``out_dir/.checkpoints``.
+
+    Every finished day gets its own small JSON record (``saved`` or
+    ``empty``), written atomically, so browser contexts never contend on a
+    shared manifest and an interrupted run loses at most the days in flight.
+    A saved day counts as done only while its CSV still exists; CSVs from
+    runs that predate checkpoints are adopted.
+    """
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.dir = out_dir / CHECKPOINT_DIR
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, d: date) -> Path:
+        return self.dir / f"{d.isoformat()}.json"
+
+    def status(self, d: date) -> Optional[str]:
+        csv_path = self.out_dir / output_name(d)
+        try:
+            record = json.loads(self._path(d).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            if csv_path.is_file() and csv_path.stat().st_size > 0:
+                self.mark(d, "saved", source="existing")
+                return "saved"
+            return None
+        status = record.get("status")
+        if status == "saved" and not csv_path.is_file():
+            return None
+        return status
+
+    def mark(self, d: date, status: str, rows: Optional[int] = None, source: str = "page") -> None:
+        path = self._path(d)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"status": status, "rows": rows, "source": source}), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+@dataclass
+class ScrapeReport:
+    saved: List[date] = field(default_factory=list)
+    exported: List[date] = field(default_factory=list)  # subset of saved that came from bulk exports
+    skipped: List[date] = field(default_factory=list)
+    empty: List[date] = field(default_factory=list)  # page showed no rows
+    failed: Dict[date, str] = field(default_factory=dict)  # retried on the next run
+    elapsed_s: float = 0.0
+
+    def summary(self) -> str:
+        rate = len(self.saved) / self.elapsed_s if self.elapsed_s else 0.0
+        return (
+            f"{len(self.saved)} saved ({len(self.exported)} via bulk export), "
+            f"{len(self.skipped)} already done, {len(self.empty)} without data, "
+            f"{len(self.failed)} failed in {self.elapsed_s:.1f}s ({rate:.1f} days/s)"
+        )
+
+
+def save_day(df: pd.DataFrame, d: date, out_dir: Path) -> Path:
+    df = df.copy()
+    df.insert(0, "date", d.isoformat())
+    out_path = out_dir / output_name(d)
+    tmp = out_path.with_name(out_path.name + ".part")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def day_ranges(days: Iterable[date], chunk_days: int) -> List[List[date]]:
+    """Split ``days`` into runs of consecutive dates at most ``chunk_days`` long."""
+    ranges: List[List[date]] = []
+    for d in sorted(days):
+        if ranges and len(ranges[-1]) < chunk_days and ranges[-1][-1] + timedelta(days=1) == d:
+            ranges[-1].append(d)
+        else:
+            ranges.append([d])
+    return ranges
+
+
+def split_export(path: Path) -> Dict[date, pd.DataFrame]:
+    """Per-day slot/price/frequency frames from a bulk export file.
+
+    Uses the manual aggregator's parser, so any layout it understands
+    (CSV or the export-8 workbook) can be split.
+    """
+    rows = _parse_file(path)
+    if rows is None or rows.empty:
+        return {}
+    return {
+        pd.Timestamp(day).date(): group[["slot", "price", "frequency"]].reset_index(drop=True)
+        for day, group in rows.groupby("date", sort=True)
+    }
+
+
+_DATE_PATTERNS = (
+    "input[type='date']",
+    "input[placeholder*='date']",
+    "input[id*='date']",
+    "input[name*='date']",
+)
+
+_SUBMIT_PATTERNS = (
+    "button:has-text('Apply')",
+    "button:has-text('Search')",
+    "button:has-text('Filter')",
+    "input[type='submit']",
+    "*:has-text('Cauta')",
+    "*:has-text('Filtreaza')",
+)
+
+_EXPORT_PATTERNS = (
+    "a:has-text('Export')",
+    "button:has-text('Export')",
+    "a:has-text('CSV')",
+    "button:has-text('CSV')",
+    "a:has-text('Excel')",
+    "button:has-text('Excel')",
+    "a[download]",
+)
+
+_TABLE_TEXT_JS = """() => {
+    const t = document.querySelector("tbody") || document.querySelector("table");
+    return t ? t.innerText : "";
+}"""
+
+_TABLE_CHANGED_JS = """(before) => {
+    const t = document.querySelector("tbody") || document.querySelector("table");
+    const now = t ? t.innerText : "";
+    return now !== before && now.trim() !== "";
+}"""
+
+
+async def _table_text(page) -> str:
+    try:
+        return await page.evaluate(_TABLE_TEXT_JS)
+    except Exception:
+        return ""
+
+
+async def _table_lines(page) -> List[str]:
+    # A table's inner text is the whole grid; parse_rows wants one row per text
+    return [line for text in await page.locator("table").all_inner_texts() for line in text.splitlines()]
+
+
+async def _row_texts(page) -> List[str]:
+    return [await tr.inner_text() for tr in await page.locator("tbody tr").all()]
+
+
+async def scrape_day(page, d: date, url: str = URL, settle_ms: int = 3000) -> pd.DataFrame:
+    before = await _table_text(page)
     # More robust date handling for Transelectrica
     try:
-        # Try multiple date input patterns
-        date_patterns = [
-            f"input[type='date']",
-            f"input[placeholder*='date']",
-            f"input[id*='date']",
-            f"input[name*='date']"
-        ]
-        
         date_set = False
-        for pattern in date_patterns:
+        for pattern in _DATE_PATTERNS:
             try:
                 date_input = page.locator(pattern).first
-                if date_input.count() > 0:
-                    date_input.fill(d.isoformat())
+                if await date_input.count() > 0:
+                    await date_input.fill(d.isoformat())
                     date_set = True
                     break
-            except:
+            except Exception:
                 continue
-        
+
         if not date_set:
             # Try URL parameter approach
-            url_with_date = f"{URL}?date={d.isoformat()}"
-            page.goto(url_with_date, timeout=30000)
-        
-        # Look for submit/apply buttons
-        submit_patterns = [
-            "button:has-text('Apply')",
-            "button:has-text('Search')", 
-            "button:has-text('Filter')",
-            "input[type='submit']",
-            "*:has-text('Cauta')",
-            "*:has-text('Filtreaza')"
-        ]
-        
-        for pattern in submit_patterns:
+            await page.goto(f"{url}?date={d.isoformat()}", timeout=30000)
+
+        for pattern in _SUBMIT_PATTERNS:
             try:
-                page.locator(pattern).first.click(timeout=2000)
+                await page.locator(pattern).first.click(timeout=2000)
                 break
-            except:
+            except Exception:
                 continue
-                
+
     except Exception as e:
         print(f"Date setting error for {d}: {e}")
 
-    page.wait_for_timeout(3000)
+    # Read as soon as the table renders new rows instead of sleeping a fixed
+    # 3 s; settle_ms only bounds the wait (days without data pay all of it).
+    try:
+        await page.wait_for_function(_TABLE_CHANGED_JS, arg=before, timeout=settle_ms, polling=100)
+    except PWTimeout:
+        if before.strip() and await _table_text(page) == before:
+            # Still the previous day's rows: saving them would mislabel data
+            raise RuntimeError(f"results table did not update for {d}")
 
-    # Enhanced data extraction
-    texts = []
-    
-    # Try multiple extraction strategies
+    texts: List[str] = []
     strategies = [
         # Strategy 1: Look for data tables
-        lambda: [page.locator("table").all_inner_texts()],
-        lambda: [tr.inner_text() for tr in page.locator("tbody tr").all()],
-        
-        # Strategy 2: Look for price data containers  
+        lambda: _table_lines(page),
+        lambda: _row_texts(page),
+        # Strategy 2: Look for price data containers
         lambda: page.locator("*").filter(has_text=re.compile(r"\d+[,\.]\d+.*Hz")).all_text_contents(),
         lambda: page.locator("*").filter(has_text=re.compile(r"\d{2}:\d{2}")).all_text_contents(),
-        
         # Strategy 3: Generic numeric data
-        lambda: page.locator("*").filter(has_text=re.compile(r"\b\d+[,\.]\d{2,}\b")).all_text_contents()
+        lambda: page.locator("*").filter(has_text=re.compile(r"\b\d+[,\.]\d{2,}\b")).all_text_contents(),
     ]
-    
+
     for i, strategy in enumerate(strategies):
         try:
-            result = strategy()
+            result = await strategy()
             if result and any(result):
                 texts.extend(result)
-                print(f"Strategy {i+1} found {len(result)} items for {d}")
                 break
         except Exception as e:
             print(f"Strategy {i+1} failed: {e}")
             continue
-    
+
     return parse_rows(texts)
 
 
-def run(years: int, out_dir: Path, headless: bool):
+async def export_range(page, start: date, end: date, dest_dir: Path, timeout_ms: int = 60000) -> Optional[Path]:
+    """Save the page's bulk export for ``start``..``end`` under ``dest_dir``.
+
+    Returns ``None`` when the page has no from/to date range or no export
+    control, i.e. there is no bulk export to use.
+    """
+    inputs = page.locator("input[type='date']")
+    if await inputs.count() < 2:
+        return None
+    await inputs.nth(0).fill(start.isoformat())
+    await inputs.nth(1).fill(end.isoformat())
+    for pattern in _EXPORT_PATTERNS:
+        control = page.locator(pattern).first
+        if await control.count() == 0:
+            continue
+        async with page.expect_download(timeout=timeout_ms) as info:
+            await control.click()
+        download = await info.value
+        suffix = Path(download.suggested_filename).suffix or ".csv"
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        path = dest_dir / f"export_{start.isoformat()}_{end.isoformat()}{suffix}"
+        await download.save_as(path)
+        return path
+    return None
+
+
+@dataclass
+class _Pool:
+    out_dir: Path
+    url: str
+    settle_ms: int
+    bulk_export: bool
+    checkpoints: DayCheckpoints
+    report: ScrapeReport
+
+    def save(self, d: date, df: pd.DataFrame, source: str) -> None:
+        out_path = save_day(df, d, self.out_dir)
+        self.checkpoints.mark(d, "saved", len(df), source)
+        self.report.saved.append(d)
+        print(f"Saved {out_path} ({len(df)} rows)")
+
+
+async def _open(page, url: str) -> None:
+    try:
+        await page.goto(url, timeout=60000)
+    except Exception as e:
+        print(f"Could not open {url}: {e}")
+        return
+    # Cookie consent
+    try:
+        await page.get_by_role("button", name=re.compile("Accept|Sunt de acord|Accepta", re.I)).click(timeout=3000)
+    except Exception:
+        pass
+
+
+async def _export_days(page, days: List[date], pool: _Pool) -> List[date]:
+    """Fetch ``days`` through the bulk export; return the days it did not cover."""
+    path = None
+    try:
+        path = await export_range(page, days[0], days[-1], pool.out_dir / CHECKPOINT_DIR)
+        per_day = split_export(path) if path is not None else {}
+    except Exception as e:
+        print(f"Bulk export failed for {days[0]}..{days[-1]}: {e}")
+        return days
+    finally:
+        if path is not None:
+            path.unlink(missing_ok=True)
+    if path is None:
+        if pool.bulk_export:
+            print("No bulk export on the page; continuing day by day")
+        pool.bulk_export = False
+        return days
+
+    remaining = []
+    for d in days:
+        df = per_day.get(d)
+        if df is None or df.empty:
+            remaining.append(d)
+            continue
+        pool.save(d, df, "export")
+        pool.report.exported.append(d)
+    return remaining
+
+
+async def _context_worker(browser, queue: "asyncio.Queue[List[date]]", pool: _Pool) -> None:
+    # One browser context (own cookies and page) per worker
+    context = await browser.new_context(accept_downloads=True)
+    try:
+        page = await context.new_page()
+        await _open(page, pool.url)
+        while True:
+            try:
+                days = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if pool.bulk_export:
+                days = await _export_days(page, days, pool)
+            for d in days:
+                try:
+                    df = await scrape_day(page, d, pool.url, pool.settle_ms)
+                except Exception as e:
+                    pool.report.failed[d] = f"{type(e).__name__}: {e}"
+                    await _open(page, pool.url)
+                    continue
+                if df.empty:
+                    pool.checkpoints.mark(d, "empty")
+                    pool.report.empty.append(d)
+                    print(f"No data parsed for {d}")
+                else:
+                    pool.save(d, df, "page")
+    finally:
+        await context.close()
+
+
+async def scrape_days(
+    days: Iterable[date],
+    out_dir: Path,
+    *,
+    headless: bool = True,
+    contexts: int = 4,
+    url: str = URL,
+    chunk_days: int = 7,
+    bulk_export: bool = False,
+    settle_ms: int = 3000,
+    retry_empty: bool = False,
+) -> ScrapeReport:
+    """Scrape ``days`` with a pool of browser contexts sharing one browser.
+
+    Pending days are split into consecutive ranges of ``chunk_days`` on a
+    shared queue; each of ``contexts`` contexts takes the next range when it
+    finishes one. Days with a checkpoint are skipped (``empty`` ones too,
+    unless ``retry_empty``). With ``bulk_export`` each range is first tried
+    through the page's from/to export and only the days it misses are
+    scraped. ``url`` can point at a local stand-in (see
+    :mod:`src.tools.transelectrica_standin`).
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        context = browser.new_context()
-        page = context.new_page()
-        page.goto(URL, timeout=60000)
-        # Cookie consent
-        try:
-            page.get_by_role("button", name=re.compile("Accept|Sunt de acord|Accepta", re.I)).click(timeout=3000)
-        except Exception:
-            pass
-
-        start = date.today() - timedelta(days=365 * years)
-        end = date.today()
-        d = start
-        while d <= end:
+    checkpoints = DayCheckpoints(out_dir)
+    report = ScrapeReport()
+    pending: List[date] = []
+    for d in days:
+        status = checkpoints.status(d)
+        if status == "saved" or (status == "empty" and not retry_empty):
+            report.skipped.append(d)
+        else:
+            pending.append(d)
+
+    queue: "asyncio.Queue[List[date]]" = asyncio.Queue()
+    for days_range in day_ranges(pending, max(1, int(chunk_days))):
+        queue.put_nowait(days_range)
+    pool = _Pool(out_dir, url, settle_ms, bulk_export, checkpoints, report)
+
+    started = time.perf_counter()
+    if pending:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=headless)
             try:
-                page.reload(timeout=30000)
-            except Exception:
-                page.goto(URL, timeout=60000)
-            df = scrape_day(page, d)
-            if not df.empty:
-                df.insert(0, "date", d.isoformat())
-                out_path = out_dir / f"imbalance_{d.isoformat()}.csv"
-                df.to_csv(out_path, index=False)
-                print(f"Saved {out_path} ({len(df)} rows)")
-            else:
-                print(f"No data parsed for {d}")
-            d += timedelta(days=1)
-        browser.close()
+                workers = max(1, min(int(contexts), queue.qsize()))
+                await asyncio.gather(*(_context_worker(browser, queue, pool) for _ in range(workers)))
+            finally:
+                await browser.close()
+    report.saved.sort()
+    report.exported.sort()
+    report.empty.sort()
+    report.elapsed_s = time.perf_counter() - started
+    return report
+
+
+def run(
+    years: int,
+    out_dir: Path,
+    headless: bool,
+    contexts: int = 4,
+    url: str = URL,
+    chunk_days: int = 7,
+    bulk_export: bool = False,
+    settle_ms: int = 3000,
+    retry_empty: bool = False,
+) -> ScrapeReport:
+    start = date.today() - timedelta(days=365 * years)
+    end = date.today()
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    report = asyncio.run(
+        scrape_days(
+            days,
+            out_dir,
+            headless=headless,
+            contexts=contexts,
+            url=url,
+            chunk_days=chunk_days,
+            bulk_export=bulk_export,
+            settle_ms=settle_ms,
+            retry_empty=retry_empty,
+        )
+    )
+    print(report.summary())
+    if report.failed:
+        print("Failed days (rerun to retry): " + ", ".join(d.isoformat() for d in sorted(report.failed)))
+    return report
 
 
 def main():
@@ -187,9 +498,25 @@ def main():
     ap.add_argument("--years", type=int, choices=[1, 2, 3], required=True)
     ap.add_argument("--out-dir", type=str, default="downloads/transelectrica_imbalance/auto")
     ap.add_argument("--headful", action="store_true")
+    ap.add_argument("--contexts", type=int, default=4, help="Browser contexts scraping in parallel")
+    ap.add_argument("--chunk-days", type=int, default=7, help="Days per queued range (and per bulk export)")
+    ap.add_argument("--bulk-export", action="store_true", help="Try the page's from/to export before day-by-day scraping")
+    ap.add_argument("--settle-ms", type=int, default=3000, help="Longest wait for the results table per day")
+    ap.add_argument("--retry-empty", action="store_true", help="Re-scrape days checkpointed without data")
+    ap.add_argument("--url", type=str, default=URL, help="Page URL (e.g. a local stand-in)")
     args = ap.parse_args()
 
-    run(args.years, Path(args.out_dir), headless=not args.headful)
+    run(
+        args.years,
+        Path(args.out_dir),
+        headless=not args.headful,
+        contexts=args.contexts,
+        url=args.url,
+        chunk_days=args.chunk_days,
+        bulk_export=args.bulk_export,
+        settle_ms=args.settle_ms,
+        retry_empty=args.retry_empty,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+# Order matters: it is the order the aggregation tools historically tried, and
+# the sniffed choice must match the first combination that would have worked.
+CSV_ENCODINGS = ("utf-8", "latin-1", "cp1252", "iso-8859-1", "windows-1252")
+CSV_SEPARATORS = (",", ";", "\t")
+
+OPCOM_MARKER = "ziua de livrare:"
+
+_HEAD_BYTES = 8192
+
+# (directory, header line, encoding) -> separator. Files from one exporter
+# share a header row, and the header alone decides how many columns each
+# separator yields, so siblings skip the separator trials entirely.
+_SEPARATOR_CACHE: Dict[Tuple[str, bytes, str], str] = {}
+
+
+def read_head(path: Path, size: int = _HEAD_BYTES) -> bytes:
+    """Return the first ``size`` bytes of ``path`` (empty on error)."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(size)
+    except OSError:
+        return b""
+
+
+def is_opcom_head(head: bytes) -> bool:
+    """True when the first line carries the OPCOM delivery-day banner."""
+    first = io.StringIO(head.decode("utf-8", errors="replace"), newline=None).readline()
+    return OPCOM_MARKER in first
+
+
+def _complete_lines(data: bytes, size: int = _HEAD_BYTES) -> bytes:
+    head = data[:size]
+    if len(data) > size:
+        cut = head.rfind(b"\n")
+        if cut > 0:
+            head = head[: cut + 1]
+    return head
+
+
+def sniff_separator(path: Path, data: bytes, encoding: str) -> Optional[str]:
+    """Pick the separator the full parse would settle on, from the head only.
+
+    Returns the first separator (in :data:`CSV_SEPARATORS` order) whose parse
+    of the leading lines yields more than one column. A separator whose head
+    parse raises is returned as-is, so the caller's full parse decides.
+    """
+    end = data.find(b"\n")
+    header = data if end < 0 else data[:end]
+    key = (str(path.parent), header, encoding)
+    cached = _SEPARATOR_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    head = _complete_lines(data)
+    for sep in CSV_SEPARATORS:
+        try:
+            columns = pd.read_csv(io.BytesIO(head), encoding=encoding, sep=sep, nrows=16).columns
+        except Exception:
+            return sep
+        if len(columns) > 1:
+            _SEPARATOR_CACHE[key] = sep
+            return sep
+    return None
+
+
+def read_csv_brute_force(
+    path: Path,
+    encodings: Iterable[str] = CSV_ENCODINGS,
+    separators: Iterable[str] = CSV_SEPARATORS,
+) -> Optional[pd.DataFrame]:
+    """Try every encoding x separator with a full ``read_csv`` (slow path)."""
+    separators = tuple(separators)
+    for encoding in encodings:
+        for sep in separators:
+            try:
+                df = pd.read_csv(path, encoding=encoding, sep=sep)
+                if not df.empty and len(df.columns) > 1:
+                    print(f"Successfully read {path.name} with encoding={encoding}, sep='{sep}'")
+                    return df
+            except Exception:
+                continue
+    return None
+
+
+def read_csv_sniffed(path: Path) -> Optional[pd.DataFrame]:
+    """Read a delimited export with one parse instead of encoding x separator retries.
+
+    The file is read once: UTF-8 is used when the bytes decode, otherwise
+    latin-1 (which always decodes, so the later candidates were never
+    reached). The separator is sniffed from the leading lines and cached per
+    directory and header row. Anything unexpected -- a parse error, an empty
+    or single-column result -- falls back to :func:`read_csv_brute_force`,
+    so the outcome always matches the exhaustive search. Errors reading the
+    file (``OSError``) propagate.
+    """
+    data = path.read_bytes()
+    try:
+        data.decode("utf-8")
+        encoding = "utf-8"
+    except UnicodeDecodeError:
+        encoding = "latin-1"
+
+    sep = sniff_separator(path, data, encoding)
+    if sep is not None:
+        try:
+            df = pd.read_csv(io.BytesIO(data), encoding=encoding, sep=sep)
+        except Exception:
+            df = None
+        if df is not None and not df.empty and len(df.columns) > 1:
+            print(f"Successfully read {path.name} with encoding={encoding}, sep='{sep}'")
+            return df
+    return read_csv_brute_force(path)
+
+
+def clear_format_cache() -> None:
+    _SEPARATOR_CACHE.clear()
+
+
+__all__ = [
+    "CSV_ENCODINGS",
+    "CSV_SEPARATORS",
+    "OPCOM_MARKER",
+    "clear_format_cache",
+    "is_opcom_head",
+    "read_csv_brute_force",
+    "read_csv_sniffed",
+    "read_head",
+    "sniff_separator",
+]
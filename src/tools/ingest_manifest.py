@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from ..data.market_cache import file_digest
+
+# Bump when the stored row layout changes so every file is re-parsed once.
+MANIFEST_VERSION = 2
+
+SOURCE_SUFFIXES = (".csv", ".xlsx", ".xls")
+
+_MANIFEST_FILE = "manifest.json"
+_SOURCE_COLUMN = "source"
+_BATCH_COLUMN = "batch"
+
+
+def iter_source_files(inputs: Iterable[Path], suffixes: Iterable[str] = SOURCE_SUFFIXES) -> List[Path]:
+    """Return the downloadable source files under ``inputs`` in scan order."""
+    wanted = tuple(s.lower() for s in suffixes)
+    files: List[Path] = []
+    for folder in inputs:
+        for path in folder.rglob("*"):
+            if path.is_file() and path.suffix.lower() in wanted:
+                files.append(path)
+    return files
+
+
+ParseResult = Tuple[Optional[pd.DataFrame], Optional[str]]
+
+
+def _parse_one(parse: Callable[[Path], Optional[pd.DataFrame]], path: Path) -> ParseResult:
+    try:
+        return parse(path), None
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def parse_files(
+    files: List[Path],
+    parse: Callable[[Path], Optional[pd.DataFrame]],
+    workers: int = 1,
+) -> List[ParseResult]:
+    """Run ``parse`` over ``files`` and return ``(rows, error)`` per file, in order.
+
+    With ``workers > 1`` files are fanned out to a process pool (``parse``
+    must be a module-level function so it can be pickled). Results come back
+    in input order either way, so merging them is deterministic.
+    """
+    if workers <= 1 or len(files) <= 1:
+        return [_parse_one(parse, path) for path in files]
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(_parse_one, parse), files, chunksize=chunksize))
+
+
+def report_errors(errors: Dict[str, str], report: Optional[Path] = None) -> None:
+    """Print the per-file parse errors and optionally write them as CSV."""
+    if errors:
+        print(f"{len(errors)} file(s) could not be parsed:")
+        for path, error in errors.items():
+            print(f"  {path}: {error}")
+    if report is not None:
+        report.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame({"path": list(errors), "error": list(errors.values())}).to_csv(report, index=False)
+
+
+def default_manifest_dir(output: Path) -> Path:
+    """Manifest directory used for an aggregated ``output`` file."""
+    return output.with_name(output.stem + ".ingest")
+
+
+@dataclass
+class IngestStats:
+    parsed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.parsed)} parsed, {self.unchanged} unchanged, "
+            f"{len(self.removed)} removed, {len(self.errors)} with errors"
+        )
+
+
+class IngestManifest:
+    """Incremental store of the normalized rows produced by each source file.
+
+    ``manifest.json`` records every file's size, mtime and SHA-1 together with
+    the number of rows it produced and the batch that wrote them. The rows
+    live in one append-only CSV with ``source`` and ``batch`` columns.
+    :meth:`update` re-parses only new or changed files (an mtime change with
+    identical content is not a change) and appends their rows. Rows of changed
+    or removed files stay in the CSV but no longer match the manifest; they
+    are dropped when the CSV is compacted, once they outnumber the live rows.
+    A daily refresh therefore parses and writes only the new files.
+    """
+
+    def __init__(self, root: Path, columns: List[str]):
+        self.root = root
+        self.columns = list(columns)
+        self.files: Dict[str, Dict[str, object]] = {}
+        self.rows_file: Optional[str] = None
+        self.next_batch = 0
+        self._rows: Optional[pd.DataFrame] = None
+        self._dead_rows = 0
+        self._compact = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            record = json.loads((self.root / _MANIFEST_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if record.get("version") != MANIFEST_VERSION or record.get("columns") != self.columns:
+            return
+        rows_file = record.get("rows_file")
+        if rows_file and not (self.root / rows_file).is_file():
+            return
+        self.files = dict(record.get("files") or {})
+        self.rows_file = rows_file
+        self.next_batch = int(record.get("next_batch") or 0)
+
+    def _empty_rows(self) -> pd.DataFrame:
+        return pd.DataFrame(columns=[*self.columns, _SOURCE_COLUMN, _BATCH_COLUMN])
+
+    def _live_rows(self, stored: pd.DataFrame) -> pd.DataFrame:
+        """Rows written by the batch each file's manifest entry points at.
+
+        Raises ``ValueError`` when the stored rows do not match the manifest.
+        """
+        if list(stored.columns) != [*self.columns, _SOURCE_COLUMN, _BATCH_COLUMN]:
+            raise ValueError("row store columns do not match the manifest")
+        batches = stored[_SOURCE_COLUMN].map({key: entry.get("batch") for key, entry in self.files.items()})
+        live = stored[stored[_BATCH_COLUMN] == batches]
+        counts = live[_SOURCE_COLUMN].value_counts()
+        for key, entry in self.files.items():
+            if int(entry.get("rows", 0)) != int(counts.get(key, 0)):
+                raise ValueError(f"row store does not match the manifest for {key}")
+        return live.reset_index(drop=True)
+
+    def _read_rows(self) -> pd.DataFrame:
+        """Live rows of the store.
+
+        A missing, unreadable or inconsistent rows file empties the manifest,
+        so every file is re-parsed and the store is rewritten.
+        """
+        if self._rows is None:
+            self._rows = self._empty_rows()
+            self._dead_rows = 0
+            if self.rows_file:
+                try:
+                    stored = pd.read_csv(self.root / self.rows_file, dtype={"date": str, _SOURCE_COLUMN: str})
+                    self._rows = self._live_rows(stored)
+                    self._dead_rows = len(stored) - len(self._rows)
+                except (OSError, ValueError):
+                    self.files = {}
+                    self._compact = True
+        return self._rows
+
+    def _is_current(self, key: str, path: Path, stat: os.stat_result) -> bool:
+        entry = self.files.get(key)
+        if entry is None or entry.get("size") != stat.st_size:
+            return False
+        if entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+        try:
+            same = file_digest(path) == entry.get("sha1")
+        except OSError:
+            return False
+        if same:
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return same
+
+    def update(
+        self,
+        files: List[Path],
+        parse: Callable[[Path], Optional[pd.DataFrame]],
+        rebuild: bool = False,
+        workers: int = 1,
+    ) -> IngestStats:
+        """Bring the store in line with ``files``, parsing only what changed.
+
+        ``parse`` returns the normalized rows of one file (``None`` or empty
+        when the file holds nothing usable) and raises on unreadable input.
+        Every outcome is recorded, so neither empty nor failing files are
+        re-read until they change; recorded errors are reported on each run.
+        """
+        stats = IngestStats()
+        if rebuild:
+            self.files = {}
+            self._rows = self._empty_rows()
+            self._compact = True
+        # Check the row store before classifying files: if it cannot be
+        # trusted, nothing counts as unchanged and every file is re-parsed.
+        rows = self._read_rows()
+
+        current: Dict[str, Path] = {str(path.resolve()): path for path in files}
+        stale = [key for key in self.files if key not in current]
+        pending: List[str] = []
+        signatures: Dict[str, Dict[str, object]] = {}
+        for key, path in current.items():
+            try:
+                stat = path.stat()
+                if self._is_current(key, path, stat):
+                    stats.unchanged += 1
+                    continue
+                signatures[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": file_digest(path)}
+            except OSError:
+                continue
+            pending.append(key)
+
+        if pending or stale:
+            replaced = rows[_SOURCE_COLUMN].isin(set(stale) | set(pending))
+            self._dead_rows += int(replaced.sum())
+            rows = rows[~replaced]
+            for key in stale:
+                self.files.pop(key, None)
+            stats.removed = stale
+
+            batch = self.next_batch
+            self.next_batch += 1
+            added: List[pd.DataFrame] = []
+            results = parse_files([current[key] for key in pending], parse, workers)
+            for key, (parsed, error) in zip(pending, results):
+                entry = dict(signatures[key], rows=0, batch=batch)
+                if error is not None:
+                    entry["error"] = error
+                elif parsed is not None and not parsed.empty:
+                    parsed = parsed.reindex(columns=self.columns).copy()
+                    parsed[_SOURCE_COLUMN] = key
+                    parsed[_BATCH_COLUMN] = batch
+                    added.append(parsed)
+                    entry["rows"] = len(parsed)
+                self.files[key] = entry
+                stats.parsed.append(key)
+            self._save(rows, pd.concat(added, ignore_index=True) if added else self._empty_rows())
+        else:
+            self._save(None, None)
+
+        for key in current:
+            error = self.files.get(key, {}).get("error")
+            if error:
+                stats.errors[key] = str(error)
+        return stats
+
+    def rows(self, files: List[Path]) -> pd.DataFrame:
+        """Return the stored rows of ``files``, ordered as ``files`` (scan order).
+
+        Callers deduplicate with ``keep="last"``, so later files win exactly as
+        they did when every file was parsed in sequence.
+        """
+        rows = self._read_rows()
+        rank = {str(path.resolve()): pos for pos, path in enumerate(files)}
+        order = rows[_SOURCE_COLUMN].map(rank)
+        rows = rows[order.notna()].assign(_rank=order[order.notna()])
+        rows = rows.sort_values("_rank", kind="stable")
+        return rows[self.columns].reset_index(drop=True)
+
+    def _save(self, live: Optional[pd.DataFrame], added: Optional[pd.DataFrame]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        previous = self.rows_file
+        rewritten = False
+        if live is not None and added is not None:
+            frames = [frame for frame in (live, added) if not frame.empty]
+            merged = pd.concat(frames, ignore_index=True) if frames else self._empty_rows()
+            if self._compact or not previous or self._dead_rows > len(merged):
+                # New generation first, then the manifest that points at it,
+                # so an interrupted run never pairs a manifest with the wrong
+                # rows.
+                generation = 0
+                if previous and previous.startswith("rows-"):
+                    try:
+                        generation = int(previous[5:].split(".", 1)[0]) + 1
+                    except ValueError:
+                        generation = 0
+                self.rows_file = f"rows-{generation}.csv"
+                merged.to_csv(self.root / self.rows_file, index=False)
+                self._dead_rows = 0
+                self._compact = False
+                rewritten = True
+            elif not added.empty:
+                # Appended rows carry a batch the old manifest does not know,
+                # so an interrupted run leaves them dead, not duplicated.
+                added.to_csv(self.root / self.rows_file, mode="a", header=False, index=False)
+            self._rows = merged
+
+        record = {
+            "version": MANIFEST_VERSION,
+            "columns": self.columns,
+            "rows_file": self.rows_file,
+            "next_batch": self.next_batch,
+            "files": self.files,
+        }
+        tmp = self.root / f".{_MANIFEST_FILE}.tmp"
+        tmp.write_text(json.dumps(record, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.root / _MANIFEST_FILE)
+        if rewritten and previous and previous != self.rows_file:
+            try:
+                (self.root / previous).unlink()
+            except OSError:
+                pass
+
+
+__all__ = [
+    "IngestManifest",
+    "IngestStats",
+    "MANIFEST_VERSION",
+    "SOURCE_SUFFIXES",
+    "default_manifest_dir",
+    "iter_source_files",
+    "parse_files",
+    "report_errors",
+]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+OPCOM_BASE_URL = "https://www.opcom.ro"
+# Direct CSV export path, relative to the base URL
+URL_PATH = "/rapoarte-pzu-raportPIP-export-csv/{day}/{month}/{year}/ro"
+
+MANIFEST_NAME = ".download_manifest.json"
+
+# HTTP statuses worth retrying; anything else is a definitive answer.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TransientDownloadError(Exception):
+    """A failure that may succeed on retry (timeouts, 429/5xx, resets)."""
+
+
+class RateLimiter:
+    """Space requests at least ``1 / rate`` seconds apart across all threads.
+
+    One downloader talks to one host, so a limiter per downloader is a
+    per-host limit.
+    """
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DownloadManifest:
+    """Resume manifest: which dates are already on disk, and from which file.
+
+    Stored as JSON next to the downloads. A date counts as done only while
+    its recorded file still exists, so deleting a file re-queues the day.
+    """
+
+    def __init__(self, out_dir: Path):
+        self.path = out_dir / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.days: Dict[str, Dict[str, object]] = {}
+        try:
+            record = json.loads(self.path.read_text(encoding="utf-8"))
+            self.days = dict(record.get("days") or {})
+        except (OSError, ValueError):
+            self.days = {}
+
+    def is_done(self, d: date, out_dir: Path) -> bool:
+        entry = self.days.get(d.isoformat())
+        if not entry:
+            return False
+        return (out_dir / str(entry.get("file", ""))).is_file()
+
+    def record(self, d: date, file_name: str, size: int) -> None:
+        with self._lock:
+            self.days[d.isoformat()] = {"file": file_name, "bytes": size}
+
+    def save(self) -> None:
+        with self._lock:
+            payload = json.dumps({"days": self.days}, indent=1, sort_keys=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class DownloadReport:
+    downloaded: List[date] = field(default_factory=list)
+    skipped: List[date] = field(default_factory=list)
+    missing: List[date] = field(default_factory=list)  # server answered without CSV data
+    failed: Dict[date, str] = field(default_factory=dict)  # gave up after retries
+    elapsed_s: float = 0.0
+
+    @property
+    def unavailable(self) -> List[date]:
+        """Dates without a file after this run, in date order."""
+        return sorted([*self.missing, *self.failed])
+
+    def summary(self) -> str:
+        rate = len(self.downloaded) / self.elapsed_s if self.elapsed_s else 0.0
+        return (
+            f"{len(self.downloaded)} downloaded, {len(self.skipped)} already present, "
+            f"{len(self.missing)} without data, {len(self.failed)} failed "
+            f"in {self.elapsed_s:.1f}s ({rate:.1f} days/s)"
+        )
+
+
+def output_name(d: date) -> str:
+    return f"pzu_{d.isoformat()}.csv"
+
+
+class OpcomDownloader:
+    """Concurrent, resumable downloader for the OPCOM daily PZU CSV export.
+
+    Days are fetched by a bounded thread pool; each worker keeps its own
+    ``requests.Session`` so connections are reused, every request passes a
+    shared per-host :class:`RateLimiter`, and transient failures are retried
+    with exponential backoff. Finished days are recorded in a
+    :class:`DownloadManifest`, so an interrupted run resumes where it stopped.
+    ``base_url`` can point at a local stand-in (see
+    :mod:`src.tools.opcom_standin`) for offline runs.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        base_url: str = OPCOM_BASE_URL,
+        workers: int = 8,
+        rate_per_sec: float = 5.0,
+        attempts: int = 4,
+        backoff_s: float = 1.0,
+        timeout_s: float = 30.0,
+    ):
+        self.out_dir = out_dir
+        self.url_pattern = base_url.rstrip("/") + URL_PATH
+        self.workers = max(1, int(workers))
+        self.attempts = max(1, int(attempts))
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self.limiter = RateLimiter(rate_per_sec)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _get(self, url: str) -> requests.Response:
+        self.limiter.wait()
+        try:
+            response = self._session().get(url, timeout=self.timeout_s)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            raise TransientDownloadError(str(exc)) from exc
+        if response.status_code in _RETRY_STATUSES:
+            raise TransientDownloadError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return response
+
+    def fetch(self, d: date) -> Optional[str]:
+        """Return the CSV text for ``d``, or ``None`` if the export has no data."""
+        url = self.url_pattern.format(day=d.day, month=d.month, year=d.year)
+        retrying = Retrying(
+            stop=stop_after_attempt(self.attempts),
+            wait=wait_exponential(multiplier=self.backoff_s, max=30 * self.backoff_s),
+            retry=retry_if_exception_type(TransientDownloadError),
+            reraise=True,
+        )
+        response = retrying(self._get, url)
+        text = response.text
+        # Same acceptance test as download_csv_direct
+        if text and ("," in text or ";" in text):
+            return text
+        return None
+
+    def _download_one(self, d: date, manifest: DownloadManifest) -> bool:
+        text = self.fetch(d)
+        if text is None:
+            return False
+        out_path = self.out_dir / output_name(d)
+        tmp = out_path.with_name(out_path.name + ".part")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, out_path)
+        manifest.record(d, out_path.name, out_path.stat().st_size)
+        return True
+
+    def download(self, days: Iterable[date], *, save_every: int = 50) -> DownloadReport:
+        """Download every day in ``days`` not already recorded as done."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = DownloadManifest(self.out_dir)
+        report = DownloadReport()
+        pending: List[date] = []
+        for d in days:
+            existing = self.out_dir / output_name(d)
+            if manifest.is_done(d, self.out_dir):
+                report.skipped.append(d)
+            elif existing.is_file() and existing.stat().st_size > 0:
+                # Downloaded before the manifest existed
+                manifest.record(d, existing.name, existing.stat().st_size)
+                report.skipped.append(d)
+            else:
+                pending.append(d)
+
+        started = time.perf_counter()
+        completed = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self._download_one, d, manifest): d for d in pending}
+                for future in as_completed(futures):
+                    d = futures[future]
+                    try:
+                        if future.result():
+                            report.downloaded.append(d)
+                        else:
+                            report.missing.append(d)
+                    except Exception as exc:
+                        report.failed[d] = f"{type(exc).__name__}: {exc}"
+                    completed += 1
+                    if completed % save_every == 0:
+                        manifest.save()
+        finally:
+            manifest.save()
+        report.downloaded.sort()
+        report.missing.sort()
+        report.elapsed_s = time.perf_counter() - started
+        return report
+
+
+__all__ = [
+    "DownloadManifest",
+    "DownloadReport",
+    "OPCOM_BASE_URL",
+    "OpcomDownloader",
+    "RateLimiter",
+    "TransientDownloadError",
+    "URL_PATH",
+    "output_name",
+]
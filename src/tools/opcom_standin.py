@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import argparse
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Set
+
+from .opcom_downloader import URL_PATH
+
+_PATH_RE = re.compile(
+    "^" + re.escape(URL_PATH).replace(r"\{day\}", r"(\d+)").replace(r"\{month\}", r"(\d+)").replace(r"\{year\}", r"(\d+)") + "$"
+)
+
+
+def opcom_csv(d: date) -> str:
+    """Synthetic OPCOM daily report in the export layout the parsers expect."""
+    lines = [
+        f'"PIP si volum tranzactionat pentru ziua de livrare: {d.day}/{d.month}/{d.year}"',
+        '"Zona de tranzactionare","Interval","Pret de Inchidere a Pietei [Lei/MWh]","Volum Tranzactionat [MWh]"',
+    ]
+    seed = d.toordinal()
+    for hour in range(1, 25):
+        price = 250 + ((seed * 37 + hour * 101) % 600) + hour / 100
+        volume = 1500 + (seed + hour * 13) % 900
+        price_text = f"{price:.2f}".replace(".", ",")  # OPCOM uses decimal commas
+        lines.append(f'"Romania","{hour}","{price_text}","{volume}"')
+    return "\r\n".join(lines) + "\r\n"
+
+
+class _StandinState:
+    def __init__(self, latency_s: float, fail_first: int, missing: Set[date]):
+        self.latency_s = latency_s
+        self.fail_first = fail_first
+        self.missing = missing
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.attempts: Dict[date, int] = {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+    state: _StandinState
+
+    def log_message(self, format, *args):  # noqa: A002 - silence per-request logging
+        pass
+
+    def _reply(self, status: int, body: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        match = _PATH_RE.match(self.path)
+        if not match:
+            self._reply(404, "not found")
+            return
+        day, month, year = (int(g) for g in match.groups())
+        try:
+            d = date(year, month, day)
+        except ValueError:
+            self._reply(404, "bad date")
+            return
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            attempt = state.attempts.get(d, 0) + 1
+            state.attempts[d] = attempt
+        if state.latency_s:
+            time.sleep(state.latency_s)
+        if attempt <= state.fail_first:
+            self._reply(503, "try again")
+        elif d in state.missing:
+            self._reply(200, "")
+        else:
+            self._reply(200, opcom_csv(d))
+
+
+class OpcomStandin:
+    """Local HTTP stand-in for the OPCOM CSV export.
+
+    Serves :data:`~src.tools.opcom_downloader.URL_PATH` with synthetic
+    reports, optionally adding latency, answering the first ``fail_first``
+    requests per day with 503, and returning an empty body for ``missing``
+    days. ``requests`` and ``attempts`` count what the server saw, so
+    throughput, retries and resume behaviour can be checked offline.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency_s: float = 0.0,
+        fail_first: int = 0,
+        missing: Optional[Set[date]] = None,
+    ):
+        self.state = _StandinState(latency_s, fail_first, set(missing or ()))
+        handler = type("StandinHandler", (_Handler,), {"state": self.state})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self.state.requests
+
+    def start(self) -> "OpcomStandin":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@contextmanager
+def running_standin(**kwargs) -> Iterator[OpcomStandin]:
+    """Run an :class:`OpcomStandin` in a background thread for a ``with`` block."""
+    standin = OpcomStandin(**kwargs).start()
+    try:
+        yield standin
+    finally:
+        standin.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve synthetic OPCOM PZU CSV exports locally")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per response")
+    ap.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests per day with 503")
+    args = ap.parse_args()
+
+    standin = OpcomStandin(port=args.port, latency_s=args.latency, fail_first=args.fail_first)
+    print(f"Serving OPCOM stand-in on {standin.base_url}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+# Path of download_transelectrica_imbalance_playwright.URL, so the scraper
+# exercises the same URL shape (kept literal: that module needs Playwright).
+PAGE_PATH = "/uu-webkit-maing02/00121011300000000000000000000100/estimatedImbalancePrices"
+EXPORT_PATH = "/export.csv"
+
+# A static copy of the page's moving parts: consent button, a from/to date
+# range, Apply, an Export link and a results table. The table is filled from
+# the export endpoint for the "from" day, with decimal commas like the real
+# site; ?date= preselects a day, as the scraper's URL fallback expects.
+_PAGE = """<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>Estimated imbalance prices</title></head>
+<body>
+<div id="consent"><button id="accept">Accept</button></div>
+<label>From <input type="date" id="date-from"></label>
+<label>To <input type="date" id="date-to"></label>
+<button id="apply">Apply</button>
+<a id="export" href="#" download>Export CSV</a>
+<table>
+<thead><tr><th>Interval</th><th>Price [RON/MWh]</th><th>Frequency [Hz]</th></tr></thead>
+<tbody></tbody>
+</table>
+<script>
+const from = document.getElementById("date-from");
+const to = document.getElementById("date-to");
+const exportUrl = (f, t) => "%(export)s?from=" + f + "&to=" + (t || f);
+document.getElementById("accept").onclick = () => document.getElementById("consent").remove();
+async function apply() {
+  if (!from.value) return;
+  const text = await (await fetch(exportUrl(from.value, from.value))).text();
+  const rows = text.trim().split("\\n").slice(1).map((line) => line.split(","));
+  document.querySelector("tbody").innerHTML = rows
+    .map((c) => "<tr><td>" + c[1] + "</td><td>" + c[2].replace(".", ",") + "</td><td>" + c[3].replace(".", ",") + "</td></tr>")
+    .join("");
+}
+document.getElementById("apply").onclick = apply;
+document.getElementById("export").onclick = (e) => { e.currentTarget.href = exportUrl(from.value, to.value); };
+const preset = new URLSearchParams(location.search).get("date");
+if (preset) { from.value = preset; apply(); }
+</script>
+</body>
+</html>
+"""
+
+
+def imbalance_csv(start: date, end: date, missing: Set[date] = frozenset()) -> str:
+    """Synthetic 15-minute estimated imbalance prices for ``start``..``end``."""
+    lines = ["date,time,price,frequency"]
+    d = start
+    while d <= end:
+        if d not in missing:
+            seed = d.toordinal()
+            for slot in range(96):
+                # Prices stay above the 45..55 band parse_rows reads as frequency
+                price = 100 + ((seed * 37 + slot * 101) % 900) + slot / 100
+                frequency = 50 + (((seed + slot * 7) % 41) - 20) / 1000
+                hh, mm = divmod(slot * 15, 60)
+                lines.append(f"{d.isoformat()},{hh:02d}:{mm:02d},{price:.2f},{frequency:.3f}")
+        d += timedelta(days=1)
+    return "\n".join(lines) + "\n"
+
+
+class _StandinState:
+    def __init__(self, latency_s: float, missing: Set[date]):
+        self.latency_s = latency_s
+        self.missing = missing
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.data_requests = 0
+        self.exports = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: _StandinState
+
+    def log_message(self, format, *args):  # noqa: A002 - silence per-request logging
+        pass
+
+    def _reply(self, status: int, body: str, content_type: str, filename: Optional[str] = None) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if filename:
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        parts = urlsplit(self.path)
+        state = self.state
+        if parts.path in (PAGE_PATH, "/"):
+            with state.lock:
+                state.pages += 1
+            self._reply(200, _PAGE % {"export": EXPORT_PATH}, "text/html; charset=utf-8")
+            return
+        if parts.path != EXPORT_PATH:
+            self._reply(404, "not found", "text/plain")
+            return
+        query = parse_qs(parts.query)
+        try:
+            start = date.fromisoformat(query["from"][0])
+            end = date.fromisoformat(query.get("to", query["from"])[0])
+        except (KeyError, ValueError):
+            self._reply(400, "bad range", "text/plain")
+            return
+        with state.lock:
+            if start == end:
+                state.data_requests += 1
+            else:
+                state.exports += 1
+        if state.latency_s:
+            time.sleep(state.latency_s)
+        self._reply(
+            200,
+            imbalance_csv(start, end, state.missing),
+            "text/csv; charset=utf-8",
+            filename=f"imbalance_{start.isoformat()}_{end.isoformat()}.csv",
+        )
+
+
+class TranselectricaStandin:
+    """Local HTTP stand-in for the estimated imbalance prices page.
+
+    Serves a static copy of the page at :data:`PAGE_PATH` and its data at
+    :data:`EXPORT_PATH`, which also answers from/to range exports. Each data
+    request waits ``latency_s``; ``missing`` days come back without rows.
+    ``pages``, ``data_requests`` and ``exports`` count what the server saw.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency_s: float = 0.0,
+        missing: Optional[Set[date]] = None,
+    ):
+        self.state = _StandinState(latency_s, set(missing or ()))
+        handler = type("StandinHandler", (_Handler,), {"state": self.state})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{PAGE_PATH}"
+
+    def start(self) -> "TranselectricaStandin":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@contextmanager
+def running_standin(**kwargs) -> Iterator[TranselectricaStandin]:
+    """Run a :class:`TranselectricaStandin` in a background thread for a ``with`` block."""
+    standin = TranselectricaStandin(**kwargs).start()
+    try:
+        yield standin
+    finally:
+        standin.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve a static stand-in of the Transelectrica imbalance page locally")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per data request")
+    args = ap.parse_args()
+
+    standin = TranselectricaStandin(port=args.port, latency_s=args.latency)
+    print(f"Serving Transelectrica stand-in on {standin.url}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
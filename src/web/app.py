@@ -21,6 +21,7 @@ import matplotlib
 matplotlib.use('Agg')
 
 from src.data.data_provider import DataProvider
+from src.data.price_cube import load_price_cube
 from src.web.data import load_config
 from src.web.ui import (
     render_ai_insights,
@@ -104,21 +105,12 @@ with st.sidebar:
         )
 
         # Get available dates
-        bm_dates: List[str] = []
-        if provider.bm_csv and Path(provider.bm_csv).exists():
-            try:
-                df_bm = pd.read_csv(provider.bm_csv, usecols=["date"]).dropna()
-                bm_dates = sorted(df_bm["date"].astype(str).unique().tolist())
-            except:
-                pass
-
-        pzu_dates: List[str] = []
-        if provider.pzu_csv and Path(provider.pzu_csv).exists():
-            try:
-                df_pzu = pd.read_csv(provider.pzu_csv, usecols=["date"]).dropna()
-                pzu_dates = sorted(df_pzu["date"].astype(str).unique().tolist())
-            except:
-                pass
+        # Shared price cubes: parsed once here and reused by every view.
+        bm_cube = load_price_cube(provider.bm_csv)
+        bm_dates: List[str] = bm_cube.dates.strftime("%Y-%m-%d").tolist() if bm_cube is not None else []
+
+        pzu_cube = load_price_cube(provider.pzu_csv)
+        pzu_dates: List[str] = pzu_cube.dates.strftime("%Y-%m-%d").tolist() if pzu_cube is not None else []
 
         available_dates = pzu_dates or bm_dates
         default_date = datetime.fromisoformat(
@@ -2,6 +2,7 @@
 
 from .loaders import (
     build_hedge_price_curve,
+    build_market_frame,
     find_in_data_dir,
     list_in_data_dir,
     load_balancing_day_series,
@@ -20,6 +21,7 @@ from .transformers import (
 
 __all__ = [
     "build_hedge_price_curve",
+    "build_market_frame",
     "find_in_data_dir",
     "list_in_data_dir",
     "load_balancing_day_series",
@@ -4,10 +4,14 @@ from .frequency_regulation import (
     simulate_frequency_regulation_revenue,
     simulate_frequency_regulation_revenue_multi,
     apply_soc_constraints_to_activation,
+    apply_soc_constraints_to_activation_batch,
+    soc_scenario_grid,
 )
 
 __all__ = [
     "simulate_frequency_regulation_revenue",
     "simulate_frequency_regulation_revenue_multi",
     "apply_soc_constraints_to_activation",
+    "apply_soc_constraints_to_activation_batch",
+    "soc_scenario_grid",
 ]
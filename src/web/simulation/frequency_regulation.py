@@ -11,661 +11,39 @@ import streamlit as st
 from src.web.config import project_root
 from src.web.data import load_config
 from src.data.data_provider import DataProvider
+from src.data.market_cache import read_csv_cached
+from src.data.price_cube import load_price_frame
+from src.data.result_cache import cached_result
+from src.data.slot_axis import attach_by_slot
 from src.web.utils import safe_pyplot_figure
 from src.ml.fr_predictor import FRPredictor, create_fr_prediction_summary
+from src.core import frequency_regulation as _core_fr
+from src.core.frequency_regulation import (
+    SOC_SCENARIO_DEFAULTS,
+    apply_soc_constraints_to_activation,
+    apply_soc_constraints_to_activation_batch,
+    soc_scenario_grid,
+)
+
+# The computation lives in src.core (no Streamlit dependency); the app keeps
+# cached entry points under the old names. The result cache keys on the
+# source digest of frames from build_market_frame (column buffers for any
+# other frame) and the parameters, and persists across sessions and restarts.
+simulate_frequency_regulation_revenue = cached_result("fr.simulate_frequency_regulation_revenue")(
+    _core_fr.simulate_frequency_regulation_revenue
+)
+simulate_frequency_regulation_revenue_multi = cached_result("fr.simulate_frequency_regulation_revenue_multi")(
+    _core_fr.simulate_frequency_regulation_revenue_multi
+)
 
 
-@st.cache_data(show_spinner=False)
-def simulate_frequency_regulation_revenue(
-    prices_eur: pd.DataFrame,
-    contracted_mw: float,
-    capacity_price_eur_mw_h: float,
-    up_threshold_eur_mwh: float = 0.0,
-    down_threshold_eur_mwh: float = 0.0,
-    pay_down_as_positive: bool = True,
-) -> Dict:
-    """Estimate revenue using estimated imbalance prices as proxy for activation price.
-    - Capacity revenue = contracted_mw * hours_available_in_month * capacity_price_eur_mw_h
-      where hours_available_in_month is computed from the presence of any price entries that month.
-    - Activation revenue: when price >= up_threshold or price <= -down_threshold, assume full contracted MW activated.
-    - Energy per 15-min slot = contracted_mw * 0.25 MWh.
-    - If pay_down_as_positive=True, down-activation uses |price|; else uses signed price.
-    """
-    if prices_eur is None or prices_eur.empty or contracted_mw <= 0:
-        return {
-            'monthly': [],
-            'totals': {
-                'capacity_revenue_eur': 0.0,
-                'activation_revenue_eur': 0.0,
-                'total_revenue_eur': 0.0,
-                'months': 0
-            }
-        }
-
-    df = prices_eur.copy()
-    df['date'] = pd.to_datetime(df['date'])
-    df['month'] = df['date'].dt.to_period('M')
-
-    monthly_rows = []
-    cap_total = 0.0
-    act_total = 0.0
-
-    for month, mdf in df.groupby('month'):
-        hours_in_data = len(mdf) * 0.25
-        cap_rev = contracted_mw * hours_in_data * capacity_price_eur_mw_h
-        # Activation flags
-        up_mask = mdf['price_eur_mwh'] >= float(up_threshold_eur_mwh)
-        down_mask = mdf['price_eur_mwh'] <= -float(down_threshold_eur_mwh)
-        # Energy per slot
-        energy_mwh_per_slot = contracted_mw * 0.25
-        # Up activation revenue
-        up_rev = float((mdf.loc[up_mask, 'price_eur_mwh'] * energy_mwh_per_slot).sum())
-        # Down activation revenue (toggle absolute or signed)
-        if pay_down_as_positive:
-            down_rev = float((mdf.loc[down_mask, 'price_eur_mwh'].abs() * energy_mwh_per_slot).sum())
-        else:
-            down_rev = float((mdf.loc[down_mask, 'price_eur_mwh'] * energy_mwh_per_slot).sum())
-        act_rev = up_rev + down_rev
-
-        monthly_rows.append({
-            'month': str(month),
-            'hours_in_data': hours_in_data,
-            'capacity_revenue_eur': cap_rev,
-            'activation_revenue_eur': act_rev,
-            'total_revenue_eur': cap_rev + act_rev,
-            'up_slots': int(up_mask.sum()),
-            'down_slots': int(down_mask.sum()),
-        })
-        cap_total += cap_rev
-        act_total += act_rev
-
-    monthly_rows.sort(key=lambda x: x['month'])
-
-    return {
-        'monthly': monthly_rows,
-        'totals': {
-            'capacity_revenue_eur': cap_total,
-            'activation_revenue_eur': act_total,
-            'total_revenue_eur': cap_total + act_total,
-            'months': len(monthly_rows)
-        }
-    }
-
-
-
-
-def apply_soc_constraints_to_activation(
-    df: pd.DataFrame,
-    up_mask: pd.Series,
-    down_mask: pd.Series,
-    energy_per_slot_mwh: pd.Series,
-    battery_capacity_mwh: float,
-    initial_soc: float = 0.5,
-    soc_min: float = 0.1,
-    soc_max: float = 0.9,
-    round_trip_efficiency: float = 0.9,
-) -> Tuple[pd.Series, pd.Series, pd.Series]:
-    """Apply battery SOC constraints to FR activation events.
-
-    Parameters
-    ----------
-    df : pd.DataFrame
-        Dataframe with date/slot columns (must be sorted chronologically)
-    up_mask : pd.Series
-        Boolean mask indicating up-regulation activation (discharge)
-    down_mask : pd.Series
-        Boolean mask indicating down-regulation activation (charge)
-    energy_per_slot_mwh : pd.Series
-        Planned energy per 15-min slot before SOC constraints
-    battery_capacity_mwh : float
-        Battery energy capacity (MWh)
-    initial_soc : float, optional
-        Starting SOC fraction (0-1), default 0.5 (50%)
-    soc_min : float, optional
-        Minimum allowed SOC fraction (0-1), default 0.1 (10%)
-    soc_max : float, optional
-        Maximum allowed SOC fraction (0-1), default 0.9 (90%)
-    round_trip_efficiency : float, optional
-        Round-trip efficiency (0-1), default 0.9
-
-    Returns
-    -------
-    constrained_up_energy : pd.Series
-        Actual up-regulation energy after SOC constraints (MWh)
-    constrained_down_energy : pd.Series
-        Actual down-regulation energy after SOC constraints (MWh)
-    soc_series : pd.Series
-        SOC evolution over time (0-1 fraction)
-
-    Notes
-    -----
-    Romania's ANRE regulations require batteries to maintain operational SOC ranges
-    to ensure continued FR availability. This function simulates realistic physical
-    constraints:
-    - Cannot discharge below SOC_min (typically 10-20%)
-    - Cannot charge above SOC_max (typically 80-90%)
-    - Efficiency losses occur during charge/discharge cycles
-    - SOC must be managed to maintain bi-directional capability
-
-    When SOC constraints are violated, activation energy is reduced or blocked,
-    which directly impacts revenue and demonstrates why SOC management is critical
-    for FR participation.
-    """
-    n = len(df)
-    soc = np.full(n, initial_soc, dtype=float)
-    actual_up_energy = np.zeros(n, dtype=float)
-    actual_down_energy = np.zeros(n, dtype=float)
-
-    charge_efficiency = np.sqrt(round_trip_efficiency)  # √η for charge
-    discharge_efficiency = np.sqrt(round_trip_efficiency)  # √η for discharge
-
-    for i in range(n):
-        # Start with previous SOC
-        if i > 0:
-            soc[i] = soc[i - 1]
-
-        current_soc = soc[i]
-        available_energy_mwh = current_soc * battery_capacity_mwh
-        available_headroom_mwh = (soc_max - current_soc) * battery_capacity_mwh
-
-        # Up-regulation (discharge): limited by available energy above SOC_min
-        if up_mask.iloc[i]:
-            max_discharge = max(0.0, (current_soc - soc_min) * battery_capacity_mwh)
-            requested_discharge = energy_per_slot_mwh.iloc[i]
-            actual_discharge = min(requested_discharge, max_discharge)
-
-            actual_up_energy[i] = actual_discharge
-            # Update SOC: discharge reduces SOC
-            energy_from_battery = actual_discharge / discharge_efficiency  # Account for discharge inefficiency
-            soc[i] = max(soc_min, current_soc - (energy_from_battery / battery_capacity_mwh))
-
-        # Down-regulation (charge): limited by available headroom below SOC_max
-        elif down_mask.iloc[i]:
-            max_charge = max(0.0, available_headroom_mwh)
-            requested_charge = energy_per_slot_mwh.iloc[i]
-            actual_charge = min(requested_charge, max_charge)
-
-            actual_down_energy[i] = actual_charge
-            # Update SOC: charge increases SOC (with losses)
-            energy_to_battery = actual_charge * charge_efficiency  # Account for charge inefficiency
-            soc[i] = min(soc_max, current_soc + (energy_to_battery / battery_capacity_mwh))
-
-    return (
-        pd.Series(actual_up_energy, index=df.index),
-        pd.Series(actual_down_energy, index=df.index),
-        pd.Series(soc, index=df.index),
-    )
-
-
-
-@st.cache_data(show_spinner=False)
-def simulate_frequency_regulation_revenue_multi(
-    prices_eur: pd.DataFrame,
-    products: Dict[str, Dict[str, float]],
-    pay_down_as_positive: bool = True,
-    pay_down_positive_map: Optional[Dict[str, bool]] = None,
-    activation_factor_map: Optional[Dict[str, float]] = None,
-    calendars: Optional[Dict[str, pd.DataFrame]] = None,
-    system_imbalance_df: Optional[pd.DataFrame] = None,
-    activation_curve_map: Optional[Dict[str, pd.Series]] = None,
-    activation_price_mode: str = "market",
-    pay_as_bid_map: Optional[Dict[str, Dict[str, float]]] = None,
-    battery_power_mw: Optional[float] = None,
-    battery_capacity_mwh: Optional[float] = None,
-    initial_soc: float = 0.5,
-    soc_min: float = 0.1,
-    soc_max: float = 0.9,
-    round_trip_efficiency: float = 0.9,
-    enable_soc_tracking: bool = True,
-    merit_order_activation_rate: float = 0.5,
-) -> Dict:
-    """Multi-product simulation for FCR/aFRR/mFRR with SOC tracking and merit-order logic.
-
-    Parameters
-    ----------
-    battery_capacity_mwh : float, optional
-        Battery energy capacity in MWh. Required if enable_soc_tracking=True.
-    initial_soc : float, default 0.5
-        Initial State of Charge as fraction (0-1)
-    soc_min : float, default 0.1
-        Minimum allowed SOC (0-1)
-    soc_max : float, default 0.9
-        Maximum allowed SOC (0-1)
-    round_trip_efficiency : float, default 0.9
-        Battery round-trip efficiency (0-1)
-    enable_soc_tracking : bool, default True
-        Enable realistic SOC constraints on activation energy
-    merit_order_activation_rate : float, default 0.5
-        Conservative activation rate (0-1) to model merit-order dispatch.
-        Represents average probability of activation based on bid position.
-        0.3 = aggressive low bids (30% avg activation)
-        0.5 = mid-stack bids (50% avg activation)
-        0.7 = conservative high bids (70% avg activation)
-
-    Products format example:
-    {
-      'FCR': {'enabled': True, 'mw': 10, 'cap_eur_mw_h': 7.5, 'up_thr': 0.0, 'down_thr': 0.0},
-      'aFRR': {'enabled': True, 'mw': 15, 'cap_eur_mw_h': 5.0, 'up_thr': 0.0, 'down_thr': 0.0},
-      'mFRR': {'enabled': False, 'mw': 0,  'cap_eur_mw_h': 0.0, 'up_thr': 0.0, 'down_thr': 0.0},
-    }
-
-    Notes
-    -----
-    Romania Pay-as-Bid Regime (ANRE 2024):
-    - From July 2024 until December 31, 2026, balancing market uses pay-as-bid pricing
-    - Each provider receives their bid price, not the marginal market price
-    - Set activation_price_mode="pay_as_bid" and provide pay_as_bid_map
-    - After 2026, market may revert to marginal pricing (update activation_price_mode accordingly)
-    """
-    if prices_eur is None or prices_eur.empty:
-        return {'monthly_by_product': {}, 'totals_by_product': {}, 'combined_monthly': [], 'combined_totals': {'capacity_revenue_eur': 0.0, 'activation_revenue_eur': 0.0, 'total_revenue_eur': 0.0, 'months': 0}}
-
-    df = prices_eur.copy()
-    df['date'] = pd.to_datetime(df['date'])
-    df['month'] = df['date'].dt.to_period('M')
-
-    has_imbalance = (system_imbalance_df is not None) and (not system_imbalance_df.empty)
-
-    monthly_by_product: Dict[str, List[Dict]] = {}
-    totals_by_product: Dict[str, Dict[str, float]] = {}
-
-    # For combined monthly, accumulate by month label
-    combined_month_map: Dict[str, Dict[str, float]] = {}
-
-    for prod, cfg in products.items():
-        if not cfg.get('enabled'):
-            continue
-        mw = float(cfg.get('mw', 0.0))
-        cap = float(cfg.get('cap_eur_mw_h', 0.0))
-        up_thr = float(cfg.get('up_thr', 0.0))
-        down_thr = float(cfg.get('down_thr', 0.0))
-        if mw <= 0:
-            continue
-
-        rows = []
-        cap_total = 0.0
-        act_total = 0.0
-        # Merge with calendar if provided
-        if calendars and prod in calendars and calendars[prod] is not None and not calendars[prod].empty:
-            cal = calendars[prod].copy()
-            cal['date'] = pd.to_datetime(cal['date'])
-            merged = df.merge(cal, on=['date', 'slot'], how='left')
-            # Determine available MW per slot
-            if 'available_mw' in merged.columns:
-                avail_mw_series = merged['available_mw'].fillna(0.0).astype(float).clip(lower=0.0)
-                avail_mw_series = avail_mw_series.apply(lambda v: min(mw, v))
-            elif 'available' in merged.columns:
-                avail_mw_series = merged['available'].fillna(0).astype(float) * mw
-            else:
-                avail_mw_series = pd.Series([mw] * len(merged), index=merged.index)
-            merged['avail_mw'] = avail_mw_series
-        else:
-            merged = df.copy()
-            merged['avail_mw'] = mw
-
-        # Merge system imbalance if provided
-        if has_imbalance:
-            simbal = system_imbalance_df.copy()
-            simbal['date'] = pd.to_datetime(simbal['date'])
-            merged = merged.merge(simbal, on=['date','slot'], how='left')
-
-        for month, mdf in merged.groupby('month'):
-            hours_in_data = len(mdf) * 0.25
-
-            # ===== CAPACITY REVENUE (€/MW/h) =====
-            # Paid for availability regardless of activation
-            # Formula: Σ(available_MW × hours_per_slot × capacity_price)
-            # Example: 10 MW × 0.25h × 7.5 €/MW/h = 18.75€ per 15-min slot
-            slot_cap_mw = mdf['avail_mw']
-            if battery_power_mw is not None:
-                slot_cap_mw = np.minimum(slot_cap_mw, float(battery_power_mw))
-            cap_rev = float((slot_cap_mw * 0.25 * cap).sum())
-
-            # ===== ACTIVATION REVENUE (€/MWh) =====
-            # Paid for actual energy delivered when called upon
-            # Formula: Σ(activation_price × energy_delivered_MWh)
-            # Example: 210 €/MWh × 5 MWh = 1,050€ for one activation
-
-            # Check if DAMAS actual activation data is available
-            use_damas_activation = False
-            damas_up_col = None
-            damas_down_col = None
-            damas_up_price_col = None
-            damas_down_price_col = None
-
-            # Map product names to DAMAS column names
-            if prod == 'FCR' and 'fcr_activated_mwh' in mdf.columns:
-                use_damas_activation = True
-                damas_up_col = 'fcr_activated_mwh'
-                # FCR doesn't have separate up/down prices in DAMAS
-            elif prod == 'aFRR':
-                if 'afrr_up_activated_mwh' in mdf.columns and 'afrr_down_activated_mwh' in mdf.columns:
-                    use_damas_activation = True
-                    damas_up_col = 'afrr_up_activated_mwh'
-                    damas_down_col = 'afrr_down_activated_mwh'
-                    damas_up_price_col = 'afrr_up_price_eur'
-                    damas_down_price_col = 'afrr_down_price_eur'
-            elif prod == 'mFRR':
-                if 'mfrr_up_activated_mwh' in mdf.columns and 'mfrr_down_activated_mwh' in mdf.columns:
-                    use_damas_activation = True
-                    damas_up_col = 'mfrr_up_activated_mwh'
-                    damas_down_col = 'mfrr_down_activated_mwh'
-                    damas_up_price_col = 'mfrr_up_scheduled_price_eur'
-                    damas_down_price_col = 'mfrr_down_scheduled_price_eur'
-
-            if use_damas_activation:
-                # USE ACTUAL TSO ACTIVATION DATA (90-95% accuracy)
-                activation_method = "DAMAS_ACTUAL_TSO_ACTIVATION"
-
-                # Masks based on actual TSO activation (not price thresholds!)
-                if damas_up_col:
-                    up_mask = mdf[damas_up_col].fillna(0) > 0
-                else:
-                    up_mask = pd.Series(False, index=mdf.index)
-
-                if damas_down_col:
-                    down_mask = mdf[damas_down_col].fillna(0) > 0
-                else:
-                    down_mask = pd.Series(False, index=mdf.index)
-
-            else:
-                # FALLBACK: Price-based activation is a PROXY, not actual TSO dispatch
-                # Real FR energy comes from TSO activation signals, not price thresholds
-                activation_method = "price_threshold_only"
-
-                up_mask = mdf['price_eur_mwh'] >= up_thr
-                down_mask = mdf['price_eur_mwh'] <= -down_thr
-
-                if has_imbalance and ('imbalance_mw' in mdf.columns):
-                    # Filter to only activate when system imbalance direction matches
-                    up_mask = up_mask & (mdf['imbalance_mw'].fillna(0) > 0)
-                    down_mask = down_mask & (mdf['imbalance_mw'].fillna(0) < 0)
-                    activation_method = "price_threshold_with_imbalance_direction"
-
-            # Apply per-product activation factor (0..1)
-            act_factor_default = 1.0
-            if activation_factor_map and prod in activation_factor_map:
-                try:
-                    act_factor_default = max(0.0, float(activation_factor_map.get(prod, 1.0)))
-                except Exception:
-                    act_factor_default = 1.0
-
-            custom_activation = None
-            if activation_curve_map and prod in activation_curve_map:
-                custom_activation = activation_curve_map.get(prod)
-
-            if custom_activation is not None and not custom_activation.empty:
-                lookup_index = pd.MultiIndex.from_arrays([
-                    mdf['date'].values,
-                    mdf['slot'].astype(int).values,
-                ])
-                looked_up = custom_activation.reindex(lookup_index)
-                act_factor_series = pd.Series(looked_up.values, index=mdf.index)
-                act_factor_series = act_factor_series.fillna(act_factor_default).clip(lower=0.0, upper=1.0)
-            else:
-                act_factor_series = pd.Series(act_factor_default, index=mdf.index)
-
-            if use_damas_activation:
-                # USE ACTUAL MARKET ACTIVATION VOLUMES from DAMAS
-                # Calculate our share based on market total and our contracted MW
-
-                # Get total market activation volumes (MWh per 15-min slot)
-                market_up_mwh = mdf[damas_up_col].fillna(0) if damas_up_col else pd.Series(0, index=mdf.index)
-                market_down_mwh = mdf[damas_down_col].fillna(0) if damas_down_col else pd.Series(0, index=mdf.index)
-
-                # Our maximum activation per slot (MWh)
-                our_max_energy_per_slot = mdf['avail_mw'] * act_factor_series * 0.25
-                if battery_power_mw is not None:
-                    our_max_energy_per_slot = np.minimum(our_max_energy_per_slot, float(battery_power_mw) * 0.25)
-
-                # Our actual activation is limited by:
-                # 1. Market total activation (can't activate more than market needed)
-                # 2. Our contracted capacity
-                # 3. Merit-order position (not always dispatched)
-
-                # Calculate energy per slot using market data
-                energy_per_slot_up = np.minimum(our_max_energy_per_slot, market_up_mwh) * merit_order_activation_rate
-                energy_per_slot_down = np.minimum(our_max_energy_per_slot, market_down_mwh) * merit_order_activation_rate
-
-                # Combined energy series (will be split by up/down masks later)
-                energy_per_slot_series = pd.Series(0.0, index=mdf.index)
-                energy_per_slot_series[up_mask] = energy_per_slot_up[up_mask]
-                energy_per_slot_series[down_mask] = energy_per_slot_down[down_mask]
-
-            else:
-                # FALLBACK: Price-threshold based energy calculation
-                slot_act_mw = mdf['avail_mw'] * act_factor_series
-                # Battery power cap during activation
-                if battery_power_mw is not None:
-                    slot_act_mw = np.minimum(slot_act_mw, float(battery_power_mw))
-                if has_imbalance and 'imbalance_mw' in mdf.columns:
-                    imbalance_cap = pd.to_numeric(mdf['imbalance_mw'], errors='coerce').abs()
-                    capped = np.minimum(slot_act_mw, imbalance_cap)
-                    slot_act_mw = slot_act_mw.where(imbalance_cap.isna(), capped)
-                energy_per_slot_series = slot_act_mw * 0.25
-
-                # Apply merit-order activation rate (models realistic dispatch probability)
-                # This accounts for the fact that you're not always first in the merit order stack
-                energy_per_slot_series = energy_per_slot_series * merit_order_activation_rate
-
-            # Apply SOC tracking constraints if enabled and battery capacity is provided
-            if enable_soc_tracking and battery_capacity_mwh and battery_capacity_mwh > 0:
-                # Apply physical SOC constraints to activation energy
-                actual_up_energy, actual_down_energy, soc_series = apply_soc_constraints_to_activation(
-                    df=mdf.reset_index(drop=True),
-                    up_mask=up_mask.reset_index(drop=True),
-                    down_mask=down_mask.reset_index(drop=True),
-                    energy_per_slot_mwh=energy_per_slot_series.reset_index(drop=True),
-                    battery_capacity_mwh=battery_capacity_mwh,
-                    initial_soc=initial_soc,
-                    soc_min=soc_min,
-                    soc_max=soc_max,
-                    round_trip_efficiency=round_trip_efficiency,
-                )
-                # Overwrite planned energy with SOC-constrained energy
-                energy_per_slot_series = pd.Series(0.0, index=mdf.index)
-                energy_per_slot_series[up_mask] = actual_up_energy[up_mask.reset_index(drop=True)]
-                energy_per_slot_series[down_mask] = actual_down_energy[down_mask.reset_index(drop=True)]
-
-            # PRICING: Use DAMAS marginal prices when available
-            if use_damas_activation and damas_up_price_col and damas_up_price_col in mdf.columns:
-                # USE ACTUAL MARGINAL MARKET PRICES from DAMAS
-                up_price_series = mdf[damas_up_price_col].fillna(0)
-                if damas_down_price_col and damas_down_price_col in mdf.columns:
-                    down_price_series = mdf[damas_down_price_col].fillna(0)
-                else:
-                    down_price_series = up_price_series.copy()
-            else:
-                # FALLBACK: Use imbalance prices or pay-as-bid prices
-                price_series = mdf['price_eur_mwh']
-
-                activation_price_mode_lower = (activation_price_mode or "market").lower()
-                up_price_series = price_series.copy()
-                down_price_series = price_series.copy()
-
-                if activation_price_mode_lower == "pay_as_bid" and pay_as_bid_map and prod in pay_as_bid_map:
-                    pay_prices = pay_as_bid_map.get(prod, {})
-                    try:
-                        up_const = float(pay_prices.get('up_price', up_price_series.mean()))
-                    except Exception:
-                        up_const = float(up_price_series.mean()) if not up_price_series.empty else 0.0
-                    try:
-                        down_const = float(pay_prices.get('down_price', up_const))
-                    except Exception:
-                        down_const = up_const
-                    up_price_series = pd.Series(up_const, index=mdf.index)
-                    down_price_series = pd.Series(down_const, index=mdf.index)
-
-            up_rev = float((up_price_series[up_mask] * energy_per_slot_series[up_mask]).sum())
-            # Per-product override for down-activation settlement sign
-            prod_down_positive = pay_down_positive_map.get(prod, pay_down_as_positive) if pay_down_positive_map else pay_down_as_positive
-            if prod_down_positive:
-                down_rev = float((down_price_series[down_mask].abs() * energy_per_slot_series[down_mask]).sum())
-            else:
-                down_rev = float((down_price_series[down_mask] * energy_per_slot_series[down_mask]).sum())
-            act_rev = up_rev + down_rev
-            act_energy = float(energy_per_slot_series.sum())
-
-            # Calculate net energy position for hedging
-            # Up-regulation = discharge (need to buy back energy)
-            # Down-regulation = charge (sell energy)
-            up_energy = float(energy_per_slot_series[up_mask].sum())
-            down_energy = float(energy_per_slot_series[down_mask].sum())
-            net_energy = up_energy - down_energy  # Positive = net discharge, need to hedge
-
-            # Use hedge curve when available; otherwise use average PZU price for net position
-            hedge_prices = None
-            if 'hedge_price_eur_mwh' in mdf.columns:
-                try:
-                    hedge_prices = pd.to_numeric(mdf['hedge_price_eur_mwh'], errors='coerce')
-                except Exception:
-                    hedge_prices = None
-
-            if hedge_prices is not None and hedge_prices.notna().any():
-                # Use slot-by-slot PZU hedge prices
-                hedge_prices = hedge_prices.fillna(hedge_prices.mean())
-                energy_cost = float(
-                    (energy_per_slot_series[up_mask] * hedge_prices[up_mask]).sum()
-                    + (energy_per_slot_series[down_mask] * hedge_prices[down_mask]).sum()
-                )
-            else:
-                # Fallback: use monthly average PZU price for net position only
-                # This avoids double-counting - you only hedge the NET energy imbalance
-                if hedge_prices is not None:
-                    avg_hedge_price = hedge_prices.mean()
-                elif 'price_eur_mwh' in mdf.columns:
-                    avg_hedge_price = mdf['price_eur_mwh'].abs().mean()
-                else:
-                    avg_hedge_price = 50.0  # Fallback default
-                energy_cost = float(net_energy * avg_hedge_price) if net_energy > 0 else 0.0
-
-            # Calculate activation hours and events for debugging
-            activation_slots = int(up_mask.sum() + down_mask.sum())
-            activation_hours = activation_slots * 0.25
-
-            # Count "events" as threshold crossings (transitions from inactive to active)
-            combined_mask = up_mask | down_mask
-            activation_events = int((combined_mask.astype(int).diff() > 0).sum())
-
-            try:
-                total_rev = cap_rev + act_rev
-                cap_pct = (cap_rev / total_rev * 100) if total_rev > 0 else 0
-                act_pct = (act_rev / total_rev * 100) if total_rev > 0 else 0
-
-                print(
-                    f"[FR DEBUG] {prod} {month}: "
-                    f"CAPACITY={cap_rev:.2f}€ ({cap_pct:.0f}%) + "
-                    f"ACTIVATION={act_rev:.2f}€ ({act_pct:.0f}%) = "
-                    f"TOTAL={total_rev:.2f}€"
-                )
-                print(
-                    f"[FR DEBUG] {prod} {month}: "
-                    f"energy={act_energy:.2f}MWh hedge_cost={energy_cost:.2f}€ "
-                    f"net_profit={(cap_rev + act_rev - energy_cost):.2f}€ pricing={activation_price_mode_lower}"
-                )
-                print(
-                    f"[FR DEBUG] {prod} {month}: "
-                    f"activation_hours={activation_hours:.1f}h activation_slots={activation_slots} "
-                    f"activation_events={activation_events} "
-                    f"up_slots={int(up_mask.sum())} down_slots={int(down_mask.sum())}"
-                )
-                print(
-                    f"[FR DEBUG] {prod} {month}: "
-                    f"up_energy={up_energy:.2f}MWh down_energy={down_energy:.2f}MWh "
-                    f"net_energy={net_energy:.2f}MWh (positive=discharge)"
-                )
-                if activation_energy > 0:
-                    avg_price = act_rev / act_energy
-                    print(f"[FR DEBUG] {prod} {month}: avg_activation_price={avg_price:.2f}€/MWh")
-                if hedge_prices is not None and hedge_prices.notna().any():
-                    print(f"[FR DEBUG] {prod} {month}: using PZU hedge curve (avg={hedge_prices.mean():.2f}€/MWh)")
-                else:
-                    print(f"[FR DEBUG] {prod} {month}: using net position hedge (avg={avg_hedge_price:.2f}€/MWh)")
-                print(f"[FR DEBUG] {prod} {month}: activation_method={activation_method}")
-            except Exception:
-                pass
-
-            row = {
-                'month': str(month),
-                'hours_in_data': hours_in_data,
-                'capacity_revenue_eur': cap_rev,
-                'activation_revenue_eur': act_rev,
-                'total_revenue_eur': cap_rev + act_rev,
-                'up_slots': int(up_mask.sum()),
-                'down_slots': int(down_mask.sum()),
-                'activation_energy_mwh': act_energy,
-                'energy_cost_eur': energy_cost,
-            }
-            rows.append(row)
-            cap_total += cap_rev
-            act_total += act_rev
-
-            # Update combined monthly
-            mkey = str(month)
-            agg = combined_month_map.setdefault(mkey, {
-                'month': mkey,
-                'hours_in_data': 0.0,
-                'capacity_revenue_eur': 0.0,
-                'activation_revenue_eur': 0.0,
-                'total_revenue_eur': 0.0,
-                'up_slots': 0,
-                'down_slots': 0,
-                'activation_energy_mwh': 0.0,
-                'energy_cost_eur': 0.0,
-            })
-            agg['hours_in_data'] = max(agg['hours_in_data'], hours_in_data)
-            agg['capacity_revenue_eur'] += cap_rev
-            agg['activation_revenue_eur'] += act_rev
-            agg['total_revenue_eur'] += (cap_rev + act_rev)
-            agg['up_slots'] += int(up_mask.sum())
-            agg['down_slots'] += int(down_mask.sum())
-            agg['activation_energy_mwh'] += act_energy
-            agg['energy_cost_eur'] += energy_cost
-
-        rows.sort(key=lambda x: x['month'])
-        monthly_by_product[prod] = rows
-        totals_by_product[prod] = {
-            'capacity_revenue_eur': cap_total,
-            'activation_revenue_eur': act_total,
-            'total_revenue_eur': cap_total + act_total,
-            'energy_cost_eur': float(sum(r['energy_cost_eur'] for r in rows)),
-            'months': len(rows),
-        }
-
-    combined_monthly = sorted(combined_month_map.values(), key=lambda x: x['month'])
-    comb_cap = sum(r['capacity_revenue_eur'] for r in combined_monthly)
-    comb_act = sum(r['activation_revenue_eur'] for r in combined_monthly)
-    comb_cost = sum(r.get('energy_cost_eur', 0.0) for r in combined_monthly)
-    combined_totals = {
-        'capacity_revenue_eur': comb_cap,
-        'activation_revenue_eur': comb_act,
-        'total_revenue_eur': comb_cap + comb_act,
-        'energy_cost_eur': comb_cost,
-        'months': len(combined_monthly),
-    }
-
-    try:
-        comb_energy = sum(r.get('activation_energy_mwh', 0.0) for r in combined_monthly)
-        print(
-            f"[FR DEBUG] Combined totals: cap={comb_cap:.2f}€ act={comb_act:.2f}€ energy={comb_energy:.2f}MWh hedge_cost={comb_cost:.2f}€ months={len(combined_monthly)}",
-        )
-    except Exception:
-        pass
-
-    return {
-        'monthly_by_product': monthly_by_product,
-        'totals_by_product': totals_by_product,
-        'combined_monthly': combined_monthly,
-        'combined_totals': combined_totals,
-    }
-
 @st.cache_data(show_spinner=False)
 def analyze_pzu_best_hours(pzu_csv: str, start_year: int = 2023, window_months: int = 12) -> Dict:
     """Compute hour-of-day average prices and best buy/sell hours over a historical window."""
     if not pzu_csv or not Path(pzu_csv).exists():
         return {'error': 'PZU CSV not found'}
     try:
-        df = pd.read_csv(pzu_csv)
+        df = load_price_frame(pzu_csv)
         df['date'] = pd.to_datetime(df['date'])
         df['month'] = df['date'].dt.to_period('M')
         df = df[df['date'] >= pd.Timestamp(year=start_year, month=1, day=1)]
@@ -713,7 +91,7 @@ def analyze_pzu_best_hours_min_years(
     if not pzu_csv or not Path(pzu_csv).exists():
         return {'error': 'PZU CSV not found'}
     try:
-        df = pd.read_csv(pzu_csv)
+        df = load_price_frame(pzu_csv)
         if not {'date','hour','price'}.issubset(df.columns):
             return {'error': 'PZU CSV must contain columns: date,hour,price'}
         df['date'] = pd.to_datetime(df['date'])
@@ -768,7 +146,7 @@ def estimate_pzu_profit_window(
     if not pzu_csv or not Path(pzu_csv).exists():
         return {'error': 'PZU CSV not found'}
     try:
-        df = pd.read_csv(pzu_csv)
+        df = load_price_frame(pzu_csv)
         if not {'date','hour','price'}.issubset(df.columns):
             return {'error': 'PZU CSV must contain columns: date,hour,price'}
         df['date'] = pd.to_datetime(df['date'])
@@ -837,7 +215,7 @@ def plan_multi_hour_strategy_from_history(
     if not pzu_csv or not Path(pzu_csv).exists():
         return {'error': 'PZU CSV not found'}
     try:
-        df = pd.read_csv(pzu_csv)
+        df = load_price_frame(pzu_csv)
         if not {'date','hour','price'}.issubset(df.columns):
             return {'error': 'PZU CSV must contain columns: date,hour,price'}
         df['date'] = pd.to_datetime(df['date'])
@@ -1463,7 +841,7 @@ def render_frequency_regulation_simulator(cfg: dict) -> None:
                         fx_ron_per_eur=fx_rate,
                     )
                     if not hedge_curve.empty:
-                        imb_df = imb_df.merge(hedge_curve, on=['date', 'slot'], how='left')
+                        imb_df = attach_by_slot(imb_df, hedge_curve, ['hedge_price_eur_mwh'])
                         hedge_mask = imb_df['hedge_price_eur_mwh'].notna()
                         if hedge_mask.any():
                             hedge_coverage = float(hedge_mask.mean())
@@ -1541,7 +919,7 @@ def render_frequency_regulation_simulator(cfg: dict) -> None:
                     damas_path = project_root / "data" / "damas_complete_fr_dataset.csv"
                     if damas_path.exists():
                         try:
-                            damas_df = pd.read_csv(damas_path)
+                            damas_df = read_csv_cached(damas_path)
                             damas_df.columns = damas_df.columns.str.strip()
 
                             def _normalize_name(name: str) -> str:
@@ -1577,14 +955,10 @@ def render_frequency_regulation_simulator(cfg: dict) -> None:
                             damas_df['date'] = pd.to_datetime(damas_df['date']).dt.date.astype(str)
                             damas_df['slot'] = damas_df['slot'].astype(int)
 
-                            merge_cols = ['date', 'slot'] + [c for c in required_columns if c in damas_df.columns]
+                            merge_cols = [c for c in required_columns if c in damas_df.columns]
                             if 'system_imbalance_mwh' in damas_df.columns:
                                 merge_cols.append('system_imbalance_mwh')
-                            imb_df = imb_df.merge(
-                                damas_df[merge_cols],
-                                on=['date', 'slot'],
-                                how='left'
-                            )
+                            imb_df = attach_by_slot(imb_df, damas_df, merge_cols)
 
                             if energy_columns:
                                 coverage_values = [imb_df[col].notna().mean() for col in energy_columns if col in imb_df]
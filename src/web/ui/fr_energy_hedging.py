@@ -6,7 +6,7 @@ import pandas as pd
 import streamlit as st
 
 from src.data.data_provider import DataProvider
-from src.web.utils.formatting import format_currency, format_price_per_mwh
+from src.web.utils.formatting import format_clock_window, format_currency, format_price_per_mwh
 from src.web.utils.styles import section_header, kpi_card, kpi_grid
 
 try:
@@ -193,15 +193,11 @@ def render_fr_energy_hedging(
 
         display_years = []
         for _, row in best_years_df.iterrows():
-            buy = int(row["buy_hour"])
-            sell = int(row["sell_hour"])
-            buy_end = min(buy + 2, 24)
-            sell_end = min(sell + 2, 24)
             display_years.append(
                 {
                     "Year": str(int(row["year"])),
-                    "Charge window": f"{buy:02d}:00–{buy_end:02d}:00",
-                    "Discharge window": f"{sell:02d}:00–{sell_end:02d}:00",
+                    "Charge window": format_clock_window(row["buy_hour"], 2, separator="–"),
+                    "Discharge window": format_clock_window(row["sell_hour"], 2, separator="–"),
                     "Profit €": format_currency(row.get("profit_eur", 0.0), decimals=currency_decimals, thousands=thousands_sep),
                     "Revenue €": format_currency(row.get("revenue_eur", 0.0), decimals=currency_decimals, thousands=thousands_sep),
                     "Cost €": format_currency(row.get("cost_eur", 0.0), decimals=currency_decimals, thousands=thousands_sep),
@@ -7,16 +7,16 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
+from src.data.result_cache import clear_result_cache
 from src.web.config import project_root
 from src.web.analysis import compute_activation_factor_series
 from src.web.data import (
-    build_hedge_price_curve,
+    build_market_frame,
     find_in_data_dir,
     list_in_data_dir,
     require_any_data_file,
     require_data_file,
     load_system_imbalance_from_excel,
-    load_transelectrica_imbalance_from_excel,
     normalize_calendar_df,
     parse_battery_specs_from_document,
     read_calendar_df,
@@ -52,6 +52,7 @@ def render_frequency_regulation_simulator(
             if 'fr_' in key.lower() or 'market' in key.lower():
                 del st.session_state[key]
         st.cache_data.clear()
+        clear_result_cache()
         st.success("Session cache cleared! Click 'Compute Revenue' to regenerate with fresh data.")
         st.rerun()
 
@@ -432,9 +433,16 @@ def render_frequency_regulation_simulator(
 
     if export8_path:
         try:
-            imb_df = load_transelectrica_imbalance_from_excel(
+            # One aligned 15-minute table (imbalance prices, PZU hedge, DAMAS,
+            # system imbalance), built once per data version and reused by every run.
+            damas_path = project_root / "data" / "damas_complete_fr_dataset.csv"
+            imb_df = build_market_frame(
                 export8_path,
+                pzu_csv=provider.pzu_csv if provider else None,
+                damas_csv=str(damas_path) if damas_path.exists() else None,
+                system_imbalance_path=sysimb_path or None,
                 fx_ron_per_eur=(1.0 if excel_currency == 'EUR' else fx_rate),
+                pzu_fx_ron_per_eur=fx_rate,
                 declared_currency=excel_currency,
             )
             if not imb_df.empty and any(v.get('enabled') and v.get('mw', 0) > 0 for v in products_cfg.values()):
@@ -487,14 +495,7 @@ def render_frequency_regulation_simulator(
                 hedge_coverage = 0.0
                 hedge_avg = None
                 if provider and provider.pzu_csv and not price_dates_ts.empty:
-                    hedge_curve = build_hedge_price_curve(
-                        provider.pzu_csv,
-                        start_date=price_dates_ts.min(),
-                        end_date=price_dates_ts.max(),
-                        fx_ron_per_eur=fx_rate,
-                    )
-                    if not hedge_curve.empty:
-                        imb_df = imb_df.merge(hedge_curve, on=['date', 'slot'], how='left')
+                    if 'hedge_price_eur_mwh' in imb_df.columns:
                         hedge_mask = imb_df['hedge_price_eur_mwh'].notna()
                         if hedge_mask.any():
                             hedge_coverage = float(hedge_mask.mean())
@@ -528,51 +529,15 @@ def render_frequency_regulation_simulator(
                 price_dates = pd.to_datetime(imb_df['date'], errors='coerce').dropna().dt.normalize().unique()
                 has_imbalance_flag = bool(activation_curves_map)
 
-                # Check if DAMAS activation data is available
-                # First, check if imb_df already contains DAMAS columns (embedded in the CSV)
-                has_damas_embedded = 'afrr_up_activated_mwh' in imb_df.columns and 'afrr_down_activated_mwh' in imb_df.columns
-
-                if has_damas_embedded:
-                    # DAMAS columns already present in imb_df - no merge needed!
-                    use_damas = True
-                    damas_coverage = (imb_df['afrr_up_activated_mwh'].notna()).mean()
-                    st.info(f"✅ DAMAS activation columns already present in imbalance data (embedded mode)")
-                else:
-                    # Try to merge from separate DAMAS file
-                    damas_path = project_root / "data" / "damas_complete_fr_dataset.csv"
-                    use_damas = damas_path.exists()
-
-                    if use_damas:
-                        try:
-                            # Load DAMAS data
-                            damas_df = pd.read_csv(damas_path)
-                            damas_df['date'] = pd.to_datetime(damas_df['date']).dt.date.astype(str)
-                            damas_df['slot'] = damas_df['slot'].astype(int)
-
-                            # Merge DAMAS activation data with imbalance prices
-                            imb_df = imb_df.merge(
-                                damas_df[['date', 'slot', 'fcr_activated_mwh', 'afrr_up_activated_mwh', 'afrr_down_activated_mwh',
-                                         'mfrr_up_activated_mwh', 'mfrr_down_activated_mwh', 'afrr_up_price_eur',
-                                         'afrr_down_price_eur', 'mfrr_up_scheduled_price_eur', 'mfrr_down_scheduled_price_eur',
-                                         'system_imbalance_mwh']],
-                                on=['date', 'slot'],
-                                how='left'
-                            )
-
-                            # Count how many slots have DAMAS data
-                            damas_coverage = (imb_df['afrr_up_activated_mwh'].notna()).mean()
-                            st.info(f"✅ DAMAS activation data merged from separate file")
-                        except Exception as e:
-                            st.warning(f"⚠️ DAMAS data available but couldn't merge: {e}. Using price-based method.")
-                            use_damas = False
-                            damas_coverage = 0.0
+                # DAMAS activation data, embedded in the imbalance CSV or aligned
+                # from the separate DAMAS file by the market frame builder
+                use_damas = 'afrr_up_activated_mwh' in imb_df.columns and 'afrr_down_activated_mwh' in imb_df.columns
+                damas_coverage = 0.0
 
                 if use_damas:
+                    damas_coverage = (imb_df['afrr_up_activated_mwh'].notna()).mean()
+                    st.info("✅ DAMAS activation data aligned with imbalance prices")
                     try:
-                        # Count how many slots have DAMAS data (already set above if embedded)
-                        if not has_damas_embedded:
-                            damas_coverage = (imb_df['afrr_up_activated_mwh'].notna()).mean()
-
                         # Calculate market statistics
                         afrr_activations = imb_df['afrr_up_activated_mwh'].notna().sum()
                         mfrr_activations = imb_df['mfrr_up_activated_mwh'].notna().sum()
@@ -625,7 +590,7 @@ def render_frequency_regulation_simulator(
                     pay_down_positive_map=paydown_map,
                     activation_factor_map=act_map,
                     calendars=calendars_cfg,
-                    system_imbalance_df=sysimb_df,
+                    system_imbalance_df=None if 'imbalance_mw' in imb_df.columns else sysimb_df,
                     activation_curve_map=activation_curves_map,
                     activation_price_mode=activation_price_mode,
                     pay_as_bid_map=pay_as_bid_map if activation_price_mode == 'pay_as_bid' else None,
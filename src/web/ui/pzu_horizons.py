@@ -18,6 +18,7 @@ import streamlit as st
 from matplotlib import pyplot as plt
 
 from src.data.data_provider import DataProvider
+from src.data.result_cache import cached_result
 from src.web.analysis import (
     analyze_historical_monthly_trends_only,
     analyze_pzu_best_hours_min_years,
@@ -26,6 +27,7 @@ from src.web.analysis import (
 )
 from src.web.utils import safe_pyplot_figure
 from src.web.utils.formatting import (
+    format_clock_window,
     format_currency,
     format_percent,
     format_price_per_mwh,
@@ -37,8 +39,11 @@ from src.ml.pzu_predictor import PZUPredictor, create_prediction_summary
 try:
     from src.strategy.horizon import (
         compute_best_fixed_cycle,
+        compute_multi_cycle_schedule,
+        compute_optimal_dispatch,
         load_pzu_daily_history,
         load_pzu_price_series,
+        profit_window_curve,
         summarize_profit_windows,
     )
 except ImportError:
@@ -47,9 +52,19 @@ except ImportError:
         load_pzu_daily_history,
         summarize_profit_windows,
     )
+    def profit_window_curve(*_args, **_kwargs):
+        return pd.DataFrame()
+    compute_optimal_dispatch = None
+    compute_multi_cycle_schedule = None
     def load_pzu_price_series(*_args, **_kwargs):
         return pd.DataFrame(columns=["date", "avg_price_eur_mwh"])
 
+compute_best_fixed_cycle = cached_result("horizon.compute_best_fixed_cycle")(compute_best_fixed_cycle)
+if compute_optimal_dispatch is not None:
+    compute_optimal_dispatch = cached_result("horizon.compute_optimal_dispatch")(compute_optimal_dispatch)
+if compute_multi_cycle_schedule is not None:
+    compute_multi_cycle_schedule = cached_result("horizon.compute_multi_cycle_schedule")(compute_multi_cycle_schedule)
+
 
 def render_pzu_horizons(
     *,
@@ -210,18 +225,98 @@ def render_pzu_horizons(
         ),
         kpi_card(
             "Charge Window",
-            f"{buy_hour:02d}:00 - {(buy_hour+2):02d}:00",
+            format_clock_window(buy_hour, result.get("charge_hours", 2)),
             "Optimal hours to charge battery"
         ),
         kpi_card(
             "Discharge Window",
-            f"{sell_hour:02d}:00 - {(sell_hour+2):02d}:00",
+            format_clock_window(sell_hour, result.get("discharge_hours", 2)),
             "Optimal hours to sell energy"
         )
     ]
 
     kpi_grid(cards, columns=4)
 
+    if compute_optimal_dispatch is not None:
+        with st.expander("Heuristic vs Optimal Dispatch"):
+            st.caption(
+                "Perfect-foresight hourly dispatch (any charge/discharge/idle pattern within "
+                "power and capacity limits) versus the fixed 2-hour schedule above."
+            )
+            if st.checkbox("Compute optimal dispatch", value=False, key="pzu_optimal_dispatch"):
+                pzu_cfg = cfg.get("strategy", {}).get("pzu", {})
+                carry_soc = st.checkbox("Carry SOC across days", value=True, key="pzu_optimal_carry_soc")
+                with st.spinner("Solving optimal dispatch..."):
+                    optimal = compute_optimal_dispatch(
+                        provider.pzu_csv,
+                        capacity_mwh=capacity_mwh,
+                        power_mw=power_mw,
+                        round_trip_efficiency=eta_rt,
+                        min_hours_per_day=24,
+                        start_date=history_start,
+                        end_date=history_end,
+                        carry_soc=carry_soc,
+                        enforce_soc_end_equal_start=bool(pzu_cfg.get("enforce_soc_end_equal_start", True)),
+                    )
+                optimal_stats = optimal.get("stats", {})
+                if optimal_stats:
+                    heuristic_profit = float(stats.get("total_profit_eur", 0.0))
+                    optimal_profit = float(optimal_stats.get("total_profit_eur", 0.0))
+                    compare_cols = st.columns(4)
+                    compare_cols[0].metric(
+                        "Fixed 2h Profit",
+                        format_currency(heuristic_profit, decimals=0, thousands=thousands_sep),
+                    )
+                    compare_cols[1].metric(
+                        "Optimal Profit",
+                        format_currency(optimal_profit, decimals=0, thousands=thousands_sep),
+                    )
+                    compare_cols[2].metric(
+                        "Captured by Heuristic",
+                        format_percent(heuristic_profit / optimal_profit * 100 if optimal_profit > 0 else 0.0),
+                    )
+                    compare_cols[3].metric(
+                        "Cycles / Day",
+                        f"{optimal_stats.get('total_cycles', 0.0) / max(optimal_stats.get('total_days', 1), 1):.2f}",
+                    )
+
+    if compute_multi_cycle_schedule is not None:
+        with st.expander("Multiple Cycles per Day"):
+            cycles_target = int(cfg.get("strategy", {}).get("pzu", {}).get("daily_cycles_target", 1))
+            cycles_day = st.slider(
+                "Cycles per day",
+                1,
+                3,
+                min(max(cycles_target, 1), 3),
+                key="pzu_cycles_per_day",
+                help="Best non-overlapping 2h charge → 2h discharge cycles each day (defaults to daily_cycles_target)",
+            )
+            multi = compute_multi_cycle_schedule(
+                provider.pzu_csv,
+                capacity_mwh=capacity_mwh,
+                power_mw=power_mw,
+                round_trip_efficiency=eta_rt,
+                cycles_per_day=cycles_day,
+                min_hours_per_day=24,
+                start_date=history_start,
+                end_date=history_end,
+            )
+            multi_stats = multi.get("stats", {})
+            if multi_stats:
+                multi_cols = st.columns(3)
+                multi_cols[0].metric(
+                    f"Profit ({cycles_day} cycle{'s' if cycles_day > 1 else ''}/day)",
+                    format_currency(multi_stats.get("total_profit_eur", 0.0), decimals=0, thousands=thousands_sep),
+                )
+                multi_cols[1].metric(
+                    "Days Using 2+ Cycles",
+                    f"{multi_stats.get('multi_cycle_days', 0):,}",
+                )
+                multi_cols[2].metric(
+                    "Avg Cycles / Day",
+                    f"{multi_stats.get('total_cycles', 0) / max(multi_stats.get('total_days', 1), 1):.2f}",
+                )
+
     # ========================================================================
     # SECTION 3: FINANCIAL BREAKDOWN
     # ========================================================================
@@ -319,6 +414,21 @@ def render_pzu_horizons(
             if display_windows:
                 st.dataframe(pd.DataFrame(display_windows), use_container_width=True, hide_index=True)
 
+        curve = profit_window_curve(result.get("daily_history", pd.DataFrame()))
+        if not curve.empty:
+            st.markdown("#### Best vs Worst Window by Length")
+            with safe_pyplot_figure(figsize=(10, 4)) as (fig, ax):
+                ax.plot(curve["window_days"], curve["best_total_eur"], color="#2ca02c", label="Best window")
+                ax.plot(curve["window_days"], curve["worst_total_eur"], color="#d62728", label="Worst window")
+                ax.fill_between(curve["window_days"], curve["worst_total_eur"], curve["best_total_eur"], color="#1f77b4", alpha=0.1)
+                ax.axhline(0, color="grey", linewidth=0.8)
+                ax.set_xlabel("Window length (days)")
+                ax.set_ylabel("Profit (EUR)")
+                ax.set_title("Profit Range by Holding Window")
+                ax.legend()
+                ax.grid(alpha=0.3)
+                st.pyplot(fig)
+
     with tab3:
         st.markdown("### Daily Trading Results")
         daily_hist = result.get("daily_history", pd.DataFrame())
@@ -4,6 +4,7 @@ from .formatting import (
     format_currency,
     format_percent,
     format_price_per_mwh,
+    format_clock_window,
     get_status_indicator,
     get_chart_colors,
     styled_table,
@@ -15,6 +16,7 @@ __all__ = [
     "format_currency",
     "format_percent",
     "format_price_per_mwh",
+    "format_clock_window",
     "get_status_indicator",
     "get_chart_colors",
     "styled_table",
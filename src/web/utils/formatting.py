@@ -75,6 +75,18 @@ def format_price_per_mwh(value: Optional[float], decimals: int = 2) -> str:
         return str(value)
 
 
+def format_clock_window(start_hour: Optional[float], length_hours: float, separator: str = " - ") -> str:
+    """Return ``HH:MM - HH:MM`` for a block starting at ``start_hour`` (15-minute starts allowed)."""
+    try:
+        if start_hour is None or pd.isna(start_hour):
+            return "—"
+        start = int(round(float(start_hour) * 60))
+        end = min(start + int(round(float(length_hours) * 60)), 24 * 60)
+        return f"{start // 60:02d}:{start % 60:02d}{separator}{end // 60:02d}:{end % 60:02d}"
+    except Exception:
+        return str(start_hour)
+
+
 def styled_table(
     df: pd.DataFrame,
     *,
@@ -127,6 +139,7 @@ __all__ = [
     "format_currency",
     "format_percent",
     "format_price_per_mwh",
+    "format_clock_window",
     "get_status_indicator",
     "styled_table",
     "get_chart_colors",